@@ -0,0 +1,49 @@
+-- Conteo de referencias para objetos de Storage direccionados por contenido.
+-- Ejecutar en el SQL Editor de Supabase.
+
+create table if not exists public.storage_refs (
+    bucket      text        not null,
+    path        text        not null,
+    sha256      text,
+    size        bigint,
+    ref_count   integer     not null default 0,
+    updated_at  timestamptz not null default now(),
+    primary key (bucket, path)
+);
+
+-- Incrementa (o crea) la referencia y retorna el nuevo total.
+create or replace function public.storage_ref_incrementar(
+    p_bucket text, p_path text, p_sha256 text default null, p_size bigint default null
+) returns integer
+language sql security definer set search_path = public as $$
+    insert into public.storage_refs as r (bucket, path, sha256, size, ref_count)
+    values (p_bucket, p_path, p_sha256, p_size, 1)
+    on conflict (bucket, path)
+    do update set ref_count = r.ref_count + 1, updated_at = now()
+    returning ref_count;
+$$;
+
+-- Decrementa la referencia. Retorna el total restante (0 = se puede borrar el
+-- objeto) o NULL si el objeto no está registrado (objetos anteriores al CAS).
+create or replace function public.storage_ref_decrementar(p_bucket text, p_path text)
+returns integer
+language plpgsql security definer set search_path = public as $$
+declare
+    restante integer;
+begin
+    update public.storage_refs
+       set ref_count = greatest(ref_count - 1, 0), updated_at = now()
+     where bucket = p_bucket and path = p_path
+    returning ref_count into restante;
+
+    if restante = 0 then
+        delete from public.storage_refs
+         where bucket = p_bucket and path = p_path and ref_count = 0;
+    end if;
+
+    return restante;
+end;
+$$;
+
+grant execute on function public.storage_ref_incrementar(text, text, text, bigint) to authenticated;
+grant execute on function public.storage_ref_decrementar(text, text) to authenticated;
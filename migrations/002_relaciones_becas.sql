@@ -0,0 +1,27 @@
+-- Llaves foráneas medallas/documentos -> becas.
+-- PostgREST las usa para detectar la relación y permitir consultas embebidas:
+--     select=*,medallas(*),documentos(*)
+-- Ejecutar en el SQL Editor de Supabase.
+
+do $$
+begin
+    if not exists (select 1 from pg_constraint where conname = 'medallas_atleta_id_fkey') then
+        -- NOT VALID: no revisa filas existentes (puede haber medallas huérfanas antiguas)
+        alter table public.medallas
+            add constraint medallas_atleta_id_fkey
+            foreign key (atleta_id) references public.becas (id) on delete cascade not valid;
+    end if;
+
+    if not exists (select 1 from pg_constraint where conname = 'documentos_atleta_id_fkey') then
+        alter table public.documentos
+            add constraint documentos_atleta_id_fkey
+            foreign key (atleta_id) references public.becas (id) on delete cascade not valid;
+    end if;
+end $$;
+
+-- Índices para filtrar por atleta y ordenar por fecha sin recorrer la tabla
+create index if not exists medallas_atleta_created_idx   on public.medallas   (atleta_id, created_at desc);
+create index if not exists documentos_atleta_created_idx on public.documentos (atleta_id, created_at desc);
+
+-- Recargar la caché de esquema de PostgREST para que vea las relaciones nuevas
+notify pgrst, 'reload schema';
@@ -0,0 +1,28 @@
+-- Cédula única en becas: la importación masiva hace upsert por cédula
+--     upsert(..., on_conflict='cedula')
+-- y PostgREST necesita un índice único sobre esa columna.
+-- Ejecutar en el SQL Editor de Supabase.
+
+-- 1. Normalizar al formato que guarda la aplicación (utils/esquema_atleta.py): V-12345678
+update public.becas
+   set cedula = coalesce(substring(upper(regexp_replace(cedula, '[\s.]', '', 'g')) from '^([VE])'), 'V')
+             || '-' || substring(regexp_replace(cedula, '[\s.]', '', 'g') from '(\d{7,8})$')
+ where regexp_replace(cedula, '[\s.]', '', 'g') ~* '^[VE]?-?\d{7,8}$'
+   and cedula !~ '^[VE]-\d{7,8}$';
+
+-- 2. Crear el índice solo si no quedan cédulas repetidas
+do $$
+declare
+    repetidas integer;
+begin
+    if not exists (select 1 from pg_indexes where schemaname = 'public' and indexname = 'becas_cedula_key') then
+        select count(*) into repetidas
+          from (select cedula from public.becas where cedula is not null group by cedula having count(*) > 1) r;
+        if repetidas > 0 then
+            raise exception 'Hay % cédulas repetidas en becas. Revíselas con: select cedula, count(*) from becas group by cedula having count(*) > 1', repetidas;
+        end if;
+        create unique index becas_cedula_key on public.becas (cedula);
+    end if;
+end $$;
+
+notify pgrst, 'reload schema';
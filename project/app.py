@@ -7,24 +7,25 @@ from dotenv import load_dotenv
 
 # Importaciones de nuestros módulos
 from config.supabase_client import supabase
+from config.registro_logs import configurar_logging
 from utils.rate_limiter import limiter
 from blueprints.dashboard import dashboard_blueprint
 from blueprints.auth import auth_blueprint
+from blueprints.media import media_blueprint
 from utils.security_headers import add_security_headers
+from utils.tiempos_peticion import registrar_en_app as registrar_tiempos
+from utils.metricas import registrar_en_app as registrar_metricas
+from utils.detector_n1 import registrar_en_app as registrar_detector_n1
+from utils.perfilador import registrar_en_app as registrar_perfilador
+from utils.memoria import registrar_en_app as registrar_memoria
 
 
 # --- Cargar variables de entorno ---
 load_dotenv()
 
 # --- Configuración de Logging ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
-)
+# Asíncrono (cola + hilo escritor), JSON por líneas con rotación (ver config/registro_logs.py)
+configurar_logging()
 logger = logging.getLogger(__name__)
 
 # --- Configuración de la App ---
@@ -61,6 +62,24 @@ app.register_blueprint(dashboard_blueprint, url_prefix='/dashboard')
 # --- Registrar el Blueprint de Autenticación ---
 app.register_blueprint(auth_blueprint, url_prefix='/')
 
+# --- Registrar el Blueprint del proxy de imágenes (opcional, MEDIA_PROXY_ENABLED) ---
+app.register_blueprint(media_blueprint, url_prefix='/media')
+
+# --- Server-Timing y log de acceso (llamadas a Supabase y render por request) ---
+registrar_tiempos(app)
+
+# --- Métricas Prometheus (GET /metrics) ---
+registrar_metricas(app)
+
+# --- Detector de consultas N+1 (N1_DETECTOR=1 en desarrollo/staging) ---
+registrar_detector_n1(app)
+
+# --- Perfilado bajo demanda (token de superadmin en X-Perfilar) ---
+registrar_perfilador(app)
+
+# --- Monitor de memoria por worker y reciclado por RSS (MEMORIA_MAX_MB) ---
+registrar_memoria(app)
+
 # --- Security Headers ---
 @app.after_request
 def apply_security_headers(response):
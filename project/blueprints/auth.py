@@ -353,6 +353,13 @@ def reset_password():
         if password != confirm_password:
             flash('Las contraseñas no coinciden.', 'error')
             return render_template('reset_password.html', access_token=access_token, refresh_token=refresh_token)
+
+        es_valida, errores, _ = validar_fortaleza_password(password)
+        if not es_valida:
+            flash('Tu contraseña no cumple con los requisitos de seguridad:', 'error')
+            for error in errores:
+                flash(f'  • {error}', 'error')
+            return render_template('reset_password.html', access_token=access_token, refresh_token=refresh_token)
             
         if not access_token:
             flash('Token de recuperación inválido o expirado. Por favor solicita uno nuevo.', 'error')
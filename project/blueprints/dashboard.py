@@ -2,14 +2,45 @@ import base64
 import os
 import random
 import logging
+import tempfile
 from datetime import datetime
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, send_file, jsonify
-from urllib.parse import urlparse, unquote
-import re
+from flask import (
+    Blueprint, render_template, request, redirect, url_for, flash, session, send_file, jsonify,
+    Response, stream_with_context, abort, current_app
+)
 from config.supabase_client import supabase, supabase_admin
 from utils.decorators import login_required, superadmin_required
 from utils.file_handler import procesar_imagen, procesar_pdf
+from utils.almacenamiento_cas import liberar_referencia
+from utils.firmador_urls import firmar_documentos
+from utils.concurrencia import ejecutar_en_paralelo
+from utils.repositorio_becas import obtener_atleta_completo, aplicar_filtros, iterar_becas
+from utils.exportador_becas import exportar_becas_xlsx, COLUMNAS_SELECT, MIMETYPE_XLSX
+from utils.exportador_datos import (
+    parsear_columnas, columnas_select, generar_csv, escribir_parquet, parquet_disponible, ColumnaInvalida
+)
+from utils.exportador_fichas import (
+    zip_fichas, reservar_exportacion, liberar_exportacion, obtener_progreso, ExportacionOcupada
+)
 from utils.excel_generator import generar_ficha_excel
+from utils.ficha_pdf import obtener_ficha_pdf, GeneradorOcupado
+from utils.password_strength import validar_fortaleza_password
+from utils.tiempos_peticion import medir
+from utils.perfilador import (
+    CABECERA as CABECERA_PERFIL, PARAMETRO as PARAMETRO_PERFIL, TTL_TOKEN as TTL_TOKEN_PERFIL,
+    generar_token, leer_reporte, listar_perfiles, ruta_pstats,
+)
+from utils.memoria import obtener_monitor, reportes_workers
+from utils.esquema_atleta import validar_atleta, mensajes_por_campo, ErrorCampo, cedula as normalizar_cedula
+from utils.importador_becas import iniciar_importacion, estado_importacion
+from utils.indice_cedulas import (
+    cedula_registrada, buscar_por_cedula, registrar_cedula, invalidar_indice, clave_cedula
+)
+from blueprints.media import url_medios
+from utils.galeria import (
+    obtener_slots, slot_valido, iniciar_trabajo, estado_trabajo, procesar_lote, MAX_IMAGENES_LOTE
+)
+from utils.procesador_imagenes import MAX_BYTES_ARCHIVO, ProcesadorOcupado
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +99,15 @@ def obtener_disciplinas_disponibles():
         # Fallback a lista básica
         return ['Atletismo', 'Baloncesto', 'Béisbol', 'Boxeo', 'Ciclismo', 'Fútbol', 'Gimnasia', 'Natación', 'Taekwondo', 'Tenis de Campo', 'Tenis de Mesa', 'Voleibol']
 
+# --- HELPER PARA LOS FILTROS DEL LISTADO ---
+def leer_filtros_becas(req):
+    """Filtros del listado de atletas (los comparten el listado y la exportación)."""
+    return {
+        'disciplina': req.args.get('disciplina'),
+        'busqueda': req.args.get('buscar', '').strip(),
+        'estatus': req.args.get('estatus'),
+    }
+
 # --- HELPER PARA RECOLECTAR DATOS DEL FORMULARIO ---
 def obtener_datos_formulario(req):
     """Extrae todos los campos del formulario para crear o editar."""
@@ -127,49 +167,6 @@ def obtener_datos_formulario(req):
     }
     return datos
 
-def get_signed_url_for_doc(doc_url):
-    """Genera una URL firmada válida por 1 hora para un documento."""
-    try:
-        if not doc_url: return doc_url
-        
-        # Normalizar URL y quitar query params si existen
-        decoded_url = unquote(doc_url).split('?')[0]
-        
-        # Regex para extraer bucket y path
-        # Soporta: .../object/public/<bucket>/<filepath>
-        match = re.search(r'/object/public/([^/]+)/(.*)', decoded_url)
-        
-        if match:
-            bucket_name = match.group(1)
-            file_path = match.group(2)
-
-            print(f"DEBUG SIGN: Bucket detected: '{bucket_name}', Path: '{file_path}'")
-            
-            # Generar Signed URL
-            res = supabase_admin.storage.from_(bucket_name).create_signed_url(file_path, 3600)
-            
-            signed_url = None
-            if isinstance(res, dict):
-                 signed_url = res.get('signedURL')
-            elif hasattr(res, 'signedURL'):
-                 signed_url = res.signedURL
-            elif isinstance(res, str):
-                 signed_url = res
-            
-            if signed_url:
-                return signed_url
-            else:
-                 logger.error(f"Error signing URL: {res}")
-                 return doc_url
-        else:
-            # Fallback para URLs que no siguen el patrón standard de Supabase
-            # o si es un bucket privado con otra estructura
-            return doc_url
-            
-    except Exception as e:
-        logger.warning(f"Error generanda signed URL para {doc_url}: {e}")
-        return doc_url
-
 # --- CONTEXT PROCESSOR ---
 @dashboard_blueprint.context_processor
 def inject_role():
@@ -210,9 +207,8 @@ def index():
         # Cargar imágenes independientes para el carrusel (Slots: home_1 a home_6)
         carousel_photos = []
         try:
-            gallery_data = supabase.table('gallery_images').select('*').execute()
-            # Crear un mapa para acceso rápido
-            slots_map = {img['slot']: img['image_data'] for img in gallery_data.data if img['slot'].startswith('home_')}
+            # Mapa slot -> URL desde la caché compartida
+            slots_map = {slot: url_medios(url) for slot, url in obtener_slots('home_').items()}
             
             for i in range(1, 13):
                 slot_id = f'home_{i}'
@@ -252,8 +248,9 @@ def index():
 @login_required
 def lista_becas():
     """Lista de becas con filtro por disciplina, búsqueda por nombre y paginación."""
-    filtro = request.args.get('disciplina')
-    busqueda = request.args.get('buscar', '').strip()
+    filtros = leer_filtros_becas(request)
+    filtro = filtros['disciplina']
+    busqueda = filtros['busqueda']
     page = request.args.get('page', 1, type=int)
     per_page = 10
     
@@ -261,15 +258,8 @@ def lista_becas():
         start = (page - 1) * per_page
         end = start + per_page - 1
         
-        query = supabase.table('becas').select('*', count='exact')
-        
-        # Filtrar por disciplina
-        if filtro and filtro != 'Todas':
-            query = query.eq('disciplina', filtro)
-        
-        # Búsqueda por nombre o apellido (case-insensitive)
-        if busqueda:
-            query = query.or_(f"nombre.ilike.%{busqueda}%,apellido.ilike.%{busqueda}%")
+        # Filtros por disciplina, estatus y búsqueda por nombre o apellido
+        query = aplicar_filtros(supabase.table('becas').select('*', count='exact'), **filtros)
         
         result = query.order('id', desc=True).range(start, end).execute()
         becas = result.data
@@ -282,8 +272,7 @@ def lista_becas():
         # Cargar imágenes de galería para los laterales (hasta 6 slots por lado)
         gallery_images = {'left': [], 'right': []}
         try:
-            gallery_data = supabase.table('gallery_images').select('*').execute()
-            slots_map = {img['slot']: img['image_data'] for img in gallery_data.data}
+            slots_map = {slot: url_medios(url) for slot, url in obtener_slots().items()}
             
             # Preparar pools de hasta 6 slots
             left_pool = []
@@ -319,6 +308,7 @@ def lista_becas():
                              disciplinas=lista_d, 
                              current_filter=filtro,
                              current_search=busqueda,
+                             current_estatus=filtros['estatus'],
                              gallery_images=gallery_images,
                              page=page,
                              total_pages=total_pages,
@@ -328,6 +318,190 @@ def lista_becas():
         flash(f'Error al cargar listado: {e}', 'error')
         return render_template('dashboard_becas.html', becas=[], disciplinas=[], page=1, total_pages=1, total=0, current_search='', gallery_images={})
 
+# --- EXPORTACIONES (EXCEL, DATOS Y FICHAS) ---
+@dashboard_blueprint.route('/becas/exportar')
+@login_required
+def exportar_becas():
+    """
+    Exporta a Excel todos los atletas que cumplen los filtros del listado.
+    Solo admins: la planilla incluye cuenta bancaria, contacto y representante.
+    """
+    if session.get('role', 'usuario') not in ['admin', 'superadmin']:
+        flash('No tienes permisos para exportar atletas.', 'error')
+        return redirect(url_for('dashboard.lista_becas'))
+
+    filtros = leer_filtros_becas(request)
+    try:
+        # El .xlsx se arma en un archivo temporal (se borra al cerrar la respuesta)
+        archivo = tempfile.TemporaryFile()
+        with medir('xlsx', 'exportacion'):
+            total = exportar_becas_xlsx(iterar_becas(COLUMNAS_SELECT, **filtros), archivo)
+        archivo.seek(0)
+        
+        logger.info(f"Exportación de atletas: {total} filas, filtros={filtros}")
+        nombre = f"atletas_{datetime.now().strftime('%Y%m%d')}.xlsx"
+        return send_file(archivo, mimetype=MIMETYPE_XLSX, as_attachment=True, download_name=nombre)
+    except Exception as e:
+        logger.error(f"Error exportando atletas: {e}", exc_info=True)
+        flash(f'Error al exportar: {e}', 'error')
+        return redirect(url_for('dashboard.lista_becas', disciplina=filtros['disciplina'],
+                                buscar=filtros['busqueda'], estatus=filtros['estatus']))
+
+@dashboard_blueprint.route('/export/becas.<formato>')
+@login_required
+def exportar_datos_becas(formato):
+    """
+    Exporta la tabla becas en CSV o Parquet para análisis.
+    Acepta los filtros del listado y ?columnas=id,nombre,... (proyección).
+    """
+    if formato not in ('csv', 'parquet'):
+        return jsonify({'error': 'Formato no soportado'}), 404
+    
+    try:
+        columnas = parsear_columnas(request.args.get('columnas'))
+    except ColumnaInvalida as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filtros = leer_filtros_becas(request)
+    becas = iterar_becas(columnas_select(columnas), **filtros)
+    nombre = f"becas_{datetime.now().strftime('%Y%m%d')}.{formato}"
+    
+    if formato == 'csv':
+        return Response(
+            stream_with_context(generar_csv(becas, columnas)),
+            mimetype='text/csv; charset=utf-8',
+            headers={'Content-Disposition': f'attachment; filename="{nombre}"'}
+        )
+    
+    if not parquet_disponible():
+        return jsonify({'error': 'Exportación Parquet no disponible (falta pyarrow)'}), 501
+    try:
+        # El footer de Parquet se escribe al final: se arma en un archivo temporal
+        archivo = tempfile.TemporaryFile()
+        escribir_parquet(becas, columnas, archivo)
+        archivo.seek(0)
+        return send_file(archivo, mimetype='application/vnd.apache.parquet', as_attachment=True, download_name=nombre)
+    except Exception as e:
+        logger.error(f"Error exportando Parquet: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@dashboard_blueprint.route('/becas/fichas.zip')
+@login_required
+def exportar_fichas():
+    """Descarga en un ZIP las fichas de todos los atletas que cumplen los filtros (Solo admins)."""
+    if session.get('role', 'usuario') not in ['admin', 'superadmin']:
+        flash('No tienes permisos para exportar fichas.', 'error')
+        return redirect(url_for('dashboard.lista_becas'))
+    
+    filtros = leer_filtros_becas(request)
+    exportacion_id = request.args.get('progreso')
+    
+    try:
+        reservar_exportacion()
+    except ExportacionOcupada as e:
+        flash(str(e), 'error')
+        return redirect(url_for('dashboard.lista_becas'))
+    
+    try:
+        total = aplicar_filtros(supabase.table('becas').select('id', count='exact'), **filtros).limit(1).execute().count
+    except Exception as e:
+        liberar_exportacion()
+        logger.error(f"Error preparando exportación de fichas: {e}", exc_info=True)
+        flash(f'Error al exportar fichas: {e}', 'error')
+        return redirect(url_for('dashboard.lista_becas'))
+    
+    # El ZIP se envía por partes a medida que se generan las fichas
+    respuesta = Response(
+        stream_with_context(zip_fichas(iterar_becas('*', **filtros), total, exportacion_id)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="fichas_{datetime.now().strftime("%Y%m%d")}.zip"'}
+    )
+    respuesta.call_on_close(liberar_exportacion)
+    return respuesta
+
+@dashboard_blueprint.route('/becas/fichas/progreso/<exportacion_id>')
+@login_required
+def progreso_fichas(exportacion_id):
+    """Avance de una exportación de fichas: {'estado', 'hechas', 'total'}."""
+    progreso = obtener_progreso(exportacion_id)
+    if progreso is None:
+        return jsonify({'estado': 'pendiente'}), 200
+    return jsonify(progreso), 200
+
+# --- IMPORTACIÓN Y VERIFICACIÓN DE CÉDULAS ---
+@dashboard_blueprint.route('/becas/cedula/verificar')
+@login_required
+def verificar_cedula():
+    """
+    Verifica una cédula mientras se escribe (formularios de crear y editar).
+    ?cedula=V-12345678[&excluir=<id del atleta que se edita>]
+    """
+    valor = request.args.get('cedula', '').strip()
+    excluir = request.args.get('excluir', type=int)
+    try:
+        cedula = normalizar_cedula(valor)
+    except ErrorCampo as e:
+        return jsonify({'valida': False, 'registrada': False, 'mensaje': str(e)}), 200
+
+    existente = buscar_por_cedula(cedula, excluir_id=excluir) if cedula_registrada(cedula) else None
+    respuesta = {'valida': True, 'cedula': cedula, 'registrada': bool(existente)}
+    if existente:
+        respuesta['atleta'] = existente
+        respuesta['mensaje'] = f"Ya registrada: {existente.get('nombre')} {existente.get('apellido')}"
+    return jsonify(respuesta), 200
+
+
+@dashboard_blueprint.route('/becas/importar', methods=['POST'])
+@login_required
+def importar_becas():
+    """
+    Importa atletas desde una planilla CSV/XLSX (Solo admins).
+    Corre en segundo plano: responde 202 con el ID para consultar el resultado.
+    """
+    if session.get('role', 'usuario') not in ['admin', 'superadmin']:
+        return jsonify({'error': 'No autorizado'}), 403
+
+    archivo = request.files.get('archivo')
+    if not archivo or not archivo.filename:
+        return jsonify({'error': 'Seleccione una planilla'}), 400
+    extension = os.path.splitext(archivo.filename)[1].lower()
+    if extension not in ('.csv', '.xlsx'):
+        return jsonify({'error': 'Formato no soportado. Use .csv o .xlsx'}), 400
+
+    try:
+        fd, ruta = tempfile.mkstemp(suffix=extension)
+        with os.fdopen(fd, 'wb') as destino:
+            archivo.save(destino)
+        importacion_id = iniciar_importacion(
+            ruta, archivo.filename, supabase_admin or supabase,
+            dry_run=request.form.get('dry_run') == 'on', solo_nuevas=request.form.get('solo_nuevas') == 'on'
+        )
+    except Exception as e:
+        logger.error(f"Error iniciando importación: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'importacion_id': importacion_id,
+        'estado_url': url_for('dashboard.estado_importacion_becas', importacion_id=importacion_id)
+    }), 202
+
+
+@dashboard_blueprint.route('/becas/importar/<importacion_id>')
+@login_required
+def estado_importacion_becas(importacion_id):
+    """Estado de una importación: {'estado', 'resultado'?, 'error'?}."""
+    if session.get('role', 'usuario') not in ['admin', 'superadmin']:
+        return jsonify({'error': 'No autorizado'}), 403
+
+    estado = estado_importacion(importacion_id)
+    if estado is None:
+        return jsonify({'error': 'Importación no encontrada'}), 404
+    if estado.get('estado') == 'listo':
+        # Pudo haber disciplinas nuevas
+        cache_disciplinas['data'] = None
+        cache_disciplinas['timestamp'] = None
+    return jsonify(estado), 200
+
 # --- RUTA MI CUENTA ---
 @dashboard_blueprint.route('/cuenta', methods=['GET', 'POST'])
 @login_required
@@ -346,8 +520,10 @@ def mi_cuenta():
             # Cambiar Contraseña
             elif 'update_password' in request.form:
                 pwd = request.form.get('password')
-                if len(pwd) < 6:
-                    flash('La contraseña es muy corta.', 'error')
+                es_valida, errores, _ = validar_fortaleza_password(pwd)
+                if not es_valida:
+                    for error in errores:
+                        flash(error, 'error')
                 else:
                     supabase.auth.update_user({"password": pwd})
                     flash('Contraseña actualizada.', 'success')
@@ -362,38 +538,51 @@ def mi_cuenta():
 @dashboard_blueprint.route('/becas/nueva', methods=['GET', 'POST'])
 @login_required
 def crear_beca():
-    print("="*50)
-    print("DEBUG: CREAR_BECA INICIADO")
-    print(f"DEBUG: Método: {request.method}")
-    
     if request.method == 'POST':
         try:
-            print("DEBUG: Procesando POST")
-            print(f"DEBUG: request.files: {request.files}")
-            print(f"DEBUG: request.form keys: {request.form.keys()}")
+            logger.debug("crear_beca: POST", extra={'archivos': list(request.files), 'campos': list(request.form)})
             
             # 1. Recolectar todos los datos del formulario usando el helper
             datos = obtener_datos_formulario(request)
-            print(f"DEBUG: Datos recolectados: {list(datos.keys())}")
+
+            # Validar y normalizar antes de subir la foto
+            datos, errores = validar_atleta(datos)
+            if errores:
+                for mensaje in mensajes_por_campo(errores):
+                    flash(mensaje, 'error')
+                # Se devuelve lo enviado para no perder lo que el usuario escribió
+                return render_template('crear_beca.html', disciplinas_list=obtener_disciplinas_disponibles(),
+                                       form=request.form.to_dict())
+
+            # Cédula repetida: el índice descarta sin consultar; un acierto se confirma en la BD
+            if cedula_registrada(datos['cedula']):
+                existente = buscar_por_cedula(datos['cedula'])
+                if existente:
+                    flash(f"La cédula {datos['cedula']} ya está registrada "
+                          f"({existente.get('nombre')} {existente.get('apellido')}).", 'error')
+                    return render_template('crear_beca.html', disciplinas_list=obtener_disciplinas_disponibles(),
+                                           form=request.form.to_dict())
             
             # 2. Procesar Foto
             file = request.files.get('foto')
-            print(f"DEBUG CREAR: Archivo recibido: {file}")
-            if file:
-                print(f"DEBUG CREAR: Filename: {file.filename}")
-                print(f"DEBUG CREAR: Content-Type: {file.content_type}")
-            
             foto_url = procesar_imagen(file)
-            print(f"DEBUG CREAR: Resultado procesar_imagen: {foto_url[:100] if foto_url else 'None'}...")
+            logger.debug("crear_beca: foto procesada", extra={
+                'archivo': file.filename if file else None, 'content_type': file.content_type if file else None,
+                'foto': foto_url})
             
             if foto_url:
                 datos['foto'] = foto_url
-                print(f"DEBUG: Foto URL: {foto_url}")
             
             # 3. Insertar en BD
-            print("DEBUG: Intentando insertar en BD...")
-            result = supabase.table('becas').insert(datos).execute()
-            print(f"DEBUG: Insert exitoso, data: {result.data}")
+            try:
+                result = supabase.table('becas').insert(datos).execute()
+            except Exception:
+                # El objeto subido quedaría sin dueño: soltar la referencia
+                if foto_url:
+                    liberar_referencia(foto_url)
+                raise
+            logger.info("Atleta registrado", extra={'beca_id': (result.data or [{}])[0].get('id')})
+            registrar_cedula(datos['cedula'])
             
             # Invalidar caché de disciplinas si se agregó una nueva
             cache_disciplinas['data'] = None
@@ -402,9 +591,7 @@ def crear_beca():
             flash('Atleta registrado exitosamente.', 'success')
             return redirect(url_for('dashboard.lista_becas'))
         except Exception as e: 
-            print(f"ERROR en crear_beca: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"Error en crear_beca: {e}")
             flash(f'Error al registrar: {e}', 'error')
     
     # GET - Cargar disciplinas disponibles usando caché
@@ -416,24 +603,18 @@ def crear_beca():
 def ver_beca(beca_id):
     """Ver ficha técnica y medallas (Solo lectura)."""
     try:
-        # Cargar Atleta
-        beca = supabase.table('becas').select('*').eq('id', beca_id).single().execute().data
+        # Atleta + medallas + documentos en una sola consulta embebida
+        beca = obtener_atleta_completo(beca_id)
         
         if not beca:
             flash('Atleta no encontrado.', 'error')
             return redirect(url_for('dashboard.lista_becas'))
 
-        # Cargar Medallas
-        try:
-            medallas = supabase.table('medallas').select('*').eq('atleta_id', beca_id).order('created_at', desc=True).execute().data
-        except: medallas = [] # Si falla (ej. tabla no existe), lista vacía
+        medallas = beca.pop('medallas', [])
 
-        # Cargar Documentos (opcional para ver ficha)
+        # Firmar URLs de documentos (una sola llamada por bucket, con caché)
         try:
-            documentos = supabase.table('documentos').select('*').eq('atleta_id', beca_id).execute().data
-            # Firmar URLs
-            for doc in documentos:
-                doc['archivo'] = get_signed_url_for_doc(doc['archivo'])
+            documentos = firmar_documentos(beca.pop('documentos', []))
         except: documentos = []
 
         return render_template('ver_beca.html', beca=beca, medallas=medallas, documentos=documentos)
@@ -445,14 +626,15 @@ def ver_beca(beca_id):
 @login_required
 def descargar_ficha(beca_id):
     try:
-        # 1. Obtener datos del atleta
-        beca = supabase.table('becas').select('*').eq('id', beca_id).single().execute().data
+        # 1. Obtener datos del atleta (la ficha no usa medallas ni documentos)
+        beca = obtener_atleta_completo(beca_id, medallas=False, documentos=False)
         if not beca:
             flash('Atleta no encontrado.', 'error')
             return redirect(url_for('dashboard.lista_becas'))
 
         # 2. Generar Excel usando el utility
-        output = generar_ficha_excel(beca)
+        with medir('xlsx', 'ficha'):
+            output = generar_ficha_excel(beca)
 
         filename = f"Ficha_{beca.get('nombre','').replace(' ','_')}_{beca.get('apellido','').replace(' ','_')}.xlsx"
 
@@ -466,6 +648,27 @@ def descargar_ficha(beca_id):
         flash(f'Error al generar ficha: {e}', 'error')
         return redirect(url_for('dashboard.ver_beca', beca_id=beca_id))
 
+@dashboard_blueprint.route('/becas/ficha/<int:beca_id>.pdf')
+@login_required
+def ficha_pdf(beca_id):
+    """Ficha del atleta en PDF (generada una vez por versión de la fila y servida desde disco)."""
+    try:
+        beca = obtener_atleta_completo(beca_id, medallas=False, documentos=False)
+        if not beca:
+            flash('Atleta no encontrado.', 'error')
+            return redirect(url_for('dashboard.lista_becas'))
+
+        with medir('pdf', 'ficha'):
+            ruta = obtener_ficha_pdf(beca)
+        filename = f"Ficha_{beca.get('nombre','').replace(' ','_')}_{beca.get('apellido','').replace(' ','_')}.pdf"
+        return send_file(ruta, mimetype='application/pdf', download_name=filename, max_age=0)
+    except GeneradorOcupado as e:
+        return str(e), 503, {'Retry-After': '5'}
+    except Exception as e:
+        logger.error(f"Error generando ficha PDF {beca_id}: {e}", exc_info=True)
+        flash(f'Error al generar ficha: {e}', 'error')
+        return redirect(url_for('dashboard.ver_beca', beca_id=beca_id))
+
 @dashboard_blueprint.route('/becas/editar/<int:beca_id>', methods=['GET', 'POST'])
 @login_required
 def editar_beca(beca_id):
@@ -476,24 +679,47 @@ def editar_beca(beca_id):
         try:
             # Recolectar datos actualizados
             datos = obtener_datos_formulario(request)
+            # Lo enviado tal cual, para volver a mostrarlo si hay errores
+            enviado = {**request.form.to_dict(), 'es_menor': datos['es_menor']}
+            datos, errores = validar_atleta(datos)
+            if errores:
+                for mensaje in mensajes_por_campo(errores):
+                    flash(mensaje, 'error')
+                return mostrar_editar_beca(beca_id, enviado)
+
+            if cedula_registrada(datos['cedula']) and buscar_por_cedula(datos['cedula'], excluir_id=beca_id):
+                flash(f"La cédula {datos['cedula']} ya está registrada en otro atleta.", 'error')
+                return mostrar_editar_beca(beca_id, enviado)
             
             # Procesar Foto Nueva (si se subió una)
             file = request.files.get('foto')
-            print(f"DEBUG EDITAR: Archivo recibido: {file}")
-            if file:
-                print(f"DEBUG EDITAR: Filename: {file.filename}")
-                print(f"DEBUG EDITAR: Content-Type: {file.content_type if hasattr(file, 'content_type') else 'N/A'}")
-            
             foto_url = procesar_imagen(file)
-            print(f"DEBUG EDITAR: Resultado procesar_imagen: {foto_url[:100] if foto_url else 'None'}")
+            logger.debug("editar_beca: foto procesada", extra={
+                'beca_id': beca_id, 'archivo': file.filename if file else None, 'foto': foto_url})
             
             if foto_url:
                 datos['foto'] = foto_url
-                print(f"DEBUG EDITAR: Foto agregada a datos para update. URL: {foto_url}")
+            
+            # Cédula y foto guardadas: la cédula anterior no se puede quitar del índice
+            actual = supabase.table('becas').select('cedula,foto').eq('id', beca_id).execute().data
+            actual = actual[0] if actual else {}
+            foto_anterior = actual.get('foto') if foto_url else None
+            
+            try:
+                supabase.table('becas').update(datos).eq('id', beca_id).execute()
+            except Exception:
+                if foto_url:
+                    liberar_referencia(foto_url)
+                raise
+            if clave_cedula(actual.get('cedula')) != clave_cedula(datos['cedula']):
+                invalidar_indice()
             else:
-                print("DEBUG EDITAR: No se procesó ninguna foto nueva")
+                registrar_cedula(datos['cedula'])
             
-            supabase.table('becas').update(datos).eq('id', beca_id).execute()
+            # La foto reemplazada pierde una referencia (se borra si nadie más la usa).
+            # Si se volvió a subir la misma foto, esto compensa la referencia nueva.
+            if foto_anterior:
+                liberar_referencia(foto_anterior)
             
             # Invalidar caché de disciplinas si se pudo haber cambiado
             cache_disciplinas['data'] = None
@@ -505,20 +731,27 @@ def editar_beca(beca_id):
             flash(f'Error al guardar cambios: {e}', 'error')
 
     # 2. MOSTRAR (GET)
+    return mostrar_editar_beca(beca_id)
+
+def mostrar_editar_beca(beca_id, enviado=None):
+    """Formulario de edición; con enviado (datos del POST rechazado) muestra lo que escribió el usuario."""
     try:
-        beca = supabase.table('becas').select('*').eq('id', beca_id).single().execute().data
-        
-        # Cargar medallas
-        try:
-            medallas = supabase.table('medallas').select('*').eq('atleta_id', beca_id).order('created_at', desc=True).execute().data
-        except: medallas = []
+        # Atleta con medallas y documentos (una consulta) en paralelo con las disciplinas
+        datos = ejecutar_en_paralelo({
+            'beca': lambda: obtener_atleta_completo(beca_id),
+            'disciplinas': obtener_disciplinas_disponibles,
+        })
+        beca = datos['beca']
+        if not beca:
+            flash('Atleta no encontrado.', 'error')
+            return redirect(url_for('dashboard.lista_becas'))
+        if enviado:
+            beca.update(enviado)
+        medallas = beca.pop('medallas', [])
 
-        # Cargar documentos
+        # Firmar URLs de documentos (una sola llamada por bucket, con caché)
         try:
-            documentos = supabase.table('documentos').select('*').eq('atleta_id', beca_id).order('created_at', desc=True).execute().data
-            # Firmar URLs
-            for doc in documentos:
-                doc['archivo'] = get_signed_url_for_doc(doc['archivo'])
+            documentos = firmar_documentos(beca.pop('documentos', []))
         except: documentos = []
         
         # Galería: usar la foto principal del atleta
@@ -526,8 +759,7 @@ def editar_beca(beca_id):
         if beca.get('foto'):
             galeria_fotos = [{'id': 0, 'url': beca['foto'], 'atleta_id': beca_id}]
         
-        # Cargar disciplinas disponibles usando caché
-        disciplinas_completas = obtener_disciplinas_disponibles()
+        disciplinas_completas = datos['disciplinas']
         
         return render_template('editar_beca.html', beca=beca, medallas=medallas, documentos=documentos, galeria_fotos=galeria_fotos, disciplinas_list=disciplinas_completas)
     except: return redirect(url_for('dashboard.lista_becas'))
@@ -536,7 +768,17 @@ def editar_beca(beca_id):
 @login_required
 def eliminar_beca(beca_id):
     try:
-        supabase.table('becas').delete().eq('id', beca_id).execute()
+        # Los documentos se borran en cascada con el atleta: guardar sus archivos para liberarlos
+        try:
+            documentos = supabase.table('documentos').select('archivo').eq('atleta_id', beca_id).execute().data or []
+        except: documentos = []
+        eliminados = supabase.table('becas').delete().eq('id', beca_id).execute().data or []
+        if eliminados:
+            invalidar_indice()
+            archivos = [fila.get('foto') for fila in eliminados] + [doc.get('archivo') for doc in documentos]
+            for url in archivos:
+                if url:
+                    liberar_referencia(url)
         flash('Atleta eliminado.', 'success')
     except Exception as e: flash(f'Error: {e}', 'error')
     return redirect(url_for('dashboard.lista_becas'))
@@ -582,11 +824,15 @@ def subir_documento(beca_id):
         else:
             doc_url = procesar_pdf(archivo)
             if doc_url:
-                supabase.table('documentos').insert({
-                    'atleta_id': beca_id,
-                    'nombre': nombre_doc,
-                    'archivo': doc_url
-                }).execute()
+                try:
+                    supabase.table('documentos').insert({
+                        'atleta_id': beca_id,
+                        'nombre': nombre_doc,
+                        'archivo': doc_url
+                    }).execute()
+                except Exception:
+                    liberar_referencia(doc_url)
+                    raise
                 flash('Documento subido correctamente.', 'success')
             else:
                 flash('Error al procesar el archivo PDF.', 'error')
@@ -600,7 +846,10 @@ def subir_documento(beca_id):
 def eliminar_documento(doc_id):
     atleta_id = request.form.get('atleta_id')
     try:
-        supabase.table('documentos').delete().eq('id', doc_id).execute()
+        eliminados = supabase.table('documentos').delete().eq('id', doc_id).execute().data or []
+        for fila in eliminados:
+            if fila.get('archivo'):
+                liberar_referencia(fila['archivo'])
         flash('Documento eliminado.', 'success')
     except: flash('Error al eliminar.', 'error')
     return redirect(url_for('dashboard.editar_beca', beca_id=atleta_id))
@@ -668,14 +917,54 @@ def eliminar_usuario():
     return redirect(url_for('dashboard.lista_usuarios'))
 
 
+# --- PERFILES DE RENDIMIENTO (SOLO SUPERADMIN) ---
+
+@dashboard_blueprint.route('/perfiles', methods=['GET', 'POST'])
+@login_required
+@superadmin_required
+def lista_perfiles():
+    """Perfiles recientes; POST genera un token para perfilar una request."""
+    token = None
+    if request.method == 'POST':
+        token = generar_token(current_app.secret_key, session.get('user_id'))
+    return render_template('dashboard_perfiles.html', perfiles=listar_perfiles(), token=token,
+                           cabecera=CABECERA_PERFIL, parametro=PARAMETRO_PERFIL, ttl_minutos=TTL_TOKEN_PERFIL // 60)
+
+@dashboard_blueprint.route('/perfiles/<perfil_id>')
+@login_required
+@superadmin_required
+def ver_perfil(perfil_id):
+    """Resumen en texto del perfil (?formato=pstats descarga el .prof)."""
+    if request.args.get('formato') == 'pstats':
+        ruta = ruta_pstats(perfil_id)
+        if not ruta:
+            abort(404)
+        return send_file(ruta, mimetype='application/octet-stream', as_attachment=True,
+                         download_name=f"{perfil_id}.prof")
+    reporte = leer_reporte(perfil_id)
+    if reporte is None:
+        abort(404)
+    return reporte, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
+@dashboard_blueprint.route('/memoria')
+@login_required
+@superadmin_required
+def memoria():
+    """RSS, estructuras en memoria y crecimiento (tracemalloc) de cada worker; ?muestrear=1 toma una muestra ya."""
+    monitor = obtener_monitor()
+    actual = monitor.muestrear() if request.args.get('muestrear') else monitor.reporte
+    return jsonify({'worker_actual': actual, 'workers': reportes_workers()})
+
+
 # --- GESTIÓN DE GALERÍA DE IMÁGENES ---
 
 @dashboard_blueprint.route('/gallery/upload', methods=['POST'])
 @login_required
 def upload_gallery_image():
-    """Subir imagen para la galería del dashboard (Solo admins)."""
-    from flask import jsonify
-    
+    """
+    Subir imagen para la galería del dashboard (Solo admins).
+    El procesamiento corre en segundo plano: responde 202 con el ID del trabajo.
+    """
     # Verificar permisos
     role = session.get('role', 'usuario')
     if role not in ['admin', 'superadmin']:
@@ -689,69 +978,85 @@ def upload_gallery_image():
             return jsonify({'error': 'Faltan datos'}), 400
         
         # Validar slot válido (becas laterales ilimitados, home dinámico)
-        import re
-        if not (slot.startswith('home_') or re.match(r'^(left|right)_\d+$', slot)):
+        if not slot_valido(slot):
             return jsonify({'error': 'Slot inválido'}), 400
         
+        # Leer como máximo el límite + 1 byte para rechazar archivos enormes sin cargarlos
+        datos = file.read(MAX_BYTES_ARCHIVO + 1)
+        if len(datos) > MAX_BYTES_ARCHIVO:
+            return jsonify({'error': f'La imagen excede {MAX_BYTES_ARCHIVO // (1024 * 1024)} MB'}), 413
+        
         try:
-            from io import BytesIO
-            from PIL import Image
-            from utils.file_handler import upload_file_to_supabase
-            
-            # 1. Procesar imagen (Opcional: Resizing/Format)
-            file.seek(0)
-            img = Image.open(file)
-            
-            # Convertir a RGB si es necesario
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            
-            # Redimensionar para la web (800px max)
-            img.thumbnail((800, 1000))
-            
-            # Guardar en buffer temporal
-            buffer = BytesIO()
-            img.save(buffer, format='JPEG', quality=85)
-            buffer.seek(0)
-            
-            # Crear un objeto "file-like" para el helper
-            class FileLike:
-                def __init__(self, content, filename, content_type):
-                    self.content = content
-                    self.filename = filename
-                    self.content_type = content_type
-                def read(self): return self.content
-                def seek(self, pos): pass
-            
-            temp_file = FileLike(buffer.read(), file.filename, 'image/jpeg')
-            
-            # 2. Subir a Supabase Storage
-            # Usamos el bucket 'becas-public' y folder 'gallery'
-            public_url = upload_file_to_supabase(temp_file, 'becas-public', 'gallery')
-            
-            if not public_url:
-                return jsonify({'error': 'Error al subir al storage'}), 500
-            
-            # 3. Upsert en la tabla gallery_images (usar slot como clave única)
-            data = {
-                'slot': slot,
-                'image_data': public_url
-            }
-            
-            # Upsert
-            supabase.table('gallery_images').upsert(data, on_conflict='slot').execute()
-            
-            logger.info(f"Imagen de galería actualizada en Storage y DB: {slot} -> {public_url}")
-            return jsonify({'success': True, 'message': 'Imagen actualizada', 'url': public_url}), 200
-            
-        except Exception as save_error:
-            logger.error(f"Error procesando/guardando imagen de galería: {save_error}", exc_info=True)
-            return jsonify({'error': f'Error procesando imagen: {str(save_error)}'}), 500
+            job_id = iniciar_trabajo(slot, datos, file.filename)
+        except ProcesadorOcupado as e:
+            return jsonify({'error': str(e)}), 503
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'estado_url': url_for('dashboard.estado_trabajo_galeria', job_id=job_id)
+        }), 202
         
     except Exception as e:
         logger.error(f"Error subiendo imagen galería: {e}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+
+@dashboard_blueprint.route('/gallery/upload/batch', methods=['POST'])
+@login_required
+def upload_gallery_batch():
+    """
+    Subir varias imágenes de galería en una sola request (Solo admins).
+    Recibe listas paralelas 'slots' e 'images'; responde el resultado por slot.
+    """
+    role = session.get('role', 'usuario')
+    if role not in ['admin', 'superadmin']:
+        return jsonify({'error': 'No autorizado'}), 403
+    
+    slots = request.form.getlist('slots')
+    files = request.files.getlist('images')
+    
+    if not slots or len(slots) != len(files):
+        return jsonify({'error': 'Faltan datos'}), 400
+    if len(slots) > MAX_IMAGENES_LOTE:
+        return jsonify({'error': f'Máximo {MAX_IMAGENES_LOTE} imágenes por lote'}), 400
+    if len(set(slots)) != len(slots):
+        return jsonify({'error': 'Slots repetidos'}), 400
+    
+    resultados = {}
+    imagenes = {}
+    for slot, file in zip(slots, files):
+        if not slot_valido(slot):
+            resultados[slot] = {'estado': 'error', 'error': 'Slot inválido'}
+            continue
+        datos = file.read(MAX_BYTES_ARCHIVO + 1)
+        if len(datos) > MAX_BYTES_ARCHIVO:
+            resultados[slot] = {'estado': 'error', 'error': f'La imagen excede {MAX_BYTES_ARCHIVO // (1024 * 1024)} MB'}
+            continue
+        imagenes[slot] = (datos, file.filename)
+    
+    try:
+        resultados.update(procesar_lote(imagenes))
+    except Exception as e:
+        logger.error(f"Error subiendo lote de galería: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+    
+    exitosos = sum(1 for r in resultados.values() if r['estado'] == 'listo')
+    return jsonify({
+        'success': exitosos == len(slots),
+        'actualizadas': exitosos,
+        'resultados': resultados
+    }), 200
+
+
+@dashboard_blueprint.route('/gallery/jobs/<job_id>')
+@login_required
+def estado_trabajo_galeria(job_id):
+    """Estado de un trabajo de galería (lo consulta el frontend hasta que termina)."""
+    if session.get('role', 'usuario') not in ['admin', 'superadmin']:
+        return jsonify({'error': 'No autorizado'}), 403
+    
+    estado = estado_trabajo(job_id)
+    if estado is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return jsonify(estado), 200
\ No newline at end of file
@@ -0,0 +1,77 @@
+import os
+import logging
+from flask import Blueprint, abort, send_file, url_for
+from utils.almacenamiento_cas import es_ruta_por_contenido, extraer_bucket_y_ruta
+from utils.cache_medios import obtener_cache_medios, se_muestra_en_linea
+
+logger = logging.getLogger(__name__)
+
+# --- Definición del Blueprint ---
+media_blueprint = Blueprint('media', __name__)
+
+# Solo se sirven los buckets de MEDIA_BUCKETS. Todo lo que hay en ellos es público,
+# documentos incluidos (becas-public/documentos), igual que por su URL de Storage.
+BUCKETS_PERMITIDOS = set(os.environ.get('MEDIA_BUCKETS', 'becas-public').split(','))
+UN_ANO = 31536000
+
+
+def proxy_habilitado():
+    """El proxy es opcional: se activa con MEDIA_PROXY_ENABLED=true."""
+    return os.environ.get('MEDIA_PROXY_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+
+def url_medios(url):
+    """
+    Convierte una URL pública de Supabase Storage en /media/<bucket>/<path>.
+    Si el proxy está desactivado o la URL no es de un bucket permitido, la
+    retorna sin cambios.
+    """
+    if not url or not proxy_habilitado() or '/object/public/' not in url:
+        return url
+    ubicacion = extraer_bucket_y_ruta(url)
+    if not ubicacion or ubicacion[0] not in BUCKETS_PERMITIDOS:
+        return url
+    return url_for('media.servir', ruta=f"{ubicacion[0]}/{ubicacion[1]}")
+
+
+@media_blueprint.app_template_filter('media_url')
+def filtro_media_url(url):
+    """Filtro Jinja: {{ beca.foto|media_url }}"""
+    return url_medios(url)
+
+
+@media_blueprint.route('/<path:ruta>')
+def servir(ruta):
+    """
+    Sirve un archivo desde la caché local en disco (descargándola de Storage
+    la primera vez). Soporta ETag/If-None-Match y Range vía send_file; el
+    archivo se envía con wsgi.file_wrapper, que gunicorn transmite con sendfile.
+    """
+    if not proxy_habilitado():
+        abort(404)
+
+    bucket, _, path = ruta.partition('/')
+    if bucket not in BUCKETS_PERMITIDOS or not path or '..' in path.split('/'):
+        abort(404)
+
+    meta = obtener_cache_medios().obtener(bucket, path)
+    if not meta:
+        abort(404)
+
+    # Lo que no es imagen ni PDF se descarga como adjunto y nunca se interpreta
+    en_linea = se_muestra_en_linea(meta['content_type'])
+    response = send_file(
+        meta['ruta'],
+        mimetype=meta['content_type'] if en_linea else 'application/octet-stream',
+        as_attachment=not en_linea,
+        download_name=os.path.basename(path),
+        etag=meta['etag'],
+        conditional=True,
+        max_age=UN_ANO,
+    )
+    response.cache_control.public = True
+    if es_ruta_por_contenido(path):
+        # Los objetos del CAS no cambian nunca (la ruta depende del contenido);
+        # las rutas anteriores al CAS pueden reemplazarse en el mismo lugar
+        response.cache_control.immutable = True
+    return response
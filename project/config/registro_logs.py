@@ -0,0 +1,203 @@
+"""
+Configuración de logging del servidor.
+
+Los hilos de las peticiones solo encolan el registro (QueueHandler); un
+hilo aparte (QueueListener) lo escribe en consola y en un archivo JSON por
+líneas que rota por tamaño, así una escritura lenta a disco nunca frena
+una respuesta.
+
+Variables de entorno:
+    LOG_LEVEL        nivel raíz (INFO)
+    LOG_NIVELES      niveles por módulo: "utils.decorators=DEBUG,werkzeug=WARNING"
+    LOG_MUESTREO     fracción de los DEBUG que se conservan por módulo: "utils.decorators=0.05"
+    LOG_ARCHIVO      archivo JSON (DATA_DIR/logs/app.log); vacío para no escribir a disco.
+                     Acepta {pid}: "logs/app.{pid}.log" da un archivo por proceso
+    LOG_MAX_MB       tamaño antes de rotar (10)
+    LOG_RESPALDOS    archivos rotados que se conservan (5)
+    LOG_CONSOLA      'texto' (por defecto) o 'json'
+
+Un registro puntual también puede pedir muestreo con extra={'muestreo': 0.01}.
+
+Varios procesos no pueden rotar el mismo archivo (cada uno renombraría el
+archivo de los demás): por eso gunicorn.conf.py deja LOG_ARCHIVO vacío salvo
+que se defina, y conviene usar {pid} si se define.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+from config import rutas_datos
+
+FORMATO_TEXTO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Atributos propios de LogRecord: todo lo demás vino en extra={...}
+_ATRIBUTOS_RECORD = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def _parsear_pares(valor: Optional[str]) -> Dict[str, str]:
+    """'a=1, b = 2' -> {'a': '1', 'b': '2'} (ignora entradas mal formadas)."""
+    pares = {}
+    for entrada in (valor or '').split(','):
+        nombre, _, dato = entrada.partition('=')
+        if nombre.strip() and dato.strip():
+            pares[nombre.strip()] = dato.strip()
+    return pares
+
+
+class FormatoJSON(logging.Formatter):
+    """Un objeto JSON por línea; los campos de extra={...} se agregan tal cual."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        registro = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'modulo': record.module,
+            'linea': record.lineno,
+            'pid': record.process,
+            'hilo': record.threadName,
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and not clave.startswith('_'):
+                registro[clave] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            registro['exc'] = record.exc_text
+        if record.stack_info:
+            registro['stack'] = record.stack_info
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+class FiltroMuestreo(logging.Filter):
+    """Conserva solo una fracción de los registros DEBUG de los módulos configurados."""
+
+    def __init__(self, tasas: Dict[str, float] = None):
+        super().__init__()
+        # Los prefijos más largos primero: 'utils.x' gana sobre 'utils'
+        self.tasas = sorted((tasas or {}).items(), key=lambda par: -len(par[0]))
+
+    def _tasa(self, record: logging.LogRecord) -> Optional[float]:
+        tasa = getattr(record, 'muestreo', None)
+        if tasa is not None or record.levelno > logging.DEBUG:
+            return tasa
+        for prefijo, tasa in self.tasas:
+            if record.name == prefijo or record.name.startswith(prefijo + '.'):
+                return tasa
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        tasa = self._tasa(record)
+        if tasa is None or tasa >= 1:
+            return True
+        record.muestreo = tasa
+        return random.random() < tasa
+
+
+class _ColaHandler(QueueHandler):
+    """Como QueueHandler, pero deja la traza en exc_text para que el formato JSON la separe."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# --- Configuración del proceso ---
+
+_listener: Optional[QueueListener] = None
+_cola_handler: Optional[QueueHandler] = None
+_lock = threading.Lock()
+
+
+def _crear_handlers():
+    consola = logging.StreamHandler()
+    consola.setFormatter(FormatoJSON() if os.environ.get('LOG_CONSOLA') == 'json' else logging.Formatter(FORMATO_TEXTO))
+    handlers = [consola]
+
+    archivo = os.environ.get('LOG_ARCHIVO')
+    if archivo is None:
+        archivo = rutas_datos.ruta_datos('logs', 'app.log')
+    if archivo:
+        archivo = archivo.replace('{pid}', str(os.getpid()))
+        os.makedirs(os.path.dirname(os.path.abspath(archivo)), exist_ok=True)
+        rotativo = RotatingFileHandler(
+            archivo, maxBytes=int(float(os.environ.get('LOG_MAX_MB', 10)) * 1024 * 1024),
+            backupCount=int(os.environ.get('LOG_RESPALDOS', 5)), encoding='utf-8', delay=True,
+        )
+        rotativo.setFormatter(FormatoJSON())
+        handlers.append(rotativo)
+    return handlers
+
+
+def configurar_logging() -> QueueListener:
+    """
+    Instala el QueueHandler en el logger raíz y arranca el listener.
+
+    Es idempotente: una segunda llamada reemplaza la configuración anterior.
+    """
+    global _listener, _cola_handler
+    with _lock:
+        raiz = logging.getLogger()
+        if _listener is not None:
+            raiz.removeHandler(_cola_handler)
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+
+        raiz.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+        for nombre, nivel in _parsear_pares(os.environ.get('LOG_NIVELES')).items():
+            logging.getLogger(nombre).setLevel(nivel.upper())
+
+        tasas = {nombre: float(tasa) for nombre, tasa in _parsear_pares(os.environ.get('LOG_MUESTREO')).items()}
+        cola = queue.SimpleQueue()
+        _cola_handler = _ColaHandler(cola)
+        _cola_handler.addFilter(FiltroMuestreo(tasas))
+        raiz.addHandler(_cola_handler)
+
+        _listener = QueueListener(cola, *_crear_handlers(), respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def detener_logging():
+    """Vacía la cola, detiene el listener y quita el QueueHandler (al salir del proceso)."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            logging.getLogger().removeHandler(_cola_handler)
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+def _reiniciar_en_hijo():
+    # El hilo del listener no sobrevive al fork (gunicorn --preload), y el
+    # hijo abre sus propios handlers para que {pid} sea el suyo
+    if _listener is not None:
+        heredados = _listener.handlers
+        _listener.handlers = tuple(_crear_handlers())
+        for handler in heredados:
+            handler.close()
+        _listener._thread = None
+        _listener.start()
+
+
+atexit.register(detener_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_en_hijo)
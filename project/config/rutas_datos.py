@@ -0,0 +1,23 @@
+"""
+Rutas de datos locales del servidor (índices, cachés en disco y reportes).
+Todo vive bajo IRDEBG_DATA_DIR (por defecto project/instance).
+"""
+
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get('IRDEBG_DATA_DIR', os.path.join(BASE_DIR, 'instance'))
+
+
+def ruta_datos(*partes):
+    """Retorna la ruta de un archivo dentro de DATA_DIR, creando sus carpetas."""
+    ruta = os.path.join(DATA_DIR, *partes)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    return ruta
+
+
+def directorio_datos(*partes):
+    """Retorna (y crea si no existe) un directorio dentro de DATA_DIR."""
+    ruta = os.path.join(DATA_DIR, *partes)
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
@@ -3,6 +3,8 @@ import logging
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from utils.tiempos_peticion import envolver_cliente
+
 # Configurar logger local para este módulo
 logger = logging.getLogger(__name__)
 
@@ -32,6 +34,15 @@ class SupabaseManager:
         self._initialized = True
     
     def _initialize_clients(self):
+        if os.environ.get('SUPABASE_LOCAL', '').lower() in ('1', 'true'):
+            # Servicio en proceso para tests, benchmarks y desarrollo sin red
+            from utils.supabase_local import desde_entorno
+            servicio = desde_entorno()
+            self._client = servicio.crear_cliente()
+            self._admin = servicio.crear_cliente()
+            logger.info(f"🧪 Usando Supabase local en {servicio.directorio}")
+            return
+
         try:
             if not self.url or not self.key:
                 raise ValueError("SUPABASE_URL y SUPABASE_KEY son requeridas en .env")
@@ -68,6 +79,7 @@ class SupabaseManager:
 # Instancia Singleton Global
 _manager = SupabaseManager()
 
-# Exportar instancias para mantener compatibilidad con imports existentes
-supabase = _manager.client
-supabase_admin = _manager.admin
\ No newline at end of file
+# Exportar instancias para mantener compatibilidad con imports existentes.
+# Envueltas para contar y cronometrar las llamadas de cada request (Server-Timing)
+supabase = envolver_cliente(_manager.client)
+supabase_admin = envolver_cliente(_manager.admin)
\ No newline at end of file
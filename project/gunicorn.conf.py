@@ -0,0 +1,38 @@
+"""
+Configuración de gunicorn.
+
+    gunicorn --chdir project -c project/gunicorn.conf.py app:app
+
+Define PROMETHEUS_MULTIPROC_DIR (si no viene en el entorno) para que las
+métricas de utils/metricas.py se sumen entre workers, lo vacía al arrancar
+el master y marca los workers que terminan. Workers, bind, etc. siguen
+viniendo de la línea de comandos o de GUNICORN_CMD_ARGS.
+
+Los logs van solo a consola (LOG_ARCHIVO vacío): varios workers rotando el
+mismo app.log se pisarían. Para escribir a disco, LOG_ARCHIVO=.../app.{pid}.log.
+"""
+
+import glob
+import os
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_DATA_DIR = os.environ.get('IRDEBG_DATA_DIR', os.path.join(_BASE_DIR, 'instance'))
+# Se define aquí, antes de que los workers importen prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(_DATA_DIR, 'prometheus'))
+os.environ.setdefault('LOG_ARCHIVO', '')
+
+
+def on_starting(server):
+    """Los archivos de una ejecución anterior sumarían métricas de procesos que ya no existen."""
+    directorio = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    os.makedirs(directorio, exist_ok=True)
+    for archivo in glob.glob(os.path.join(directorio, '*.db')):
+        os.remove(archivo)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
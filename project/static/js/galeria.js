@@ -0,0 +1,44 @@
+
+/**
+ * Subida de imágenes de la galería.
+ * El servidor responde 202 con un job_id; se consulta el estado hasta que
+ * el procesamiento termina. Resuelve con {estado: 'listo', url} o lanza Error.
+ */
+async function subirImagenGaleria(formData, intervaloMs = 700, maxIntentos = 120) {
+    const res = await fetch('/dashboard/gallery/upload', { method: 'POST', body: formData });
+    const inicio = await res.json();
+    if (!res.ok) {
+        throw new Error(inicio.error || 'Error al guardar');
+    }
+
+    for (let i = 0; i < maxIntentos; i++) {
+        await new Promise(r => setTimeout(r, intervaloMs));
+        const estadoRes = await fetch(inicio.estado_url);
+        const estado = await estadoRes.json();
+        if (!estadoRes.ok || estado.estado === 'error') {
+            throw new Error(estado.error || 'Error procesando imagen');
+        }
+        if (estado.estado === 'listo') {
+            return estado;
+        }
+    }
+    throw new Error('La imagen sigue en proceso, recargue la página en unos segundos');
+}
+
+/**
+ * Sube varias imágenes en una sola request.
+ * pares: [{slot: 'home_1', file: File}, ...]. Resuelve con {slot: {estado, url|error}}.
+ */
+async function subirLoteGaleria(pares) {
+    const formData = new FormData();
+    for (const { slot, file } of pares) {
+        formData.append('slots', slot);
+        formData.append('images', file);
+    }
+    const res = await fetch('/dashboard/gallery/upload/batch', { method: 'POST', body: formData });
+    const result = await res.json();
+    if (!res.ok) {
+        throw new Error(result.error || 'Error al guardar');
+    }
+    return result.resultados;
+}
@@ -0,0 +1,33 @@
+/**
+ * Verificación de cédula mientras se escribe.
+ * Se activa en los inputs con data-verificar-cedula (data-excluir = id del
+ * atleta que se edita) y muestra el resultado debajo del campo.
+ */
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('input[data-verificar-cedula]').forEach(input => {
+        const aviso = document.createElement('p');
+        aviso.className = 'mt-1 text-xs';
+        input.insertAdjacentElement('afterend', aviso);
+        let temporizador = null;
+        let ultima = null;
+
+        input.addEventListener('input', () => {
+            clearTimeout(temporizador);
+            temporizador = setTimeout(async () => {
+                const valor = input.value.trim();
+                if (valor.length < 7) { aviso.textContent = ''; return; }
+                const params = new URLSearchParams({ cedula: valor });
+                if (input.dataset.excluir) params.set('excluir', input.dataset.excluir);
+                ultima = params.toString();
+                const consulta = ultima;
+
+                const res = await fetch('/dashboard/becas/cedula/verificar?' + consulta);
+                if (!res.ok || consulta !== ultima) return;
+                const r = await res.json();
+                aviso.textContent = r.mensaje || (r.valida ? 'Cédula disponible' : '');
+                aviso.className = 'mt-1 text-xs ' + (r.valida && !r.registrada ? 'text-green-600' : 'text-red-600');
+                input.setCustomValidity(r.registrada ? r.mensaje : '');
+            }, 300);
+        });
+    });
+});
@@ -0,0 +1,262 @@
+"""
+Almacenamiento direccionado por contenido (CAS) para Supabase Storage.
+
+Cada archivo se guarda como <folder>/<sha256>.<ext>, así que subir dos veces
+la misma cédula o foto reutiliza el mismo objeto. Un índice local (SQLite)
+evita consultar Storage por cada archivo y la tabla storage_refs lleva la
+cuenta de referencias para que borrar un objeto compartido sea seguro.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+from urllib.parse import unquote
+
+from config.supabase_client import supabase
+from config.rutas_datos import ruta_datos
+from utils.metricas import observar_subida
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+PATRON_URL_PUBLICA = re.compile(r'/object/(?:public|sign)/([^/]+)/(.+)')
+PATRON_EXTENSION = re.compile(r'^[a-z0-9]{1,8}$')
+PATRON_RUTA_CAS = re.compile(r'^(?:[^/]+/)+[0-9a-f]{64}\.[a-z0-9]{1,8}$')
+
+
+# --- HASH Y RUTAS ---
+
+def hash_archivo(file) -> Tuple[str, int]:
+    """
+    Calcula el SHA-256 de un archivo leyéndolo por bloques.
+
+    Args:
+        file: FileStorage de Werkzeug o cualquier objeto con read()/seek()
+
+    Returns:
+        Tuple (sha256_hex, tamaño_en_bytes)
+    """
+    stream = getattr(file, 'stream', file)
+    stream.seek(0)
+    sha = hashlib.sha256()
+    size = 0
+    while True:
+        bloque = stream.read(CHUNK_SIZE)
+        if not bloque:
+            break
+        sha.update(bloque)
+        size += len(bloque)
+        if len(bloque) > CHUNK_SIZE:
+            # read() que ignora el tamaño pedido: ya devolvió todo el contenido
+            break
+    stream.seek(0)
+    return sha.hexdigest(), size
+
+
+def ruta_por_contenido(folder: str, sha256: str, filename: str) -> str:
+    """Construye la ruta del objeto: <folder>/<sha256>.<ext>."""
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if not PATRON_EXTENSION.match(ext):
+        ext = 'bin'
+    return f"{folder}/{sha256}.{ext}"
+
+
+def es_ruta_por_contenido(path: str) -> bool:
+    """True si la ruta tiene la forma <folder>/<sha256>.<ext> (su contenido no cambia nunca)."""
+    return bool(PATRON_RUTA_CAS.match(path or ''))
+
+
+def extraer_bucket_y_ruta(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Extrae (bucket, ruta) de una URL pública o firmada de Supabase Storage.
+    Retorna None si la URL no sigue el patrón estándar.
+    """
+    if not url:
+        return None
+    match = PATRON_URL_PUBLICA.search(unquote(url).split('?')[0])
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+# --- ÍNDICE LOCAL DE OBJETOS EXISTENTES ---
+
+class IndiceHashLocal:
+    """
+    Índice SQLite de objetos que sabemos que ya existen en Storage.
+    Compartido por todos los workers del mismo servidor.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        with self._conectar() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS objetos ('
+                ' bucket TEXT NOT NULL, path TEXT NOT NULL, sha256 TEXT, size INTEGER,'
+                ' creado REAL, PRIMARY KEY (bucket, path))'
+            )
+
+    def _conectar(self):
+        return sqlite3.connect(self.ruta, timeout=5)
+
+    def contiene(self, bucket: str, path: str) -> bool:
+        with self._conectar() as conn:
+            fila = conn.execute(
+                'SELECT 1 FROM objetos WHERE bucket = ? AND path = ?', (bucket, path)
+            ).fetchone()
+        return fila is not None
+
+    def registrar(self, bucket: str, path: str, sha256: str = None, size: int = None):
+        with self._lock, self._conectar() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO objetos (bucket, path, sha256, size, creado) VALUES (?, ?, ?, ?, ?)',
+                (bucket, path, sha256, size, time.time())
+            )
+
+    def olvidar(self, bucket: str, path: str):
+        with self._lock, self._conectar() as conn:
+            conn.execute('DELETE FROM objetos WHERE bucket = ? AND path = ?', (bucket, path))
+
+
+_indice_local = None
+
+
+def obtener_indice_local() -> IndiceHashLocal:
+    """Retorna el índice local (se crea la primera vez que se usa)."""
+    global _indice_local
+    if _indice_local is None:
+        _indice_local = IndiceHashLocal(
+            os.environ.get('CAS_INDEX_PATH') or ruta_datos('indices', 'storage_objetos.sqlite3')
+        )
+    return _indice_local
+
+
+# --- CONTEO DE REFERENCIAS (tabla storage_refs) ---
+
+def registrar_referencia(bucket: str, path: str, sha256: str = None, size: int = None) -> Optional[int]:
+    """
+    Incrementa el contador de referencias del objeto.
+
+    Returns:
+        Nuevo total de referencias, o None si la tabla no está disponible
+    """
+    try:
+        res = supabase.rpc('storage_ref_incrementar', {
+            'p_bucket': bucket, 'p_path': path, 'p_sha256': sha256, 'p_size': size
+        }).execute()
+        return res.data
+    except Exception as e:
+        logger.warning(f"No se pudo registrar referencia de {bucket}/{path}: {e}")
+        return None
+
+
+def liberar_referencia(url: str) -> bool:
+    """
+    Decrementa las referencias del objeto apuntado por la URL y lo elimina de
+    Storage solo cuando el contador llega exactamente a cero. Objetos sin
+    registro (anteriores al CAS) nunca se borran desde aquí.
+
+    Returns:
+        True si el objeto fue eliminado de Storage
+    """
+    ubicacion = extraer_bucket_y_ruta(url)
+    if not ubicacion:
+        return False
+    return _liberar(*ubicacion)
+
+
+def _liberar(bucket: str, path: str) -> bool:
+    try:
+        restante = supabase.rpc('storage_ref_decrementar', {'p_bucket': bucket, 'p_path': path}).execute().data
+    except Exception as e:
+        logger.warning(f"No se pudo liberar referencia de {bucket}/{path}: {e}")
+        return False
+
+    if restante != 0:
+        return False
+
+    try:
+        supabase.storage.from_(bucket).remove([path])
+        obtener_indice_local().olvidar(bucket, path)
+        logger.info(f"Objeto sin referencias eliminado: {bucket}/{path}")
+        return True
+    except Exception as e:
+        logger.error(f"Error eliminando objeto {bucket}/{path}: {e}")
+        return False
+
+
+# --- SUBIDA ---
+
+def _es_duplicado(error) -> bool:
+    """True si Storage rechazó la subida porque el objeto ya existe (409)."""
+    estado = error.get('statusCode') if isinstance(error, dict) else getattr(error, 'status', None)
+    if estado is not None:
+        return str(estado) == '409'
+    texto = str(error).lower()
+    return 'duplicate' in texto or 'already exists' in texto
+
+
+def subir_por_contenido(file, bucket: str, folder: str) -> Optional[str]:
+    """
+    Sube un archivo con ruta derivada de su SHA-256 y registra una referencia.
+    Si el objeto ya existe la operación solo actualiza metadatos.
+
+    Returns:
+        URL pública del objeto o None si falló
+    """
+    if not file or not file.filename:
+        return None
+
+    referencias = None
+    try:
+        sha256, size = hash_archivo(file)
+        path = ruta_por_contenido(folder, sha256, file.filename)
+        indice = obtener_indice_local()
+        conocido = indice.contiene(bucket, path)
+
+        # Se registra la referencia ANTES de subir: así un borrado concurrente
+        # no puede eliminar el objeto entre la comprobación y el uso.
+        referencias = registrar_referencia(bucket, path, sha256, size)
+
+        # Si somos la primera referencia, el objeto pudo haberse borrado aunque
+        # el índice local lo recuerde; en ese caso se sube de nuevo.
+        if not conocido or referencias == 1:
+            stream = getattr(file, 'stream', file)
+            stream.seek(0)
+            file_bytes = stream.read()
+            inicio = time.perf_counter()
+            try:
+                res = supabase.storage.from_(bucket).upload(
+                    path=path,
+                    file=file_bytes,
+                    file_options={
+                        "content-type": file.content_type,
+                        "cache-control": "31536000",
+                    }
+                )
+                if hasattr(res, 'error') and res.error:
+                    if not _es_duplicado(res.error):
+                        raise RuntimeError(f"Error Supabase Storage: {res.error}")
+            except Exception as e:
+                if not _es_duplicado(e):
+                    raise
+                logger.debug(f"Objeto ya existente en Storage: {bucket}/{path}")
+            observar_subida(bucket, len(file_bytes), time.perf_counter() - inicio)
+            indice.registrar(bucket, path, sha256, size)
+        else:
+            logger.debug(f"Subida deduplicada (solo metadatos): {bucket}/{path}")
+
+        return supabase.storage.from_(bucket).get_public_url(path)
+    except Exception as e:
+        logger.error(f"Error subiendo archivo a {bucket}/{folder}: {e}")
+        if referencias is not None:
+            # La referencia se registró antes de subir: sin soltarla el objeto nunca llegaría a cero
+            _liberar(bucket, path)
+        return None
@@ -0,0 +1,165 @@
+"""
+Caché clave/valor con TTL compartida entre los workers de gunicorn.
+
+Los diccionarios en memoria (como cache_contadores) viven dentro de cada
+worker; esta caché usa un archivo SQLite en modo WAL bajo DATA_DIR, así que
+todos los procesos del mismo servidor ven los mismos datos sin depender de
+un servicio externo. Los valores se guardan como JSON.
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List
+
+from config.rutas_datos import ruta_datos
+from utils.metricas import contar_cache, metricas_disponibles
+
+logger = logging.getLogger(__name__)
+
+
+class CacheCompartido:
+    """Caché TTL respaldada por SQLite (segura entre procesos e hilos)."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._local = threading.local()
+        # SHARED_CACHE_PATH puede apuntar fuera de DATA_DIR, a un directorio que aún no existe
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        os.makedirs(directorio, exist_ok=True)
+        conn = self._conexion()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            ' clave TEXT PRIMARY KEY, valor TEXT NOT NULL, expira REAL NOT NULL)'
+        )
+        conn.commit()
+
+    def _conexion(self) -> sqlite3.Connection:
+        # Una conexión por hilo: sqlite3 no permite compartirlas entre hilos
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, clave: str, default: Any = None) -> Any:
+        """Retorna el valor guardado o default si no existe o expiró."""
+        return self.get_many([clave]).get(clave, default)
+
+    def get_many(self, claves: Iterable[str]) -> Dict[str, Any]:
+        """Retorna un dict con las claves encontradas y vigentes."""
+        claves = list(claves)
+        if not claves:
+            return {}
+        resultado = {}
+        try:
+            conn = self._conexion()
+            ahora = time.time()
+            # SQLite limita el número de parámetros por consulta
+            for i in range(0, len(claves), 500):
+                lote = claves[i:i + 500]
+                marcas = ','.join('?' * len(lote))
+                filas = conn.execute(
+                    f'SELECT clave, valor FROM cache WHERE clave IN ({marcas}) AND expira > ?',
+                    (*lote, ahora)
+                ).fetchall()
+                for clave, valor in filas:
+                    resultado[clave] = json.loads(valor)
+        except sqlite3.Error as e:
+            logger.warning(f"Error leyendo caché compartida: {e}")
+        if metricas_disponibles():
+            _contar_consultas(claves, resultado)
+        return resultado
+
+    def set(self, clave: str, valor: Any, ttl: float):
+        """Guarda un valor durante ttl segundos."""
+        self.set_many({clave: valor}, ttl)
+
+    def set_many(self, valores: Dict[str, Any], ttl: float):
+        """Guarda varios valores con el mismo TTL en una sola transacción."""
+        if not valores:
+            return
+        expira = time.time() + ttl
+        try:
+            conn = self._conexion()
+            with conn:
+                conn.execute('BEGIN')
+                conn.executemany(
+                    'INSERT OR REPLACE INTO cache (clave, valor, expira) VALUES (?, ?, ?)',
+                    [(clave, json.dumps(valor), expira) for clave, valor in valores.items()]
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Error escribiendo caché compartida: {e}")
+            return
+
+        # Limpieza ocasional para que el archivo no crezca indefinidamente
+        if random.random() < 0.01:
+            self.limpiar_expirados()
+
+    def claves(self, prefijo: str) -> List[str]:
+        """Claves vigentes que empiezan con el prefijo."""
+        try:
+            filas = self._conexion().execute(
+                'SELECT clave FROM cache WHERE clave >= ? AND clave < ? AND expira > ?',
+                (prefijo, prefijo + '\uffff', time.time())
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Error leyendo caché compartida: {e}")
+            return []
+        return [clave for clave, in filas]
+
+    def delete(self, *claves: str):
+        """Elimina una o más claves."""
+        try:
+            conn = self._conexion()
+            conn.executemany('DELETE FROM cache WHERE clave = ?', [(c,) for c in claves])
+        except sqlite3.Error as e:
+            logger.warning(f"Error eliminando de la caché compartida: {e}")
+
+    def delete_prefix(self, prefijo: str):
+        """Elimina todas las claves que empiezan con el prefijo."""
+        try:
+            conn = self._conexion()
+            conn.execute("DELETE FROM cache WHERE clave >= ? AND clave < ?", (prefijo, prefijo + '\uffff'))
+        except sqlite3.Error as e:
+            logger.warning(f"Error eliminando de la caché compartida: {e}")
+
+    def limpiar_expirados(self) -> int:
+        """Borra las entradas vencidas. Retorna cuántas se eliminaron."""
+        try:
+            cur = self._conexion().execute('DELETE FROM cache WHERE expira <= ?', (time.time(),))
+            return cur.rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Error limpiando caché compartida: {e}")
+            return 0
+
+
+_cache = None
+
+
+def _contar_consultas(claves, resultado):
+    """Aciertos y fallos por espacio (prefijo de la clave hasta ':')."""
+    conteo = {}
+    for clave in claves:
+        espacio = clave.split(':', 1)[0]
+        aciertos, fallos = conteo.get(espacio, (0, 0))
+        conteo[espacio] = (aciertos + 1, fallos) if clave in resultado else (aciertos, fallos + 1)
+    for espacio, (aciertos, fallos) in conteo.items():
+        contar_cache(espacio, aciertos, fallos)
+
+
+def obtener_cache() -> CacheCompartido:
+    """Retorna la caché compartida del proceso (se crea en el primer uso)."""
+    global _cache
+    if _cache is None:
+        _cache = CacheCompartido(
+            os.environ.get('SHARED_CACHE_PATH') or ruta_datos('cache', 'compartida.sqlite3')
+        )
+    return _cache
@@ -0,0 +1,198 @@
+"""
+Caché en disco de imágenes de Supabase Storage para el proxy /media.
+
+Cada objeto se descarga una sola vez y queda en disco junto con sus
+metadatos (ETag fuerte = SHA-256 del contenido, content-type y tamaño).
+El tamaño total está acotado: al superar el límite se eliminan los archivos
+usados hace más tiempo (LRU por bytes, usando el mtime como marca de uso).
+"""
+
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from config.supabase_client import supabase
+from config.rutas_datos import directorio_datos
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES_POR_DEFECTO = 512 * 1024 * 1024  # 512 MB
+
+# Solo se actualiza el mtime si el último uso registrado es más viejo que esto
+INTERVALO_TOQUE = 60
+
+
+class CacheMedios:
+    """Caché LRU en disco acotada por bytes, compartida entre workers."""
+
+    def __init__(self, directorio: str, max_bytes: int = MAX_BYTES_POR_DEFECTO):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._locks = [threading.Lock() for _ in range(64)]
+        self._total_estimado = None
+        os.makedirs(directorio, exist_ok=True)
+
+    # --- Rutas ---
+
+    def _rutas(self, bucket: str, path: str):
+        clave = hashlib.sha256(f"{bucket}/{path}".encode()).hexdigest()
+        carpeta = os.path.join(self.directorio, clave[:2])
+        base = os.path.join(carpeta, clave)
+        return carpeta, base + '.bin', base + '.json'
+
+    def _lock(self, clave: str) -> threading.Lock:
+        # Locks repartidos por hash: acotados en número sin importar cuántos objetos haya
+        return self._locks[hash(clave) % len(self._locks)]
+
+    # --- API ---
+
+    def obtener(self, bucket: str, path: str) -> Optional[dict]:
+        """
+        Retorna los datos del objeto en caché, descargándolo si hace falta.
+
+        Returns:
+            dict con 'ruta', 'etag', 'content_type' y 'size', o None si el
+            objeto no existe en Storage
+        """
+        carpeta, ruta_bin, ruta_meta = self._rutas(bucket, path)
+        meta = self._leer_meta(ruta_bin, ruta_meta)
+        if meta:
+            return meta
+
+        # Un solo hilo por objeto descarga; los demás esperan y reutilizan
+        with self._lock(ruta_bin):
+            meta = self._leer_meta(ruta_bin, ruta_meta)
+            if meta:
+                return meta
+            return self._descargar(bucket, path, carpeta, ruta_bin, ruta_meta)
+
+    def _leer_meta(self, ruta_bin: str, ruta_meta: str) -> Optional[dict]:
+        try:
+            with open(ruta_meta) as f:
+                meta = json.load(f)
+            st = os.stat(ruta_bin)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - st.st_mtime > INTERVALO_TOQUE:
+            try:
+                os.utime(ruta_bin)
+            except OSError:
+                pass
+        meta['ruta'] = ruta_bin
+        return meta
+
+    def _descargar(self, bucket, path, carpeta, ruta_bin, ruta_meta) -> Optional[dict]:
+        try:
+            contenido = supabase.storage.from_(bucket).download(path)
+        except Exception as e:
+            logger.warning(f"No se pudo descargar {bucket}/{path} para la caché de medios: {e}")
+            return None
+
+        meta = {
+            'etag': hashlib.sha256(contenido).hexdigest(),
+            'content_type': _tipo_contenido(path),
+            'size': len(contenido),
+        }
+
+        os.makedirs(carpeta, exist_ok=True)
+        # Escritura atómica: otro worker nunca ve un archivo a medio escribir
+        for destino, datos in ((ruta_bin, contenido), (ruta_meta, json.dumps(meta).encode())):
+            fd, tmp = tempfile.mkstemp(dir=carpeta)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(datos)
+            os.replace(tmp, destino)
+
+        self._registrar_bytes(len(contenido))
+        meta['ruta'] = ruta_bin
+        return meta
+
+    # --- Límite de tamaño ---
+
+    def _registrar_bytes(self, n: int):
+        if self._total_estimado is None:
+            self._total_estimado = self.tamano_total()
+        else:
+            self._total_estimado += n
+        if self._total_estimado > self.max_bytes:
+            self._total_estimado = self.expulsar()
+
+    def tamano_total(self) -> int:
+        total = 0
+        for raiz, _, archivos in os.walk(self.directorio):
+            for nombre in archivos:
+                if nombre.endswith('.bin'):
+                    try:
+                        total += os.path.getsize(os.path.join(raiz, nombre))
+                    except OSError:
+                        pass
+        return total
+
+    def expulsar(self, objetivo: float = 0.9) -> int:
+        """
+        Elimina los archivos menos usados hasta quedar bajo objetivo*max_bytes.
+        Retorna el tamaño total resultante.
+        """
+        entradas = []
+        for raiz, _, archivos in os.walk(self.directorio):
+            for nombre in archivos:
+                if nombre.endswith('.bin'):
+                    ruta = os.path.join(raiz, nombre)
+                    try:
+                        st = os.stat(ruta)
+                    except OSError:
+                        continue
+                    entradas.append((st.st_mtime, st.st_size, ruta))
+
+        total = sum(size for _, size, _ in entradas)
+        limite = self.max_bytes * objetivo
+        expulsados = 0
+        for _, size, ruta in sorted(entradas):
+            if total <= limite:
+                break
+            for archivo in (ruta, ruta[:-4] + '.json'):
+                try:
+                    os.remove(archivo)
+                except OSError:
+                    pass
+            total -= size
+            expulsados += 1
+
+        if expulsados:
+            logger.info(f"Caché de medios: {expulsados} archivos expulsados, {total / 1e6:.1f} MB en uso")
+        return total
+
+
+def _tipo_contenido(path: str) -> str:
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def se_muestra_en_linea(content_type: str) -> bool:
+    """
+    Solo imágenes rasterizadas y PDF se entregan para mostrarse en el
+    navegador. El CAS conserva cualquier extensión, así que un .html o un
+    .svg servido en línea desde nuestro dominio ejecutaría sus scripts.
+    """
+    if content_type == 'application/pdf':
+        return True
+    return content_type.startswith('image/') and content_type != 'image/svg+xml'
+
+
+_cache_medios = None
+
+
+def obtener_cache_medios() -> CacheMedios:
+    """Retorna la caché de medios del proceso (se crea en el primer uso)."""
+    global _cache_medios
+    if _cache_medios is None:
+        _cache_medios = CacheMedios(
+            os.environ.get('MEDIA_CACHE_DIR') or directorio_datos('media'),
+            int(os.environ.get('MEDIA_CACHE_MAX_MB', MAX_BYTES_POR_DEFECTO // (1024 * 1024))) * 1024 * 1024
+        )
+    return _cache_medios
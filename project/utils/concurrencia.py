@@ -0,0 +1,147 @@
+"""
+Ejecución concurrente de lecturas independientes a Supabase dentro de una request.
+
+Las vistas de detalle hacen varias consultas que no dependen entre sí (atleta,
+medallas, documentos, disciplinas). Ejecutarlas en un pool de hilos compartido
+hace que la latencia total sea la de la consulta más lenta y no la suma.
+"""
+
+import contextvars
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.environ.get('SUPABASE_IO_WORKERS', 16))
+TIMEOUT_POR_DEFECTO = float(os.environ.get('SUPABASE_IO_TIMEOUT', 10))
+
+_executor = None
+_executor_lock = threading.Lock()
+_PREFIJO_HILO = 'supabase-io'
+
+
+def obtener_executor() -> ThreadPoolExecutor:
+    """Pool de hilos del proceso (se crea en el primer uso, también tras un fork)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix=_PREFIJO_HILO)
+    return _executor
+
+
+_pools_procesos = {}
+
+
+def obtener_pool_procesos(nombre: str, max_workers: int) -> ProcessPoolExecutor:
+    """
+    Pool de procesos con nombre (uno por tipo de trabajo: imágenes, fichas...).
+    Usa spawn: los hijos no heredan los hilos ni el estado del worker web.
+    """
+    pool = _pools_procesos.get(nombre)
+    if pool is None:
+        with _executor_lock:
+            pool = _pools_procesos.get(nombre)
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+                _pools_procesos[nombre] = pool
+    return pool
+
+
+def descartar_pool_procesos(nombre: str):
+    """Olvida un pool roto (ej. un hijo murió por OOM); el siguiente uso crea otro."""
+    pool = _pools_procesos.pop(nombre, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _reiniciar_tras_fork():
+    # Los hilos no sobreviven a un fork: el proceso hijo necesita sus propios pools
+    global _executor
+    _executor = None
+    _pools_procesos.clear()
+
+
+os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
+def enviar(fn: Callable, *args, **kwargs):
+    """
+    Envía una tarea al pool conservando el contexto actual (app de Flask,
+    request, métricas), de modo que la tarea se comporte como si corriera
+    en el hilo de la request.
+    """
+    ctx = contextvars.copy_context()
+    return obtener_executor().submit(ctx.run, fn, *args, **kwargs)
+
+
+def ejecutar_en_paralelo(
+    tareas: Dict[str, Callable[[], Any]],
+    timeout: float = None,
+    timeouts: Optional[Dict[str, float]] = None,
+    defaults: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Ejecuta funciones sin argumentos en paralelo y retorna sus resultados por nombre.
+
+    Args:
+        tareas: dict nombre -> función sin argumentos
+        timeout: tiempo máximo por llamada (segundos)
+        timeouts: timeouts específicos por nombre de tarea
+        defaults: valor a usar si la tarea falla o excede su timeout. Las
+                  tareas SIN default propagan su excepción (ej. el atleta
+                  principal), las que tienen default solo se registran en el log.
+
+    Returns:
+        dict nombre -> resultado
+    """
+    timeout = TIMEOUT_POR_DEFECTO if timeout is None else timeout
+    timeouts = timeouts or {}
+    defaults = defaults or {}
+
+    # Dentro de un hilo del pool se ejecuta en serie para no agotar el pool
+    if threading.current_thread().name.startswith(_PREFIJO_HILO) or len(tareas) <= 1:
+        return {nombre: _ejecutar_directo(nombre, fn, defaults) for nombre, fn in tareas.items()}
+
+    inicio = time.monotonic()
+    futuros = {nombre: enviar(fn) for nombre, fn in tareas.items()}
+
+    resultados = {}
+    error = None
+    for nombre, futuro in futuros.items():
+        limite = inicio + timeouts.get(nombre, timeout)
+        try:
+            resultados[nombre] = futuro.result(timeout=max(0.0, limite - time.monotonic()))
+        except FuturesTimeout:
+            futuro.cancel()
+            logger.warning(f"Tarea '{nombre}' excedió {timeouts.get(nombre, timeout)}s")
+            if nombre in defaults:
+                resultados[nombre] = defaults[nombre]
+            elif error is None:
+                error = TimeoutError(f"La consulta '{nombre}' excedió el tiempo máximo")
+        except Exception as e:
+            if nombre in defaults:
+                logger.warning(f"Tarea '{nombre}' falló, usando valor por defecto: {e}")
+                resultados[nombre] = defaults[nombre]
+            elif error is None:
+                error = e
+
+    if error is not None:
+        raise error
+    return resultados
+
+
+def _ejecutar_directo(nombre, fn, defaults):
+    try:
+        return fn()
+    except Exception as e:
+        if nombre not in defaults:
+            raise
+        logger.warning(f"Tarea '{nombre}' falló, usando valor por defecto: {e}")
+        return defaults[nombre]
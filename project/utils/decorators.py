@@ -1,8 +1,11 @@
+import logging
 from functools import wraps
 from flask import session, flash, redirect, url_for
 from config.supabase_client import supabase
 from gotrue.errors import AuthApiError
 
+logger = logging.getLogger(__name__)
+
 def login_required(f):
     """
     Verifica sesión, restaura conexión Supabase y asegura que el ROL exista.
@@ -29,7 +32,8 @@ def login_required(f):
                 if current_user and current_user.user:
                     if current_user.user.id != user_id_session:
                         # El usuario de Supabase no coincide con la sesión de Flask
-                        print(f"⚠️ SECURITY: User mismatch! Supabase: {current_user.user.id} != Session: {user_id_session}")
+                        logger.warning("Usuario de Supabase distinto al de la sesión",
+                                       extra={'usuario_supabase': current_user.user.id, 'usuario_sesion': user_id_session})
                         session.clear()
                         flash('Sesión inválida. Por favor inicia sesión nuevamente.', 'error')
                         return redirect(url_for('auth.login'))
@@ -38,30 +42,30 @@ def login_required(f):
 
             # 3. RECUPERACIÓN DE ROL CON VALIDACIÓN DE SEGURIDAD
             if 'role' not in session or not session['role']:
-                print(f"DEBUG: Rol perdido para {user_id_session}. Recuperando de forma segura...")
+                logger.debug("Rol ausente en la sesión; recuperando", extra={'usuario': user_id_session})
                 try:
                     profile = supabase.table('profiles').select('role').eq('id', user_id_session).single().execute()
                     if profile.data and profile.data.get('role'):
                         new_role = profile.data['role']
                         session['role'] = new_role
-                        print(f"DEBUG: Rol recuperado correctamente para {user_id_session} -> {new_role}")
+                        logger.debug("Rol recuperado", extra={'usuario': user_id_session, 'rol': new_role})
                     else:
-                        print(f"⚠️ No se encontró rol para {user_id_session}, asignando 'usuario' por defecto")
+                        logger.warning("Perfil sin rol; se asigna 'usuario'", extra={'usuario': user_id_session})
                         session['role'] = 'usuario'
                 except Exception as e:
-                    print(f"❌ Error recuperando rol: {e}")
+                    logger.error(f"Error recuperando rol: {e}", extra={'usuario': user_id_session})
                     # Por seguridad, cerrar sesión si hay error
                     session.clear()
                     flash('Error de autenticación. Por favor inicia sesión nuevamente.', 'error')
                     return redirect(url_for('auth.login'))
                 
         except (AuthApiError, ValueError) as e:
-            print(f"Sesión expirada: {e}")
+            logger.info(f"Sesión expirada: {e}")
             session.clear()
             flash('Tu sesión ha expirado.', 'warning')
             return redirect(url_for('auth.login'))
         except Exception as e:
-            print(f"Error inesperado: {e}")
+            logger.exception(f"Error inesperado verificando la sesión: {e}")
             session.clear()
             return redirect(url_for('auth.login'))
 
@@ -0,0 +1,114 @@
+"""
+Detector de consultas N+1 (desarrollo y staging).
+
+Revisa las llamadas a Supabase que utils/tiempos_peticion registró durante
+una request (o un bloque vigilar()) y avisa cuando:
+    - se superó el presupuesto de llamadas de la ruta, o
+    - la misma forma de llamada (tabla + cadena de métodos, sin argumentos)
+      se repitió N1_REPETICIONES veces o más: el patrón de "una consulta por
+      elemento" que conviene agrupar en un .in_() o en un embed.
+
+Se activa con N1_DETECTOR=1 (registra un warning por infracción). En los
+tests lo activa el plugin de tests/conftest.py, que hace fallar el test.
+
+Variables de entorno:
+    N1_DETECTOR      '1' para activarlo
+    N1_PRESUPUESTO   llamadas permitidas por request (20); por ruta con @presupuesto_llamadas(n)
+    N1_REPETICIONES  repeticiones de una misma forma que se consideran N+1 (5)
+"""
+
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from utils.tiempos_peticion import TiemposPeticion, medicion_actual, _actual
+
+logger = logging.getLogger(__name__)
+
+ACTIVO = os.environ.get('N1_DETECTOR') == '1'
+PRESUPUESTO = int(os.environ.get('N1_PRESUPUESTO', 20))
+REPETICIONES = int(os.environ.get('N1_REPETICIONES', 5))
+
+SERVICIOS = frozenset({'postgrest', 'gotrue', 'storage'})
+
+# Funciones que reciben cada Infraccion (el plugin de pytest agrega la suya)
+_oyentes: List[Callable[['Infraccion'], None]] = []
+
+
+@dataclass
+class Infraccion:
+    origen: str
+    llamadas: int
+    presupuesto: int
+    # (servicio, operación, veces)
+    repetidas: List[Tuple[str, str, int]] = field(default_factory=list)
+
+    def __str__(self):
+        texto = f"{self.origen}: {self.llamadas} llamadas a Supabase (presupuesto {self.presupuesto})"
+        for servicio, operacion, veces in self.repetidas:
+            texto += f"\n    {veces}x {servicio} {operacion}"
+        return texto
+
+
+def presupuesto_llamadas(n: int):
+    """Decorador de vista: presupuesto propio para rutas que legítimamente hacen más llamadas."""
+    def decorador(vista):
+        vista.presupuesto_llamadas = n
+        return vista
+    return decorador
+
+
+def analizar(tiempos: TiemposPeticion, origen: str, presupuesto: int = None,
+             repeticiones: int = None) -> Optional[Infraccion]:
+    """Infraccion si las llamadas de tiempos exceden el presupuesto o se repiten; None si no."""
+    presupuesto = PRESUPUESTO if presupuesto is None else presupuesto
+    repeticiones = REPETICIONES if repeticiones is None else repeticiones
+
+    llamadas = sum(n for categoria, (n, _) in tiempos.categorias.items() if categoria in SERVICIOS)
+    formas = Counter((categoria, operacion) for categoria, operacion, _ in tiempos.eventos if categoria in SERVICIOS)
+    repetidas = [(categoria, operacion, veces) for (categoria, operacion), veces in formas.most_common()
+                 if veces >= repeticiones]
+    if llamadas <= presupuesto and not repetidas:
+        return None
+    return Infraccion(origen, llamadas, presupuesto, repetidas)
+
+
+def reportar(infraccion: Infraccion):
+    logger.warning(f"Posible N+1 en {infraccion}", extra={
+        'origen': infraccion.origen, 'llamadas': infraccion.llamadas, 'presupuesto': infraccion.presupuesto})
+    for oyente in _oyentes:
+        oyente(infraccion)
+
+
+@contextmanager
+def vigilar(origen: str, presupuesto: int = None):
+    """Aplica el detector a un bloque fuera de Flask (scripts, tareas)."""
+    tiempos = TiemposPeticion()
+    token = _actual.set(tiempos)
+    try:
+        yield tiempos
+    finally:
+        _actual.reset(token)
+        if ACTIVO:
+            infraccion = analizar(tiempos, origen, presupuesto)
+            if infraccion:
+                reportar(infraccion)
+
+
+def registrar_en_app(app):
+    """Analiza cada request al responder (solo con el detector activo)."""
+    from flask import request
+
+    @app.after_request
+    def _detectar_n1(response):
+        tiempos = medicion_actual()
+        if not ACTIVO or tiempos is None or request.endpoint is None:
+            return response
+        vista = app.view_functions.get(request.endpoint)
+        infraccion = analizar(tiempos, request.endpoint, getattr(vista, 'presupuesto_llamadas', None))
+        if infraccion:
+            reportar(infraccion)
+        return response
@@ -0,0 +1,333 @@
+"""
+Esquema declarativo de la ficha del atleta (tabla becas).
+
+Cada campo que recoge el formulario (obtener_datos_formulario) se declara
+una vez con su conversión, si es requerido y su mensaje de error. El esquema
+se compila al importar el módulo: los patrones quedan compilados y validar
+un registro es un solo recorrido por una tupla, sin volver a decidir qué
+función corresponde a cada campo.
+
+Se usa para un registro (crear/editar) o por lotes (importaciones).
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.validaciones import PATRON_EMAIL, sanitizar_input
+
+
+class ErrorCampo(ValueError):
+    """El valor de un campo no es válido (el mensaje se muestra al usuario)."""
+
+
+@dataclass(frozen=True)
+class Campo:
+    conversion: Callable[[Any], Any]
+    requerido: bool = False
+    mensaje_requerido: Optional[str] = None
+    # Valor que se guarda si el campo viene vacío
+    defecto: Any = None
+
+
+# --- Conversiones ---
+
+_PATRON_NUMERO = re.compile(r'^(\d+(?:[.,]\d+)?)\s*([a-zA-Z]*)$')
+_PATRON_CEDULA = re.compile(r'^([VE])?-?(\d{7,8})$')
+_PATRON_TELEFONO = re.compile(r'^0\d{10}$')
+_LIMPIAR_CEDULA = re.compile(r'[\s.]')
+_LIMPIAR_TELEFONO = re.compile(r'[\s\-()]')
+
+VALORES_SI = frozenset({'si', 'sí', 's', 'true', '1', 'on', 'yes', 'x'})
+VALORES_NO = frozenset({'no', 'n', 'false', '0', 'off', ''})
+
+
+def texto(maximo: int = 150) -> Callable[[Any], str]:
+    def convertir(valor):
+        valor = sanitizar_input(str(valor))
+        if len(valor) > maximo:
+            raise ErrorCampo(f"Máximo {maximo} caracteres")
+        return valor
+    return convertir
+
+
+def opcion(*valores: str, alias: Dict[str, str] = None, mensaje: str = None) -> Callable[[Any], str]:
+    """Uno de los valores dados (sin distinguir mayúsculas); alias para otras formas."""
+    por_clave = {v.lower(): v for v in valores}
+    por_clave.update({k.lower(): v for k, v in (alias or {}).items()})
+    mensaje = mensaje or f"Debe ser uno de: {', '.join(valores)}"
+
+    def convertir(valor):
+        try:
+            return por_clave[str(valor).strip().lower()]
+        except KeyError:
+            raise ErrorCampo(mensaje) from None
+    return convertir
+
+
+def si_no(valor) -> str:
+    clave = str(valor).strip().lower()
+    if clave in VALORES_SI:
+        return 'Si'
+    if clave in VALORES_NO:
+        return 'No'
+    raise ErrorCampo("Debe ser Si o No")
+
+
+def booleano(valor) -> bool:
+    if isinstance(valor, bool):
+        return valor
+    return si_no(valor) == 'Si'
+
+
+def entero(minimo: int, maximo: int, mensaje: str) -> Callable[[Any], int]:
+    def convertir(valor):
+        try:
+            numero = int(float(str(valor).replace(',', '.')))
+        except ValueError:
+            raise ErrorCampo(mensaje) from None
+        if not minimo <= numero <= maximo:
+            raise ErrorCampo(mensaje)
+        return numero
+    return convertir
+
+
+def _medida(valor) -> Tuple[float, str]:
+    """'60,5 kg' -> (60.5, 'kg'); '1.70' -> (1.7, '')."""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor), ''
+    m = _PATRON_NUMERO.match(str(valor).strip())
+    if not m:
+        raise ErrorCampo("Debe ser un número válido")
+    return float(m.group(1).replace(',', '.')), m.group(2).lower()
+
+
+def peso(valor) -> float:
+    """Peso en kg ('60', '60,5 kg', '60kg')."""
+    kg, unidad = _medida(valor)
+    if unidad not in ('', 'kg', 'kgs', 'k'):
+        raise ErrorCampo("El peso debe estar en kg")
+    if not 20 <= kg <= 200:
+        raise ErrorCampo("El peso debe estar entre 20 y 200 kg")
+    return round(kg, 1)
+
+
+def estatura(valor) -> float:
+    """Estatura en metros; acepta metros ('1.70', '1,70 m') o centímetros ('170', '170 cm')."""
+    numero, unidad = _medida(valor)
+    if unidad == 'cm' or (unidad == '' and numero > 3):
+        numero = numero / 100
+    elif unidad not in ('', 'm', 'mts', 'mt'):
+        raise ErrorCampo("La estatura debe estar en metros o centímetros")
+    if not 0.5 <= numero <= 2.5:
+        raise ErrorCampo("La estatura debe estar entre 50 cm (0.5 m) y 250 cm (2.5 m)")
+    return round(numero, 2)
+
+
+_FORMATOS_FECHA = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+
+
+def fecha_pasada(valor) -> str:
+    """Fecha ISO (acepta AAAA-MM-DD, DD/MM/AAAA y DD-MM-AAAA) no futura."""
+    if isinstance(valor, datetime):
+        valor = valor.date()
+    if not isinstance(valor, date):
+        for formato in _FORMATOS_FECHA:
+            try:
+                valor = datetime.strptime(str(valor).strip()[:10], formato).date()
+                break
+            except ValueError:
+                continue
+        else:
+            raise ErrorCampo("Fecha inválida. Use AAAA-MM-DD o DD/MM/AAAA")
+    if not date(1900, 1, 1) <= valor <= date.today():
+        raise ErrorCampo("La fecha no puede ser futura ni anterior a 1900")
+    return valor.isoformat()
+
+
+def cedula(valor) -> str:
+    """Normaliza a 'V-12345678' (sin prefijo se asume V; ignora espacios y puntos)."""
+    m = _PATRON_CEDULA.match(_LIMPIAR_CEDULA.sub('', str(valor)).upper())
+    if not m:
+        raise ErrorCampo("Formato de cédula inválido. Use V-12345678 o E-12345678")
+    return f"{m.group(1) or 'V'}-{m.group(2)}"
+
+
+def telefono(valor) -> str:
+    """Normaliza a '0414-1234567'."""
+    limpio = _LIMPIAR_TELEFONO.sub('', str(valor))
+    if limpio.startswith('+58'):
+        limpio = '0' + limpio[3:]
+    if not _PATRON_TELEFONO.match(limpio):
+        raise ErrorCampo("Formato de teléfono inválido. Use 0414-1234567")
+    return f"{limpio[:4]}-{limpio[4:]}"
+
+
+def email(valor) -> str:
+    valor = str(valor).strip().lower()
+    if not PATRON_EMAIL.match(valor):
+        raise ErrorCampo("Formato de email inválido")
+    return valor
+
+
+# --- Esquema ---
+
+_TALLA = texto(10)
+
+ESQUEMA_ATLETA: Dict[str, Campo] = {
+    # Datos básicos
+    'nombre': Campo(texto(100), requerido=True, mensaje_requerido="El nombre es requerido"),
+    'apellido': Campo(texto(100), requerido=True, mensaje_requerido="El apellido es requerido"),
+    'cedula': Campo(cedula, requerido=True, mensaje_requerido="La cédula es requerida"),
+    'edad': Campo(entero(5, 100, "La edad debe estar entre 5 y 100 años")),
+    'sexo': Campo(opcion('Masculino', 'Femenino', alias={'m': 'Masculino', 'f': 'Femenino'})),
+    'email': Campo(email),
+    'telefono': Campo(telefono),
+    'estatus': Campo(opcion('Activo', 'En Revisión', 'Inactivo', alias={'en revision': 'En Revisión'}),
+                     defecto='Activo'),
+    'cuenta_bancaria': Campo(texto(30)),
+
+    # Representante
+    'es_menor': Campo(booleano, defecto=False),
+    'representante_nombre': Campo(texto(150)),
+    'representante_cedula': Campo(cedula),
+    'representante_telefono': Campo(telefono),
+    'representante_parentesco': Campo(texto(30)),
+
+    # Ubicación
+    'municipio': Campo(texto(80)),
+    'lugar_nacimiento': Campo(texto(150)),
+    'direccion': Campo(texto(300)),
+    'fecha_nacimiento': Campo(fecha_pasada),
+
+    # Datos deportivos
+    'disciplina': Campo(texto(80)),
+    'especialidad': Campo(texto(120)),
+    'categoria': Campo(texto(80)),
+    'tipo_beca': Campo(texto(50)),
+
+    # Antropometría
+    'sangre': Campo(texto()),
+    'peso': Campo(peso),
+    'estatura': Campo(estatura),
+
+    # Tallas
+    'talla_zapato': Campo(_TALLA),
+    'talla_franela': Campo(_TALLA),
+    'talla_short': Campo(_TALLA),
+    'talla_chemise': Campo(_TALLA),
+    'talla_mono': Campo(_TALLA),
+    'talla_competencia': Campo(_TALLA),
+
+    # Información médica y otros
+    'usa_lentes': Campo(si_no, defecto='No'),
+    'usa_bucal': Campo(si_no, defecto='No'),
+    'usa_munequera': Campo(si_no, defecto='No'),
+    'usa_rodilleras': Campo(si_no, defecto='No'),
+    'dieta_deportiva': Campo(si_no, defecto='No'),
+    'control_medico': Campo(si_no, defecto='No'),
+    'estudio_social': Campo(si_no, defecto='No'),
+}
+
+
+# Nombres con tildes o más claros que el de la columna
+ETIQUETAS = {
+    'cedula': 'Cédula',
+    'telefono': 'Teléfono',
+    'email': 'Correo',
+    'es_menor': 'Menor de edad',
+    'representante_nombre': 'Representante',
+    'representante_cedula': 'Cédula del representante',
+    'representante_telefono': 'Teléfono del representante',
+    'representante_parentesco': 'Parentesco',
+    'direccion': 'Dirección',
+    'fecha_nacimiento': 'Fecha de nacimiento',
+    'lugar_nacimiento': 'Lugar de nacimiento',
+    'tipo_beca': 'Tipo de beca',
+    'categoria': 'Categoría',
+    'sangre': 'Tipo de sangre',
+    'talla_mono': 'Talla de chaqueta/mono',
+    'usa_munequera': 'Usa muñequera',
+}
+
+
+def compilar(esquema: Dict[str, Campo]) -> Tuple[tuple, ...]:
+    """Aplana el esquema en tuplas (nombre, conversión, requerido, mensaje, defecto)."""
+    return tuple(
+        (nombre, c.conversion, c.requerido, c.mensaje_requerido or f"El campo {nombre} es requerido", c.defecto)
+        for nombre, c in esquema.items()
+    )
+
+
+_COMPILADO = compilar(ESQUEMA_ATLETA)
+
+
+def validar_atleta(datos: dict, parcial: bool = False) -> Tuple[dict, Dict[str, str]]:
+    """
+    Valida y convierte un registro.
+
+    Args:
+        datos: valores crudos (formulario o fila importada)
+        parcial: solo validar los campos presentes en datos (los requeridos
+                 que falten no son error)
+
+    Returns:
+        Tuple (datos_limpios, errores por campo). datos_limpios solo tiene
+        los campos del esquema.
+    """
+    limpio = {}
+    errores = {}
+    for nombre, convertir, requerido, mensaje, defecto in _COMPILADO:
+        if nombre not in datos:
+            if parcial:
+                continue
+            valor = None
+        else:
+            valor = datos[nombre]
+        if valor is None or (isinstance(valor, str) and not valor.strip()):
+            if requerido:
+                errores[nombre] = mensaje
+            limpio[nombre] = defecto
+            continue
+        try:
+            limpio[nombre] = convertir(valor)
+        except ErrorCampo as e:
+            errores[nombre] = str(e)
+    return limpio, errores
+
+
+def etiqueta(campo: str) -> str:
+    """Nombre legible del campo para los mensajes al usuario."""
+    return ETIQUETAS.get(campo) or campo.replace('_', ' ').capitalize()
+
+
+def mensajes_por_campo(errores: Dict[str, str]) -> List[str]:
+    """Errores de validar_atleta como 'Campo: mensaje' (el mensaje solo no dice qué campo falló)."""
+    return [f"{etiqueta(campo)}: {mensaje}" for campo, mensaje in errores.items()]
+
+
+def validar_lote(filas: Iterable[dict], parcial: bool = False) -> Tuple[List[Tuple[int, dict]], Dict[int, dict]]:
+    """
+    Valida muchos registros (importaciones). Además marca cédulas repetidas
+    dentro del mismo lote.
+
+    Returns:
+        Tuple (válidas como [(índice, datos_limpios)], {índice: errores})
+    """
+    validas = []
+    errores = {}
+    vistas = {}
+    for indice, fila in enumerate(filas):
+        limpio, errores_fila = validar_atleta(fila, parcial)
+        ced = limpio.get('cedula')
+        if ced and not errores_fila:
+            if ced in vistas:
+                errores_fila = {'cedula': f"Cédula repetida (fila {vistas[ced] + 1})"}
+            else:
+                vistas[ced] = indice
+        if errores_fila:
+            errores[indice] = errores_fila
+        else:
+            validas.append((indice, limpio))
+    return validas, errores
@@ -1,202 +1,286 @@
+"""
+Generación de la ficha del atleta en Excel.
+
+El formato (anchos, combinaciones, estilos con nombre) se arma una sola vez
+por proceso en una plantilla con marcadores {{campo}}. Cada descarga copia
+el .xlsx de la plantilla y reemplaza los marcadores en el XML, sin volver a
+pasar por openpyxl. Los bytes generados se guardan en la caché
+compartida por (id, hash del contenido de la fila), así que repetir una
+descarga no cuesta nada.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import zipfile
 from io import BytesIO
+from xml.sax.saxutils import escape
+
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side
-
-def style_range(ws, cell_range, border=Border(), fill=None, font=None, alignment=None):
-    """Función auxiliar para aplicar estilos a un rango de celdas"""
-    top = Border(top=border.top)
-    left = Border(left=border.left)
-    right = Border(right=border.right)
-    bottom = Border(bottom=border.bottom)
-    
-    first_cell = ws[cell_range.split(":")[0]]
-    rows = list(ws[cell_range])
-    
-    for cell in rows[0]: cell.border = cell.border + top
-    for cell in rows[-1]: cell.border = cell.border + bottom
-    
-    for row in rows:
-        l = row[0]
-        r = row[-1]
-        l.border = l.border + left
-        r.border = r.border + right
-        
-        for cell in row:
-            if font: cell.font = font
-            if alignment: cell.alignment = alignment
+from openpyxl.styles import Font, Alignment, Border, Side, NamedStyle
 
-def generar_ficha_excel(beca):
+from utils.cache_compartido import obtener_cache
+
+# Cambiar al modificar el formato: invalida las fichas en caché
+VERSION_PLANTILLA = 2
+TTL_FICHA = 7 * 24 * 3600
+
+PATRON_MARCADOR = re.compile(r'\{\{(\w+)\}\}')
+
+_LADO = Side(style='thin')
+
+RECAUDOS = [
+    "● Postulación de la Asociación Deportiva del Atleta.",
+    "● Imagen legible de la cédula de identidad o Partida de Nacimiento.",
+    "● Síntesis Curricular o Palmarés deportivo.",
+    "● Copia de cédula del titular de la cuenta bancaria.",
+    "● Copia de cédula del Representante (si aplica).",
+    "● Soporte de Cuenta Bancaria (Referencia, Cheque, Libreta)."
+]
+
+
+def _estilos():
+    """Estilos con nombre de la ficha (se registran una vez en el libro)."""
+    centro = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    izquierda = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    return {
+        'ficha_titulo': NamedStyle('ficha_titulo', font=Font(bold=True), alignment=centro),
+        'ficha_negrita': NamedStyle('ficha_negrita', font=Font(bold=True)),
+        'ficha_tabla': NamedStyle('ficha_tabla', alignment=centro),
+        'ficha_tabla_negrita': NamedStyle('ficha_tabla_negrita', font=Font(bold=True), alignment=centro),
+        'ficha_tabla_izq': NamedStyle('ficha_tabla_izq', alignment=izquierda),
+        'ficha_tabla_izq_negrita': NamedStyle('ficha_tabla_izq_negrita', font=Font(bold=True), alignment=izquierda),
+    }
+
+
+def _tabla(ws, rango, estilo, negritas=()):
+    """Aplica un estilo a un rango y le dibuja el contorno."""
+    filas = list(ws[rango])
+    for i, fila in enumerate(filas):
+        for j, cell in enumerate(fila):
+            cell.style = estilo + '_negrita' if cell.coordinate in negritas else estilo
+            cell.border = Border(
+                top=_LADO if i == 0 else None,
+                bottom=_LADO if i == len(filas) - 1 else None,
+                left=_LADO if j == 0 else None,
+                right=_LADO if j == len(fila) - 1 else None,
+            )
+
+
+def construir_libro_ficha(valores: dict = None) -> Workbook:
     """
-    Genera el archivo Excel de la ficha del atleta.
-    Retorna un objeto BytesIO con el contenido del archivo excel.
+    Arma el libro de la ficha con todo su formato.
+
+    Args:
+        valores: valores de los campos. Si es None las celdas variables quedan
+                 con marcadores {{campo}} (así se construye la plantilla).
     """
+    v = valores if valores is not None else _Marcadores()
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Ficha Atleta"
+    for estilo in _estilos().values():
+        wb.add_named_style(estilo)
 
-    # Estilos comunes
-    bold_font = Font(bold=True)
-    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    left_align = Alignment(horizontal='left', vertical='center', wrap_text=True)
-    thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), 
-                         top=Side(style='thin'), bottom=Side(style='thin'))
-
-    # Configurar ancho de columnas
     ws.column_dimensions['A'].width = 25
-    ws.column_dimensions['B'].width = 15
-    ws.column_dimensions['C'].width = 15
-    ws.column_dimensions['D'].width = 15
-    ws.column_dimensions['E'].width = 15
-    ws.column_dimensions['F'].width = 15
-    ws.column_dimensions['G'].width = 15
-    ws.column_dimensions['H'].width = 15
+    for col in 'BCDEFGH':
+        ws.column_dimensions[col].width = 15
 
     # --- ENCABEZADO ---
-    ws.merge_cells('A1:H1')
-    ws['A1'] = "REPUBLICA BOLIVARIANA DE VENEZUELA"
-    ws['A1'].font = bold_font
-    ws['A1'].alignment = center_align
-
-    ws.merge_cells('A2:H2')
-    ws['A2'] = "INSTITUTO REGIONAL DE DEPORTES DEL ESTADO BOLIVARIANO DE GUÁRICO"
-    ws['A2'].font = bold_font
-    ws['A2'].alignment = center_align
-
-    ws.merge_cells('A3:H3')
-    ws['A3'] = "PROGRAMA BECAS DEPORTIVAS"
-    ws['A3'].font = bold_font
-    ws['A3'].alignment = center_align
+    for fila, texto in enumerate([
+        "REPUBLICA BOLIVARIANA DE VENEZUELA",
+        "INSTITUTO REGIONAL DE DEPORTES DEL ESTADO BOLIVARIANO DE GUÁRICO",
+        "PROGRAMA BECAS DEPORTIVAS",
+    ], start=1):
+        ws.merge_cells(f'A{fila}:H{fila}')
+        ws[f'A{fila}'] = texto
+        ws[f'A{fila}'].style = 'ficha_titulo'
 
     # --- DATOS GENERALES ---
     ws['A5'] = "FICHA ATLETA"
-    ws['A5'].font = bold_font
     ws['D5'] = "DISCIPLINA DEPORTIVA:"
-    ws['D5'].font = bold_font
-    ws['G5'] = beca.get('disciplina', '')
-
+    ws['G5'] = v['disciplina']
     ws['A6'] = "DATOS PERSONALES"
-    ws['A6'].font = bold_font
     ws['D6'] = "Especialidad, Modalidad, División:"
-    ws['G6'] = beca.get('especialidad', '')
-    
+    ws['G6'] = v['especialidad']
     ws['F7'] = "FECHA SOLICITUD:"
-    ws['F7'].font = bold_font
-    # Usamos created_at o la fecha actual si no hay
-    ws['G7'] = beca.get('created_at', '').split('T')[0] if beca.get('created_at') else ''
-
-    # --- TABLA IDENTIFICACIÓN ---
-    headers_id = ["NACIONALIDAD", "C. I. N°", "PRIMER APELLIDO", "SEGUNDO APELLIDO", "PRIMER NOMBRE", "SEGUNDO NOMBRE"]
-    ws.append([]) # Espacio
-    ws.append(headers_id + ["", "FOTO"]) 
-    
-    # Datos del atleta
-    nacionalidad = "Venezolana" 
-    cedula = beca.get('cedula', '')
-    apellido = beca.get('apellido', '')
-    nombre = beca.get('nombre', '')
-    
-    datos_atleta = [nacionalidad, cedula, apellido, "", nombre, "", "", "[FOTO]"]
-    ws.append(datos_atleta)
-    
-    style_range(ws, 'A9:H10', border=thin_border, alignment=center_align)
-    for col in ['A','B','C','D','E','F']:
-        ws[f'{col}9'].font = bold_font
-
-    # --- DATOS FISICOS Y NACIMIENTO ---
-    ws.append([]) # Row 11 vacía
-    ws.append(["FECHA DE NACIMIENTO", "", "", "SEXO", "DIAGNÓSTICO MÉDICO", "", "GRUPO SANGUÍNEO", "PESO (Kg)"]) # Row 12
-    ws['A12'].font = bold_font
-    
-    # Subcabeceras
-    ws.append(["DIA", "MES", "AÑO", f"{beca.get('sexo','')} [X]", "No", "", beca.get('sangre',''), beca.get('peso','')]) # Row 13
-    ws['I13'] = f"{beca.get('estatura','')} m"
-    
-    # Valores fecha
-    fecha_nac = beca.get('fecha_nacimiento', '')
-    dia, mes, anio = "", "", ""
-    if fecha_nac:
-        try:
-            parts = fecha_nac.split('-')
-            if len(parts) == 3:
-                anio, mes, dia = parts
-        except: pass
-
-    ws.append([dia, mes, anio, "", "", "", "", ""]) # Row 14
-    
-    style_range(ws, 'A12:H14', border=thin_border, alignment=center_align)
-
-    # --- DIRECCIÓN ---
-    ws.append([]) # Row 15 vacía
+    ws['G7'] = v['fecha_solicitud']
+    for celda in ('A5', 'D5', 'A6', 'F7'):
+        ws[celda].style = 'ficha_negrita'
+
+    # --- TABLA IDENTIFICACIÓN (filas 9-10) ---
+    for col, texto in zip('ABCDEFGH', ["NACIONALIDAD", "C. I. N°", "PRIMER APELLIDO", "SEGUNDO APELLIDO",
+                                       "PRIMER NOMBRE", "SEGUNDO NOMBRE", "", "FOTO"]):
+        ws[f'{col}9'] = texto
+    for col, valor in zip('ABCDEFGH', ["Venezolana", v['cedula'], v['apellido'], "",
+                                       v['nombre'], "", "", "[FOTO]"]):
+        ws[f'{col}10'] = valor
+    _tabla(ws, 'A9:H10', 'ficha_tabla', negritas=('A9', 'B9', 'C9', 'D9', 'E9', 'F9'))
+
+    # --- DATOS FÍSICOS Y NACIMIENTO (filas 12-14) ---
+    for col, texto in zip('ABCDEFGH', ["FECHA DE NACIMIENTO", "", "", "SEXO", "DIAGNÓSTICO MÉDICO", "",
+                                       "GRUPO SANGUÍNEO", "PESO (Kg)"]):
+        ws[f'{col}12'] = texto
+    for col, valor in zip('ABCDEFGH', ["DIA", "MES", "AÑO", v['sexo_marcado'], "No", "", v['sangre'], v['peso']]):
+        ws[f'{col}13'] = valor
+    ws['I13'] = v['estatura_m']
+    for col, valor in zip('ABC', [v['nacimiento_dia'], v['nacimiento_mes'], v['nacimiento_anio']]):
+        ws[f'{col}14'] = valor
+    _tabla(ws, 'A12:H14', 'ficha_tabla', negritas=('A12',))
+
+    # --- DIRECCIÓN (filas 16-20) ---
     ws.merge_cells('A16:F16')
     ws['A16'] = "LUGAR DE NACIMIENTO Y DIRECCIÓN DE HABITACIÓN DEL ATLETA"
-    ws['A16'].font = bold_font
     ws['G16'] = "PROGRAMA DEPORTIVO"
-    ws['G16'].font = bold_font
-    
-    ws.append(["PAÍS", "", "ESTADO", "MUNICIPIO", "CIUDAD", "PARROQUIA", "Elite II", ""]) # Row 17
-    ws.append(["Venezuela", "", "Guarico", beca.get('municipio',''), "San Juan de los Morros", "", "", ""]) # Row 18
-    
-    ws.merge_cells('A19:H19')
+    for col, texto in zip('ABCDEFG', ["PAÍS", "", "ESTADO", "MUNICIPIO", "CIUDAD", "PARROQUIA", "Elite II"]):
+        ws[f'{col}17'] = texto
+    for col, valor in zip('ABCDE', ["Venezuela", "", "Guarico", v['municipio'], "San Juan de los Morros"]):
+        ws[f'{col}18'] = valor
+    ws.merge_cells('A19:F19')
     ws['A19'] = "DIRECCIÓN: URB - BARRIO - SECTOR - AVENIDA - CALLE - VEREDA - N°CASA"
-    ws['A19'].font = bold_font
-    
-    ws.merge_cells('A20:F20')
-    ws['A20'] = beca.get('direccion', '')
     ws['G19'] = "TELÉFONO / EMAIL"
-    ws['G20'] = f"{beca.get('telefono','')} / {beca.get('email','')}"
-
-    style_range(ws, 'A16:H20', border=thin_border, alignment=left_align)
-
-    # --- OTROS DATOS (Lentes, tallas, etc) ---
-    ws.append([]) # Row 21
-    ws.append(["OTRA INFORMACIÓN DEPORTIVA"]) # Row 22
-    ws['A22'].font = bold_font
-    
-    ws.append(["¿USA LENTES?", "¿PROTECTOR BUCAL?", "¿MUÑEQUERA?", "¿RODILLERAS?", "¿DIETA?", "CONTROL MÉDICO"]) # Row 23
-    
-    def check_si(val): return "Si [X]" if val == 'Si' else "No"
-    
-    ws.append([
-        check_si(beca.get('usa_lentes')),
-        check_si(beca.get('usa_bucal')),
-        check_si(beca.get('usa_munequera')),
-        check_si(beca.get('usa_rodilleras')),
-        check_si(beca.get('dieta_deportiva')),
-        check_si(beca.get('control_medico'))
-    ]) # Row 24
-    
-    ws.append(["TALLAS:", "Chaqueta/Mono", "Chemise", "Franela", "Short", "Calzado", "Uniforme Comp."]) # Row 25
-    ws.append(["", beca.get('talla_mono',''), beca.get('talla_chemise',''), beca.get('talla_franela',''), beca.get('talla_short',''), beca.get('talla_zapato',''), beca.get('talla_competencia','')]) # Row 26
-    
-    style_range(ws, 'A23:G26', border=thin_border, alignment=center_align)
+    ws.merge_cells('A20:F20')
+    ws['A20'] = v['direccion']
+    ws['G20'] = v['contacto']
+    _tabla(ws, 'A16:H20', 'ficha_tabla_izq', negritas=('A16', 'G16', 'A19'))
+
+    # --- OTRA INFORMACIÓN (filas 22-26) ---
+    ws['A22'] = "OTRA INFORMACIÓN DEPORTIVA"
+    ws['A22'].style = 'ficha_negrita'
+    for col, texto in zip('ABCDEF', ["¿USA LENTES?", "¿PROTECTOR BUCAL?", "¿MUÑEQUERA?", "¿RODILLERAS?",
+                                     "¿DIETA?", "CONTROL MÉDICO"]):
+        ws[f'{col}23'] = texto
+    for col, campo in zip('ABCDEF', ['usa_lentes', 'usa_bucal', 'usa_munequera', 'usa_rodilleras',
+                                     'dieta_deportiva', 'control_medico']):
+        ws[f'{col}24'] = v[campo]
+    for col, texto in zip('ABCDEFG', ["TALLAS:", "Chaqueta/Mono", "Chemise", "Franela", "Short", "Calzado",
+                                      "Uniforme Comp."]):
+        ws[f'{col}25'] = texto
+    for col, campo in zip('BCDEFG', ['talla_mono', 'talla_chemise', 'talla_franela', 'talla_short',
+                                     'talla_zapato', 'talla_competencia']):
+        ws[f'{col}26'] = v[campo]
+    _tabla(ws, 'A23:G26', 'ficha_tabla')
 
     # --- OBSERVACIONES Y NOTAS ---
-    ws.append([]) # Row 27
     ws['A27'] = "OBSERVACIONES:"
-    ws['A27'].font = bold_font
-    
-    ws.append([]) # Row 28
     ws['A29'] = "NOTA IMPORTANTE - RECAUDOS:"
-    ws['A29'].font = bold_font
-    
-    recaudos = [
-        "● Postulación de la Asociación Deportiva del Atleta.",
-        "● Imagen legible de la cédula de identidad o Partida de Nacimiento.",
-        "● Síntesis Curricular o Palmarés deportivo.",
-        "● Copia de cédula del titular de la cuenta bancaria.",
-        "● Copia de cédula del Representante (si aplica).",
-        "● Soporte de Cuenta Bancaria (Referencia, Cheque, Libreta)."
-    ]
-    
-    current_row = 30
-    for recaudo in recaudos:
-        ws.cell(row=current_row, column=1, value=recaudo)
-        ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=8)
-        current_row += 1
-
-    # 3. Guardar en memoria
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return output
+    ws['A27'].style = 'ficha_negrita'
+    ws['A29'].style = 'ficha_negrita'
+    for fila, recaudo in enumerate(RECAUDOS, start=30):
+        ws.cell(row=fila, column=1, value=recaudo)
+        ws.merge_cells(start_row=fila, start_column=1, end_row=fila, end_column=8)
+
+    return wb
+
+
+class _Marcadores(dict):
+    """Devuelve '{{campo}}' para cualquier campo (valores de la plantilla)."""
+
+    def __missing__(self, campo):
+        return '{{%s}}' % campo
+
+
+def valores_ficha(beca: dict) -> dict:
+    """Calcula el texto de cada celda variable a partir de la fila de becas."""
+    def texto(campo):
+        valor = beca.get(campo)
+        return '' if valor is None else str(valor)
+
+    def check_si(campo):
+        return "Si [X]" if beca.get(campo) == 'Si' else "No"
+
+    dia, mes, anio = "", "", ""
+    partes = texto('fecha_nacimiento').split('-')
+    if len(partes) == 3:
+        anio, mes, dia = partes
+
+    valores = {campo: texto(campo) for campo in (
+        'disciplina', 'especialidad', 'cedula', 'apellido', 'nombre', 'sangre', 'peso',
+        'municipio', 'direccion', 'talla_mono', 'talla_chemise', 'talla_franela',
+        'talla_short', 'talla_zapato', 'talla_competencia',
+    )}
+    valores.update({
+        'fecha_solicitud': texto('created_at').split('T')[0],
+        'sexo_marcado': f"{texto('sexo')} [X]",
+        'estatura_m': f"{texto('estatura')} m",
+        'nacimiento_dia': dia,
+        'nacimiento_mes': mes,
+        'nacimiento_anio': anio,
+        'contacto': f"{texto('telefono')} / {texto('email')}",
+    })
+    for campo in ('usa_lentes', 'usa_bucal', 'usa_munequera', 'usa_rodilleras', 'dieta_deportiva', 'control_medico'):
+        valores[campo] = check_si(campo)
+    return valores
+
+
+class PlantillaFicha:
+    """Plantilla .xlsx en memoria; rellenar() solo reemplaza los marcadores en el XML."""
+
+    def __init__(self):
+        buffer = BytesIO()
+        construir_libro_ficha().save(buffer)
+        with zipfile.ZipFile(buffer) as z:
+            # Las partes con marcadores (la hoja o sharedStrings.xml, según la
+            # versión de openpyxl) se guardan como texto; el resto tal cual
+            self._partes = []
+            for info in z.infolist():
+                datos = z.read(info.filename)
+                if PATRON_MARCADOR.search(datos.decode('utf-8', 'ignore')):
+                    datos = datos.decode('utf-8')
+                self._partes.append((info, datos))
+
+    def rellenar(self, valores: dict) -> bytes:
+        def reemplazo(m):
+            return escape(valores.get(m.group(1), ''))
+
+        salida = BytesIO()
+        with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as z:
+            for info, datos in self._partes:
+                if isinstance(datos, str):
+                    datos = PATRON_MARCADOR.sub(reemplazo, datos).encode('utf-8')
+                z.writestr(info, datos)
+        return salida.getvalue()
+
+
+_plantilla = None
+_plantilla_lock = threading.Lock()
+
+
+def obtener_plantilla() -> PlantillaFicha:
+    """Plantilla del proceso (se construye en el primer uso)."""
+    global _plantilla
+    if _plantilla is None:
+        with _plantilla_lock:
+            if _plantilla is None:
+                _plantilla = PlantillaFicha()
+    return _plantilla
+
+
+def _clave_cache(beca: dict) -> str:
+    # Hash de la fila completa: becas.updated_at no se actualiza al editar
+    version = hashlib.sha1(json.dumps(beca, sort_keys=True, default=str).encode()).hexdigest()
+    return f"ficha:v{VERSION_PLANTILLA}:{beca.get('id')}:{version}"
+
+
+def ficha_excel_bytes(beca: dict) -> bytes:
+    """Bytes del .xlsx de la ficha, desde la caché compartida si ya se generó."""
+    cache = obtener_cache()
+    clave = _clave_cache(beca)
+    guardado = cache.get(clave)
+    if guardado:
+        return base64.b64decode(guardado)
+
+    contenido = obtener_plantilla().rellenar(valores_ficha(beca))
+    cache.set(clave, base64.b64encode(contenido).decode('ascii'), TTL_FICHA)
+    return contenido
+
+
+def generar_ficha_excel(beca):
+    """
+    Genera el archivo Excel de la ficha del atleta.
+    Retorna un objeto BytesIO con el contenido del archivo excel.
+    """
+    return BytesIO(ficha_excel_bytes(beca))
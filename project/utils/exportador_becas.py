@@ -0,0 +1,98 @@
+"""
+Exportación masiva del listado de atletas a Excel.
+
+Usa el modo write_only de openpyxl: las filas se escriben a disco a medida
+que llegan (ver repositorio_becas.iterar_becas) y la memoria se mantiene
+constante aunque se exporten decenas de miles de atletas.
+"""
+
+from typing import BinaryIO, Iterable
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+# (columna en becas, título en la hoja, ancho)
+COLUMNAS_EXPORTACION = [
+    ('id', 'ID', 8),
+    ('cedula', 'Cédula', 14),
+    ('nombre', 'Nombre', 20),
+    ('apellido', 'Apellido', 20),
+    ('sexo', 'Sexo', 10),
+    ('fecha_nacimiento', 'Fecha de Nacimiento', 14),
+    ('edad', 'Edad', 8),
+    ('disciplina', 'Disciplina', 16),
+    ('especialidad', 'Especialidad', 16),
+    ('categoria', 'Categoría', 14),
+    ('tipo_beca', 'Tipo de Beca', 14),
+    ('estatus', 'Estatus', 12),
+    ('municipio', 'Municipio', 16),
+    ('lugar_nacimiento', 'Lugar de Nacimiento', 18),
+    ('direccion', 'Dirección', 30),
+    ('telefono', 'Teléfono', 14),
+    ('email', 'Correo', 26),
+    ('cuenta_bancaria', 'Cuenta Bancaria', 24),
+    ('es_menor', 'Menor de Edad', 8),
+    ('representante_nombre', 'Representante', 22),
+    ('representante_cedula', 'Cédula Representante', 14),
+    ('representante_telefono', 'Teléfono Representante', 14),
+    ('representante_parentesco', 'Parentesco', 12),
+    ('sangre', 'Tipo de Sangre', 8),
+    ('peso', 'Peso', 8),
+    ('estatura', 'Estatura', 8),
+    ('talla_zapato', 'Talla Zapato', 8),
+    ('talla_franela', 'Talla Franela', 8),
+    ('talla_short', 'Talla Short', 8),
+    ('talla_chemise', 'Talla Chemise', 8),
+    ('talla_mono', 'Talla Mono', 8),
+    ('talla_competencia', 'Talla Competencia', 8),
+]
+
+# Selección para la consulta: solo las columnas que se exportan
+COLUMNAS_SELECT = ','.join(campo for campo, _, _ in COLUMNAS_EXPORTACION)
+
+MIMETYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def exportar_becas_xlsx(becas: Iterable[dict], destino: BinaryIO) -> int:
+    """
+    Escribe las becas en un libro de Excel.
+
+    Args:
+        becas: iterable de filas (se consume una sola vez, sin cargarlo en memoria)
+        destino: archivo binario donde se guarda el .xlsx
+
+    Returns:
+        Número de filas escritas
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Atletas")
+    ws.freeze_panes = 'A2'
+    for i, (_, _, ancho) in enumerate(COLUMNAS_EXPORTACION, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = ancho
+
+    fuente = Font(bold=True, color='FFFFFF')
+    relleno = PatternFill('solid', fgColor='1E3A8A')
+    encabezado = []
+    for _, titulo, _ in COLUMNAS_EXPORTACION:
+        celda = WriteOnlyCell(ws, value=titulo)
+        celda.font = fuente
+        celda.fill = relleno
+        encabezado.append(celda)
+    ws.append(encabezado)
+
+    campos = [campo for campo, _, _ in COLUMNAS_EXPORTACION]
+    total = 0
+    for beca in becas:
+        ws.append([_valor_celda(beca.get(campo)) for campo in campos])
+        total += 1
+
+    wb.save(destino)
+    return total
+
+
+def _valor_celda(valor):
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    return valor
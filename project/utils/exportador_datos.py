@@ -0,0 +1,221 @@
+"""
+Exportación de la tabla becas para análisis (CSV y Parquet).
+
+Los datos se leen por páginas (repositorio_becas.iterar_becas) y se escriben
+por trozos: el CSV sale de un generador directo a la respuesta y el Parquet
+se escribe por grupos de filas con pyarrow (dependencia opcional). La
+memoria queda acotada por el tamaño de página, no por el de la tabla.
+
+Los valores se normalizan: peso en kg y estatura en metros como números,
+fechas en ISO y booleanos reales.
+"""
+
+import csv
+import io
+import re
+from datetime import date, datetime
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+# Columnas exportables y su tipo (sin datos de contacto ni bancarios)
+TIPOS_COLUMNAS = {
+    'id': 'int',
+    'cedula': 'str',
+    'nombre': 'str',
+    'apellido': 'str',
+    'sexo': 'str',
+    'fecha_nacimiento': 'date',
+    'edad': 'int',
+    'disciplina': 'str',
+    'especialidad': 'str',
+    'categoria': 'str',
+    'tipo_beca': 'str',
+    'estatus': 'str',
+    'municipio': 'str',
+    'es_menor': 'bool',
+    'sangre': 'str',
+    'peso': 'peso',
+    'estatura': 'estatura',
+    'talla_zapato': 'str',
+    'talla_franela': 'str',
+    'talla_short': 'str',
+    'talla_chemise': 'str',
+    'talla_mono': 'str',
+    'talla_competencia': 'str',
+    'created_at': 'timestamp',
+}
+
+COLUMNAS_POR_DEFECTO = list(TIPOS_COLUMNAS)
+
+FILAS_POR_TROZO = 1000
+FILAS_POR_GRUPO_PARQUET = 10000
+
+_PATRON_NUMERO = re.compile(r'(\d+(?:[.,]\d+)?)')
+
+
+class ColumnaInvalida(ValueError):
+    """Se pidió una columna que no se puede exportar."""
+
+
+def parsear_columnas(valor: Optional[str]) -> List[str]:
+    """Convierte 'id,nombre,peso' en la lista de columnas validada."""
+    if not valor:
+        return list(COLUMNAS_POR_DEFECTO)
+    columnas = [c.strip() for c in valor.split(',') if c.strip()]
+    invalidas = [c for c in columnas if c not in TIPOS_COLUMNAS]
+    if invalidas:
+        raise ColumnaInvalida(f"Columnas no exportables: {', '.join(invalidas)}")
+    return columnas
+
+
+def columnas_select(columnas: List[str]) -> str:
+    """Selección para la consulta; 'id' siempre se incluye para paginar."""
+    return ','.join(columnas if 'id' in columnas else ['id'] + columnas)
+
+
+# --- Normalización ---
+
+def _numero(valor) -> Optional[float]:
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    m = _PATRON_NUMERO.search(str(valor))
+    return float(m.group(1).replace(',', '.')) if m else None
+
+
+def normalizar_peso(valor) -> Optional[float]:
+    """'60', '60,5 kg', '60kg' -> kg."""
+    peso = _numero(valor)
+    return peso if peso and 0 < peso < 400 else None
+
+
+def normalizar_estatura(valor) -> Optional[float]:
+    """'1.70', '1,70 m', '170', '170 cm' -> metros."""
+    estatura = _numero(valor)
+    if not estatura:
+        return None
+    if estatura > 3:  # Vino en centímetros
+        estatura = estatura / 100
+    return round(estatura, 2) if 0.3 < estatura < 3 else None
+
+
+def _fecha(valor) -> Optional[date]:
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(str(valor)[:10])
+    except ValueError:
+        return None
+
+
+def _timestamp(valor) -> Optional[datetime]:
+    if not valor:
+        return None
+    try:
+        return datetime.fromisoformat(str(valor).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _entero(valor) -> Optional[int]:
+    try:
+        return int(valor) if valor not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _booleano(valor) -> Optional[bool]:
+    if valor is None:
+        return None
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() in ('true', 'si', 'sí', '1', 'on')
+
+
+def _texto(valor) -> Optional[str]:
+    return None if valor is None else str(valor)
+
+
+CONVERSORES = {
+    'int': _entero,
+    'str': _texto,
+    'date': _fecha,
+    'timestamp': _timestamp,
+    'bool': _booleano,
+    'peso': normalizar_peso,
+    'estatura': normalizar_estatura,
+}
+
+
+def filas_tipadas(becas: Iterable[dict], columnas: List[str]) -> Iterator[list]:
+    """Convierte cada fila en la lista de valores tipados de las columnas pedidas."""
+    conversores = [(c, CONVERSORES[TIPOS_COLUMNAS[c]]) for c in columnas]
+    for beca in becas:
+        yield [convertir(beca.get(c)) for c, convertir in conversores]
+
+
+# --- CSV ---
+
+def generar_csv(becas: Iterable[dict], columnas: List[str]) -> Iterator[str]:
+    """Genera el CSV por trozos de FILAS_POR_TROZO filas."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columnas)
+
+    for i, fila in enumerate(filas_tipadas(becas, columnas), start=1):
+        writer.writerow(['' if v is None else v.isoformat() if isinstance(v, (date, datetime)) else v for v in fila])
+        if i % FILAS_POR_TROZO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+# --- Parquet ---
+
+def parquet_disponible() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def escribir_parquet(becas: Iterable[dict], columnas: List[str], destino: BinaryIO) -> int:
+    """
+    Escribe el Parquet por grupos de filas. Requiere pyarrow.
+
+    Returns:
+        Número de filas escritas
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tipos_arrow = {
+        'int': pa.int64(), 'str': pa.string(), 'date': pa.date32(), 'timestamp': pa.timestamp('us', tz='UTC'),
+        'bool': pa.bool_(), 'peso': pa.float64(), 'estatura': pa.float64(),
+    }
+    esquema = pa.schema([(c, tipos_arrow[TIPOS_COLUMNAS[c]]) for c in columnas])
+
+    total = 0
+    with pq.ParquetWriter(destino, esquema, compression='snappy') as writer:
+        grupo = []
+        for fila in filas_tipadas(becas, columnas):
+            grupo.append(fila)
+            if len(grupo) >= FILAS_POR_GRUPO_PARQUET:
+                writer.write_table(_tabla_arrow(pa, esquema, grupo))
+                total += len(grupo)
+                grupo = []
+        if grupo or total == 0:
+            writer.write_table(_tabla_arrow(pa, esquema, grupo))
+            total += len(grupo)
+    return total
+
+
+def _tabla_arrow(pa, esquema, filas: list):
+    columnas = list(zip(*filas)) if filas else [[] for _ in esquema.names]
+    return pa.Table.from_arrays(
+        [pa.array(list(valores), type=campo.type) for valores, campo in zip(columnas, esquema)],
+        schema=esquema
+    )
@@ -0,0 +1,154 @@
+"""
+Exportación masiva de fichas de atletas en un ZIP.
+
+Las fichas se generan por lotes en un pool de procesos (reutilizando
+generar_ficha_excel y su caché) y cada lote se escribe en el ZIP en cuanto
+termina, de modo que la descarga empieza enseguida y la memoria queda
+acotada por los lotes en vuelo. El avance se publica en la caché compartida
+para que el frontend pueda consultarlo desde cualquier worker.
+"""
+
+import logging
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from utils.cache_compartido import obtener_cache
+from utils.concurrencia import obtener_pool_procesos
+from utils.excel_generator import generar_ficha_excel
+
+logger = logging.getLogger(__name__)
+
+MAX_PROCESOS = int(os.environ.get('FICHAS_WORKERS', min(4, os.cpu_count() or 1)))
+# Exportaciones simultáneas por worker web; las demás reciben "ocupado"
+MAX_EXPORTACIONES = int(os.environ.get('FICHAS_MAX_EXPORTS', 2))
+TAMANO_LOTE = 25
+LOTES_EN_VUELO = MAX_PROCESOS * 2
+
+PREFIJO_PROGRESO = 'fichas:progreso:'
+TTL_PROGRESO = 3600
+
+_exportaciones = threading.BoundedSemaphore(MAX_EXPORTACIONES)
+
+
+class ExportacionOcupada(RuntimeError):
+    """Ya hay MAX_EXPORTACIONES exportaciones en curso."""
+
+
+def nombre_archivo_ficha(beca: dict) -> str:
+    """Nombre de la ficha dentro del ZIP (con el id para que no se repita)."""
+    nombre = f"{beca.get('nombre') or ''}_{beca.get('apellido') or ''}".strip('_')
+    nombre = re.sub(r'[^\w.-]+', '_', nombre)
+    return f"Ficha_{nombre}_{beca.get('id')}.xlsx"
+
+
+def generar_lote(becas: List[dict]) -> List[Tuple[str, bytes]]:
+    """Genera las fichas de un lote (corre dentro del pool de procesos)."""
+    return [(nombre_archivo_ficha(beca), generar_ficha_excel(beca).getvalue()) for beca in becas]
+
+
+class _SalidaStream:
+    """Archivo de solo escritura que acumula lo escrito hasta que se retira."""
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def retirar(self) -> bytes:
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def publicar_progreso(exportacion_id: Optional[str], **estado):
+    if exportacion_id:
+        obtener_cache().set(PREFIJO_PROGRESO + exportacion_id, estado, TTL_PROGRESO)
+
+
+def obtener_progreso(exportacion_id: str) -> Optional[dict]:
+    return obtener_cache().get(PREFIJO_PROGRESO + exportacion_id)
+
+
+def reservar_exportacion():
+    """
+    Reserva un lugar para una exportación; liberar con liberar_exportacion().
+
+    Raises:
+        ExportacionOcupada: si ya hay MAX_EXPORTACIONES en curso
+    """
+    if not _exportaciones.acquire(blocking=False):
+        raise ExportacionOcupada("Hay otra exportación de fichas en curso, intente en unos minutos")
+
+
+def liberar_exportacion():
+    _exportaciones.release()
+
+
+def zip_fichas(becas: Iterable[dict], total: int = None, exportacion_id: str = None) -> Iterator[bytes]:
+    """
+    Genera el ZIP de fichas por partes, a medida que los lotes terminan.
+
+    Args:
+        becas: filas de becas (se consumen de a TAMANO_LOTE)
+        total: cantidad esperada, solo para el progreso
+        exportacion_id: ID con el que se publica el progreso
+
+    Yields:
+        bytes del ZIP listos para enviar al cliente
+    """
+    salida = _SalidaStream()
+    pool = obtener_pool_procesos('fichas', MAX_PROCESOS)
+    iterador = iter(becas)
+    en_vuelo = set()
+    hechas = 0
+    publicar_progreso(exportacion_id, estado='generando', hechas=0, total=total)
+
+    try:
+        with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as z:
+            pendientes = True
+            while pendientes or en_vuelo:
+                # Mantener a lo sumo LOTES_EN_VUELO lotes en el pool
+                while pendientes and len(en_vuelo) < LOTES_EN_VUELO:
+                    lote = list(islice(iterador, TAMANO_LOTE))
+                    if not lote:
+                        pendientes = False
+                        break
+                    en_vuelo.add(pool.submit(generar_lote, lote))
+
+                if not en_vuelo:
+                    break
+                listos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    for nombre, contenido in futuro.result():
+                        z.writestr(nombre, contenido)
+                        hechas += 1
+                publicar_progreso(exportacion_id, estado='generando', hechas=hechas, total=total)
+                yield salida.retirar()
+
+        yield salida.retirar()
+        publicar_progreso(exportacion_id, estado='listo', hechas=hechas, total=total)
+        logger.info(f"Exportación de fichas: {hechas} fichas")
+    except BaseException as e:
+        # Incluye GeneratorExit: el cliente canceló la descarga
+        for futuro in en_vuelo:
+            futuro.cancel()
+        publicar_progreso(exportacion_id, estado='error', hechas=hechas, total=total,
+                          error='Descarga cancelada' if isinstance(e, GeneratorExit) else 'Error generando fichas')
+        if not isinstance(e, GeneratorExit):
+            logger.error(f"Error en exportación de fichas: {e}", exc_info=True)
+        raise
@@ -0,0 +1,323 @@
+"""
+Ficha del atleta en PDF, generada en el servidor.
+
+Reemplaza imprimir ver_beca.html (que vuelve a renderizar la página y a
+firmar las URLs de los documentos en cada impresión). El PDF usa los mismos
+datos que la ficha Excel (excel_generator.valores_ficha) y se escribe
+directamente con las fuentes estándar del formato, sin dependencias extra.
+
+Los PDF se guardan en disco por versión de la fila (id, hash del contenido): repetir
+una descarga es un send_file del archivo. Las generaciones corren en un pool
+de procesos acotado para que una ráfaga de impresiones no ocupe los workers web.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Sequence, Tuple
+
+from config.rutas_datos import directorio_datos
+from utils.concurrencia import obtener_pool_procesos, descartar_pool_procesos
+from utils.excel_generator import RECAUDOS, valores_ficha
+
+logger = logging.getLogger(__name__)
+
+# Cambiar al modificar el diseño: los PDF anteriores dejan de usarse
+VERSION_PDF = 1
+
+MAX_PROCESOS = int(os.environ.get('FICHAS_PDF_WORKERS', min(2, os.cpu_count() or 1)))
+# Generaciones aceptadas a la vez (en proceso + en cola); el resto espera ESPERA_GENERACION
+MAX_PENDIENTES = int(os.environ.get('FICHAS_PDF_MAX_PENDING', MAX_PROCESOS * 4))
+ESPERA_GENERACION = 5
+TIMEOUT_GENERACION = 30
+
+# A4 en puntos
+ANCHO_PAGINA, ALTO_PAGINA = 595, 842
+MARGEN = 36
+ANCHO_UTIL = ANCHO_PAGINA - 2 * MARGEN
+ALTO_FILA = 16
+
+
+class GeneradorOcupado(RuntimeError):
+    """Hay demasiadas fichas PDF generándose."""
+
+
+# --- Escritura del PDF ---
+
+def _texto_pdf(texto: str) -> bytes:
+    """Cadena literal PDF en WinAnsiEncoding (cp1252, cubre los acentos y la ñ)."""
+    datos = str(texto).replace('●', '•').encode('cp1252', 'replace')
+    return b'(' + datos.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _ancho_texto(texto: str, tamano: float) -> float:
+    # Aproximación del ancho medio de Helvetica; alcanza para centrar y recortar
+    return len(texto) * tamano * 0.52
+
+
+def _recortar(texto: str, ancho: float, tamano: float) -> str:
+    maximo = int(ancho / (tamano * 0.52))
+    return texto if len(texto) <= maximo else texto[:max(0, maximo - 1)] + '…'
+
+
+class LienzoPDF:
+    """Una página A4 con texto en Helvetica y rectángulos."""
+
+    def __init__(self):
+        self._ops: List[bytes] = []
+
+    def texto(self, x: float, y: float, texto: str, tamano: float = 8, negrita: bool = False):
+        if not texto:
+            return
+        fuente = b'/F2' if negrita else b'/F1'
+        self._ops.append(b'BT %s %g Tf %.2f %.2f Td %s Tj ET' % (fuente, tamano, x, y, _texto_pdf(texto)))
+
+    def texto_centrado(self, x: float, y: float, ancho: float, texto: str, tamano: float = 8,
+                       negrita: bool = False):
+        texto = _recortar(texto, ancho - 4, tamano)
+        self.texto(x + max(2, (ancho - _ancho_texto(texto, tamano)) / 2), y, texto, tamano, negrita)
+
+    def rectangulo(self, x: float, y: float, ancho: float, alto: float):
+        self._ops.append(b'%.2f %.2f %.2f %.2f re S' % (x, y, ancho, alto))
+
+    def contenido(self) -> bytes:
+        return b'0.5 w\n' + b'\n'.join(self._ops)
+
+    def pdf(self) -> bytes:
+        """Documento completo de una página."""
+        contenido = self.contenido()
+        objetos = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>' % (ANCHO_PAGINA, ALTO_PAGINA),
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+            b'<< /Length %d >>\nstream\n%s\nendstream' % (len(contenido), contenido),
+        ]
+
+        salida = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        posiciones = []
+        for i, objeto in enumerate(objetos, start=1):
+            posiciones.append(len(salida))
+            salida += b'%d 0 obj\n%s\nendobj\n' % (i, objeto)
+
+        inicio_xref = len(salida)
+        salida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+        for posicion in posiciones:
+            salida += b'%010d 00000 n \n' % posicion
+        salida += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objetos) + 1, inicio_xref)
+        return bytes(salida)
+
+
+def _tabla(lienzo: LienzoPDF, y: float, anchos: Sequence[float], filas: Sequence[Sequence],
+           negritas: Sequence[int] = (0,)) -> float:
+    """
+    Dibuja una tabla con bordes desde y (borde superior) hacia abajo.
+
+    Args:
+        anchos: proporción de cada columna sobre ANCHO_UTIL
+        filas: textos de cada fila; None en una celda la une con la anterior
+        negritas: índices de las filas en negrita
+
+    Returns:
+        y del borde inferior de la tabla
+    """
+    total = sum(anchos)
+    anchos = [ANCHO_UTIL * a / total for a in anchos]
+    for i, fila in enumerate(filas):
+        y -= ALTO_FILA
+        x = MARGEN
+        celdas: List[Tuple[float, str]] = []
+        for ancho, texto in zip(anchos, fila):
+            if texto is None and celdas:
+                celdas[-1] = (celdas[-1][0] + ancho, celdas[-1][1])
+            else:
+                celdas.append((ancho, texto or ''))
+        for ancho, texto in celdas:
+            lienzo.rectangulo(x, y, ancho, ALTO_FILA)
+            lienzo.texto_centrado(x, y + 5, ancho, texto, 7, negrita=i in negritas)
+            x += ancho
+    return y
+
+
+def renderizar_ficha_pdf(beca: dict) -> bytes:
+    """Genera el PDF de la ficha (mismos datos que la ficha Excel)."""
+    v = valores_ficha(beca)
+    lienzo = LienzoPDF()
+    y = ALTO_PAGINA - MARGEN
+
+    # --- ENCABEZADO ---
+    for texto in ("REPUBLICA BOLIVARIANA DE VENEZUELA",
+                  "INSTITUTO REGIONAL DE DEPORTES DEL ESTADO BOLIVARIANO DE GUÁRICO",
+                  "PROGRAMA BECAS DEPORTIVAS"):
+        y -= 13
+        lienzo.texto_centrado(MARGEN, y, ANCHO_UTIL, texto, 10, negrita=True)
+
+    # --- DATOS GENERALES ---
+    y -= 26
+    lienzo.texto(MARGEN, y, "FICHA ATLETA", 11, negrita=True)
+    lienzo.texto(MARGEN + 220, y, "DISCIPLINA DEPORTIVA:", 8, negrita=True)
+    lienzo.texto(MARGEN + 380, y, v['disciplina'], 8)
+    y -= 13
+    lienzo.texto(MARGEN, y, "DATOS PERSONALES", 9, negrita=True)
+    lienzo.texto(MARGEN + 220, y, "Especialidad, Modalidad, División:", 8, negrita=True)
+    lienzo.texto(MARGEN + 380, y, _recortar(v['especialidad'], 140, 8), 8)
+    y -= 13
+    lienzo.texto(MARGEN + 300, y, "FECHA SOLICITUD:", 8, negrita=True)
+    lienzo.texto(MARGEN + 380, y, v['fecha_solicitud'], 8)
+
+    # --- IDENTIFICACIÓN ---
+    y = _tabla(lienzo, y - 12, (1, 1, 1.2, 1.2, 1.2, 1.2), [
+        ("NACIONALIDAD", "C. I. N°", "PRIMER APELLIDO", "SEGUNDO APELLIDO", "PRIMER NOMBRE", "SEGUNDO NOMBRE"),
+        ("Venezolana", v['cedula'], v['apellido'], "", v['nombre'], ""),
+    ])
+
+    # --- DATOS FÍSICOS Y NACIMIENTO ---
+    y = _tabla(lienzo, y - 10, (0.6, 0.6, 0.6, 1, 1.4, 1, 0.8, 0.8), [
+        ("FECHA DE NACIMIENTO", None, None, "SEXO", "DIAGNÓSTICO MÉDICO", "GRUPO SANGUÍNEO", "PESO (Kg)",
+         "ESTATURA"),
+        ("DIA", "MES", "AÑO", v['sexo_marcado'], "No", v['sangre'], v['peso'], v['estatura_m']),
+        (v['nacimiento_dia'], v['nacimiento_mes'], v['nacimiento_anio'], None, None, None, None, None),
+    ], negritas=(0,))
+
+    # --- DIRECCIÓN ---
+    y = _tabla(lienzo, y - 10, (1, 1, 1, 1, 1.4, 1.2), [
+        ("LUGAR DE NACIMIENTO Y DIRECCIÓN DE HABITACIÓN DEL ATLETA", None, None, None, None, "PROGRAMA DEPORTIVO"),
+        ("PAÍS", "ESTADO", "MUNICIPIO", "CIUDAD", "PARROQUIA", "Elite II"),
+        ("Venezuela", "Guarico", v['municipio'], "San Juan de los Morros", "", ""),
+        ("DIRECCIÓN: URB - BARRIO - SECTOR - AVENIDA - CALLE - VEREDA - N°CASA", None, None, None, None,
+         "TELÉFONO / EMAIL"),
+        (v['direccion'], None, None, None, None, v['contacto']),
+    ], negritas=(0, 3))
+
+    # --- OTRA INFORMACIÓN ---
+    y -= 18
+    lienzo.texto(MARGEN, y, "OTRA INFORMACIÓN DEPORTIVA", 9, negrita=True)
+    y = _tabla(lienzo, y - 4, (1, 1, 1, 1, 1, 1), [
+        ("¿USA LENTES?", "¿PROTECTOR BUCAL?", "¿MUÑEQUERA?", "¿RODILLERAS?", "¿DIETA?", "CONTROL MÉDICO"),
+        tuple(v[c] for c in ('usa_lentes', 'usa_bucal', 'usa_munequera', 'usa_rodilleras',
+                             'dieta_deportiva', 'control_medico')),
+    ])
+    y = _tabla(lienzo, y - 10, (1, 1, 1, 1, 1, 1, 1), [
+        ("TALLAS:", "Chaqueta/Mono", "Chemise", "Franela", "Short", "Calzado", "Uniforme Comp."),
+        ("",) + tuple(v[c] for c in ('talla_mono', 'talla_chemise', 'talla_franela', 'talla_short',
+                                     'talla_zapato', 'talla_competencia')),
+    ])
+
+    # --- OBSERVACIONES Y NOTAS ---
+    y -= 22
+    lienzo.texto(MARGEN, y, "OBSERVACIONES:", 9, negrita=True)
+    lienzo.rectangulo(MARGEN, y - 50, ANCHO_UTIL, 44)
+    y -= 72
+    lienzo.texto(MARGEN, y, "NOTA IMPORTANTE - RECAUDOS:", 9, negrita=True)
+    for recaudo in RECAUDOS:
+        y -= 12
+        lienzo.texto(MARGEN + 6, y, recaudo, 8)
+
+    return lienzo.pdf()
+
+
+# --- Caché en disco ---
+
+def version_ficha(beca: dict) -> str:
+    """Versión del contenido de la fila (hash de la fila: becas.updated_at no cambia al editar)."""
+    version = json.dumps(beca, sort_keys=True, default=str)
+    return hashlib.sha1(f"{VERSION_PDF}:{version}".encode()).hexdigest()[:16]
+
+
+def ruta_cache(beca: dict) -> str:
+    return os.path.join(directorio_datos('fichas_pdf'), f"{beca.get('id')}-{version_ficha(beca)}.pdf")
+
+
+def _guardar(ruta: str, contenido: bytes):
+    """Escribe el PDF de forma atómica y borra las versiones anteriores del mismo atleta."""
+    carpeta, nombre = os.path.split(ruta)
+    fd, temporal = tempfile.mkstemp(dir=carpeta, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contenido)
+        os.replace(temporal, ruta)
+    except Exception:
+        os.unlink(temporal)
+        raise
+
+    prefijo = nombre.split('-', 1)[0] + '-'
+    for otro in os.listdir(carpeta):
+        if otro.startswith(prefijo) and otro.endswith('.pdf') and otro != nombre:
+            try:
+                os.unlink(os.path.join(carpeta, otro))
+            except OSError:
+                pass
+
+
+# --- Pool de procesos ---
+
+_pendientes = threading.BoundedSemaphore(MAX_PENDIENTES)
+# Generaciones en curso por ruta: una ráfaga de la misma ficha espera a una sola
+_en_curso: Dict[str, Future] = {}
+_en_curso_lock = threading.Lock()
+
+
+def _reiniciar_tras_fork():
+    global _pendientes, _en_curso_lock
+    _pendientes = threading.BoundedSemaphore(MAX_PENDIENTES)
+    _en_curso_lock = threading.Lock()
+    _en_curso.clear()
+
+
+os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
+def _enviar(beca: dict) -> Future:
+    if not _pendientes.acquire(timeout=ESPERA_GENERACION):
+        raise GeneradorOcupado("Hay demasiadas fichas generándose, intente en unos segundos")
+    try:
+        try:
+            futuro = obtener_pool_procesos('fichas_pdf', MAX_PROCESOS).submit(renderizar_ficha_pdf, beca)
+        except BrokenProcessPool:
+            logger.warning("Pool de fichas PDF roto, recreándolo")
+            descartar_pool_procesos('fichas_pdf')
+            futuro = obtener_pool_procesos('fichas_pdf', MAX_PROCESOS).submit(renderizar_ficha_pdf, beca)
+    except Exception:
+        _pendientes.release()
+        raise
+    futuro.add_done_callback(lambda _: _pendientes.release())
+    return futuro
+
+
+def obtener_ficha_pdf(beca: dict) -> str:
+    """
+    Ruta del PDF de la ficha en disco; lo genera si esa versión no existe.
+
+    Raises:
+        GeneradorOcupado: si el pool sigue lleno después de ESPERA_GENERACION
+    """
+    ruta = ruta_cache(beca)
+    if os.path.exists(ruta):
+        return ruta
+
+    with _en_curso_lock:
+        futuro = _en_curso.get(ruta)
+    propio = futuro is None
+    if propio:
+        # La espera por un lugar en el pool se hace fuera del lock
+        futuro = _enviar(beca)
+        with _en_curso_lock:
+            _en_curso.setdefault(ruta, futuro)
+
+    try:
+        contenido = futuro.result(timeout=TIMEOUT_GENERACION)
+        if not os.path.exists(ruta):
+            _guardar(ruta, contenido)
+    finally:
+        if propio:
+            with _en_curso_lock:
+                if _en_curso.get(ruta) is futuro:
+                    del _en_curso[ruta]
+    return ruta
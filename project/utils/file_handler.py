@@ -1,47 +1,15 @@
 import logging
-import uuid
-from datetime import datetime
-from config.supabase_client import supabase
+from utils.almacenamiento_cas import subir_por_contenido
 
 logger = logging.getLogger(__name__)
 
 def upload_file_to_supabase(file, bucket, folder):
     """
     Sube un archivo a Supabase Storage y retorna la URL pública.
+    El nombre del objeto es el SHA-256 del contenido, así que volver a subir
+    el mismo archivo reutiliza el objeto existente (ver utils.almacenamiento_cas).
     """
-    if not file or not file.filename:
-        return None
-        
-    try:
-        # Generar nombre único: timestamp_uuid_filename
-        ext = file.filename.split('.')[-1]
-        filename = f"{folder}/{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}.{ext}"
-        
-        # Leer archivo
-        file.seek(0)
-        file_bytes = file.read()
-        
-        # Subir a Supabase
-        # IMPORTANTE: En versiones recientes, upload puede retornar un objeto con .error o lanzar excepción
-        res = supabase.storage.from_(bucket).upload(
-            path=filename, 
-            file=file_bytes, 
-            file_options={"content-type": file.content_type}
-        )
-        
-        # Si res tiene atributo error (y no es None), falló
-        if hasattr(res, 'error') and res.error:
-            logger.error(f"Error Supabase Storage: {res.error}")
-            return None
-
-        # Obtener URL pública
-        # get_public_url en storage-py retorna el string directamente
-        public_url = supabase.storage.from_(bucket).get_public_url(filename)
-        
-        return public_url
-    except Exception as e:
-        logger.error(f"Error subiendo archivo a {bucket}/{folder}: {e}")
-        return None
+    return subir_por_contenido(file, bucket, folder)
 
 def procesar_imagen(file):
     """
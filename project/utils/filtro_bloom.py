@@ -0,0 +1,67 @@
+"""
+Filtro de Bloom: pertenencia aproximada en poco espacio.
+
+Responde "seguro que no está" o "puede estar" (con una tasa de falsos
+positivos configurable). Se usa delante de estructuras exactas para
+descartar sin costo las claves que no están. Los bits pueden vivir en un
+bytearray o en cualquier buffer escribible (ej. un mmap de un archivo).
+"""
+
+import hashlib
+import math
+from typing import Iterable, Tuple, Union
+
+Clave = Union[str, bytes]
+
+
+def parametros(capacidad: int, error: float) -> Tuple[int, int]:
+    """Bits y cantidad de hashes óptimos para capacidad elementos con esa tasa de error."""
+    capacidad = max(1, capacidad)
+    bits = math.ceil(-capacidad * math.log(error) / (math.log(2) ** 2))
+    hashes = max(1, round(bits / capacidad * math.log(2)))
+    return bits, hashes
+
+
+def _bytes(clave: Clave) -> bytes:
+    return clave.encode('utf-8') if isinstance(clave, str) else clave
+
+
+class FiltroBloom:
+    """Filtro de Bloom con doble hashing sobre un solo blake2b de 128 bits."""
+
+    def __init__(self, capacidad: int = 1000, error: float = 0.01, bits=None, num_bits: int = None,
+                 num_hashes: int = None):
+        """
+        Args:
+            capacidad, error: dimensionan un filtro nuevo
+            bits: buffer existente (bytearray, mmap...); requiere num_bits y num_hashes
+        """
+        if bits is None:
+            num_bits, num_hashes = parametros(capacidad, error)
+            bits = bytearray((num_bits + 7) // 8)
+        self.bits = bits
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+
+    def _posiciones(self, clave: Clave):
+        digest = hashlib.blake2b(_bytes(clave), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def agregar(self, clave: Clave):
+        bits = self.bits
+        for p in self._posiciones(clave):
+            bits[p >> 3] |= 1 << (p & 7)
+
+    def agregar_todos(self, claves: Iterable[Clave]):
+        for clave in claves:
+            self.agregar(clave)
+
+    def __contains__(self, clave: Clave) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._posiciones(clave))
+
+    def bytes_usados(self) -> int:
+        return len(self.bits)
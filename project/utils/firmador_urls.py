@@ -0,0 +1,101 @@
+"""
+Firma de URLs de documentos en lote y con caché.
+
+En lugar de una llamada create_signed_url por documento, agrupa todas las
+rutas por bucket en una sola llamada create_signed_urls y guarda cada URL
+firmada en la caché compartida hasta poco antes de que expire. Una ficha con
+20 documentos cuesta una llamada a Storage (o ninguna si ya estaban firmados).
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from config.supabase_client import supabase_admin
+from utils.almacenamiento_cas import extraer_bucket_y_ruta
+from utils.cache_compartido import obtener_cache
+
+logger = logging.getLogger(__name__)
+
+EXPIRACION_FIRMA = 3600  # 1 hora
+MARGEN_RENOVACION = 300  # Se vuelve a firmar 5 minutos antes de expirar
+
+
+def _clave_cache(bucket: str, path: str) -> str:
+    return f"firma:{bucket}/{path}"
+
+
+def firmar_urls(urls: Iterable[str]) -> Dict[str, str]:
+    """
+    Genera URLs firmadas para una lista de URLs públicas de Storage.
+
+    Args:
+        urls: URLs públicas (las que no sean de Storage se devuelven igual)
+
+    Returns:
+        dict url_original -> url_firmada. Si algo falla se usa la URL original.
+    """
+    resultado = {}
+    ubicaciones = {}
+    for url in urls:
+        if not url or url in resultado:
+            continue
+        ubicacion = extraer_bucket_y_ruta(url)
+        resultado[url] = url
+        if ubicacion:
+            ubicaciones[url] = ubicacion
+
+    if not ubicaciones:
+        return resultado
+
+    cache = obtener_cache()
+    claves = {url: _clave_cache(*ubicacion) for url, ubicacion in ubicaciones.items()}
+    cacheadas = cache.get_many(claves.values())
+
+    # Agrupar por bucket lo que no está en caché
+    pendientes = defaultdict(lambda: defaultdict(list))
+    for url, (bucket, path) in ubicaciones.items():
+        firmada = cacheadas.get(claves[url])
+        if firmada:
+            resultado[url] = firmada
+        else:
+            pendientes[bucket][path].append(url)
+
+    if not pendientes:
+        return resultado
+
+    if not supabase_admin:
+        logger.warning("No se pueden firmar URLs: cliente admin no disponible")
+        return resultado
+
+    nuevas = {}
+    for bucket, rutas in pendientes.items():
+        try:
+            respuesta = supabase_admin.storage.from_(bucket).create_signed_urls(
+                list(rutas.keys()), EXPIRACION_FIRMA
+            )
+        except Exception as e:
+            logger.warning(f"Error firmando {len(rutas)} URLs del bucket '{bucket}': {e}")
+            continue
+
+        for item in respuesta or []:
+            path = item.get('path')
+            firmada = item.get('signedURL') or item.get('signedUrl')
+            if item.get('error') or not firmada or path not in rutas:
+                logger.error(f"Error firmando {bucket}/{path}: {item.get('error')}")
+                continue
+            for url in rutas[path]:
+                resultado[url] = firmada
+            nuevas[_clave_cache(bucket, path)] = firmada
+
+    cache.set_many(nuevas, EXPIRACION_FIRMA - MARGEN_RENOVACION)
+    return resultado
+
+
+def firmar_documentos(documentos: List[dict], campo: str = 'archivo') -> List[dict]:
+    """Reemplaza en cada documento la URL del campo indicado por su versión firmada."""
+    firmadas = firmar_urls(doc.get(campo) for doc in documentos)
+    for doc in documentos:
+        if doc.get(campo):
+            doc[campo] = firmadas.get(doc[campo], doc[campo])
+    return documentos
@@ -0,0 +1,253 @@
+"""
+Servicio de imágenes de la galería (carrusel del inicio y laterales del listado).
+
+Las imágenes solo cambian desde la ruta de subida de galería, así que el mapa
+slot -> URL se guarda en la caché compartida entre workers y se invalida al
+subir. Inicio y listado dejan de consultar gallery_images en cada request.
+
+Las subidas se procesan como trabajos en segundo plano (utils/procesador_imagenes.py);
+su estado queda en la caché compartida para que cualquier worker pueda
+responder la consulta del frontend.
+"""
+
+import logging
+import re
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, wait
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+from werkzeug.datastructures import FileStorage
+
+from config.supabase_client import supabase
+from utils.almacenamiento_cas import liberar_referencia
+from utils.cache_compartido import obtener_cache
+from utils.concurrencia import enviar
+from utils.file_handler import upload_file_to_supabase
+from utils.procesador_imagenes import ImagenInvalida, ProcesadorOcupado, enviar_procesamiento
+
+logger = logging.getLogger(__name__)
+
+CLAVE_CACHE = 'galeria:slots'
+PREFIJO_TRABAJO = 'galeria:trabajo:'
+
+# Respaldo por si la tabla se modifica fuera de la app (ej. scripts/migrate_images.py)
+TTL_GALERIA = 3600
+TTL_TRABAJO = 3600
+
+# Lotes: 12 slots de inicio + 6 por cada lateral
+MAX_IMAGENES_LOTE = 24
+TIMEOUT_LOTE = 60
+
+# Slots de inicio (home_N) y laterales del listado (left_N / right_N)
+PATRON_SLOT = re.compile(r'^(home|left|right)_\d+$')
+
+
+def slot_valido(slot: Optional[str]) -> bool:
+    return bool(slot and PATRON_SLOT.match(slot))
+
+
+def obtener_slots(prefijo: str = '') -> Dict[str, str]:
+    """
+    Retorna el mapa slot -> image_data de la galería.
+
+    Args:
+        prefijo: solo incluir slots que empiecen con este prefijo (ej. 'home_')
+    """
+    cache = obtener_cache()
+    slots = cache.get(CLAVE_CACHE)
+    if slots is None:
+        filas = supabase.table('gallery_images').select('slot,image_data').execute().data or []
+        slots = {f['slot']: f['image_data'] for f in filas if f.get('slot') and f.get('image_data')}
+        cache.set(CLAVE_CACHE, slots, TTL_GALERIA)
+
+    if prefijo:
+        return {slot: url for slot, url in slots.items() if slot.startswith(prefijo)}
+    return slots
+
+
+def invalidar_galeria():
+    """Descarta el mapa en caché; la siguiente lectura lo vuelve a cargar."""
+    obtener_cache().delete(CLAVE_CACHE)
+
+
+# --- Escritura ---
+
+def subir_imagen_galeria(contenido: bytes, nombre: str) -> Optional[str]:
+    """Sube un JPEG ya procesado a 'becas-public/gallery'. Retorna la URL pública."""
+    archivo = FileStorage(stream=BytesIO(contenido), filename=nombre or 'galeria.jpg', content_type='image/jpeg')
+    return upload_file_to_supabase(archivo, 'becas-public', 'gallery')
+
+
+def asignar_slots(urls_por_slot: Dict[str, str]):
+    """
+    Asigna URLs a slots con un solo upsert y libera las imágenes reemplazadas.
+    Si el upsert falla se liberan las imágenes nuevas.
+    """
+    if not urls_por_slot:
+        return
+
+    anteriores = supabase.table('gallery_images').select('slot,image_data') \
+        .in_('slot', list(urls_por_slot)).execute().data or []
+
+    try:
+        supabase.table('gallery_images').upsert(
+            [{'slot': slot, 'image_data': url} for slot, url in urls_por_slot.items()],
+            on_conflict='slot'
+        ).execute()
+    except Exception:
+        for url in urls_por_slot.values():
+            liberar_referencia(url)
+        raise
+    invalidar_galeria()
+
+    # Si la imagen nueva es idéntica a la anterior (misma URL por contenido),
+    # la subida ya sumó una referencia: liberar la anterior deja la cuenta igual
+    for fila in anteriores:
+        if fila.get('image_data'):
+            liberar_referencia(fila['image_data'])
+
+
+# --- Trabajos en segundo plano ---
+
+def _guardar_estado(job_id: str, estado: dict):
+    obtener_cache().set(PREFIJO_TRABAJO + job_id, estado, TTL_TRABAJO)
+
+
+def estado_trabajo(job_id: str) -> Optional[dict]:
+    """Estado de un trabajo: {'estado': 'procesando'|'listo'|'error', 'slot', 'url'?, 'error'?}."""
+    return obtener_cache().get(PREFIJO_TRABAJO + job_id)
+
+
+def iniciar_trabajo(slot: str, datos: bytes, nombre: str) -> str:
+    """
+    Encola el procesamiento y la publicación de una imagen para un slot.
+
+    Returns:
+        ID del trabajo para consultar su estado
+
+    Raises:
+        ProcesadorOcupado: si el pool de procesamiento está lleno
+    """
+    job_id = uuid.uuid4().hex
+    _guardar_estado(job_id, {'estado': 'procesando', 'slot': slot})
+    try:
+        futuro = enviar_procesamiento(datos)
+    except Exception:
+        obtener_cache().delete(PREFIJO_TRABAJO + job_id)
+        raise
+
+    # La subida y el upsert son I/O: se hacen en el pool de hilos, no en el de procesos
+    futuro.add_done_callback(lambda f: enviar(_finalizar_trabajo, job_id, slot, nombre, f))
+    return job_id
+
+
+def _finalizar_trabajo(job_id: str, slot: str, nombre: str, futuro):
+    try:
+        url = subir_imagen_galeria(futuro.result(), nombre)
+        if not url:
+            raise RuntimeError("Error al subir al storage")
+        asignar_slots({slot: url})
+        logger.info(f"Imagen de galería actualizada: {slot} -> {url}")
+        _guardar_estado(job_id, {'estado': 'listo', 'slot': slot, 'url': url})
+    except ImagenInvalida as e:
+        _guardar_estado(job_id, {'estado': 'error', 'slot': slot, 'error': str(e)})
+    except Exception as e:
+        logger.error(f"Error procesando imagen de galería {slot}: {e}", exc_info=True)
+        _guardar_estado(job_id, {'estado': 'error', 'slot': slot, 'error': 'Error procesando imagen'})
+
+
+# --- Lotes ---
+
+def _liberar_subida_tardia(futuro):
+    """Suelta la referencia de una subida que terminó después del plazo del lote."""
+    try:
+        url = futuro.result()
+    except Exception:
+        return
+    if url:
+        logger.info(f"Subida de galería fuera de plazo, se libera: {url}")
+        liberar_referencia(url)
+
+
+def procesar_lote(imagenes: Dict[str, Tuple[bytes, str]]) -> Dict[str, dict]:
+    """
+    Procesa, sube y asigna varias imágenes a la vez.
+
+    Las imágenes se procesan en paralelo en el pool de procesos, cada una se
+    sube en el pool de hilos apenas está lista y se guardan con un solo upsert.
+    Todo el lote comparte un plazo de TIMEOUT_LOTE segundos; la referencia de
+    una subida que termina fuera de plazo se libera.
+
+    Args:
+        imagenes: dict slot -> (contenido, nombre_archivo)
+
+    Returns:
+        dict slot -> {'estado': 'listo', 'url'} o {'estado': 'error', 'error'}
+    """
+    resultados = {}
+    limite = time.monotonic() + TIMEOUT_LOTE
+
+    def restante() -> float:
+        return max(0.0, limite - time.monotonic())
+
+    # 1. Procesar (si el pool está lleno se espera a que se libere)
+    futuros = {}
+    for slot, (datos, _) in imagenes.items():
+        try:
+            futuros[slot] = enviar_procesamiento(datos, espera=restante())
+        except ProcesadorOcupado as e:
+            resultados[slot] = {'estado': 'error', 'error': str(e)}
+
+    # 2. Subir en paralelo: cada imagen apenas termina de procesarse, así las
+    # listas no se quedan sin plazo esperando a las lentas
+    slots = {futuro: slot for slot, futuro in futuros.items()}
+    pendientes = set(slots)
+    subidas = {}
+    while pendientes and restante() > 0:
+        listos, pendientes = wait(pendientes, timeout=restante(), return_when=FIRST_COMPLETED)
+        for futuro in listos:
+            slot = slots[futuro]
+            try:
+                subidas[slot] = enviar(subir_imagen_galeria, futuro.result(), imagenes[slot][1])
+            except ImagenInvalida as e:
+                resultados[slot] = {'estado': 'error', 'error': str(e)}
+            except Exception as e:
+                logger.error(f"Error procesando imagen de galería {slot}: {e}", exc_info=True)
+                resultados[slot] = {'estado': 'error', 'error': 'Error procesando imagen'}
+    for futuro in pendientes:
+        futuro.cancel()
+        resultados[slots[futuro]] = {'estado': 'error', 'error': 'Tiempo de procesamiento agotado'}
+
+    wait(subidas.values(), timeout=restante())
+    urls = {}
+    for slot, futuro in subidas.items():
+        if not futuro.done():
+            # Una subida ya en curso registra su referencia aunque el lote no la use
+            if not futuro.cancel():
+                futuro.add_done_callback(_liberar_subida_tardia)
+            resultados[slot] = {'estado': 'error', 'error': 'Tiempo de subida agotado'}
+            continue
+        try:
+            url = futuro.result()
+        except Exception as e:
+            logger.error(f"Error subiendo imagen de galería {slot}: {e}", exc_info=True)
+            url = None
+        if url:
+            urls[slot] = url
+        else:
+            resultados[slot] = {'estado': 'error', 'error': 'Error al subir al storage'}
+
+    # 3. Un solo upsert para todos los slots
+    try:
+        asignar_slots(urls)
+        for slot, url in urls.items():
+            resultados[slot] = {'estado': 'listo', 'url': url}
+    except Exception as e:
+        logger.error(f"Error guardando lote de galería: {e}", exc_info=True)
+        for slot in urls:
+            resultados[slot] = {'estado': 'error', 'error': 'Error guardando en la base de datos'}
+
+    logger.info(f"Lote de galería: {len(urls)}/{len(imagenes)} imágenes actualizadas")
+    return resultados
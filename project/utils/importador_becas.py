@@ -0,0 +1,444 @@
+"""
+Importación masiva de atletas desde planillas CSV/XLSX.
+
+La planilla se lee fila por fila (csv o openpyxl en modo read_only), se
+valida por lotes con el esquema de utils/esquema_atleta.py y las filas
+válidas se guardan con upsert por cédula en lotes que se envían en
+paralelo. Los errores se reportan por fila y campo.
+
+El avance se guarda en un checkpoint por archivo (hash del contenido): si la
+importación se corta, volver a importar el mismo archivo retoma desde la
+última fila confirmada. En modo dry_run solo se valida.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import unicodedata
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from config.rutas_datos import ruta_datos
+from utils.cache_compartido import obtener_cache
+from utils.concurrencia import enviar
+from utils.esquema_atleta import ESQUEMA_ATLETA, validar_lote
+from utils.indice_cedulas import obtener_indice, registrar_cedulas
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+LOTES_PARALELOS = int(os.environ.get('IMPORT_PARALLEL', 4))
+MAX_ERRORES_REPORTE = 1000
+
+COLUMNAS_REQUERIDAS = ('cedula', 'nombre', 'apellido')
+
+# Encabezados habituales en las planillas -> campo de becas
+ALIAS_COLUMNAS = {
+    'ci': 'cedula', 'c_i': 'cedula', 'c_i_n': 'cedula', 'cedula_de_identidad': 'cedula',
+    'nombres': 'nombre', 'apellidos': 'apellido',
+    'correo': 'email', 'correo_electronico': 'email',
+    'tlf': 'telefono', 'celular': 'telefono',
+    'fecha_de_nacimiento': 'fecha_nacimiento',
+    'grupo_sanguineo': 'sangre', 'tipo_de_sangre': 'sangre',
+    'especialidad_modalidad_division': 'especialidad',
+}
+
+PREFIJO_ESTADO = 'importacion:'
+TTL_ESTADO = 24 * 3600
+
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+class ArchivoInvalido(ValueError):
+    """La planilla no se puede leer o le faltan columnas requeridas."""
+
+
+@dataclass
+class ResultadoImportacion:
+    leidas: int = 0
+    validas: int = 0
+    importadas: int = 0
+    con_error: int = 0
+    # Filas válidas cuya cédula ya estaba registrada (se actualizan, o se rechazan con solo_nuevas)
+    existentes: int = 0
+    lotes_fallidos: int = 0
+    reanudado_desde: int = 0
+    dry_run: bool = False
+    columnas_ignoradas: List[str] = field(default_factory=list)
+    # [{'fila', 'campo', 'mensaje'}] (a lo sumo MAX_ERRORES_REPORTE)
+    errores: List[dict] = field(default_factory=list)
+
+    def agregar_error(self, fila: int, campo: str, mensaje: str):
+        if len(self.errores) < MAX_ERRORES_REPORTE:
+            self.errores.append({'fila': fila, 'campo': campo, 'mensaje': mensaje})
+
+
+# --- Lectura ---
+
+def normalizar_encabezado(texto) -> str:
+    """'Cédula de Identidad' -> 'cedula_de_identidad' (y aplica ALIAS_COLUMNAS)."""
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode().lower()
+    clave = _NO_ALFANUMERICO.sub('_', texto).strip('_')
+    return ALIAS_COLUMNAS.get(clave, clave)
+
+
+def _valor_celda(valor):
+    # Excel guarda la cédula o el teléfono como número: 12345678.0 -> '12345678'
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        return str(valor)
+    return valor
+
+
+def _filas_xlsx(archivo: BinaryIO) -> Iterator[list]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        for fila in wb.worksheets[0].iter_rows(values_only=True):
+            yield [_valor_celda(v) for v in fila]
+    finally:
+        wb.close()
+
+
+def _filas_csv(archivo: BinaryIO) -> Iterator[list]:
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    yield from csv.reader(texto, dialecto)
+
+
+def leer_planilla(archivo: BinaryIO, nombre: str) -> Tuple[List[str], Iterator[dict]]:
+    """
+    Abre una planilla CSV o XLSX.
+
+    Returns:
+        Tuple (columnas_ignoradas, iterador de filas como dict campo -> valor)
+
+    Raises:
+        ArchivoInvalido: formato no soportado o faltan columnas requeridas
+    """
+    extension = os.path.splitext(nombre or '')[1].lower()
+    if extension == '.xlsx':
+        filas = _filas_xlsx(archivo)
+    elif extension in ('.csv', '.txt'):
+        filas = _filas_csv(archivo)
+    else:
+        raise ArchivoInvalido("Formato no soportado. Use .csv o .xlsx")
+
+    try:
+        encabezados = [normalizar_encabezado(c) for c in next(filas)]
+    except StopIteration:
+        raise ArchivoInvalido("La planilla está vacía") from None
+    except Exception as e:
+        raise ArchivoInvalido(f"No se pudo leer la planilla: {e}") from None
+
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in encabezados]
+    if faltantes:
+        raise ArchivoInvalido(f"Faltan columnas requeridas: {', '.join(faltantes)}")
+
+    indices = [(i, c) for i, c in enumerate(encabezados) if c in ESQUEMA_ATLETA]
+    ignoradas = [c for c in encabezados if c and c not in ESQUEMA_ATLETA]
+
+    def iterar():
+        for fila in filas:
+            if not any(v not in (None, '') for v in fila):
+                yield None  # Fila vacía: cuenta para la numeración
+                continue
+            yield {campo: (fila[i] if i < len(fila) else None) for i, campo in indices}
+
+    return ignoradas, iterar()
+
+
+# --- Checkpoint ---
+
+def hash_archivo(archivo: BinaryIO) -> str:
+    h = hashlib.sha1()
+    for bloque in iter(lambda: archivo.read(1 << 20), b''):
+        h.update(bloque)
+    archivo.seek(0)
+    return h.hexdigest()
+
+
+class Checkpoint:
+    """Filas de datos ya confirmadas de un archivo (JSON en DATA_DIR/importaciones)."""
+
+    def __init__(self, huella: str):
+        self.ruta = ruta_datos('importaciones', f'{huella}.json')
+
+    def leer(self) -> int:
+        try:
+            with open(self.ruta) as f:
+                return int(json.load(f).get('filas', 0))
+        except (OSError, ValueError):
+            return 0
+
+    def guardar(self, filas: int):
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'w') as f:
+            json.dump({'filas': filas}, f)
+        os.replace(temporal, self.ruta)
+
+    def borrar(self):
+        try:
+            os.unlink(self.ruta)
+        except OSError:
+            pass
+
+
+# --- Importación ---
+
+def _upsert(cliente, filas: List[dict]):
+    # En un upsert masivo PostgREST completa con NULL las columnas que le faltan a
+    # una fila (y las sobrescribe en las existentes): se envía un upsert por cada
+    # combinación de columnas presentes
+    grupos: Dict[Tuple[str, ...], List[dict]] = {}
+    for fila in filas:
+        grupos.setdefault(tuple(sorted(fila)), []).append(fila)
+    for grupo in grupos.values():
+        cliente.table('becas').upsert(grupo, on_conflict='cedula').execute()
+
+
+def _confirmar_registradas(cliente, cedulas: List[str]) -> Set[str]:
+    # El índice puede dar falsos positivos (Bloom, cédulas cambiadas): los aciertos
+    # de un lote se confirman con un solo select
+    if not cedulas or cliente is None:
+        return set(cedulas)
+    try:
+        filas = cliente.table('becas').select('cedula').in_('cedula', cedulas).execute().data or []
+    except Exception as e:
+        logger.warning(f"No se pudieron confirmar {len(cedulas)} cédulas en la base; se usa el índice: {e}")
+        return set(cedulas)
+    return {fila['cedula'] for fila in filas}
+
+
+def _celda_vacia(valor) -> bool:
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def importar_filas(
+    filas: Iterable[Optional[dict]],
+    cliente=None,
+    tamano_lote: int = TAMANO_LOTE,
+    paralelo: int = LOTES_PARALELOS,
+    dry_run: bool = False,
+    checkpoint: Checkpoint = None,
+    progreso: Callable[[ResultadoImportacion], None] = None,
+    indice=None,
+    solo_nuevas: bool = False,
+    al_guardar: Callable[[List[str]], None] = None,
+) -> ResultadoImportacion:
+    """
+    Valida e importa filas en lotes.
+
+    Args:
+        filas: filas de datos en orden (None para filas vacías)
+        cliente: cliente de Supabase (admin para no depender de RLS)
+        tamano_lote: filas por upsert
+        paralelo: upserts en vuelo a la vez
+        dry_run: solo validar
+        checkpoint: avance para retomar; se borra al terminar sin fallas
+        progreso: se llama con el resultado parcial después de cada lote
+        indice: cédulas ya registradas (utils/indice_cedulas.py), para contar
+                o rechazar las existentes; sus aciertos se confirman con un
+                select por lote
+        solo_nuevas: rechazar las filas cuya cédula ya está registrada
+        al_guardar: se llama con las cédulas de cada lote guardado
+
+    Returns:
+        ResultadoImportacion (las filas se numeran como en la planilla: la 1 es el encabezado)
+    """
+    resultado = ResultadoImportacion(dry_run=dry_run)
+    inicio = checkpoint.leer() if checkpoint and not dry_run else 0
+    resultado.reanudado_desde = inicio
+
+    iterador = islice(filas, inicio, None)
+    numero = inicio + 1  # Número de la última fila leída (1 = encabezado)
+    cedulas = set()
+
+    # Lotes en vuelo: futuro -> (número de lote, fila final, cédulas)
+    en_vuelo = {}
+    terminados = {}  # número de lote -> (fila final, exitoso)
+    siguiente_confirmar = 0
+    confirmadas = inicio
+    fallo = False
+
+    def recoger(listos):
+        nonlocal siguiente_confirmar, confirmadas, fallo
+        for futuro in listos:
+            numero_lote, fila_final, cedulas_lote = en_vuelo.pop(futuro)
+            try:
+                futuro.result()
+                resultado.importadas += len(cedulas_lote)
+                terminados[numero_lote] = (fila_final, True)
+                if al_guardar:
+                    al_guardar(cedulas_lote)
+            except Exception as e:
+                logger.error(f"Error importando lote hasta la fila {fila_final}: {e}")
+                resultado.lotes_fallidos += 1
+                resultado.agregar_error(fila_final, '', f"Error guardando el lote que termina en esta fila: {e}")
+                terminados[numero_lote] = (fila_final, False)
+
+        # El checkpoint avanza solo hasta el primer lote sin confirmar
+        while siguiente_confirmar in terminados:
+            fila_final, exitoso = terminados.pop(siguiente_confirmar)
+            if not exitoso:
+                fallo = True
+            if not fallo:
+                confirmadas = fila_final - 1
+            siguiente_confirmar += 1
+        if checkpoint and not dry_run and not fallo:
+            checkpoint.guardar(confirmadas)
+
+    with ThreadPoolExecutor(max_workers=max(1, paralelo), thread_name_prefix='importacion') as pool:
+        numero_lote = 0
+        while True:
+            bloque = list(islice(iterador, tamano_lote))
+            if not bloque:
+                break
+            numeros = list(range(numero + 1, numero + 1 + len(bloque)))
+            numero += len(bloque)
+
+            datos = [(n, f) for n, f in zip(numeros, bloque) if f is not None]
+            resultado.leidas += len(datos)
+            validas, errores = validar_lote([f for _, f in datos], parcial=True)
+
+            for i, errores_fila in errores.items():
+                resultado.con_error += 1
+                for campo, mensaje in errores_fila.items():
+                    resultado.agregar_error(datos[i][0], campo, mensaje)
+
+            nuevas = []
+            for i, limpio in validas:
+                # Cédulas repetidas entre lotes (dentro del lote ya las marca validar_lote)
+                if limpio['cedula'] in cedulas:
+                    resultado.con_error += 1
+                    resultado.agregar_error(datos[i][0], 'cedula', "Cédula repetida en la planilla")
+                    continue
+                cedulas.add(limpio['cedula'])
+                nuevas.append((i, limpio))
+
+            registradas = set()
+            if indice is not None:
+                registradas = _confirmar_registradas(
+                    cliente, [limpio['cedula'] for _, limpio in nuevas if limpio['cedula'] in indice])
+
+            lote = []
+            for i, limpio in nuevas:
+                if limpio['cedula'] in registradas:
+                    resultado.existentes += 1
+                    if solo_nuevas:
+                        resultado.con_error += 1
+                        resultado.agregar_error(datos[i][0], 'cedula', "Cédula ya registrada")
+                        continue
+                # Una celda en blanco no borra lo que ya está guardado (el esquema la
+                # convertiría en su valor por defecto: None o 'No')
+                original = datos[i][1]
+                lote.append({campo: valor for campo, valor in limpio.items()
+                             if not _celda_vacia(original.get(campo))})
+            resultado.validas += len(lote)
+
+            if lote and not dry_run:
+                if len(en_vuelo) >= paralelo:
+                    listos, _ = wait(list(en_vuelo), return_when=FIRST_COMPLETED)
+                    recoger(listos)
+                en_vuelo[pool.submit(_upsert, cliente, lote)] = (numero_lote, numero, [f['cedula'] for f in lote])
+            else:
+                terminados[numero_lote] = (numero, True)
+                recoger([])
+            numero_lote += 1
+
+            if progreso:
+                progreso(resultado)
+
+        if en_vuelo:
+            recoger(wait(list(en_vuelo)).done)
+
+    if checkpoint and not dry_run and not resultado.lotes_fallidos:
+        checkpoint.borrar()
+    logger.info(
+        f"Importación{' (dry-run)' if dry_run else ''}: {resultado.leidas} filas, {resultado.validas} válidas, "
+        f"{resultado.importadas} importadas, {resultado.con_error} con error, {resultado.lotes_fallidos} lotes fallidos"
+    )
+    return resultado
+
+
+def importar_planilla(archivo: BinaryIO, nombre: str, cliente=None, dry_run: bool = False,
+                      reanudar: bool = True, **opciones) -> ResultadoImportacion:
+    """
+    Importa una planilla CSV/XLSX (archivo abierto en modo binario y con seek).
+
+    Raises:
+        ArchivoInvalido: formato no soportado o faltan columnas requeridas
+    """
+    checkpoint = Checkpoint(hash_archivo(archivo))
+    if not reanudar:
+        checkpoint.borrar()
+    ignoradas, filas = leer_planilla(archivo, nombre)
+    if 'indice' not in opciones:
+        # Índice de cédulas del proceso: las guardadas se registran para los demás workers
+        opciones.update(indice=obtener_indice(), al_guardar=registrar_cedulas)
+    resultado = importar_filas(filas, cliente, dry_run=dry_run, checkpoint=checkpoint, **opciones)
+    resultado.columnas_ignoradas = ignoradas
+    return resultado
+
+
+# --- Importaciones en segundo plano (ruta web) ---
+
+def estado_importacion(importacion_id: str) -> Optional[dict]:
+    """{'estado': 'procesando'|'listo'|'error', 'resultado'?, 'error'?}."""
+    return obtener_cache().get(PREFIJO_ESTADO + importacion_id)
+
+
+def _publicar(importacion_id: str, estado: str, resultado: ResultadoImportacion = None, error: str = None):
+    valor = {'estado': estado}
+    if resultado is not None:
+        valor['resultado'] = asdict(resultado)
+    if error:
+        valor['error'] = error
+    obtener_cache().set(PREFIJO_ESTADO + importacion_id, valor, TTL_ESTADO)
+
+
+def iniciar_importacion(ruta: str, nombre: str, cliente, dry_run: bool = False, solo_nuevas: bool = False) -> str:
+    """
+    Importa en segundo plano un archivo ya guardado en disco (se borra al terminar).
+
+    Returns:
+        ID para consultar estado_importacion()
+    """
+    importacion_id = uuid.uuid4().hex
+    _publicar(importacion_id, 'procesando')
+    enviar(_ejecutar_importacion, importacion_id, ruta, nombre, cliente, dry_run, solo_nuevas)
+    return importacion_id
+
+
+def _ejecutar_importacion(importacion_id: str, ruta: str, nombre: str, cliente, dry_run: bool, solo_nuevas: bool):
+    try:
+        with open(ruta, 'rb') as archivo:
+            resultado = importar_planilla(
+                archivo, nombre, cliente, dry_run=dry_run, solo_nuevas=solo_nuevas,
+                progreso=lambda r: _publicar(importacion_id, 'procesando', r)
+            )
+        _publicar(importacion_id, 'listo', resultado)
+    except ArchivoInvalido as e:
+        _publicar(importacion_id, 'error', error=str(e))
+    except Exception as e:
+        logger.error(f"Error en importación {importacion_id}: {e}", exc_info=True)
+        _publicar(importacion_id, 'error', error='Error procesando la planilla')
+    finally:
+        try:
+            os.unlink(ruta)
+        except OSError:
+            pass
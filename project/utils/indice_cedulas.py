@@ -0,0 +1,209 @@
+"""
+Índice en memoria de las cédulas registradas en becas.
+
+Se carga una vez por worker (recorriendo id,cedula por páginas) y responde
+"¿ya existe esta cédula?" sin ir a la base: un filtro de Bloom descarta al
+instante las cédulas nuevas (el caso común) y un arreglo ordenado de hashes
+de 64 bits confirma las demás. Las rutas que escriben lo mantienen al día:
+registrar_cedula() lo actualiza en el worker y publica las altas como un
+delta en la caché compartida, que los demás workers aplican sin recorrer la
+tabla. Solo las bajas y cambios de cédula (invalidar_indice) cambian la
+generación y obligan a todos a recargar el índice completo.
+
+Es un filtro previo, no la garantía: un acierto se confirma con
+buscar_por_cedula() y el índice único de migrations/003 evita carreras.
+"""
+
+import bisect
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from array import array
+from typing import Iterable, Optional, Set
+
+from config.supabase_client import supabase
+from utils.cache_compartido import obtener_cache
+from utils.esquema_atleta import ErrorCampo, cedula as normalizar_cedula
+from utils.filtro_bloom import FiltroBloom
+from utils.repositorio_becas import iterar_becas
+
+logger = logging.getLogger(__name__)
+
+CLAVE_GENERACION = 'cedulas:generacion'
+# Altas publicadas por los workers: cedulas:altas:<generación>:<id> -> [cédulas]
+PREFIJO_ALTAS = 'cedulas:altas:'
+TTL_GENERACION = 30 * 24 * 3600
+# Con más deltas que esto se compacta: nueva generación y una recarga completa
+MAX_ALTAS = 1000
+# Cada cuánto se mira la generación en la caché compartida (segundos)
+REVISION_GENERACION = 2
+ERROR_BLOOM = 0.001
+
+
+def clave_cedula(valor) -> Optional[str]:
+    """Forma normalizada para el índice ('12.345.678' -> 'V-12345678'); None si no es una cédula."""
+    if not valor:
+        return None
+    try:
+        return normalizar_cedula(valor)
+    except ErrorCampo:
+        return str(valor).strip().upper() or None
+
+
+def _hash64(clave: str) -> int:
+    return int.from_bytes(hashlib.blake2b(clave.encode(), digest_size=8).digest(), 'big')
+
+
+class IndiceCedulas:
+    """Bloom + arreglo ordenado de hashes; las altas posteriores van a un set aparte."""
+
+    def __init__(self, cedulas: Iterable[str] = ()):
+        claves = {c for c in map(clave_cedula, cedulas) if c}
+        self._hashes = array('Q', sorted(_hash64(c) for c in claves))
+        # Holgura para las altas hasta la próxima recarga
+        self._bloom = FiltroBloom(capacidad=max(1000, len(claves) * 2), error=ERROR_BLOOM)
+        self._bloom.agregar_todos(claves)
+        self._nuevas = set()
+
+    def agregar(self, valor):
+        clave = clave_cedula(valor)
+        if clave:
+            self._bloom.agregar(clave)
+            self._nuevas.add(_hash64(clave))
+
+    def __contains__(self, valor) -> bool:
+        clave = clave_cedula(valor)
+        if not clave or clave not in self._bloom:
+            return False
+        h = _hash64(clave)
+        i = bisect.bisect_left(self._hashes, h)
+        return (i < len(self._hashes) and self._hashes[i] == h) or h in self._nuevas
+
+    def __len__(self) -> int:
+        return len(self._hashes) + len(self._nuevas)
+
+    def bytes_usados(self) -> int:
+        return self._hashes.itemsize * len(self._hashes) + self._bloom.bytes_usados()
+
+
+def cargar_indice() -> IndiceCedulas:
+    """Recorre todas las cédulas de becas (paginación por id)."""
+    inicio = time.perf_counter()
+    indice = IndiceCedulas(fila.get('cedula') for fila in iterar_becas('id,cedula'))
+    logger.info(f"Índice de cédulas: {len(indice)} cédulas en {(time.perf_counter() - inicio) * 1000:.0f} ms "
+                f"({indice.bytes_usados() // 1024} KB)")
+    return indice
+
+
+# --- Índice del proceso ---
+
+_indice: Optional[IndiceCedulas] = None
+_generacion: Optional[str] = None
+# Deltas de la generación actual ya aplicados a _indice
+_aplicadas: Set[str] = set()
+_revisado = 0.0
+_lock = threading.Lock()
+
+
+def obtener_indice() -> IndiceCedulas:
+    """Índice del worker; aplica las altas de otros workers y se recarga si cambió la generación."""
+    global _indice, _generacion, _aplicadas, _revisado
+    ahora = time.monotonic()
+    if _indice is not None and ahora - _revisado < REVISION_GENERACION:
+        return _indice
+
+    with _lock:
+        cache = obtener_cache()
+        generacion = cache.get(CLAVE_GENERACION)
+        altas = cache.claves(_prefijo_altas(generacion)) if generacion else []
+        if len(altas) > MAX_ALTAS:
+            generacion, altas = _compactar(generacion), []
+        _revisado = ahora
+        if _indice is None or generacion != _generacion:
+            # Las altas anteriores a la carga ya están en la tabla; aplicarlas otra vez no cambia nada
+            _indice = cargar_indice()
+            _generacion = generacion
+            _aplicadas = set()
+        pendientes = [clave for clave in altas if clave not in _aplicadas]
+        for cedulas in cache.get_many(pendientes).values():
+            for valor in cedulas:
+                _indice.agregar(valor)
+        _aplicadas.update(pendientes)
+        return _indice
+
+
+def _prefijo_altas(generacion: str) -> str:
+    return f"{PREFIJO_ALTAS}{generacion}:"
+
+
+def _nueva_generacion() -> str:
+    generacion = uuid.uuid4().hex
+    obtener_cache().set(CLAVE_GENERACION, generacion, TTL_GENERACION)
+    return generacion
+
+
+def _compactar(anterior: str) -> str:
+    generacion = _nueva_generacion()
+    obtener_cache().delete_prefix(_prefijo_altas(anterior))
+    logger.info(f"Índice de cédulas: más de {MAX_ALTAS} altas sin recargar, nueva generación")
+    return generacion
+
+
+def cedula_registrada(valor) -> bool:
+    """True si la cédula (normalizada) probablemente ya está registrada."""
+    return valor in obtener_indice()
+
+
+def registrar_cedulas(valores: Iterable[str]):
+    """Agrega cédulas recién guardadas y las publica para los demás workers."""
+    global _generacion
+    cedulas = [clave for clave in map(clave_cedula, valores) if clave]
+    if not cedulas:
+        return
+    with _lock:
+        cache = obtener_cache()
+        generacion = cache.get(CLAVE_GENERACION)
+        if not generacion:
+            # Primera alta (o la generación expiró): un índice cargado sin generación sigue al día
+            generacion = _nueva_generacion()
+            if _generacion is None:
+                _generacion = generacion
+        clave = _prefijo_altas(generacion) + uuid.uuid4().hex
+        cache.set(clave, cedulas, TTL_GENERACION)
+        # Con otra generación el índice local se recarga completo en la próxima consulta
+        if _indice is not None and generacion == _generacion:
+            for valor in cedulas:
+                _indice.agregar(valor)
+            _aplicadas.add(clave)
+
+
+def registrar_cedula(valor: str):
+    registrar_cedulas([valor])
+
+
+def invalidar_indice():
+    """Las bajas y cambios de cédula no se pueden quitar del índice: todos recargan."""
+    global _indice
+    with _lock:
+        obtener_cache().delete_prefix(PREFIJO_ALTAS)
+        _nueva_generacion()
+        _indice = None
+
+
+def buscar_por_cedula(valor, excluir_id: int = None) -> Optional[dict]:
+    """
+    Confirma en la base un acierto del índice.
+
+    Returns:
+        {'id', 'nombre', 'apellido'} del atleta con esa cédula (distinto de excluir_id) o None
+    """
+    clave = clave_cedula(valor)
+    if not clave:
+        return None
+    query = supabase.table('becas').select('id,nombre,apellido').eq('cedula', clave)
+    if excluir_id is not None:
+        query = query.neq('id', excluir_id)
+    filas = query.limit(1).execute().data or []
+    return filas[0] if filas else None
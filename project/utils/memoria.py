@@ -0,0 +1,246 @@
+"""
+Uso de memoria por worker y seguimiento de fugas.
+
+Cada worker corre un hilo que cada MEMORIA_INTERVALO segundos anota su RSS
+y el tamaño de las estructuras en memoria que crecen con el uso (la caché
+de optimizaciones, login_attempts, el almacenamiento del limiter). Con
+MEMORIA_TRACEMALLOC=<frames> además toma un snapshot de tracemalloc y lo
+compara, por línea y por módulo, con el primero y con el anterior: lo que
+crece sin parar entre snapshots es la fuga. El reporte se publica en
+DATA_DIR/memoria/<pid>.json para que /dashboard/memoria muestre todos los
+workers.
+
+Watchdog: si el RSS pasa de MEMORIA_MAX_MB el worker se recicla con
+SIGTERM (bajo gunicorn termina las requests en curso y el master levanta
+otro); fuera de gunicorn solo se registra el aviso.
+
+Variables de entorno:
+    MEMORIA_INTERVALO    segundos entre muestras (300)
+    MEMORIA_TRACEMALLOC  frames por traza de tracemalloc; 0 lo deja apagado (0)
+    MEMORIA_MAX_MB       RSS a partir del cual se recicla el worker; 0 desactiva (0)
+"""
+
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from config import rutas_datos
+
+logger = logging.getLogger(__name__)
+
+INTERVALO = int(os.environ.get('MEMORIA_INTERVALO', 300))
+FRAMES_TRACEMALLOC = int(os.environ.get('MEMORIA_TRACEMALLOC', 0))
+MAX_MB = float(os.environ.get('MEMORIA_MAX_MB', 0))
+TOP = 15
+
+MB = 1024 * 1024
+_RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_bytes() -> int:
+    """Memoria residente actual del proceso."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Sin /proc (macOS): el pico, que es lo más parecido que da resource
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == 'darwin' else pico * 1024
+
+
+def estructuras() -> Dict[str, int]:
+    """Entradas de las estructuras en memoria que no tienen tope."""
+    tamanos = {}
+    try:
+        from utils import optimizaciones
+        tamanos['optimizaciones._cache'] = len(optimizaciones._cache)
+    except ImportError:
+        pass
+    try:
+        from utils.login_attempts import login_attempts
+        tamanos['login_attempts'] = len(login_attempts)
+    except ImportError:
+        pass
+    try:
+        from utils.rate_limiter import limiter
+        almacen = limiter._storage
+        tamanos['limiter'] = len(getattr(almacen, 'storage', None) or ()) if almacen is not None else 0
+    except (ImportError, AttributeError, TypeError):
+        pass
+    return tamanos
+
+
+# --- tracemalloc ---
+
+_FILTROS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _ubicacion(frame) -> str:
+    archivo = frame.filename
+    if archivo.startswith(_RAIZ_PROYECTO):
+        archivo = os.path.relpath(archivo, _RAIZ_PROYECTO)
+    elif 'site-packages' in archivo:
+        archivo = archivo.split('site-packages' + os.sep, 1)[1]
+    return f"{archivo}:{frame.lineno}"
+
+
+def diferencias(actual: tracemalloc.Snapshot, anterior: tracemalloc.Snapshot, agrupar: str = 'lineno',
+                top: int = TOP) -> List[dict]:
+    """Lo que más creció de anterior a actual, agrupado por línea ('lineno') o módulo ('filename')."""
+    resultado = []
+    for estadistica in actual.compare_to(anterior, agrupar)[:top]:
+        ubicacion = _ubicacion(estadistica.traceback[0])
+        if agrupar == 'filename':
+            ubicacion = ubicacion.rsplit(':', 1)[0]
+        resultado.append({
+            'ubicacion': ubicacion,
+            'crecimiento_kb': round(estadistica.size_diff / 1024, 1),
+            'bloques': estadistica.count_diff,
+            'total_kb': round(estadistica.size / 1024, 1),
+        })
+    return resultado
+
+
+class MonitorMemoria:
+    """Muestras de memoria de este worker."""
+
+    def __init__(self):
+        self.base: Optional[tracemalloc.Snapshot] = None
+        self.anterior: Optional[tracemalloc.Snapshot] = None
+        self.reporte: dict = {}
+        self.reciclando = False
+
+    def muestrear(self) -> dict:
+        reporte = {
+            'pid': os.getpid(),
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'rss_mb': round(rss_bytes() / MB, 1),
+            'estructuras': estructuras(),
+        }
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces(_FILTROS)
+            if self.base is None:
+                self.base = snapshot
+            reporte['tracemalloc_mb'] = round(tracemalloc.get_traced_memory()[0] / MB, 1)
+            reporte['desde_inicio'] = diferencias(snapshot, self.base)
+            reporte['por_modulo'] = diferencias(snapshot, self.base, 'filename')
+            if self.anterior is not None:
+                reporte['ultimo_intervalo'] = diferencias(snapshot, self.anterior)
+            self.anterior = snapshot
+        self.reporte = reporte
+        publicar(reporte)
+        self.revisar_limite(reporte)
+        return reporte
+
+    def revisar_limite(self, reporte: dict):
+        if not MAX_MB or reporte['rss_mb'] < MAX_MB or self.reciclando:
+            return
+        logger.warning(f"Worker {reporte['pid']} usa {reporte['rss_mb']} MB (límite {MAX_MB:.0f} MB): reciclando",
+                       extra={'rss_mb': reporte['rss_mb'], 'estructuras': reporte['estructuras']})
+        self.reciclando = reciclar_worker()
+
+
+def reciclar_worker() -> bool:
+    """Pide al worker que termine con gracia (solo bajo gunicorn)."""
+    if 'gunicorn' not in sys.modules:
+        return False
+    os.kill(os.getpid(), signal.SIGTERM)
+    return True
+
+
+# --- Reportes de todos los workers ---
+
+def _directorio() -> str:
+    return rutas_datos.directorio_datos('memoria')
+
+
+def publicar(reporte: dict):
+    ruta = os.path.join(_directorio(), f"{reporte['pid']}.json")
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def _vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def reportes_workers() -> List[dict]:
+    """Último reporte de cada worker vivo (borra los de procesos que ya terminaron)."""
+    directorio = _directorio()
+    reportes = []
+    for nombre in os.listdir(directorio):
+        if not nombre.endswith('.json'):
+            continue
+        ruta = os.path.join(directorio, nombre)
+        try:
+            pid = int(nombre[:-5])
+        except ValueError:
+            continue
+        if not _vivo(pid):
+            os.remove(ruta)
+            continue
+        try:
+            with open(ruta, encoding='utf-8') as f:
+                reportes.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(reportes, key=lambda r: r.get('pid', 0))
+
+
+# --- Hilo del worker ---
+
+_monitor: Optional[MonitorMemoria] = None
+_pid_monitor: Optional[int] = None
+_lock = threading.Lock()
+
+
+def obtener_monitor() -> MonitorMemoria:
+    """Monitor del worker; arranca el hilo en el primer uso (también tras un fork)."""
+    global _monitor, _pid_monitor
+    if _pid_monitor == os.getpid():
+        return _monitor
+    with _lock:
+        if _pid_monitor != os.getpid():
+            if FRAMES_TRACEMALLOC and not tracemalloc.is_tracing():
+                tracemalloc.start(FRAMES_TRACEMALLOC)
+            _monitor = MonitorMemoria()
+            _pid_monitor = os.getpid()
+            threading.Thread(target=_bucle, args=(_monitor,), name='monitor-memoria', daemon=True).start()
+    return _monitor
+
+
+def _bucle(monitor: MonitorMemoria):
+    while True:
+        try:
+            monitor.muestrear()
+        except Exception as e:
+            logger.error(f"Error muestreando memoria: {e}")
+        time.sleep(INTERVALO)
+
+
+def registrar_en_app(app):
+    """Arranca el monitor con la primera request de cada worker."""
+
+    @app.before_request
+    def _iniciar_monitor_memoria():
+        obtener_monitor()
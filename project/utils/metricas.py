@@ -0,0 +1,179 @@
+"""
+Métricas en formato Prometheus (GET /metrics).
+
+Requiere prometheus_client (pip install prometheus-client); sin él las
+funciones de este módulo no hacen nada y /metrics responde 503.
+
+Con varios workers de gunicorn cada proceso tiene sus propios contadores:
+gunicorn.conf.py define PROMETHEUS_MULTIPROC_DIR para que cada worker los
+escriba en archivos mmap y /metrics sume los de todos (y marca los workers
+que terminan). Registrar una observación cuesta unos pocos microsegundos.
+
+Qué se mide:
+    irdebg_http_request_duration_seconds   latencia por endpoint, método y estado
+    irdebg_http_requests_en_curso          requests en curso (suma de workers vivos)
+    irdebg_supabase_duration_seconds       latencia por servicio y operación (tabla.verbo, bucket.método)
+    irdebg_supabase_errores_total          llamadas que lanzaron excepción
+    irdebg_cache_consultas_total           aciertos/fallos de la caché compartida por espacio
+    irdebg_limiter_rechazos_total          respuestas 429 por endpoint
+    irdebg_subida_bytes / _duration_seconds subidas a Storage por bucket
+    irdebg_documento_duration_seconds      fichas (pdf/xlsx) y exportaciones
+
+Variables de entorno:
+    METRICS_TOKEN    /metrics exige 'Authorization: Bearer <token>'; sin ella solo
+                     responde en modo debug (desarrollo) y en producción da 404
+"""
+
+import hmac
+import logging
+import os
+import time
+
+from utils import tiempos_peticion
+
+logger = logging.getLogger(__name__)
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    prometheus_client = None
+
+BUCKETS_HTTP = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_SUPABASE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+BUCKETS_BYTES = (16 * 1024, 64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 16 * 1024 ** 2)
+
+SERVICIOS_SUPABASE = frozenset({'postgrest', 'gotrue', 'storage'})
+DOCUMENTOS = frozenset({'pdf', 'xlsx'})
+
+
+def metricas_disponibles() -> bool:
+    return prometheus_client is not None
+
+
+class _Nula:
+    """Métrica que no registra nada (sin prometheus_client)."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, valor):
+        pass
+
+    def inc(self, valor=1):
+        pass
+
+    def dec(self, valor=1):
+        pass
+
+
+if prometheus_client is not None:
+    DURACION_HTTP = Histogram('irdebg_http_request_duration_seconds', "Latencia de las requests",
+                              ['endpoint', 'metodo', 'estado'], buckets=BUCKETS_HTTP)
+    EN_CURSO = Gauge('irdebg_http_requests_en_curso', "Requests en curso", multiprocess_mode='livesum')
+    DURACION_SUPABASE = Histogram('irdebg_supabase_duration_seconds', "Latencia de las llamadas a Supabase",
+                                  ['servicio', 'operacion'], buckets=BUCKETS_SUPABASE)
+    ERRORES_SUPABASE = Counter('irdebg_supabase_errores_total', "Llamadas a Supabase que fallaron",
+                               ['servicio', 'operacion'])
+    CONSULTAS_CACHE = Counter('irdebg_cache_consultas_total', "Consultas a la caché compartida",
+                              ['espacio', 'resultado'])
+    RECHAZOS_LIMITER = Counter('irdebg_limiter_rechazos_total', "Requests rechazadas por el rate limiter",
+                               ['endpoint'])
+    BYTES_SUBIDA = Histogram('irdebg_subida_bytes', "Tamaño de los archivos subidos", ['bucket'],
+                             buckets=BUCKETS_BYTES)
+    DURACION_SUBIDA = Histogram('irdebg_subida_duration_seconds', "Duración de las subidas a Storage", ['bucket'],
+                                buckets=BUCKETS_SUPABASE)
+    DURACION_DOCUMENTO = Histogram('irdebg_documento_duration_seconds', "Generación de fichas y exportaciones",
+                                   ['formato', 'documento'], buckets=BUCKETS_HTTP)
+else:
+    DURACION_HTTP = EN_CURSO = DURACION_SUPABASE = ERRORES_SUPABASE = CONSULTAS_CACHE = _Nula()
+    RECHAZOS_LIMITER = BYTES_SUBIDA = DURACION_SUBIDA = DURACION_DOCUMENTO = _Nula()
+
+
+def _operacion_corta(operacion: str) -> str:
+    """'becas.select.eq.order' -> 'becas.select': acota la cardinalidad de la etiqueta."""
+    return '.'.join(operacion.split('.', 2)[:2])
+
+
+def _observar_llamada(categoria: str, operacion: str, segundos: float, error: bool):
+    if categoria in SERVICIOS_SUPABASE:
+        operacion = _operacion_corta(operacion)
+        DURACION_SUPABASE.labels(categoria, operacion).observe(segundos)
+        if error:
+            ERRORES_SUPABASE.labels(categoria, operacion).inc()
+    elif categoria in DOCUMENTOS and not error:
+        DURACION_DOCUMENTO.labels(categoria, operacion or 'otro').observe(segundos)
+
+
+if prometheus_client is not None:
+    tiempos_peticion.suscribir(_observar_llamada)
+
+
+def contar_cache(espacio: str, aciertos: int, fallos: int):
+    if aciertos:
+        CONSULTAS_CACHE.labels(espacio, 'hit').inc(aciertos)
+    if fallos:
+        CONSULTAS_CACHE.labels(espacio, 'miss').inc(fallos)
+
+
+def observar_subida(bucket: str, num_bytes: int, segundos: float):
+    BYTES_SUBIDA.labels(bucket).observe(num_bytes)
+    DURACION_SUBIDA.labels(bucket).observe(segundos)
+
+
+# --- Exposición ---
+
+def exponer_metricas():
+    """(cuerpo, content-type) con las métricas de todos los workers."""
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, REGISTRY, generate_latest
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
+
+
+def registrar_en_app(app):
+    """Mide cada request e instala GET /metrics."""
+    from flask import current_app, g, request
+
+    @app.before_request
+    def _inicio_metricas():
+        g._inicio_metricas = time.perf_counter()
+        g._en_curso = True
+        EN_CURSO.inc()
+
+    @app.after_request
+    def _fin_metricas(response):
+        endpoint = request.endpoint or 'sin_ruta'
+        inicio = g.pop('_inicio_metricas', None)
+        if inicio is not None:
+            DURACION_HTTP.labels(endpoint, request.method, response.status_code).observe(
+                time.perf_counter() - inicio)
+        # El limiter rechaza en su propio before_request, antes que _inicio_metricas
+        if response.status_code == 429:
+            RECHAZOS_LIMITER.labels(endpoint).inc()
+        return response
+
+    @app.teardown_request
+    def _salida_metricas(exc):
+        # Solo si este hook llegó a contarla (otro before_request pudo cortar antes)
+        if g.pop('_en_curso', False):
+            EN_CURSO.dec()
+
+    @app.route('/metrics')
+    def metrics():
+        if not metricas_disponibles():
+            return "prometheus_client no está instalado", 503, {'Content-Type': 'text/plain; charset=utf-8'}
+        token = os.environ.get('METRICS_TOKEN')
+        if not token:
+            # Sin token las métricas (endpoints, volumen, errores) no se publican fuera de desarrollo
+            if not current_app.debug:
+                return "No encontrado", 404, {'Content-Type': 'text/plain; charset=utf-8'}
+        elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return "No autorizado", 401, {'WWW-Authenticate': 'Bearer'}
+        cuerpo, tipo = exponer_metricas()
+        return cuerpo, 200, {'Content-Type': tipo}
@@ -4,6 +4,8 @@ Validaciones de contraseñas con requisitos de fortaleza.
 import re
 from typing import Tuple, List
 
+from utils.passwords_comunes import es_password_comun
+
 
 def validar_fortaleza_password(password: str) -> Tuple[bool, List[str], int]:
     """
@@ -62,6 +64,11 @@ def validar_fortaleza_password(password: str) -> Tuple[bool, List[str], int]:
     else:
         puntos += 10
     
+    # 7. No estar en listas de contraseñas comunes o filtradas (REQUERIDO)
+    if es_password_comun(password):
+        errores.append("Es una contraseña común o filtrada; elige otra")
+        puntos = min(puntos, 20)
+    
     # Es válida si no hay errores
     es_valida = len(errores) == 0
     
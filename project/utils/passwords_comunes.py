@@ -0,0 +1,140 @@
+"""
+Contraseñas comunes o filtradas (listas públicas de millones de entradas).
+
+La lista no se carga en memoria: se compila una vez (scripts/construir_filtro_passwords.py)
+a un filtro de Bloom en disco y cada worker lo abre con mmap de solo lectura.
+Una consulta son ~10 lecturas de bytes (O(1)); el sistema operativo solo
+trae a RAM las páginas que se tocan y las comparte entre workers.
+
+Las contraseñas se comparan en minúsculas: 'Password1' cuenta como
+'password1', que es justo la variante que prueban los ataques de diccionario.
+En Render el filtro se compila en el buildCommand (ver render.yaml); sin el
+archivo compilado se usa una lista mínima incorporada.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Iterable, Optional
+
+from config import rutas_datos
+from utils.filtro_bloom import FiltroBloom
+
+logger = logging.getLogger(__name__)
+
+NOMBRE_ARCHIVO = 'passwords_comunes.bloom'
+ERROR_FILTRO = 0.001
+
+# Cabecera: firma, num_bits, num_hashes, entradas (relleno hasta 32 bytes)
+_FIRMA = b'IRPWBF01'
+_CABECERA = struct.Struct('<8sQIQ4x')
+
+# Respaldo cuando no hay filtro compilado
+_MINIMAS = frozenset({
+    '123456', '123456789', '12345678', '1234567', '12345', '1234567890', '111111', '000000', '123123',
+    '654321', '666666', '121212', '112233', '123321', 'password', 'password1', 'password123', 'passw0rd',
+    'qwerty', 'qwerty123', 'qwertyuiop', 'abc123', 'abc12345', 'a123456', 'iloveyou', 'admin', 'admin123',
+    'welcome', 'welcome1', 'letmein', 'monkey', 'dragon', 'football', 'baseball', 'sunshine', 'princess',
+    'superman', 'master', 'shadow', 'michael', 'trustno1', '1q2w3e4r', '1qaz2wsx', 'zaq12wsx', 'contraseña',
+    'contrasena', 'contrasena1', 'clave123', 'venezuela', 'venezuela1', 'teamo', 'teamo123', 'tequiero',
+    'barcelona', 'realmadrid', 'hola123', 'amor123', 'mariposa', 'estrella', 'bonita',
+})
+
+
+def ruta_filtro() -> str:
+    """PASSWORDS_COMUNES_FILTRO o DATA_DIR/passwords_comunes.bloom."""
+    return os.environ.get('PASSWORDS_COMUNES_FILTRO') or os.path.join(rutas_datos.DATA_DIR, NOMBRE_ARCHIVO)
+
+
+def _normalizar(password: str) -> str:
+    return password.strip().lower()
+
+
+def construir_filtro(passwords: Iterable[str], destino: str, capacidad: int, error: float = ERROR_FILTRO) -> int:
+    """
+    Compila passwords a un filtro en destino (escritura atómica).
+
+    Args:
+        capacidad: cantidad aproximada de entradas (dimensiona el filtro)
+
+    Returns:
+        Entradas agregadas
+    """
+    filtro = FiltroBloom(capacidad=capacidad, error=error)
+    entradas = 0
+    for password in passwords:
+        password = _normalizar(password)
+        if password:
+            filtro.agregar(password)
+            entradas += 1
+
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as f:
+        f.write(_CABECERA.pack(_FIRMA, filtro.num_bits, filtro.num_hashes, entradas))
+        f.write(filtro.bits)
+    os.replace(temporal, destino)
+    return entradas
+
+
+class FiltroPasswords:
+    """Filtro compilado abierto con mmap (solo lectura)."""
+
+    def __init__(self, ruta: str):
+        with open(ruta, 'rb') as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mapa) < _CABECERA.size:
+            raise ValueError(f"Filtro de contraseñas truncado: {ruta}")
+        firma, num_bits, num_hashes, self.entradas = _CABECERA.unpack_from(self._mapa)
+        if firma != _FIRMA or len(self._mapa) < _CABECERA.size + (num_bits + 7) // 8:
+            raise ValueError(f"Filtro de contraseñas inválido: {ruta}")
+        bits = memoryview(self._mapa)[_CABECERA.size:]
+        self._filtro = FiltroBloom(bits=bits, num_bits=num_bits, num_hashes=num_hashes)
+
+    def __contains__(self, password: str) -> bool:
+        return _normalizar(password) in self._filtro
+
+
+# --- Filtro del proceso ---
+
+_filtro: Optional[FiltroPasswords] = None
+_cargado = False
+_lock = threading.Lock()
+
+
+def obtener_filtro() -> Optional[FiltroPasswords]:
+    """Filtro del worker (se abre en la primera consulta); None si no hay archivo compilado."""
+    global _filtro, _cargado
+    if _cargado:
+        return _filtro
+    with _lock:
+        if not _cargado:
+            ruta = ruta_filtro()
+            try:
+                _filtro = FiltroPasswords(ruta)
+                logger.info(f"Filtro de contraseñas comunes: {_filtro.entradas} entradas ({ruta})")
+            except FileNotFoundError:
+                logger.warning(f"No hay filtro de contraseñas comunes en {ruta}; se usa la lista mínima")
+            except ValueError as e:
+                logger.error(str(e))
+            _cargado = True
+    return _filtro
+
+
+def recargar_filtro():
+    """Vuelve a abrir el archivo en la próxima consulta (tras recompilarlo)."""
+    global _filtro, _cargado
+    with _lock:
+        _filtro = None
+        _cargado = False
+
+
+def es_password_comun(password: str) -> bool:
+    """True si la contraseña (sin distinguir mayúsculas) está en la lista de comunes."""
+    if not password:
+        return False
+    if _normalizar(password) in _MINIMAS:
+        return True
+    filtro = obtener_filtro()
+    return filtro is not None and password in filtro
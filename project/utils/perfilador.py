@@ -0,0 +1,206 @@
+"""
+Perfilado bajo demanda de una request (solo superadmin).
+
+Un superadmin genera un token firmado en /dashboard/perfiles y lo envía en
+el encabezado X-Perfilar (o ?_perfilar=<token>) de la request que quiere
+medir. Esa request corre con cProfile y el resultado queda en
+DATA_DIR/perfiles: el .prof (pstats, sirve para snakeviz o gprof2dot), un
+resumen en texto y los datos de la request. Se conservan los últimos
+PERFILADOR_MAX perfiles.
+
+Sin el token el costo es buscar un encabezado. Se perfila una request a la
+vez por worker y solo el hilo de la request (las tareas que se envían al
+pool de utils.concurrencia no aparecen).
+
+Variables de entorno:
+    PERFILADOR_TTL   validez del token en segundos (900)
+    PERFILADOR_MAX   perfiles que se conservan (50)
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from config.rutas_datos import directorio_datos
+
+logger = logging.getLogger(__name__)
+
+CABECERA = 'X-Perfilar'
+PARAMETRO = '_perfilar'
+TTL_TOKEN = int(os.environ.get('PERFILADOR_TTL', 900))
+MAX_PERFILES = int(os.environ.get('PERFILADOR_MAX', 50))
+LINEAS_REPORTE = 60
+
+_PATRON_ID = re.compile(r'^\d{8}-\d{9}-[0-9a-f]{6}$')
+# cProfile no admite dos perfiles activos a la vez en el mismo proceso
+_ocupado = threading.Lock()
+
+
+def _serializador(secreto: str) -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(secreto, salt='perfilador')
+
+
+def generar_token(secreto: str, usuario_id: str) -> str:
+    return _serializador(secreto).dumps({'uid': usuario_id})
+
+
+def verificar_token(secreto: str, token: str) -> Optional[str]:
+    """ID del superadmin que firmó el token; None si es inválido o venció."""
+    try:
+        return _serializador(secreto).loads(token, max_age=TTL_TOKEN).get('uid')
+    except (BadSignature, AttributeError):
+        return None
+
+
+# --- Almacenamiento ---
+
+def _directorio() -> str:
+    return directorio_datos('perfiles')
+
+
+def _ruta(perfil_id: str, extension: str) -> str:
+    if not _PATRON_ID.match(perfil_id or ''):
+        raise ValueError(f"ID de perfil inválido: {perfil_id!r}")
+    return os.path.join(_directorio(), f"{perfil_id}.{extension}")
+
+
+def _escribir(ruta: str, contenido: str):
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(contenido)
+    os.replace(temporal, ruta)
+
+
+def guardar_perfil(perfil: cProfile.Profile, datos: dict) -> str:
+    """Guarda .prof, .txt y .json; retorna el ID del perfil."""
+    ahora = time.time()
+    # Ordenable por fecha (hasta milisegundos)
+    perfil_id = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(ahora))}{int(ahora % 1 * 1000):03d}-{uuid.uuid4().hex[:6]}"
+
+    temporal = _ruta(perfil_id, 'prof') + '.tmp'
+    perfil.dump_stats(temporal)
+    os.replace(temporal, _ruta(perfil_id, 'prof'))
+
+    salida = io.StringIO()
+    estadisticas = pstats.Stats(perfil, stream=salida)
+    estadisticas.sort_stats('cumulative').print_stats(LINEAS_REPORTE)
+    _escribir(_ruta(perfil_id, 'txt'), salida.getvalue())
+
+    datos = dict(datos, id=perfil_id, llamadas=estadisticas.total_calls)
+    _escribir(_ruta(perfil_id, 'json'), json.dumps(datos, ensure_ascii=False))
+    _podar()
+    return perfil_id
+
+
+def _podar():
+    """Borra los perfiles más viejos por encima de MAX_PERFILES."""
+    directorio = _directorio()
+    ids = sorted(nombre[:-5] for nombre in os.listdir(directorio) if nombre.endswith('.json'))
+    for perfil_id in ids[:max(0, len(ids) - MAX_PERFILES)]:
+        for extension in ('json', 'txt', 'prof'):
+            try:
+                os.remove(os.path.join(directorio, f"{perfil_id}.{extension}"))
+            except FileNotFoundError:
+                pass
+
+
+def listar_perfiles() -> List[dict]:
+    """Datos de los perfiles guardados, el más reciente primero."""
+    directorio = _directorio()
+    perfiles = []
+    for nombre in sorted(os.listdir(directorio), reverse=True):
+        if nombre.endswith('.json'):
+            try:
+                with open(os.path.join(directorio, nombre), encoding='utf-8') as f:
+                    perfiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return perfiles
+
+
+def leer_reporte(perfil_id: str) -> Optional[str]:
+    try:
+        with open(_ruta(perfil_id, 'txt'), encoding='utf-8') as f:
+            return f.read()
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def ruta_pstats(perfil_id: str) -> Optional[str]:
+    try:
+        ruta = _ruta(perfil_id, 'prof')
+    except ValueError:
+        return None
+    return ruta if os.path.exists(ruta) else None
+
+
+# --- Integración con Flask ---
+
+def registrar_en_app(app):
+    """Perfila las requests que traen un token válido."""
+    from flask import g, request
+
+    @app.before_request
+    def _iniciar_perfil():
+        token = request.headers.get(CABECERA) or request.args.get(PARAMETRO)
+        if not token:
+            return
+        usuario_id = verificar_token(app.secret_key, token)
+        if not usuario_id:
+            logger.warning("Token de perfilado inválido o vencido", extra={'ruta': request.path})
+            return
+        if not _ocupado.acquire(blocking=False):
+            g._perfil_ocupado = True
+            return
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError as e:
+            # Otro perfilador (ej. un depurador) ya está activo
+            _ocupado.release()
+            logger.warning(f"No se pudo perfilar {request.path}: {e}")
+            return
+        g._perfil = (perfil, usuario_id, time.perf_counter())
+
+    def _terminar(response=None):
+        perfil, usuario_id, inicio = g.pop('_perfil')
+        try:
+            perfil.disable()
+            datos = {
+                # La ruta sin el token
+                'fecha': time.strftime('%Y-%m-%d %H:%M:%S'), 'metodo': request.method, 'ruta': request.path,
+                'endpoint': request.endpoint, 'estado': response.status_code if response is not None else 500,
+                'ms': round((time.perf_counter() - inicio) * 1000, 1), 'usuario': usuario_id, 'pid': os.getpid(),
+            }
+            perfil_id = guardar_perfil(perfil, datos)
+            logger.info(f"Perfil {perfil_id} de {request.path} ({datos['ms']:.0f} ms)")
+            return perfil_id
+        except Exception as e:
+            logger.error(f"Error guardando el perfil de {request.path}: {e}")
+            return 'error'
+        finally:
+            _ocupado.release()
+
+    @app.after_request
+    def _guardar_perfil(response):
+        if '_perfil' in g:
+            response.headers['X-Perfil'] = _terminar(response)
+        elif g.pop('_perfil_ocupado', False):
+            response.headers['X-Perfil'] = 'ocupado'
+        return response
+
+    @app.teardown_request
+    def _cerrar_perfil(exc):
+        # La request terminó con una excepción sin manejar: after_request no corrió
+        if '_perfil' in g:
+            _terminar()
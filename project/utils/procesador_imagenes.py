@@ -0,0 +1,148 @@
+"""
+Procesamiento de imágenes de la galería fuera del hilo de la request.
+
+Una foto de teléfono de 50 MP decodificada completa ocupa cientos de MB y
+tarda segundos. Aquí se decodifica en modo draft (el decodificador JPEG
+escala 1/2, 1/4 u 1/8 directamente), se reduce con reduce() y solo al final
+se aplica thumbnail(). Todo corre en un pool de procesos acotado y con
+límites contra bombas de descompresión.
+"""
+
+import logging
+import os
+import warnings
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Tuple
+
+from PIL import Image, ImageOps
+
+from utils.concurrencia import obtener_pool_procesos, descartar_pool_procesos
+
+logger = logging.getLogger(__name__)
+
+TAMANO_GALERIA = (800, 1000)
+CALIDAD_JPEG = 85
+ORIENTACION_EXIF = 0x0112
+
+# Límites contra bombas de descompresión
+MAX_PIXELES = int(os.environ.get('GALLERY_MAX_PIXELS', 64_000_000))
+MAX_BYTES_ARCHIVO = int(os.environ.get('GALLERY_MAX_MB', 25)) * 1024 * 1024
+
+MAX_PROCESOS = int(os.environ.get('GALLERY_WORKERS', min(2, os.cpu_count() or 1)))
+# Trabajos aceptados a la vez (en proceso + en cola); el resto se rechaza
+MAX_PENDIENTES = int(os.environ.get('GALLERY_MAX_PENDING', MAX_PROCESOS * 4))
+
+
+class ImagenInvalida(ValueError):
+    """La imagen no se puede procesar (formato, tamaño o bomba de descompresión)."""
+
+
+class ProcesadorOcupado(RuntimeError):
+    """Hay demasiados trabajos pendientes."""
+
+
+def procesar_imagen_galeria(datos: bytes, tamano: Tuple[int, int] = TAMANO_GALERIA) -> bytes:
+    """
+    Convierte una imagen subida en un JPEG para la web.
+
+    Args:
+        datos: contenido del archivo subido
+        tamano: caja máxima (ancho, alto) del resultado
+
+    Returns:
+        bytes del JPEG resultante
+
+    Raises:
+        ImagenInvalida: si el archivo no es una imagen o excede los límites
+    """
+    if len(datos) > MAX_BYTES_ARCHIVO:
+        raise ImagenInvalida(f"El archivo excede {MAX_BYTES_ARCHIVO // (1024 * 1024)} MB")
+
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELES
+    try:
+        # Image.open solo lee la cabecera: Pillow avisa de la bomba antes de decodificar
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', Image.DecompressionBombWarning)
+            img = Image.open(BytesIO(datos))
+
+        # Tamaño final (antes de rotar según EXIF, las fotos verticales vienen acostadas)
+        caja = tamano[::-1] if img.getexif().get(ORIENTACION_EXIF) in (5, 6, 7, 8) else tamano
+        escala = min(1.0, caja[0] / img.width, caja[1] / img.height)
+        final = (max(1, round(img.width * escala)), max(1, round(img.height * escala)))
+
+        # JPEG: el decodificador escala 1/2, 1/4 u 1/8 sin pasar por el tamaño completo
+        img.draft('RGB', final)
+
+        # Reducción entera rápida hasta quedar a menos del doble del tamaño final
+        factor = min(img.width // final[0], img.height // final[1]) // 2
+        if factor > 1:
+            img = img.reduce(factor)
+
+        img = _a_rgb(img)
+        if img.size != final:
+            img = img.resize(final, Image.LANCZOS)
+        img = ImageOps.exif_transpose(img)
+
+        salida = BytesIO()
+        img.save(salida, format='JPEG', quality=CALIDAD_JPEG)
+        return salida.getvalue()
+    except (Image.DecompressionBombError, Image.DecompressionBombWarning) as e:
+        raise ImagenInvalida(f"La imagen excede {MAX_PIXELES // 1_000_000} MP") from e
+    except (Image.UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise ImagenInvalida(f"Imagen no válida: {e}") from e
+
+
+def _a_rgb(img: Image.Image) -> Image.Image:
+    """Convierte a RGB con fondo blanco para las imágenes con transparencia."""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        fondo = Image.new('RGB', img.size, (255, 255, 255))
+        fondo.paste(img, mask=img.split()[-1])
+        return fondo
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+# --- Pool de procesos ---
+
+_pendientes = threading.BoundedSemaphore(MAX_PENDIENTES)
+
+
+def _reiniciar_tras_fork():
+    global _pendientes
+    _pendientes = threading.BoundedSemaphore(MAX_PENDIENTES)
+
+
+os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
+def enviar_procesamiento(datos: bytes, tamano: Tuple[int, int] = TAMANO_GALERIA, espera: float = 0) -> Future:
+    """
+    Envía una imagen al pool de procesos.
+
+    Args:
+        espera: segundos a esperar por un lugar libre si el pool está lleno
+
+    Raises:
+        ProcesadorOcupado: si sigue habiendo MAX_PENDIENTES trabajos en curso
+    """
+    if not (_pendientes.acquire(timeout=espera) if espera > 0 else _pendientes.acquire(blocking=False)):
+        raise ProcesadorOcupado("Hay demasiadas imágenes en proceso, intente en unos segundos")
+    try:
+        try:
+            futuro = obtener_pool_procesos('imagenes', MAX_PROCESOS).submit(procesar_imagen_galeria, datos, tamano)
+        except BrokenProcessPool:
+            # Un proceso hijo murió (ej. OOM): se recrea el pool una vez
+            logger.warning("Pool de procesamiento de imágenes roto, recreándolo")
+            descartar_pool_procesos('imagenes')
+            futuro = obtener_pool_procesos('imagenes', MAX_PROCESOS).submit(procesar_imagen_galeria, datos, tamano)
+    except Exception:
+        _pendientes.release()
+        raise
+    futuro.add_done_callback(lambda _: _pendientes.release())
+    return futuro
@@ -0,0 +1,231 @@
+"""
+Recolector de objetos huérfanos en Supabase Storage.
+
+Compara el listado del bucket (leído página por página) con las URLs
+referenciadas en becas.foto, documentos.archivo y gallery_images.image_data,
+y elimina en lotes los objetos que nadie usa. Los huérfanos se borran recién
+después de listar todo el bucket: borrar mientras se pagina por offset
+corre las páginas siguientes y deja objetos sin revisar. Las referencias se guardan en
+un arreglo ordenado de hashes de 64 bits (8 bytes por URL) en lugar de un
+set de strings.
+"""
+
+import bisect
+import hashlib
+import logging
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+
+from utils.almacenamiento_cas import extraer_bucket_y_ruta, obtener_indice_local
+
+logger = logging.getLogger(__name__)
+
+# Columnas que referencian objetos de Storage: (tabla, columna)
+COLUMNAS_REFERENCIA = (
+    ('becas', 'foto'),
+    ('documentos', 'archivo'),
+    ('gallery_images', 'image_data'),
+)
+
+TAMANO_PAGINA = 1000
+
+
+def _hash64(bucket: str, path: str) -> int:
+    return int.from_bytes(hashlib.blake2b(f"{bucket}/{path}".encode(), digest_size=8).digest(), 'big')
+
+
+class ConjuntoCompacto:
+    """
+    Conjunto inmutable de rutas representado como arreglo ordenado de hashes.
+    Una colisión solo puede hacer que un objeto se conserve, nunca que se borre.
+    """
+
+    def __init__(self):
+        self._hashes = array('Q')
+        self._congelado = False
+
+    def agregar(self, bucket: str, path: str):
+        self._hashes.append(_hash64(bucket, path))
+        self._congelado = False
+
+    def congelar(self):
+        self._hashes = array('Q', sorted(set(self._hashes)))
+        self._congelado = True
+
+    def __contains__(self, ubicacion) -> bool:
+        if not self._congelado:
+            self.congelar()
+        h = _hash64(*ubicacion)
+        i = bisect.bisect_left(self._hashes, h)
+        return i < len(self._hashes) and self._hashes[i] == h
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def bytes_usados(self) -> int:
+        return self._hashes.itemsize * len(self._hashes)
+
+
+@dataclass
+class ResultadoGC:
+    revisados: int = 0
+    huerfanos: int = 0
+    eliminados: int = 0
+    retenidos_por_gracia: int = 0
+    errores: int = 0
+    rutas_huerfanas: List[str] = field(default_factory=list)
+
+
+def cargar_referencias(cliente) -> ConjuntoCompacto:
+    """Recorre las columnas de referencia con paginación por id (keyset)."""
+    referencias = ConjuntoCompacto()
+    for tabla, columna in COLUMNAS_REFERENCIA:
+        ultimo_id = None
+        total = 0
+        while True:
+            query = cliente.table(tabla).select(f'id,{columna}').order('id').limit(TAMANO_PAGINA)
+            if ultimo_id is not None:
+                query = query.gt('id', ultimo_id)
+            filas = query.execute().data or []
+            for fila in filas:
+                ubicacion = extraer_bucket_y_ruta(fila.get(columna))
+                if ubicacion:
+                    referencias.agregar(*ubicacion)
+                    total += 1
+            if len(filas) < TAMANO_PAGINA:
+                break
+            ultimo_id = filas[-1]['id']
+        logger.info(f"Referencias en {tabla}.{columna}: {total}")
+    referencias.congelar()
+    return referencias
+
+
+def listar_objetos(cliente, bucket: str, prefijo: str = '') -> Iterator[dict]:
+    """Lista los objetos del bucket página por página (recorre subcarpetas)."""
+    offset = 0
+    while True:
+        pagina = cliente.storage.from_(bucket).list(prefijo, {
+            'limit': TAMANO_PAGINA, 'offset': offset, 'sortBy': {'column': 'name', 'order': 'asc'}
+        }) or []
+        for item in pagina:
+            ruta = f"{prefijo}/{item['name']}" if prefijo else item['name']
+            if item.get('id') is None:
+                # Las carpetas no tienen id
+                yield from listar_objetos(cliente, bucket, ruta)
+            else:
+                item['path'] = ruta
+                yield item
+        if len(pagina) < TAMANO_PAGINA:
+            break
+        offset += TAMANO_PAGINA
+
+
+def _fecha(valor: Optional[str]) -> Optional[datetime]:
+    if not valor:
+        return None
+    try:
+        return datetime.fromisoformat(valor.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def recolectar(cliente, bucket: str = 'becas-public', prefijos=('imagenes', 'documentos', 'gallery'),
+               dry_run: bool = False, tamano_lote: int = 100, lotes_por_segundo: float = 2.0,
+               gracia: timedelta = timedelta(hours=24)) -> ResultadoGC:
+    """
+    Elimina objetos sin referencias del bucket.
+
+    Args:
+        cliente: cliente de Supabase con service key (debe ver TODAS las filas)
+        bucket: bucket a revisar
+        prefijos: carpetas del bucket a recorrer
+        dry_run: solo reportar, no borrar
+        tamano_lote: objetos por llamada a remove()
+        lotes_por_segundo: límite de velocidad de borrado
+        gracia: no se tocan objetos más nuevos que esto (subidas en curso)
+    """
+    resultado = ResultadoGC()
+    referencias = cargar_referencias(cliente)
+    logger.info(f"{len(referencias)} referencias en memoria ({referencias.bytes_usados() / 1024:.1f} KB)")
+
+    limite_fecha = datetime.now(timezone.utc) - gracia
+    intervalo = 1.0 / lotes_por_segundo if lotes_por_segundo > 0 else 0
+    lote = []
+    ultimo_borrado = 0.0
+
+    def vaciar_lote():
+        nonlocal ultimo_borrado
+        if not lote:
+            return
+        espera = intervalo - (time.monotonic() - ultimo_borrado)
+        if espera > 0:
+            time.sleep(espera)
+        try:
+            _eliminar_lote(cliente, bucket, lote, limite_fecha, resultado)
+        except Exception as e:
+            resultado.errores += len(lote)
+            logger.error(f"Error eliminando lote de {len(lote)} objetos: {e}")
+        ultimo_borrado = time.monotonic()
+        lote.clear()
+
+    for prefijo in prefijos:
+        for objeto in listar_objetos(cliente, bucket, prefijo):
+            resultado.revisados += 1
+            if (bucket, objeto['path']) in referencias:
+                continue
+
+            creado = _fecha(objeto.get('created_at') or objeto.get('updated_at'))
+            if creado is None or creado > limite_fecha:
+                resultado.retenidos_por_gracia += 1
+                continue
+
+            resultado.huerfanos += 1
+            resultado.rutas_huerfanas.append(objeto['path'])
+
+    if not dry_run:
+        for ruta in resultado.rutas_huerfanas:
+            lote.append(ruta)
+            if len(lote) >= tamano_lote:
+                vaciar_lote()
+        vaciar_lote()
+
+    logger.info(
+        f"GC {bucket}: {resultado.revisados} revisados, {resultado.huerfanos} huérfanos, "
+        f"{resultado.eliminados} eliminados, {resultado.retenidos_por_gracia} retenidos por gracia"
+        + (" (dry-run)" if dry_run else "")
+    )
+    return resultado
+
+
+def _eliminar_lote(cliente, bucket: str, rutas: List[str], limite_fecha: datetime, resultado: ResultadoGC):
+    """
+    Borra un lote de objetos. Los que tienen una referencia registrada
+    recientemente en storage_refs (subida en curso) se conservan.
+    """
+    recientes = set()
+    try:
+        filas = cliente.table('storage_refs').select('path,updated_at') \
+            .eq('bucket', bucket).in_('path', rutas).execute().data or []
+        recientes = {f['path'] for f in filas if (_fecha(f.get('updated_at')) or limite_fecha) > limite_fecha}
+    except Exception as e:
+        logger.debug(f"storage_refs no disponible: {e}")
+
+    a_borrar = [r for r in rutas if r not in recientes]
+    resultado.retenidos_por_gracia += len(recientes)
+    if not a_borrar:
+        return
+
+    cliente.storage.from_(bucket).remove(a_borrar)
+    resultado.eliminados += len(a_borrar)
+
+    # Limpiar registros de referencias y el índice local
+    try:
+        cliente.table('storage_refs').delete().eq('bucket', bucket).in_('path', a_borrar).execute()
+    except Exception as e:
+        logger.debug(f"No se limpiaron filas de storage_refs: {e}")
+    indice = obtener_indice_local()
+    for ruta in a_borrar:
+        indice.olvidar(bucket, ruta)
@@ -0,0 +1,131 @@
+"""
+Consultas de lectura de atletas con sus tablas relacionadas.
+
+PostgREST puede devolver las filas relacionadas en la misma respuesta
+(select('*, medallas(*), documentos(*)')), reemplazando tres round trips por
+uno. Requiere las llaves foráneas de migrations/002_relaciones_becas.sql; si
+la relación no existe se recurre a consultas separadas (en paralelo).
+"""
+
+import logging
+import time
+from typing import Iterator, Optional
+
+from postgrest.exceptions import APIError
+
+from config.supabase_client import supabase
+from utils.concurrencia import ejecutar_en_paralelo
+
+logger = logging.getLogger(__name__)
+
+TABLAS_HIJAS = ('medallas', 'documentos')
+
+# Códigos de PostgREST cuando no encuentra (o no puede desambiguar) la relación
+CODIGOS_SIN_RELACION = ('PGRST200', 'PGRST201')
+
+# Si la relación no existe no se vuelve a intentar hasta pasado este tiempo
+REINTENTO_RELACIONES = 600
+
+_relaciones_no_disponibles_desde = None
+
+
+def _relaciones_disponibles() -> bool:
+    if _relaciones_no_disponibles_desde is None:
+        return True
+    return time.monotonic() - _relaciones_no_disponibles_desde > REINTENTO_RELACIONES
+
+
+def obtener_atleta_completo(beca_id: int, medallas: bool = True, documentos: bool = True) -> Optional[dict]:
+    """
+    Obtiene un atleta junto con sus medallas y/o documentos en una sola consulta.
+    Las tablas hijas vienen ordenadas por created_at descendente.
+
+    Args:
+        beca_id: ID del atleta
+        medallas: incluir la lista 'medallas'
+        documentos: incluir la lista 'documentos'
+
+    Returns:
+        dict del atleta con las claves 'medallas'/'documentos' solicitadas,
+        o None si no existe
+    """
+    global _relaciones_no_disponibles_desde
+    hijas = [t for t, incluir in zip(TABLAS_HIJAS, (medallas, documentos)) if incluir]
+
+    if hijas and _relaciones_disponibles():
+        try:
+            query = supabase.table('becas').select(','.join(['*'] + [f'{t}(*)' for t in hijas])).eq('id', beca_id)
+            for tabla in hijas:
+                query = query.order('created_at', desc=True, foreign_table=tabla)
+            filas = query.limit(1).execute().data
+            _relaciones_no_disponibles_desde = None
+            return filas[0] if filas else None
+        except APIError as e:
+            if e.code not in CODIGOS_SIN_RELACION:
+                raise
+            logger.warning(f"Relación becas->{hijas} no disponible ({e.code}); usando consultas separadas")
+            _relaciones_no_disponibles_desde = time.monotonic()
+
+    return _obtener_por_separado(beca_id, hijas)
+
+
+def _obtener_por_separado(beca_id: int, hijas: list) -> Optional[dict]:
+    """Alternativa sin relaciones: una consulta por tabla, en paralelo."""
+    tareas = {'beca': lambda: supabase.table('becas').select('*').eq('id', beca_id).limit(1).execute().data}
+    for tabla in hijas:
+        tareas[tabla] = (
+            lambda tabla=tabla: supabase.table(tabla).select('*').eq('atleta_id', beca_id)
+            .order('created_at', desc=True).execute().data
+        )
+
+    # Si falla una tabla hija (ej. no existe) se muestra la ficha sin ella
+    datos = ejecutar_en_paralelo(tareas, defaults={tabla: [] for tabla in hijas})
+    if not datos['beca']:
+        return None
+
+    beca = datos['beca'][0]
+    for tabla in hijas:
+        beca[tabla] = datos[tabla] or []
+    return beca
+
+
+def aplicar_filtros(query, disciplina: str = None, busqueda: str = None, estatus: str = None):
+    """
+    Aplica los filtros del listado de atletas a una consulta sobre becas.
+
+    Args:
+        disciplina: disciplina exacta ('Todas' o vacío = sin filtro)
+        busqueda: texto a buscar en nombre o apellido (case-insensitive)
+        estatus: estatus exacto ('Todos' o vacío = sin filtro)
+    """
+    if disciplina and disciplina != 'Todas':
+        query = query.eq('disciplina', disciplina)
+    if estatus and estatus != 'Todos':
+        query = query.eq('estatus', estatus)
+    if busqueda:
+        query = query.or_(f"nombre.ilike.%{busqueda}%,apellido.ilike.%{busqueda}%")
+    return query
+
+
+def iterar_becas(columnas: str = '*', tamano_pagina: int = 1000, **filtros) -> Iterator[dict]:
+    """
+    Recorre todas las becas que cumplen los filtros, de la más nueva a la más vieja.
+
+    Usa paginación por id (keyset): cada página cuesta lo mismo sin importar
+    cuántas filas haya antes, a diferencia de range()/offset.
+
+    Args:
+        columnas: columnas a seleccionar (debe incluir 'id')
+        tamano_pagina: filas por consulta
+        **filtros: ver aplicar_filtros()
+    """
+    ultimo_id = None
+    while True:
+        query = aplicar_filtros(supabase.table('becas').select(columnas), **filtros)
+        if ultimo_id is not None:
+            query = query.lt('id', ultimo_id)
+        filas = query.order('id', desc=True).limit(tamano_pagina).execute().data or []
+        yield from filas
+        if len(filas) < tamano_pagina:
+            break
+        ultimo_id = filas[-1]['id']
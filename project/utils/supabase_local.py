@@ -0,0 +1,1129 @@
+"""
+Supabase local en proceso: PostgREST, GoTrue y Storage sin red.
+
+Implementa el subconjunto de la API que usa el proyecto con la misma
+interfaz encadenable de supabase-py, para ejercitar las rutas reales de
+construcción de consultas en tests y benchmarks sin un proyecto remoto:
+
+- PostgREST sobre SQLite: select (columnas, count='exact', tablas
+  relacionadas tabla(*)), eq/neq/gt/gte/lt/lte/like/ilike/is_/in_/not_/
+  or_/match/filter, order/limit/offset/range/single/maybe_single, insert,
+  update, upsert (on_conflict), delete y las rpc de storage_refs.
+- GoTrue: usuarios con contraseña y OTP, sesiones con JWT HS256.
+- Storage: objetos en disco con URLs públicas y firmadas.
+
+Las tablas no tienen esquema: cada fila es un JSON en SQLite y las columnas
+se consultan con json_extract (el índice de una columna se crea la primera
+vez que se filtra por ella). Las llaves únicas y las relaciones son las de
+migrations/. Los errores son los mismos tipos que lanza el cliente real
+(APIError, AuthApiError, StorageApiError) para que los caminos de error
+también se ejerciten.
+
+Cada llamada (execute, auth, storage) pasa por Red, que agrega latencia y
+puede fallar a propósito; con una semilla las corridas son reproducibles.
+
+Uso:
+    servicio = SupabaseLocal(directorio, latencia=0.04, semilla=1)
+    servicio.cargar({'becas': [...], 'medallas': [...]})
+    cliente = servicio.crear_cliente()
+
+Variables de entorno (config/supabase_client.py, ver desde_entorno()):
+    SUPABASE_LOCAL              1 = usar el servicio local en vez de SUPABASE_URL
+    SUPABASE_LOCAL_DIR          base de datos y archivos (DATA_DIR/supabase_local)
+    SUPABASE_LOCAL_LATENCIA_MS  latencia por llamada; "20-60" para un rango (0)
+    SUPABASE_LOCAL_FALLOS       probabilidad de que una llamada falle (0)
+    SUPABASE_LOCAL_SEMILLA      semilla de latencias y fallos
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from gotrue.errors import AuthApiError, AuthSessionMissingError
+from postgrest.exceptions import APIError
+from storage3.exceptions import StorageApiError
+
+from config import rutas_datos
+
+logger = logging.getLogger(__name__)
+
+URL_BASE = 'http://supabase.local'
+SECRETO_JWT = 'supabase-local-secreto-jwt'
+DURACION_SESION = 3600
+
+# migrations/001 y 003: llaves únicas además de 'id'
+LLAVES_UNICAS = {
+    'becas': [('cedula',)],
+    'storage_refs': [('bucket', 'path')],
+    'gallery_images': [('slot',)],
+}
+# migrations/002: (tabla padre, tabla hija) -> columna de la hija
+RELACIONES = {
+    ('becas', 'medallas'): 'atleta_id',
+    ('becas', 'documentos'): 'atleta_id',
+}
+
+
+def _ahora_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# --- Red simulada ---
+
+class Red:
+    """Latencia y fallos simulados de las llamadas al servicio."""
+
+    def __init__(self, latencia=0.0, tasa_fallos: float = 0.0, semilla: Optional[int] = None):
+        self.latencia = tuple(latencia) if isinstance(latencia, (tuple, list)) else (latencia, latencia)
+        self.tasa_fallos = tasa_fallos
+        self.llamadas = 0
+        self.por_servicio: Dict[str, int] = {}
+        self._azar = random.Random(semilla)
+        self._forzados: List[Optional[str]] = []
+        self._lock = threading.Lock()
+
+    def fallar_proximas(self, n: int = 1, servicio: Optional[str] = None):
+        """Las próximas n llamadas a servicio ('postgrest', 'gotrue', 'storage'; None = cualquiera) fallan."""
+        with self._lock:
+            self._forzados.extend([servicio] * n)
+
+    def reiniciar_conteo(self):
+        with self._lock:
+            self.llamadas = 0
+            self.por_servicio.clear()
+
+    def llamada(self, servicio: str) -> bool:
+        """Cuenta la llamada y espera la latencia. Retorna True si la llamada debe fallar."""
+        with self._lock:
+            self.llamadas += 1
+            self.por_servicio[servicio] = self.por_servicio.get(servicio, 0) + 1
+            espera = self._azar.uniform(*self.latencia) if self.latencia[1] else 0
+            falla = bool(self.tasa_fallos) and self._azar.random() < self.tasa_fallos
+            for i, objetivo in enumerate(self._forzados):
+                if objetivo in (None, servicio):
+                    del self._forzados[i]
+                    falla = True
+                    break
+        if espera:
+            time.sleep(espera)
+        return falla
+
+
+# --- JWT (HS256, como los que firma GoTrue) ---
+
+def _b64(datos: bytes) -> str:
+    return base64.urlsafe_b64encode(datos).rstrip(b'=').decode()
+
+
+def _b64_decodificar(texto: str) -> bytes:
+    return base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
+
+
+def firmar_jwt(claims: dict, secreto: str = SECRETO_JWT) -> str:
+    cabecera = _b64(b'{"alg":"HS256","typ":"JWT"}')
+    cuerpo = _b64(json.dumps(claims, separators=(',', ':')).encode())
+    firma = hmac.new(secreto.encode(), f"{cabecera}.{cuerpo}".encode(), hashlib.sha256).digest()
+    return f"{cabecera}.{cuerpo}.{_b64(firma)}"
+
+
+def verificar_jwt(token: str, secreto: str = SECRETO_JWT) -> Optional[dict]:
+    """Claims del token si la firma es válida y no venció; None en otro caso."""
+    try:
+        cabecera, cuerpo, firma = token.split('.')
+        esperada = hmac.new(secreto.encode(), f"{cabecera}.{cuerpo}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(_b64_decodificar(firma), esperada):
+            return None
+        claims = json.loads(_b64_decodificar(cuerpo))
+    except (ValueError, AttributeError):
+        return None
+    if claims.get('exp', 0) < time.time():
+        return None
+    return claims
+
+
+# --- Base de datos ---
+
+_PATRON_COLUMNA = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _error_api(mensaje: str, codigo: str, detalles: str = None) -> APIError:
+    return APIError({'message': mensaje, 'code': codigo, 'hint': None, 'details': detalles})
+
+
+def _expr(columna: str) -> str:
+    """Expresión SQL de una columna (nombre validado: va dentro del SQL)."""
+    if not _PATRON_COLUMNA.match(columna or ''):
+        raise _error_api(f'column "{columna}" does not exist', '42703')
+    return f"json_extract(datos, '$.{columna}')"
+
+
+class BaseDatos:
+    """Tablas sin esquema sobre SQLite (segura entre procesos e hilos)."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._indexadas = set()
+        conn = self.conexion()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(
+            'CREATE TABLE IF NOT EXISTS filas ('
+            ' n INTEGER PRIMARY KEY AUTOINCREMENT, tabla TEXT NOT NULL, datos TEXT NOT NULL);'
+            "CREATE INDEX IF NOT EXISTS filas_id ON filas (tabla, json_extract(datos, '$.id'));"
+            'CREATE TABLE IF NOT EXISTS usuarios ('
+            ' id TEXT PRIMARY KEY, email TEXT UNIQUE, telefono TEXT UNIQUE, hash TEXT,'
+            ' metadata TEXT NOT NULL, creado TEXT NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS codigos ('
+            ' codigo TEXT NOT NULL, destino TEXT NOT NULL, usuario TEXT NOT NULL, expira REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS sesiones ('
+            ' refresh TEXT PRIMARY KEY, usuario TEXT NOT NULL, expira REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS objetos ('
+            ' bucket TEXT NOT NULL, ruta TEXT NOT NULL, tipo TEXT, tamano INTEGER NOT NULL,'
+            ' id TEXT NOT NULL, creado TEXT NOT NULL, actualizado TEXT NOT NULL, PRIMARY KEY (bucket, ruta));'
+        )
+
+    def conexion(self) -> sqlite3.Connection:
+        # Una conexión por hilo: sqlite3 no permite compartirlas entre hilos
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.ruta, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            # lower() de SQLite solo entiende ASCII (ilike con tildes)
+            conn.create_function('minusculas', 1, lambda v: v.lower() if isinstance(v, str) else v,
+                                 deterministic=True)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaccion(self):
+        conn = self.conexion()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def indexar(self, columna: str):
+        """Índice por la columna (lo que en Postgres sería un índice de la tabla)."""
+        if columna in self._indexadas:
+            return
+        self.conexion().execute(f'CREATE INDEX IF NOT EXISTS filas_{columna} ON filas (tabla, {_expr(columna)})')
+        self._indexadas.add(columna)
+
+    def buscar(self, conn, tabla: str, donde: str = '', params: Iterable = (), orden: str = '',
+               limite: Optional[int] = None, desde: int = 0) -> List[Tuple[int, dict]]:
+        sql = f'SELECT n, datos FROM filas WHERE tabla = ?{" AND " + donde if donde else ""}{orden}'
+        params = [tabla, *params]
+        if limite is not None or desde:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [-1 if limite is None else limite, desde]
+        return [(n, json.loads(datos)) for n, datos in conn.execute(sql, params)]
+
+    def contar(self, conn, tabla: str, donde: str = '', params: Iterable = ()) -> int:
+        sql = f'SELECT COUNT(*) FROM filas WHERE tabla = ?{" AND " + donde if donde else ""}'
+        return conn.execute(sql, [tabla, *params]).fetchone()[0]
+
+    def insertar(self, conn, tabla: str, fila: dict) -> dict:
+        """Inserta con los valores por defecto de las tablas (id serial y created_at)."""
+        fila = dict(fila)
+        if fila.get('id') is None:
+            # MAX por el índice filas_id; si hay ids de texto (uuid) quedan por encima
+            ultimo = conn.execute(f"SELECT MAX({_expr('id')}) FROM filas WHERE tabla = ?", (tabla,)).fetchone()[0]
+            if not isinstance(ultimo, (int, type(None))):
+                ultimo = conn.execute(
+                    f"SELECT MAX({_expr('id')}) FROM filas WHERE tabla = ? AND typeof({_expr('id')}) = 'integer'",
+                    (tabla,)
+                ).fetchone()[0]
+            fila['id'] = (ultimo or 0) + 1
+        fila.setdefault('created_at', _ahora_iso())
+        for llave in [('id',)] + LLAVES_UNICAS.get(tabla, []):
+            if self.buscar_por_llave(conn, tabla, llave, fila):
+                columnas = ', '.join(llave)
+                raise _error_api(f'duplicate key value violates unique constraint "{tabla}_{"_".join(llave)}_key"',
+                                 '23505', f'Key ({columnas}) already exists.')
+        conn.execute('INSERT INTO filas (tabla, datos) VALUES (?, ?)', (tabla, json.dumps(fila, default=str)))
+        return fila
+
+    def buscar_por_llave(self, conn, tabla: str, llave: Tuple[str, ...], fila: dict) -> Optional[Tuple[int, dict]]:
+        if any(fila.get(c) is None for c in llave):
+            return None
+        for columna in llave:
+            self.indexar(columna)
+        donde = ' AND '.join(f'{_expr(c)} = ?' for c in llave)
+        encontradas = self.buscar(conn, tabla, donde, [fila[c] for c in llave], limite=1)
+        return encontradas[0] if encontradas else None
+
+    def reemplazar(self, conn, n: int, fila: dict):
+        conn.execute('UPDATE filas SET datos = ? WHERE n = ?', (json.dumps(fila, default=str), n))
+
+    def eliminar(self, conn, ns: List[int]):
+        conn.executemany('DELETE FROM filas WHERE n = ?', [(n,) for n in ns])
+
+
+# --- PostgREST ---
+
+_OPERADORES = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+_PATRON_NUMERO = re.compile(r'^-?\d+(\.\d+)?$')
+
+
+def _dividir(texto: str) -> List[str]:
+    """Separa por comas fuera de paréntesis: 'a.eq.1,or(b.eq.2,c.eq.3)'."""
+    partes, profundidad, actual = [], 0, ''
+    for caracter in texto:
+        if caracter == ',' and profundidad == 0:
+            partes.append(actual.strip())
+            actual = ''
+            continue
+        profundidad += (caracter == '(') - (caracter == ')')
+        actual += caracter
+    if actual.strip():
+        partes.append(actual.strip())
+    return partes
+
+
+def _condicion(columna: str, operador: str, valor: Any) -> Tuple[str, list]:
+    """SQL de un filtro de PostgREST."""
+    expr = _expr(columna)
+    if operador in _OPERADORES:
+        simbolo = _OPERADORES[operador]
+        if isinstance(valor, str) and _PATRON_NUMERO.match(valor):
+            # Postgres convierte '5' al tipo de la columna; aquí no hay tipos
+            return (f"(CASE WHEN typeof({expr}) IN ('integer', 'real') THEN {expr} {simbolo} ? "
+                    f"ELSE {expr} {simbolo} ? END)", [float(valor), valor])
+        return f'{expr} {simbolo} ?', [valor]
+    if operador == 'ilike':
+        return f'minusculas({expr}) LIKE minusculas(?)', [str(valor).replace('*', '%')]
+    if operador == 'like':
+        return f'{expr} GLOB ?', [str(valor).replace('*', '%').replace('%', '*').replace('_', '?')]
+    if operador == 'is':
+        texto = str(valor).lower()
+        if valor is None or texto == 'null':
+            return f'{expr} IS NULL', []
+        if texto in ('true', 'false'):
+            return f'{expr} = ?', [texto == 'true']
+    if operador == 'in':
+        valores = list(valor)
+        return f'{expr} IN ({",".join("?" * len(valores))})', valores
+    raise _error_api(f'operador no soportado por SupabaseLocal: {operador}', 'PGRST100')
+
+
+def _valor_de_texto(operador: str, valor: str) -> Any:
+    if operador == 'in':
+        return [v.strip().strip('"') for v in _dividir(valor.strip()[1:-1])]
+    return valor.strip('"')
+
+
+def _filtro_de_texto(texto: str, union: str = ' OR ') -> Tuple[str, list]:
+    """SQL de la sintaxis de or_()/filter(): 'nombre.ilike.%a%,and(x.eq.1,y.not.is.null)'."""
+    sqls, params = [], []
+    for parte in _dividir(texto):
+        logica = re.match(r'^(not\.)?(and|or)\((.*)\)$', parte)
+        if logica:
+            sql, valores = _filtro_de_texto(logica.group(3), ' AND ' if logica.group(2) == 'and' else ' OR ')
+            negar = bool(logica.group(1))
+        else:
+            columna, _, resto = parte.partition('.')
+            negar = resto.startswith('not.')
+            operador, _, valor = resto[4 if negar else 0:].partition('.')
+            sql, valores = _condicion(columna, operador, _valor_de_texto(operador, valor))
+        sqls.append(f'NOT ({sql})' if negar else sql)
+        params += valores
+    return '(' + union.join(sqls) + ')', params
+
+
+def _parsear_select(columnas: str) -> Tuple[Optional[List[str]], Dict[str, Optional[List[str]]]]:
+    """('*, medallas(*)') -> (None, {'medallas': None}); None = todas las columnas."""
+    todas, campos, embebidas = False, [], {}
+    for parte in _dividir(re.sub(r'\s+', '', columnas or '*')):
+        relacion = re.match(r'^(\w+)(?:!\w+)?\((.*)\)$', parte)
+        if relacion:
+            embebidas[relacion.group(1)] = _parsear_select(relacion.group(2))[0]
+        elif parte == '*':
+            todas = True
+        else:
+            campos.append(parte)
+    return None if todas else campos, embebidas
+
+
+def _proyectar(fila: dict, campos: Optional[List[str]]) -> dict:
+    return dict(fila) if campos is None else {c: fila.get(c) for c in campos}
+
+
+def _orden_sql(ordenes: List[Tuple[str, bool, Optional[bool]]]) -> str:
+    # Como Postgres: NULLS LAST en asc y NULLS FIRST en desc
+    partes = []
+    for columna, desc, nulos_primero in ordenes:
+        expr = _expr(columna)
+        primero = desc if nulos_primero is None else nulos_primero
+        partes.append(f'({expr} IS NULL) {"DESC" if primero else "ASC"}')
+        partes.append(f'{expr} {"DESC" if desc else "ASC"}')
+    return ' ORDER BY ' + ', '.join(partes + ['n']) if partes else ' ORDER BY n'
+
+
+class _Consulta:
+    """Constructor encadenable de una consulta (table('x').select()...execute())."""
+
+    def __init__(self, servicio: 'SupabaseLocal', tabla: str):
+        self._servicio = servicio
+        self._tabla = tabla
+        self._operacion = 'select'
+        self._columnas = '*'
+        self._contar = False
+        self._valores: Any = None
+        self._on_conflict = ''
+        self._ignorar_duplicados = False
+        self._devolver = True
+        self._condiciones: List[Tuple[str, list]] = []
+        self._negar = False
+        self._ordenes: List[Tuple[str, bool, Optional[bool]]] = []
+        self._ordenes_embebidas: Dict[str, List[Tuple[str, bool, Optional[bool]]]] = {}
+        self._limite: Optional[int] = None
+        self._desde = 0
+        self._modo = 'lista'
+
+    # Operaciones
+
+    def select(self, *columnas: str, count: Optional[str] = None):
+        self._columnas = ','.join(columnas) or '*'
+        self._contar = count is not None
+        return self
+
+    def insert(self, json: Any, *, count=None, returning: str = 'representation', upsert: bool = False,
+               default_to_null: bool = True):
+        self._operacion = 'upsert' if upsert else 'insert'
+        self._valores = json
+        self._devolver = returning != 'minimal'
+        return self
+
+    def upsert(self, json: Any, *, count=None, returning: str = 'representation', ignore_duplicates: bool = False,
+               on_conflict: str = '', default_to_null: bool = True):
+        self.insert(json, returning=returning, upsert=True)
+        self._on_conflict = on_conflict
+        self._ignorar_duplicados = ignore_duplicates
+        return self
+
+    def update(self, json: dict, *, count=None, returning: str = 'representation'):
+        self._operacion = 'update'
+        self._valores = json
+        self._devolver = returning != 'minimal'
+        return self
+
+    def delete(self, *, count=None, returning: str = 'representation'):
+        self._operacion = 'delete'
+        self._devolver = returning != 'minimal'
+        return self
+
+    # Filtros
+
+    def _agregar(self, sql: str, params: list):
+        if self._negar:
+            sql, self._negar = f'NOT ({sql})', False
+        self._condiciones.append((sql, params))
+        return self
+
+    @property
+    def not_(self):
+        self._negar = True
+        return self
+
+    def filter(self, column: str, operator: str, criteria: str):
+        negar = operator.startswith('not.')
+        operador = operator[4:] if negar else operator
+        sql, params = _condicion(column, operador, _valor_de_texto(operador, criteria))
+        return self._agregar(f'NOT ({sql})' if negar else sql, params)
+
+    def eq(self, column: str, value: Any):
+        self._servicio.db.indexar(column)
+        return self._agregar(*_condicion(column, 'eq', value))
+
+    def neq(self, column: str, value: Any):
+        return self._agregar(*_condicion(column, 'neq', value))
+
+    def gt(self, column: str, value: Any):
+        return self._agregar(*_condicion(column, 'gt', value))
+
+    def gte(self, column: str, value: Any):
+        return self._agregar(*_condicion(column, 'gte', value))
+
+    def lt(self, column: str, value: Any):
+        return self._agregar(*_condicion(column, 'lt', value))
+
+    def lte(self, column: str, value: Any):
+        return self._agregar(*_condicion(column, 'lte', value))
+
+    def like(self, column: str, pattern: str):
+        return self._agregar(*_condicion(column, 'like', pattern))
+
+    def ilike(self, column: str, pattern: str):
+        return self._agregar(*_condicion(column, 'ilike', pattern))
+
+    def is_(self, column: str, value: Any):
+        return self._agregar(*_condicion(column, 'is', value))
+
+    def in_(self, column: str, values: Iterable):
+        self._servicio.db.indexar(column)
+        return self._agregar(*_condicion(column, 'in', values))
+
+    def match(self, query: dict):
+        for columna, valor in query.items():
+            self.eq(columna, valor)
+        return self
+
+    def or_(self, filters: str, reference_table: Optional[str] = None):
+        return self._agregar(*_filtro_de_texto(filters))
+
+    # Modificadores
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None,
+              foreign_table: Optional[str] = None):
+        destino = self._ordenes_embebidas.setdefault(foreign_table, []) if foreign_table else self._ordenes
+        destino.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None):
+        if not foreign_table:
+            self._limite = size
+        return self
+
+    def offset(self, size: int):
+        self._desde = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: Optional[str] = None):
+        if not foreign_table:
+            self._desde, self._limite = start, end - start + 1
+        return self
+
+    def single(self):
+        self._modo = 'single'
+        return self
+
+    def maybe_single(self):
+        self._modo = 'maybe'
+        return self
+
+    # Ejecución
+
+    def _donde(self) -> Tuple[str, list]:
+        return ' AND '.join(sql for sql, _ in self._condiciones), [p for _, ps in self._condiciones for p in ps]
+
+    def execute(self):
+        if self._servicio.red.llamada('postgrest'):
+            raise _error_api('Fallo inyectado (SupabaseLocal)', '503')
+        db = self._servicio.db
+        if self._operacion == 'select':
+            respuesta = self._seleccionar(db.conexion())
+        else:
+            with db.transaccion() as conn:
+                filas = getattr(self, f'_{self._operacion}')(conn)
+            respuesta = SimpleNamespace(data=filas if self._devolver else [], count=None)
+
+        if self._modo == 'lista':
+            return respuesta
+        if len(respuesta.data) == 1:
+            return SimpleNamespace(data=respuesta.data[0], count=respuesta.count)
+        if self._modo == 'maybe' and not respuesta.data:
+            return None
+        raise _error_api('JSON object requested, multiple (or no) rows returned', 'PGRST116',
+                         f'The result contains {len(respuesta.data)} rows')
+
+    def _seleccionar(self, conn) -> SimpleNamespace:
+        db = self._servicio.db
+        campos, embebidas = _parsear_select(self._columnas)
+        donde, params = self._donde()
+        encontradas = db.buscar(conn, self._tabla, donde, params, _orden_sql(self._ordenes),
+                                self._limite, self._desde)
+        filas = [fila for _, fila in encontradas]
+        datos = [_proyectar(fila, campos) for fila in filas]
+        for tabla, campos_embebidos in embebidas.items():
+            self._embeber(conn, tabla, campos_embebidos, filas, datos)
+        total = db.contar(conn, self._tabla, donde, params) if self._contar else None
+        return SimpleNamespace(data=datos, count=total)
+
+    def _embeber(self, conn, tabla: str, campos: Optional[List[str]], filas: List[dict], datos: List[dict]):
+        """Agrega las filas relacionadas (tabla(*)) con una consulta por relación."""
+        db = self._servicio.db
+        if (self._tabla, tabla) in RELACIONES:
+            # Uno a muchos: lista de hijas por fila
+            columna, local, es_lista = RELACIONES[(self._tabla, tabla)], 'id', True
+        elif (tabla, self._tabla) in RELACIONES:
+            # Muchos a uno: la fila padre
+            columna, local, es_lista = 'id', RELACIONES[(tabla, self._tabla)], False
+        else:
+            raise _error_api(f"Could not find a relationship between '{self._tabla}' and '{tabla}' in the schema cache",
+                             'PGRST200')
+        claves = list({f.get(local) for f in filas if f.get(local) is not None})
+        grupos: Dict[Any, List[dict]] = {}
+        if claves:
+            db.indexar(columna)
+            sql, params = _condicion(columna, 'in', claves)
+            for _, hija in db.buscar(conn, tabla, sql, params, _orden_sql(self._ordenes_embebidas.get(tabla, []))):
+                grupos.setdefault(hija.get(columna), []).append(_proyectar(hija, campos))
+        for fila, dato in zip(filas, datos):
+            relacionadas = grupos.get(fila.get(local), [])
+            dato[tabla] = relacionadas if es_lista else (relacionadas[0] if relacionadas else None)
+
+    def _lista_valores(self) -> List[dict]:
+        return [self._valores] if isinstance(self._valores, dict) else list(self._valores)
+
+    def _insert(self, conn) -> List[dict]:
+        return [self._servicio.db.insertar(conn, self._tabla, fila) for fila in self._lista_valores()]
+
+    def _upsert(self, conn) -> List[dict]:
+        db = self._servicio.db
+        llave = tuple(c.strip() for c in self._on_conflict.split(',') if c.strip()) or ('id',)
+        resultado = []
+        for fila in self._lista_valores():
+            existente = db.buscar_por_llave(conn, self._tabla, llave, fila)
+            if existente is None:
+                resultado.append(db.insertar(conn, self._tabla, fila))
+            elif not self._ignorar_duplicados:
+                n, anterior = existente
+                nueva = {**anterior, **fila}
+                db.reemplazar(conn, n, nueva)
+                resultado.append(nueva)
+        return resultado
+
+    def _update(self, conn) -> List[dict]:
+        db = self._servicio.db
+        donde, params = self._donde()
+        resultado = []
+        for n, fila in db.buscar(conn, self._tabla, donde, params):
+            fila.update(self._valores)
+            db.reemplazar(conn, n, fila)
+            resultado.append(fila)
+        return resultado
+
+    def _delete(self, conn) -> List[dict]:
+        db = self._servicio.db
+        donde, params = self._donde()
+        encontradas = db.buscar(conn, self._tabla, donde, params)
+        db.eliminar(conn, [n for n, _ in encontradas])
+        return [fila for _, fila in encontradas]
+
+
+class _Rpc:
+    """Llamada a una función de la base (supabase.rpc(nombre, params).execute())."""
+
+    def __init__(self, servicio: 'SupabaseLocal', funcion: Callable, params: dict):
+        self._servicio = servicio
+        self._funcion = funcion
+        self._params = params or {}
+
+    def execute(self):
+        if self._servicio.red.llamada('postgrest'):
+            raise _error_api('Fallo inyectado (SupabaseLocal)', '503')
+        with self._servicio.db.transaccion() as conn:
+            return SimpleNamespace(data=self._funcion(self._servicio.db, conn, **self._params), count=None)
+
+
+def _storage_ref_incrementar(db: BaseDatos, conn, p_bucket, p_path, p_sha256=None, p_size=None):
+    existente = db.buscar_por_llave(conn, 'storage_refs', ('bucket', 'path'), {'bucket': p_bucket, 'path': p_path})
+    if existente is None:
+        db.insertar(conn, 'storage_refs', {'bucket': p_bucket, 'path': p_path, 'sha256': p_sha256, 'size': p_size,
+                                           'ref_count': 1, 'updated_at': _ahora_iso()})
+        return 1
+    n, fila = existente
+    fila.update(ref_count=fila['ref_count'] + 1, updated_at=_ahora_iso())
+    db.reemplazar(conn, n, fila)
+    return fila['ref_count']
+
+
+def _storage_ref_decrementar(db: BaseDatos, conn, p_bucket, p_path):
+    existente = db.buscar_por_llave(conn, 'storage_refs', ('bucket', 'path'), {'bucket': p_bucket, 'path': p_path})
+    if existente is None:
+        return None
+    n, fila = existente
+    fila.update(ref_count=max(fila['ref_count'] - 1, 0), updated_at=_ahora_iso())
+    if fila['ref_count'] == 0:
+        db.eliminar(conn, [n])
+    else:
+        db.reemplazar(conn, n, fila)
+    return fila['ref_count']
+
+
+# migrations/001_storage_refs.sql
+FUNCIONES_RPC = {
+    'storage_ref_incrementar': _storage_ref_incrementar,
+    'storage_ref_decrementar': _storage_ref_decrementar,
+}
+
+
+# --- GoTrue ---
+
+def _hash_password(password: str, sal: Optional[str] = None) -> str:
+    # Pocas iteraciones: es un servicio de pruebas
+    sal = sal or secrets.token_hex(8)
+    return f"{sal}${hashlib.pbkdf2_hmac('sha256', password.encode(), sal.encode(), 1000).hex()}"
+
+
+def _password_correcta(password: str, guardado: Optional[str]) -> bool:
+    if not guardado or not password:
+        return False
+    return hmac.compare_digest(_hash_password(password, guardado.split('$', 1)[0]), guardado)
+
+
+class _Admin:
+    """auth.admin (requiere la service key en el cliente real)."""
+
+    def __init__(self, auth: '_Auth'):
+        self._auth = auth
+
+    def create_user(self, atributos: dict):
+        self._auth._llamada()
+        usuario = self._auth._crear_usuario(atributos.get('email'), atributos.get('phone'), atributos.get('password'),
+                                            atributos.get('user_metadata') or {})
+        return SimpleNamespace(user=usuario)
+
+    def get_user_by_id(self, uid: str):
+        self._auth._llamada()
+        return SimpleNamespace(user=self._auth._usuario(uid))
+
+    def list_users(self, page: int = None, per_page: int = None) -> list:
+        self._auth._llamada()
+        filas = self._auth._db.conexion().execute('SELECT id FROM usuarios ORDER BY creado').fetchall()
+        return [self._auth._usuario(uid) for uid, in filas]
+
+    def update_user_by_id(self, uid: str, atributos: dict):
+        self._auth._llamada()
+        return SimpleNamespace(user=self._auth._actualizar(uid, atributos))
+
+    def delete_user(self, uid: str, should_soft_delete: bool = False):
+        self._auth._llamada()
+        with self._auth._db.transaccion() as conn:
+            conn.execute('DELETE FROM usuarios WHERE id = ?', (uid,))
+            conn.execute('DELETE FROM sesiones WHERE usuario = ?', (uid,))
+
+
+class _Auth:
+    """Subconjunto de GoTrue. La sesión actual es del cliente, como en supabase-py."""
+
+    def __init__(self, servicio: 'SupabaseLocal'):
+        self._servicio = servicio
+        self._db = servicio.db
+        self._sesion = None
+        self.admin = _Admin(self)
+
+    def _llamada(self):
+        if self._servicio.red.llamada('gotrue'):
+            raise AuthApiError('Fallo inyectado (SupabaseLocal)', 503, 'unexpected_failure')
+
+    # Usuarios
+
+    def _usuario(self, uid: str):
+        fila = self._db.conexion().execute(
+            'SELECT id, email, telefono, metadata, creado FROM usuarios WHERE id = ?', (uid,)
+        ).fetchone()
+        if fila is None:
+            raise AuthApiError('User not found', 404, 'user_not_found')
+        uid, email, telefono, metadata, creado = fila
+        return SimpleNamespace(id=uid, email=email, phone=telefono or '', user_metadata=json.loads(metadata),
+                               app_metadata={'provider': 'email' if email else 'phone'}, role='authenticated',
+                               aud='authenticated', created_at=creado)
+
+    def _buscar(self, email: str = None, telefono: str = None) -> Optional[str]:
+        columna, valor = ('email', email.lower()) if email else ('telefono', telefono)
+        fila = self._db.conexion().execute(f'SELECT id FROM usuarios WHERE {columna} = ?', (valor,)).fetchone()
+        return fila[0] if fila else None
+
+    def _crear_usuario(self, email: str, telefono: str, password: Optional[str], metadata: dict):
+        if (email or telefono) and self._buscar(email, telefono):
+            raise AuthApiError('User already registered', 422, 'user_already_exists')
+        uid = str(uuid.uuid4())
+        with self._db.transaccion() as conn:
+            conn.execute(
+                'INSERT INTO usuarios (id, email, telefono, hash, metadata, creado) VALUES (?, ?, ?, ?, ?, ?)',
+                (uid, email.lower() if email else None, telefono, _hash_password(password) if password else None,
+                 json.dumps(metadata), _ahora_iso())
+            )
+            # Como el trigger del proyecto que crea el perfil de cada usuario nuevo
+            self._db.insertar(conn, 'profiles', {'id': uid, 'email': email, 'role': metadata.get('role', 'user')})
+        return self._usuario(uid)
+
+    def _actualizar(self, uid: str, atributos: dict):
+        usuario = self._usuario(uid)
+        with self._db.transaccion() as conn:
+            if atributos.get('password'):
+                conn.execute('UPDATE usuarios SET hash = ? WHERE id = ?', (_hash_password(atributos['password']), uid))
+            if atributos.get('email'):
+                conn.execute('UPDATE usuarios SET email = ? WHERE id = ?', (atributos['email'].lower(), uid))
+            if atributos.get('data'):
+                conn.execute('UPDATE usuarios SET metadata = ? WHERE id = ?',
+                             (json.dumps({**usuario.user_metadata, **atributos['data']}), uid))
+        if atributos.get('phone'):
+            # El cambio de teléfono se confirma con verify_otp(type='phone_change')
+            self._emitir_codigo(atributos['phone'], uid)
+        return self._usuario(uid)
+
+    # Sesiones
+
+    def _nueva_sesion(self, uid: str):
+        usuario = self._usuario(uid)
+        expira = int(time.time()) + DURACION_SESION
+        access = firmar_jwt({'sub': uid, 'email': usuario.email, 'phone': usuario.phone, 'role': 'authenticated',
+                             'aud': 'authenticated', 'iat': int(time.time()), 'exp': expira,
+                             'session_id': str(uuid.uuid4())}, self._servicio.secreto_jwt)
+        refresh = secrets.token_urlsafe(24)
+        with self._db.transaccion() as conn:
+            conn.execute('INSERT INTO sesiones (refresh, usuario, expira) VALUES (?, ?, ?)',
+                         (refresh, uid, time.time() + 30 * 86400))
+        self._sesion = SimpleNamespace(access_token=access, refresh_token=refresh, token_type='bearer',
+                                       expires_in=DURACION_SESION, expires_at=expira, user=usuario)
+        return SimpleNamespace(user=usuario, session=self._sesion)
+
+    def _emitir_codigo(self, destino: str, uid: str) -> str:
+        codigo = f"{secrets.randbelow(10 ** 6):06d}"
+        with self._db.transaccion() as conn:
+            conn.execute('INSERT INTO codigos (codigo, destino, usuario, expira) VALUES (?, ?, ?, ?)',
+                         (codigo, destino.lower(), uid, time.time() + 3600))
+        return codigo
+
+    def _canjear_codigo(self, codigo: str, destino: Optional[str] = None) -> str:
+        donde = 'codigo = ? AND expira > ?'
+        params = [codigo, time.time()]
+        if destino:
+            donde += ' AND destino = ?'
+            params.append(destino.lower())
+        with self._db.transaccion() as conn:
+            fila = conn.execute(f'SELECT usuario FROM codigos WHERE {donde}', params).fetchone()
+            if fila is None:
+                raise AuthApiError('Token has expired or is invalid', 403, 'otp_expired')
+            conn.execute(f'DELETE FROM codigos WHERE {donde}', params)
+        return fila[0]
+
+    def sign_up(self, credenciales: dict):
+        self._llamada()
+        metadata = (credenciales.get('options') or {}).get('data') or {}
+        usuario = self._crear_usuario(credenciales.get('email'), credenciales.get('phone'),
+                                      credenciales.get('password'), metadata)
+        return self._nueva_sesion(usuario.id)
+
+    def sign_in_with_password(self, credenciales: dict):
+        self._llamada()
+        uid = self._buscar(credenciales.get('email'), credenciales.get('phone'))
+        guardado = uid and self._db.conexion().execute('SELECT hash FROM usuarios WHERE id = ?', (uid,)).fetchone()[0]
+        if not _password_correcta(credenciales.get('password'), guardado):
+            raise AuthApiError('Invalid login credentials', 400, 'invalid_credentials')
+        return self._nueva_sesion(uid)
+
+    def sign_in_with_otp(self, credenciales: dict):
+        self._llamada()
+        email, telefono = credenciales.get('email'), credenciales.get('phone')
+        uid = self._buscar(email, telefono) or self._crear_usuario(email, telefono, None, {}).id
+        self._emitir_codigo(email or telefono, uid)
+        return SimpleNamespace(user=None, session=None, message_id=None)
+
+    def verify_otp(self, parametros: dict):
+        self._llamada()
+        destino = parametros.get('email') or parametros.get('phone')
+        uid = self._canjear_codigo(parametros.get('token'), destino)
+        if parametros.get('type') == 'phone_change':
+            with self._db.transaccion() as conn:
+                conn.execute('UPDATE usuarios SET telefono = ? WHERE id = ?', (destino, uid))
+        return self._nueva_sesion(uid)
+
+    def reset_password_email(self, email: str, options: dict = None):
+        self._llamada()
+        uid = self._buscar(email)
+        if uid:
+            self._emitir_codigo(email, uid)
+
+    def exchange_code_for_session(self, parametros: dict):
+        self._llamada()
+        return self._nueva_sesion(self._canjear_codigo(parametros.get('auth_code')))
+
+    def get_session(self):
+        return self._sesion
+
+    def get_user(self, jwt: Optional[str] = None):
+        self._llamada()
+        token = jwt or (self._sesion.access_token if self._sesion else None)
+        if not token:
+            return None
+        claims = verificar_jwt(token, self._servicio.secreto_jwt)
+        if claims is None:
+            raise AuthApiError('invalid JWT: unable to parse or verify signature', 401, 'bad_jwt')
+        return SimpleNamespace(user=self._usuario(claims['sub']))
+
+    def set_session(self, access_token: str, refresh_token: str):
+        claims = verificar_jwt(access_token, self._servicio.secreto_jwt)
+        if claims is not None:
+            usuario = self._usuario(claims['sub'])
+            self._sesion = SimpleNamespace(access_token=access_token, refresh_token=refresh_token, token_type='bearer',
+                                           expires_in=int(claims['exp'] - time.time()), expires_at=claims['exp'],
+                                           user=usuario)
+            return SimpleNamespace(user=usuario, session=self._sesion)
+        return self.refresh_session(refresh_token)
+
+    def refresh_session(self, refresh_token: Optional[str] = None):
+        self._llamada()
+        refresh_token = refresh_token or (self._sesion.refresh_token if self._sesion else None)
+        with self._db.transaccion() as conn:
+            fila = conn.execute('SELECT usuario FROM sesiones WHERE refresh = ? AND expira > ?',
+                                (refresh_token, time.time())).fetchone()
+            conn.execute('DELETE FROM sesiones WHERE refresh = ?', (refresh_token,))
+        if fila is None:
+            raise AuthApiError('Invalid Refresh Token: Refresh Token Not Found', 400, 'refresh_token_not_found')
+        return self._nueva_sesion(fila[0])
+
+    def update_user(self, atributos: dict):
+        self._llamada()
+        if self._sesion is None:
+            raise AuthSessionMissingError()
+        return SimpleNamespace(user=self._actualizar(self._sesion.user.id, atributos))
+
+    def sign_out(self, options: dict = None):
+        self._llamada()
+        if self._sesion is not None:
+            with self._db.transaccion() as conn:
+                conn.execute('DELETE FROM sesiones WHERE refresh = ?', (self._sesion.refresh_token,))
+        self._sesion = None
+
+
+# --- Storage ---
+
+class _Bucket:
+    """storage.from_(bucket): objetos en DIRECTORIO/storage/<bucket>/<ruta>."""
+
+    def __init__(self, servicio: 'SupabaseLocal', bucket: str):
+        self._servicio = servicio
+        self._db = servicio.db
+        self.id = bucket
+
+    def _llamada(self):
+        if self._servicio.red.llamada('storage'):
+            raise StorageApiError('Fallo inyectado (SupabaseLocal)', 'InternalError', 503)
+
+    def _archivo(self, ruta: str) -> str:
+        partes = ruta.strip('/').split('/')
+        if not ruta or ruta.startswith('/') or any(p in ('', '.', '..') for p in partes):
+            raise StorageApiError('Invalid key', 'InvalidKey', 400)
+        return os.path.join(self._servicio.directorio, 'storage', self.id, *partes)
+
+    def _metadatos(self, ruta: str) -> Optional[tuple]:
+        return self._db.conexion().execute(
+            'SELECT tipo, tamano, id, creado, actualizado FROM objetos WHERE bucket = ? AND ruta = ?', (self.id, ruta)
+        ).fetchone()
+
+    def upload(self, path: str, file, file_options: dict = None):
+        self._llamada()
+        opciones = file_options or {}
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'rb') as f:
+                contenido = f.read()
+        else:
+            contenido = file if isinstance(file, bytes) else file.read()
+        reemplazar = str(opciones.get('upsert') or opciones.get('x-upsert')).lower() == 'true'
+        if self._metadatos(path) and not reemplazar:
+            raise StorageApiError('The resource already exists', 'Duplicate', 409)
+        archivo = self._archivo(path)
+        os.makedirs(os.path.dirname(archivo), exist_ok=True)
+        temporal = f"{archivo}.{uuid.uuid4().hex}.tmp"
+        with open(temporal, 'wb') as f:
+            f.write(contenido)
+        os.replace(temporal, archivo)
+        ahora = _ahora_iso()
+        with self._db.transaccion() as conn:
+            conn.execute(
+                'INSERT INTO objetos (bucket, ruta, tipo, tamano, id, creado, actualizado) VALUES (?, ?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT (bucket, ruta) DO UPDATE SET tipo = excluded.tipo, tamano = excluded.tamano,'
+                ' actualizado = excluded.actualizado',
+                (self.id, path, opciones.get('content-type', 'text/plain;charset=UTF-8'), len(contenido),
+                 str(uuid.uuid4()), ahora, ahora)
+            )
+        return SimpleNamespace(path=path, full_path=f"{self.id}/{path}", fullPath=f"{self.id}/{path}")
+
+    def download(self, path: str, options: dict = None) -> bytes:
+        self._llamada()
+        return self._leer(path)
+
+    def _leer(self, path: str) -> bytes:
+        if not self._metadatos(path):
+            raise StorageApiError('Object not found', 'not_found', 404)
+        with open(self._archivo(path), 'rb') as f:
+            return f.read()
+
+    def remove(self, paths: List[str]) -> List[dict]:
+        self._llamada()
+        eliminados = []
+        with self._db.transaccion() as conn:
+            for ruta in paths:
+                if conn.execute('DELETE FROM objetos WHERE bucket = ? AND ruta = ?', (self.id, ruta)).rowcount:
+                    eliminados.append({'bucket_id': self.id, 'name': ruta})
+        for item in eliminados:
+            try:
+                os.remove(self._archivo(item['name']))
+            except FileNotFoundError:
+                pass
+        return eliminados
+
+    def list(self, path: Optional[str] = None, options: dict = None) -> List[dict]:
+        """Contenido directo de la carpeta; las subcarpetas vienen con id None."""
+        self._llamada()
+        opciones = options or {}
+        prefijo = f"{path.strip('/')}/" if path else ''
+        filas = self._db.conexion().execute(
+            'SELECT ruta, tipo, tamano, id, creado, actualizado FROM objetos WHERE bucket = ? AND substr(ruta, 1, ?) = ?',
+            (self.id, len(prefijo), prefijo)
+        ).fetchall()
+        items = {}
+        for ruta, tipo, tamano, oid, creado, actualizado in filas:
+            nombre, carpeta, _ = ruta[len(prefijo):].partition('/')
+            if carpeta:
+                items.setdefault(nombre, {'name': nombre, 'id': None, 'created_at': None, 'updated_at': None,
+                                          'metadata': None})
+            else:
+                items[nombre] = {'name': nombre, 'id': oid, 'created_at': creado, 'updated_at': actualizado,
+                                 'metadata': {'size': tamano, 'mimetype': tipo}}
+        orden = opciones.get('sortBy') or {}
+        columna = orden.get('column', 'name')
+        resultado = sorted(items.values(), key=lambda i: (i.get(columna) is None, i.get(columna) or ''),
+                           reverse=orden.get('order') == 'desc')
+        if opciones.get('search'):
+            resultado = [i for i in resultado if opciones['search'].lower() in i['name'].lower()]
+        desde = int(opciones.get('offset', 0))
+        return resultado[desde:desde + int(opciones.get('limit', 100))]
+
+    def get_public_url(self, path: str, options: dict = None) -> str:
+        return f"{self._servicio.url}/storage/v1/object/public/{self.id}/{quote(path)}"
+
+    def _firmar(self, path: str, expires_in: int) -> str:
+        token = firmar_jwt({'url': f"{self.id}/{path}", 'iat': int(time.time()), 'exp': int(time.time()) + expires_in},
+                           self._servicio.secreto_jwt)
+        return f"{self._servicio.url}/storage/v1/object/sign/{self.id}/{quote(path)}?token={token}"
+
+    def create_signed_url(self, path: str, expires_in: int, options: dict = None) -> dict:
+        self._llamada()
+        if not self._metadatos(path):
+            raise StorageApiError('Object not found', 'not_found', 404)
+        url = self._firmar(path, expires_in)
+        return {'signedURL': url, 'signedUrl': url}
+
+    def create_signed_urls(self, paths: List[str], expires_in: int, options: dict = None) -> List[dict]:
+        self._llamada()
+        resultado = []
+        for ruta in paths:
+            existe = self._metadatos(ruta) is not None
+            url = self._firmar(ruta, expires_in) if existe else None
+            resultado.append({'path': ruta, 'signedURL': url, 'signedUrl': url,
+                              'error': None if existe else 'Either the object does not exist or you do not have access to it'})
+        return resultado
+
+
+class _Storage:
+    def __init__(self, servicio: 'SupabaseLocal'):
+        self._servicio = servicio
+
+    def from_(self, bucket: str) -> _Bucket:
+        return _Bucket(self._servicio, bucket)
+
+
+# --- Cliente y servicio ---
+
+class ClienteLocal:
+    """Equivalente de supabase.Client sobre un SupabaseLocal."""
+
+    def __init__(self, servicio: 'SupabaseLocal'):
+        self.servicio = servicio
+        self.auth = _Auth(servicio)
+        self.storage = _Storage(servicio)
+
+    def table(self, nombre: str) -> _Consulta:
+        return _Consulta(self.servicio, nombre)
+
+    def from_(self, nombre: str) -> _Consulta:
+        return self.table(nombre)
+
+    def rpc(self, funcion: str, params: dict = None, **kwargs) -> _Rpc:
+        if funcion not in self.servicio.funciones:
+            raise _error_api(f'Could not find the function public.{funcion} in the schema cache', 'PGRST202')
+        return _Rpc(self.servicio, self.servicio.funciones[funcion], params)
+
+
+class SupabaseLocal:
+    """
+    Estado compartido (base, archivos y red simulada) de los clientes locales.
+    Varios procesos pueden usar el mismo directorio.
+
+    Args:
+        directorio: donde viven supabase.sqlite3 y storage/
+        latencia: segundos por llamada, o (mínimo, máximo) para variarla
+        tasa_fallos: probabilidad de que una llamada falle
+        semilla: semilla de latencias y fallos
+    """
+
+    def __init__(self, directorio: str, latencia=0.0, tasa_fallos: float = 0.0, semilla: Optional[int] = None,
+                 url: str = URL_BASE, secreto_jwt: str = SECRETO_JWT):
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.url = url.rstrip('/')
+        self.secreto_jwt = secreto_jwt
+        self.db = BaseDatos(os.path.join(directorio, 'supabase.sqlite3'))
+        self.red = Red(latencia, tasa_fallos, semilla)
+        self.funciones = dict(FUNCIONES_RPC)
+
+    def crear_cliente(self) -> ClienteLocal:
+        return ClienteLocal(self)
+
+    def cargar(self, datos: Dict[str, List[dict]]):
+        """Inserta filas sin pasar por la red simulada (datos de prueba)."""
+        with self.db.transaccion() as conn:
+            for tabla, filas in datos.items():
+                for fila in filas:
+                    self.db.insertar(conn, tabla, fila)
+
+    def filas(self, tabla: str) -> List[dict]:
+        """Todas las filas de la tabla, sin pasar por la red simulada."""
+        return [fila for _, fila in self.db.buscar(self.db.conexion(), tabla, orden=' ORDER BY n')]
+
+    def codigo_enviado(self, destino: str) -> Optional[str]:
+        """Último código OTP o de recuperación enviado a un email o teléfono."""
+        fila = self.db.conexion().execute(
+            'SELECT codigo FROM codigos WHERE destino = ? ORDER BY rowid DESC LIMIT 1', (destino.lower(),)
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def leer_url_firmada(self, url: str) -> bytes:
+        """Contenido de una URL firmada por este servicio (verifica token y vencimiento)."""
+        partes = urlsplit(url)
+        token = (parse_qs(partes.query).get('token') or [''])[0]
+        claims = verificar_jwt(token, self.secreto_jwt)
+        ruta = unquote(partes.path).split('/object/sign/', 1)[-1]
+        if claims is None or claims.get('url') != ruta:
+            raise StorageApiError('Invalid signature', 'InvalidSignature', 400)
+        bucket, _, path = ruta.partition('/')
+        return _Bucket(self, bucket)._leer(path)
+
+
+def _latencia_de_entorno(valor: str):
+    minimo, _, maximo = (valor or '0').partition('-')
+    return float(minimo) / 1000, float(maximo or minimo) / 1000
+
+
+def desde_entorno() -> SupabaseLocal:
+    """Servicio configurado con las variables SUPABASE_LOCAL_* (ver el docstring del módulo)."""
+    semilla = os.environ.get('SUPABASE_LOCAL_SEMILLA')
+    return SupabaseLocal(
+        os.environ.get('SUPABASE_LOCAL_DIR') or rutas_datos.directorio_datos('supabase_local'),
+        latencia=_latencia_de_entorno(os.environ.get('SUPABASE_LOCAL_LATENCIA_MS')),
+        tasa_fallos=float(os.environ.get('SUPABASE_LOCAL_FALLOS', 0)),
+        semilla=int(semilla) if semilla else None,
+    )
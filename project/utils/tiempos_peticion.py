@@ -0,0 +1,246 @@
+"""
+Contabilidad de llamadas a Supabase (y de otras etapas) por request.
+
+config/supabase_client.py envuelve los clientes con ClienteMedido: cada
+consulta de PostgREST (.execute()), llamada de GoTrue (auth.*) y de Storage
+(storage.from_(...).*) se cronometra y se suma a la request en curso, que
+vive en una ContextVar (también la ven las tareas lanzadas con
+utils.concurrencia.enviar). Jinja se mide con las señales de Flask y el
+resto de etapas con medir('xlsx') / medir('pdf').
+
+Al responder se emite el encabezado Server-Timing (lo muestran las
+herramientas de desarrollo del navegador) y una línea en el log de acceso.
+Las llamadas en paralelo suman su duración: una categoría puede superar
+al total de la request.
+
+Variables de entorno:
+    SERVER_TIMING    '0' para no enviar el encabezado (el log de acceso se mantiene)
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logger_acceso = logging.getLogger('acceso')
+
+# Eventos individuales que se guardan por request (las sumas no tienen tope)
+MAX_EVENTOS = 500
+
+
+class TiemposPeticion:
+    """Llamadas y segundos por categoría de una request."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.categorias: Dict[str, Tuple[int, float]] = {}
+        # (categoría, operación, segundos)
+        self.eventos: List[Tuple[str, str, float]] = []
+        self._lock = threading.Lock()
+
+    def registrar(self, categoria: str, segundos: float, operacion: str = ''):
+        with self._lock:
+            llamadas, total = self.categorias.get(categoria, (0, 0.0))
+            self.categorias[categoria] = (llamadas + 1, total + segundos)
+            if len(self.eventos) < MAX_EVENTOS:
+                self.eventos.append((categoria, operacion, segundos))
+
+    def transcurrido(self) -> float:
+        return time.perf_counter() - self.inicio
+
+
+_actual: contextvars.ContextVar[Optional[TiemposPeticion]] = contextvars.ContextVar('tiempos_peticion', default=None)
+
+
+def iniciar_medicion() -> TiemposPeticion:
+    tiempos = TiemposPeticion()
+    _actual.set(tiempos)
+    return tiempos
+
+
+def medicion_actual() -> Optional[TiemposPeticion]:
+    return _actual.get()
+
+
+# Funciones (categoría, operación, segundos, error) que reciben cada llamada, haya o no request
+_observadores: List[Callable[[str, str, float, bool], None]] = []
+
+
+def suscribir(observador: Callable[[str, str, float, bool], None]):
+    """Agrega un observador de todas las llamadas (ej. utils.metricas)."""
+    if observador not in _observadores:
+        _observadores.append(observador)
+
+
+def registrar(categoria: str, segundos: float, operacion: str = '', error: bool = False):
+    """Suma una llamada a la request en curso y avisa a los observadores."""
+    tiempos = _actual.get()
+    if tiempos is not None:
+        tiempos.registrar(categoria, segundos, operacion)
+    for observador in _observadores:
+        try:
+            observador(categoria, operacion, segundos, error)
+        except Exception as e:
+            logger.debug(f"Observador de tiempos falló: {e}")
+
+
+@contextmanager
+def medir(categoria: str, operacion: str = ''):
+    inicio = time.perf_counter()
+    error = True
+    try:
+        yield
+        error = False
+    finally:
+        registrar(categoria, time.perf_counter() - inicio, operacion, error)
+
+
+# --- Proxies de los clientes ---
+
+def _cronometrar(fn, categoria: str, operacion: str):
+    def medido(*args, **kwargs):
+        inicio = time.perf_counter()
+        error = True
+        try:
+            resultado = fn(*args, **kwargs)
+            error = False
+            return resultado
+        finally:
+            registrar(categoria, time.perf_counter() - inicio, operacion, error)
+    return medido
+
+
+class _ConsultaMedida:
+    """Constructor de PostgREST: encadena como el original y cronometra execute()."""
+
+    __slots__ = ('_consulta', '_operacion')
+
+    def __init__(self, consulta, operacion: str):
+        self._consulta = consulta
+        self._operacion = operacion
+
+    def _envolver(self, valor, nombre: str):
+        if hasattr(valor, 'execute'):
+            return _ConsultaMedida(valor, f"{self._operacion}.{nombre}")
+        return valor
+
+    def __getattr__(self, nombre):
+        valor = getattr(self._consulta, nombre)
+        if nombre == 'execute':
+            return _cronometrar(valor, 'postgrest', self._operacion)
+        if callable(valor):
+            def encadenar(*args, **kwargs):
+                return self._envolver(valor(*args, **kwargs), nombre)
+            return encadenar
+        # Propiedades como .not_ también devuelven un constructor
+        return self._envolver(valor, nombre)
+
+
+class _ServicioMedido:
+    """Cronometra cada método del servicio (GoTrue, bucket de Storage...)."""
+
+    def __init__(self, servicio, categoria: str, prefijo: str = '', anidados=('admin', 'mfa')):
+        self._servicio = servicio
+        self._categoria = categoria
+        self._prefijo = prefijo
+        self._anidados = anidados
+
+    def __getattr__(self, nombre):
+        valor = getattr(self._servicio, nombre)
+        if nombre in self._anidados:
+            return _ServicioMedido(valor, self._categoria, f"{self._prefijo}{nombre}.", ())
+        if callable(valor) and not nombre.startswith('_'):
+            return _cronometrar(valor, self._categoria, self._prefijo + nombre)
+        return valor
+
+
+class _StorageMedido(_ServicioMedido):
+    def __init__(self, storage):
+        super().__init__(storage, 'storage', anidados=())
+
+    def from_(self, bucket: str):
+        return _ServicioMedido(self._servicio.from_(bucket), 'storage', f"{bucket}.", ())
+
+
+class ClienteMedido:
+    """Envoltorio del cliente de Supabase con la misma interfaz."""
+
+    def __init__(self, cliente):
+        self._cliente = cliente
+        self.auth = _ServicioMedido(cliente.auth, 'gotrue')
+        self.storage = _StorageMedido(cliente.storage)
+
+    def table(self, nombre: str):
+        return _ConsultaMedida(self._cliente.table(nombre), nombre)
+
+    from_ = table
+
+    def rpc(self, funcion: str, *args, **kwargs):
+        return _ConsultaMedida(self._cliente.rpc(funcion, *args, **kwargs), f"rpc:{funcion}")
+
+    def __getattr__(self, nombre):
+        return getattr(self._cliente, nombre)
+
+
+def envolver_cliente(cliente):
+    """ClienteMedido sobre cliente (None queda None: las rutas siguen viendo que falta)."""
+    if cliente is None or isinstance(cliente, ClienteMedido):
+        return cliente
+    return ClienteMedido(cliente)
+
+
+# --- Integración con Flask ---
+
+def encabezado_server_timing(tiempos: TiemposPeticion) -> str:
+    """'postgrest;dur=12.3;desc="x3", ..., total;dur=40.1' (ms)."""
+    partes = [
+        f'{categoria};dur={total * 1000:.1f};desc="x{llamadas}"'
+        for categoria, (llamadas, total) in sorted(tiempos.categorias.items())
+    ]
+    partes.append(f'total;dur={tiempos.transcurrido() * 1000:.1f}')
+    return ', '.join(partes)
+
+
+def registrar_en_app(app):
+    """Instala los hooks de medición, el encabezado y el log de acceso."""
+    from flask import before_render_template, request, template_rendered
+
+    enviar_encabezado = os.environ.get('SERVER_TIMING', '1') != '0'
+    renders = contextvars.ContextVar('inicio_render', default=())
+
+    @app.before_request
+    def _iniciar():
+        iniciar_medicion()
+
+    def _antes_de_render(sender, template, context, **extra):
+        renders.set(renders.get() + (time.perf_counter(),))
+
+    def _despues_de_render(sender, template, context, **extra):
+        pila = renders.get()
+        if pila:
+            renders.set(pila[:-1])
+            registrar('jinja', time.perf_counter() - pila[-1], template.name or '')
+
+    before_render_template.connect(_antes_de_render, app, weak=False)
+    template_rendered.connect(_despues_de_render, app, weak=False)
+
+    @app.after_request
+    def _responder(response):
+        tiempos = medicion_actual()
+        if tiempos is None:
+            return response
+        if enviar_encabezado:
+            response.headers['Server-Timing'] = encabezado_server_timing(tiempos)
+
+        campos = {'metodo': request.method, 'ruta': request.path, 'endpoint': request.endpoint,
+                  'estado': response.status_code, 'ms': round(tiempos.transcurrido() * 1000, 1)}
+        for categoria, (llamadas, total) in tiempos.categorias.items():
+            campos[f'{categoria}_n'] = llamadas
+            campos[f'{categoria}_ms'] = round(total * 1000, 1)
+        logger_acceso.info(f"{request.method} {request.path} {response.status_code} {campos['ms']:.0f}ms",
+                           extra=campos)
+        return response
@@ -6,6 +6,15 @@ Contiene funciones para validar emails, cédulas, rangos numéricos, etc.
 import re
 from typing import Optional, Tuple
 
+# Patrones compilados una sola vez (no en cada llamada)
+PATRON_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Formato venezolano: V-12345678 o E-12345678
+PATRON_CEDULA = re.compile(r'^[VEve]-?\d{7,8}$')
+# Formato: 0414-1234567 o 04141234567
+PATRON_TELEFONO = re.compile(r'^0(412|414|424|416|426)\d{7}$')
+_PATRON_SCRIPT = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+_PATRON_TAGS = re.compile(r'<[^>]+>')
+
 def validar_email(email: str) -> Tuple[bool, Optional[str]]:
     """
     Valida el formato de un email.
@@ -19,8 +28,7 @@ def validar_email(email: str) -> Tuple[bool, Optional[str]]:
     if not email:
         return False, "El email es requerido"
     
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(pattern, email):
+    if not PATRON_EMAIL.match(email):
         return False, "Formato de email inválido"
     
     return True, None
@@ -39,9 +47,7 @@ def validar_cedula(cedula: str) -> Tuple[bool, Optional[str]]:
     if not cedula:
         return False, "La cédula es requerida"
     
-    # Formato venezolano: V-12345678 o E-12345678
-    pattern = r'^[VEve]-?\d{7,8}$'
-    if not re.match(pattern, cedula.upper()):
+    if not PATRON_CEDULA.match(cedula.upper()):
         return False, "Formato de cédula inválido. Use V-12345678 o E-12345678"
     
     return True, None
@@ -170,11 +176,9 @@ def validar_telefono(telefono: str) -> Tuple[bool, Optional[str]]:
     if not telefono:
         return True, None  # El teléfono puede ser opcional
     
-    # Formato: 0414-1234567 o 04141234567
-    pattern = r'^0(412|414|424|416|426)\d{7}$'
     telefono_limpio = telefono.replace('-', '').replace(' ', '')
     
-    if not re.match(pattern, telefono_limpio):
+    if not PATRON_TELEFONO.match(telefono_limpio):
         return False, "Formato de teléfono inválido. Use 0414-1234567"
     
     return True, None
@@ -182,7 +186,7 @@ def validar_telefono(telefono: str) -> Tuple[bool, Optional[str]]:
 
 def validar_datos_atleta(datos: dict) -> Tuple[bool, list]:
     """
-    Valida todos los datos de un atleta.
+    Valida todos los datos de un atleta con el esquema de utils/esquema_atleta.py.
     
     Args:
         datos: Diccionario con los datos del atleta
@@ -190,54 +194,10 @@ def validar_datos_atleta(datos: dict) -> Tuple[bool, list]:
     Returns:
         Tuple (es_valido, lista_de_errores)
     """
-    errores = []
-    
-    # Validaciones obligatorias
-    if not datos.get('nombre'):
-        errores.append("El nombre es requerido")
-    
-    if not datos.get('apellido'):
-        errores.append("El apellido es requerido")
-    
-    # Validar cédula
-    if datos.get('cedula'):
-        es_valido, mensaje = validar_cedula(datos['cedula'])
-        if not es_valido:
-            errores.append(mensaje)
-    else:
-        errores.append("La cédula es requerida")
-    
-    # Validar email
-    if datos.get('email'):
-        es_valido, mensaje = validar_email(datos['email'])
-        if not es_valido:
-            errores.append(mensaje)
-    
-    # Validar edad
-    if datos.get('edad'):
-        es_valido, mensaje = validar_edad(datos['edad'])
-        if not es_valido:
-            errores.append(mensaje)
-    
-    # Validar peso
-    if datos.get('peso'):
-        es_valido, mensaje = validar_peso(datos['peso'])
-        if not es_valido:
-            errores.append(mensaje)
-    
-    # Validar estatura
-    if datos.get('estatura'):
-        es_valido, mensaje = validar_estatura(datos['estatura'])
-        if not es_valido:
-            errores.append(mensaje)
-    
-    # Validar teléfono
-    if datos.get('telefono'):
-        es_valido, mensaje = validar_telefono(datos['telefono'])
-        if not es_valido:
-            errores.append(mensaje)
+    from utils.esquema_atleta import validar_atleta
     
-    return len(errores) == 0, errores
+    _, errores = validar_atleta(datos)
+    return len(errores) == 0, list(errores.values())
 
 
 def sanitizar_input(texto: str) -> str:
@@ -254,7 +214,7 @@ def sanitizar_input(texto: str) -> str:
         return texto
     
     # Eliminar scripts y tags HTML
-    texto = re.sub(r'<script[^>]*>.*?</script>', '', texto, flags=re.DOTALL | re.IGNORECASE)
-    texto = re.sub(r'<[^>]+>', '', texto)
+    texto = _PATRON_SCRIPT.sub('', texto)
+    texto = _PATRON_TAGS.sub('', texto)
     
     return texto.strip()
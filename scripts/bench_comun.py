@@ -0,0 +1,44 @@
+"""
+Utilidades comunes para los benchmarks de scripts/bench_*.py.
+
+cliente_local() crea un Supabase en proceso (utils/supabase_local.py) en un
+directorio temporal: las consultas recorren el mismo código que contra el
+proyecto real (filtros, orden, paginación, upserts, firmas de Storage) y
+cada llamada de red tarda LATENCIA, con una semilla fija para que las
+corridas sean comparables.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Añadir el directorio del proyecto al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+# Los módulos que importan config.supabase_client también usan el servicio local
+os.environ.setdefault('SUPABASE_LOCAL', '1')
+os.environ.setdefault('SUPABASE_LOCAL_DIR', tempfile.mkdtemp(prefix='bench-supabase-'))
+
+
+def cliente_local(latencia=0.04, datos=None, semilla=1):
+    """
+    Cliente de un SupabaseLocal nuevo con los datos cargados.
+    cliente.servicio.red.llamadas cuenta las llamadas hechas.
+    """
+    # Import diferido: los benchmarks fijan IRDEBG_DATA_DIR después de importar este módulo
+    from utils.supabase_local import SupabaseLocal
+    servicio = SupabaseLocal(tempfile.mkdtemp(prefix='bench-supabase-'), latencia=latencia, semilla=semilla)
+    servicio.cargar(datos or {})
+    return servicio.crear_cliente()
+
+
+def medir(fn, repeticiones=5):
+    """Ejecuta fn varias veces y retorna la mediana en milisegundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2]
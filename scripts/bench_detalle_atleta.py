@@ -0,0 +1,82 @@
+"""
+Benchmark: latencia de la vista de detalle de un atleta (ver_beca).
+
+Compara el flujo anterior (consultas en serie + una firma por documento)
+con el actual (consultas en paralelo + firma en lote con caché).
+
+Uso:
+    python scripts/bench_detalle_atleta.py [latencia_ms] [documentos]
+"""
+
+import os
+import sys
+import tempfile
+
+from bench_comun import cliente_local, medir
+
+os.environ.setdefault('SHARED_CACHE_PATH', os.path.join(tempfile.mkdtemp(), 'cache.sqlite3'))
+
+from utils import firmador_urls
+from utils.cache_compartido import obtener_cache
+from utils.concurrencia import ejecutar_en_paralelo
+
+
+def flujo_anterior(cliente, beca_id=1):
+    beca = cliente.table('becas').select('*').eq('id', beca_id).single().execute().data
+    medallas = cliente.table('medallas').select('*').eq('atleta_id', beca_id).execute().data
+    documentos = cliente.table('documentos').select('*').eq('atleta_id', beca_id).execute().data
+    for doc in documentos:
+        doc_path = doc['archivo'].split('/becas-public/')[1]
+        cliente.storage.from_('becas-public').create_signed_url(doc_path, 3600)
+    return beca, medallas
+
+
+def flujo_actual(cliente, beca_id=1):
+    datos = ejecutar_en_paralelo({
+        'beca': lambda: cliente.table('becas').select('*').eq('id', beca_id).single().execute().data,
+        'medallas': lambda: cliente.table('medallas').select('*').eq('atleta_id', beca_id).execute().data,
+        'documentos': lambda: cliente.table('documentos').select('*').eq('atleta_id', beca_id).execute().data,
+    }, defaults={'medallas': [], 'documentos': []})
+    firmador_urls.firmar_documentos([dict(d) for d in datos['documentos']])
+    return datos
+
+
+def main():
+    latencia = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.04
+    n_docs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    cliente = cliente_local(latencia)
+    bucket = cliente.storage.from_('becas-public')
+    documentos = []
+    for i in range(n_docs):
+        bucket.upload(f"documentos/doc{i}.pdf", b'%PDF-1.4', {'content-type': 'application/pdf'})
+        documentos.append({'atleta_id': 1, 'archivo': bucket.get_public_url(f"documentos/doc{i}.pdf")})
+    cliente.servicio.cargar({
+        'becas': [{'id': 1, 'nombre': 'Ana'}],
+        'medallas': [{'atleta_id': 1, 'tipo': 'oro'} for _ in range(5)],
+        'documentos': documentos,
+    })
+    firmador_urls.supabase_admin = cliente
+
+    print(f"Latencia por llamada: {latencia * 1000:.0f} ms, documentos: {n_docs}")
+
+    red = cliente.servicio.red
+    red.reiniciar_conteo()
+    t_antes = medir(lambda: flujo_anterior(cliente))
+    print(f"Antes  (serie + firma por doc):        {t_antes:8.1f} ms  ({red.llamadas // 5} llamadas)")
+
+    def en_frio():
+        obtener_cache().delete_prefix('firma:')
+        flujo_actual(cliente)
+
+    red.reiniciar_conteo()
+    t_frio = medir(en_frio)
+    print(f"Ahora  (paralelo + lote, caché fría):  {t_frio:8.1f} ms  ({red.llamadas // 5} llamadas)")
+
+    red.reiniciar_conteo()
+    t_caliente = medir(lambda: flujo_actual(cliente))
+    print(f"Ahora  (paralelo + lote, caché llena): {t_caliente:8.1f} ms  ({red.llamadas // 5} llamadas)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: exportar la tabla becas completa.
+
+Compara el camino actual de los analistas (recorrer /dashboard/becas página
+por página: una consulta de 10 filas con count, render del HTML y extracción
+de la tabla) con /dashboard/export/becas.csv (páginas de 1000 filas por
+keyset y CSV generado por trozos).
+
+Uso:
+    python scripts/bench_exportacion.py [filas] [latencia_ms]
+"""
+
+import sys
+from html.parser import HTMLParser
+
+from bench_comun import cliente_local, medir
+
+from jinja2 import Template
+
+from utils import repositorio_becas
+from utils.exportador_datos import COLUMNAS_POR_DEFECTO, columnas_select, generar_csv
+
+PAGINA_HTML = Template("""
+<table>{% for b in becas %}
+<tr><td><a href="/dashboard/becas/ver/{{ b.id }}">{{ b.nombre }} {{ b.apellido }}</a></td>
+<td>{{ b.cedula }}</td><td>{{ b.disciplina }}</td><td>{{ b.estatus }}</td></tr>{% endfor %}
+</table>""")
+
+
+class _ExtractorTabla(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.celdas = []
+
+    def handle_data(self, data):
+        if data.strip():
+            self.celdas.append(data.strip())
+
+
+def scraping_html(cliente, por_pagina=10):
+    page, total_pages, celdas = 1, 1, 0
+    while page <= total_pages:
+        start = (page - 1) * por_pagina
+        result = cliente.table('becas').select('*', count='exact').order('id', desc=True) \
+            .range(start, start + por_pagina - 1).execute()
+        total_pages = (result.count + por_pagina - 1) // por_pagina
+        extractor = _ExtractorTabla()
+        extractor.feed(PAGINA_HTML.render(becas=result.data))
+        celdas += len(extractor.celdas)
+        page += 1
+    return celdas
+
+
+def exportacion_csv(cliente):
+    repositorio_becas.supabase = cliente
+    becas = repositorio_becas.iterar_becas(columnas_select(COLUMNAS_POR_DEFECTO))
+    return sum(len(trozo) for trozo in generar_csv(becas, COLUMNAS_POR_DEFECTO))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    latencia = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+    filas = [{
+        'id': i, 'nombre': f'Atleta {i}', 'apellido': 'Pérez', 'cedula': f'V{i}', 'disciplina': 'Boxeo',
+        'estatus': 'Activo', 'peso': '60,5 kg', 'estatura': '170', 'fecha_nacimiento': '2005-03-04',
+        'created_at': '2024-01-01T10:00:00+00:00', 'es_menor': False, 'edad': 19,
+    } for i in range(n, 0, -1)]
+
+    for nombre, fn in (('scraping HTML (10/página)', scraping_html), ('export CSV (1000/página)', exportacion_csv)):
+        cliente = cliente_local(latencia, datos={'becas': filas})
+        ms = medir(lambda: fn(cliente), repeticiones=1)
+        print(f"{nombre:<28} {ms:>9.0f} ms  {cliente.servicio.red.llamadas:>5} consultas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: fichas Excel por segundo.
+
+Compara el flujo anterior (armar el libro completo con openpyxl en cada
+descarga) con la plantilla (copiar el .xlsx y reemplazar marcadores) y con
+la descarga repetida servida desde la caché compartida.
+
+Uso:
+    python scripts/bench_fichas.py [fichas]
+"""
+
+import os
+import sys
+import tempfile
+from io import BytesIO
+
+from bench_comun import medir
+
+os.environ.setdefault('SHARED_CACHE_PATH', os.path.join(tempfile.mkdtemp(), 'cache.sqlite3'))
+
+from utils.excel_generator import construir_libro_ficha, ficha_excel_bytes, obtener_plantilla, valores_ficha
+
+
+def crear_beca(i):
+    return {
+        'id': i, 'nombre': f'Atleta {i}', 'apellido': 'Pérez', 'cedula': f'V{20000000 + i}',
+        'disciplina': 'Boxeo', 'especialidad': '60 Kg', 'sexo': 'M', 'fecha_nacimiento': '2005-03-04',
+        'created_at': '2024-01-01T10:00:00', 'updated_at': '2024-02-01T10:00:00', 'peso': '60',
+        'estatura': '1.70', 'municipio': 'Roscio', 'direccion': 'Calle 1', 'telefono': '0414',
+        'email': 'a@b.com', 'usa_lentes': 'No', 'talla_zapato': '42',
+    }
+
+
+def flujo_anterior(beca):
+    buffer = BytesIO()
+    construir_libro_ficha(valores_ficha(beca)).save(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    becas = [crear_beca(i) for i in range(n)]
+    obtener_plantilla()  # Se construye una vez por proceso
+
+    casos = {
+        'anterior (armar libro)': lambda: [flujo_anterior(b) for b in becas],
+        'plantilla': lambda: [obtener_plantilla().rellenar(valores_ficha(b)) for b in becas],
+        'caché (repetidas)': lambda: [ficha_excel_bytes(b) for b in becas],
+    }
+    [ficha_excel_bytes(b) for b in becas]  # Calentar la caché
+
+    for nombre, fn in casos.items():
+        ms = medir(fn, repeticiones=3)
+        print(f"{nombre:<24} {n / (ms / 1000):>8.0f} fichas/s  ({ms / n:.2f} ms/ficha)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: procesamiento de imágenes de galería por tamaño de foto.
+
+Compara el flujo anterior (decodificación completa + convert + thumbnail)
+con procesar_imagen_galeria (draft + reduce + resize). Cada medición
+corre en un proceso nuevo, como en el pool de procesamiento.
+
+Uso:
+    python scripts/bench_galeria.py [megapixeles ...]
+"""
+
+import multiprocessing
+import sys
+from io import BytesIO
+
+from bench_comun import medir
+
+from PIL import Image
+
+from utils.procesador_imagenes import procesar_imagen_galeria
+
+
+def crear_jpeg(megapixeles: float) -> bytes:
+    ancho = int((megapixeles * 1_000_000 * 4 / 3) ** 0.5)
+    alto = int(ancho * 3 / 4)
+    img = Image.radial_gradient('L').resize((ancho, alto)).convert('RGB')
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def flujo_anterior(datos: bytes) -> bytes:
+    img = Image.open(BytesIO(datos))
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGB')
+    img.thumbnail((800, 1000))
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def _medir_en_proceso(args):
+    nombre, datos = args
+    fn = {'anterior': flujo_anterior, 'actual': procesar_imagen_galeria}[nombre]
+    fn(crear_jpeg(0.1))  # Cargar códecs antes de medir
+    return medir(lambda: fn(datos), repeticiones=3)
+
+
+def main():
+    tamanos = [float(a) for a in sys.argv[1:]] or [2, 12, 24, 48]
+    ctx = multiprocessing.get_context('spawn')
+
+    print(f"{'MP':>5} {'KB':>7} | {'anterior ms':>11} | {'actual ms':>9} | {'x':>5}")
+    for mp in tamanos:
+        datos = crear_jpeg(mp)
+        resultados = {}
+        for nombre in ('anterior', 'actual'):
+            with ctx.Pool(1) as pool:
+                resultados[nombre] = pool.apply(_medir_en_proceso, ((nombre, datos),))
+        ms_a, ms_n = resultados['anterior'], resultados['actual']
+        print(f"{mp:>5.0f} {len(datos) // 1024:>7} | {ms_a:>11.0f} | {ms_n:>9.0f} | {ms_a / ms_n:>5.1f}")
+
+
+if __name__ == '__main__':
+    main()
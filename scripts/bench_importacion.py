@@ -0,0 +1,87 @@
+"""
+Benchmark: filas por segundo de la importación masiva contra el Supabase local.
+
+Compara la carga al estilo de scripts/seed_becas.py (lotes de 10 en serie)
+con la importación (lectura por streaming, validación por lotes y upserts de
+500 filas en paralelo). Cada llamada a la base tarda LATENCIA.
+
+Uso:
+    python scripts/bench_importacion.py [filas] [latencia_ms]
+"""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+from bench_comun import cliente_local
+
+os.environ.setdefault('IRDEBG_DATA_DIR', tempfile.mkdtemp())
+
+from openpyxl import Workbook
+
+from utils.importador_becas import importar_planilla
+from utils.indice_cedulas import IndiceCedulas
+
+COLUMNAS = ['Cédula', 'Nombre', 'Apellido', 'Sexo', 'Fecha de Nacimiento', 'Disciplina', 'Peso', 'Estatura',
+            'Teléfono', 'Correo']
+
+
+def fila(i):
+    return [f'V-{20000000 + i}', f'Atleta {i}', 'Pérez', 'M', '04/03/2007', 'Boxeo', '60,5', '170',
+            '0414-1234567', f'atleta{i}@correo.com']
+
+
+def planilla_csv(n):
+    salida = io.StringIO()
+    writer = csv.writer(salida)
+    writer.writerow(COLUMNAS)
+    writer.writerows(fila(i) for i in range(n))
+    return salida.getvalue().encode('utf-8')
+
+
+def planilla_xlsx(n):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(COLUMNAS)
+    for i in range(n):
+        ws.append(fila(i))
+    salida = io.BytesIO()
+    wb.save(salida)
+    return salida.getvalue()
+
+
+def estilo_seed(filas, cliente):
+    """Lotes de 10 insertados uno tras otro."""
+    for i in range(0, len(filas), 10):
+        cliente.table('becas').insert(filas[i:i + 10]).execute()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    latencia = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+
+    # El estilo seed se mide sobre una muestra: a 10 filas por llamada tardaría demasiado
+    muestra = min(n, 1000)
+    cliente = cliente_local(latencia)
+    inicio = time.perf_counter()
+    estilo_seed([dict(zip(COLUMNAS, fila(i))) for i in range(muestra)], cliente)
+    segundos = time.perf_counter() - inicio
+    print(f"{'seed (10 en serie)':<28} {muestra / segundos:>8.0f} filas/s  {cliente.servicio.red.llamadas} llamadas")
+
+    for nombre, datos, extension in (('importación CSV', planilla_csv(n), '.csv'),
+                                     ('importación XLSX', planilla_xlsx(n), '.xlsx')):
+        cliente = cliente_local(latencia)
+        inicio = time.perf_counter()
+        resultado = importar_planilla(io.BytesIO(datos), 'planilla' + extension, cliente, reanudar=False,
+                                      tamano_lote=500, paralelo=4, indice=IndiceCedulas())
+        segundos = time.perf_counter() - inicio
+        assert resultado.importadas == n, resultado.errores[:3]
+        assert len(cliente.servicio.filas('becas')) == n
+        print(f"{nombre + ' (500 x 4)':<28} {n / segundos:>8.0f} filas/s  {cliente.servicio.red.llamadas} llamadas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: consulta de contraseñas comunes contra un filtro de millones de entradas.
+
+Compila un filtro con contraseñas sintéticas y mide la consulta (mmap) y
+la memoria residente del proceso antes y después de abrirlo, frente a un
+set de Python con las mismas entradas.
+
+Uso:
+    python scripts/bench_passwords.py [entradas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from bench_comun import medir
+
+from utils.passwords_comunes import FiltroPasswords, construir_filtro
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for linea in f:
+            if linea.startswith('VmRSS:'):
+                return int(linea.split()[1]) / 1024
+    return 0.0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    consultas = [f'Clave{i * 7919}x' for i in range(100_000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, 'passwords.bloom')
+        inicio = time.perf_counter()
+        construir_filtro((f'clave{i}x' for i in range(n)), ruta, n)
+        print(f"Compilar {n} entradas: {time.perf_counter() - inicio:.1f} s, "
+              f"{os.path.getsize(ruta) / 1024 / 1024:.1f} MB en disco")
+
+        antes = rss_mb()
+        filtro = FiltroPasswords(ruta)
+        ms = medir(lambda: [c in filtro for c in consultas], repeticiones=3)
+        print(f"Filtro mmap: {ms * 1000 / len(consultas):.2f} µs/consulta, "
+              f"+{rss_mb() - antes:.1f} MB RSS")
+        positivos = sum(c in filtro for c in consultas[:20000] if int(c[5:-1]) >= n)
+        print(f"Falsos positivos: {positivos} de {sum(1 for c in consultas[:20000] if int(c[5:-1]) >= n)}")
+
+    antes = rss_mb()
+    conjunto = {f'clave{i}x' for i in range(n)}
+    ms = medir(lambda: [c.lower() in conjunto for c in consultas], repeticiones=3)
+    print(f"set() en memoria: {ms * 1000 / len(consultas):.2f} µs/consulta, +{rss_mb() - antes:.1f} MB RSS")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Compila listas de contraseñas comunes/filtradas (una por línea, .txt o .gz)
+al filtro de Bloom que usa utils/passwords_comunes.py.
+
+Las listas (ej. las de SecLists, millones de entradas) se descargan aparte;
+el servidor solo necesita el archivo compilado (~1.8 MB por millón de
+entradas con 0.1% de falsos positivos). Sin --destino se escribe en
+DATA_DIR/passwords_comunes.bloom.
+
+Las listas también pueden ser URLs http(s): se descargan a un temporal antes
+de compilar (así lo hace el buildCommand de render.yaml).
+
+Uso:
+    python scripts/construir_filtro_passwords.py rockyou.txt.gz 10-million-top.txt
+    python scripts/construir_filtro_passwords.py lista.txt --error 0.0001 --destino /srv/irdebg/passwords.bloom
+    python scripts/construir_filtro_passwords.py https://ejemplo.org/top-1000000.txt
+"""
+
+import os
+import sys
+import gzip
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+import urllib.request
+
+# Añadir el directorio del proyecto al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils.passwords_comunes import ERROR_FILTRO, construir_filtro, ruta_filtro
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def abrir(ruta):
+    # Las listas filtradas mezclan codificaciones: se ignoran los bytes inválidos
+    if ruta.endswith('.gz'):
+        return gzip.open(ruta, 'rt', encoding='utf-8', errors='ignore')
+    return open(ruta, encoding='utf-8', errors='ignore')
+
+
+def descargar(url, directorio):
+    """Descarga una lista a directorio y retorna la ruta local."""
+    nombre = os.path.basename(url.split('?', 1)[0]) or 'lista.txt'
+    ruta = os.path.join(directorio, nombre)
+    logger.info(f"Descargando {url}")
+    with urllib.request.urlopen(url, timeout=60) as respuesta, open(ruta, 'wb') as f:
+        shutil.copyfileobj(respuesta, f)
+    return ruta
+
+
+def leer(rutas):
+    for ruta in rutas:
+        with abrir(ruta) as f:
+            for linea in f:
+                yield linea.rstrip('\r\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compila el filtro de contraseñas comunes")
+    parser.add_argument('listas', nargs='+', help="Archivos o URLs con una contraseña por línea (.txt o .gz)")
+    parser.add_argument('--destino', default=None, help="Archivo de salida (por defecto el que usa el servidor)")
+    parser.add_argument('--error', type=float, default=ERROR_FILTRO, help="Tasa de falsos positivos")
+    parser.add_argument('--capacidad', type=int, default=None,
+                        help="Entradas esperadas (si no se indica se cuentan las líneas)")
+    args = parser.parse_args()
+
+    destino = args.destino or ruta_filtro()
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as descargas:
+        listas = [descargar(l, descargas) if l.startswith(('http://', 'https://')) else l for l in args.listas]
+
+        capacidad = args.capacidad
+        if capacidad is None:
+            capacidad = sum(1 for _ in leer(listas))
+            logger.info(f"{capacidad} líneas en {len(listas)} lista(s)")
+
+        inicio = time.perf_counter()
+        entradas = construir_filtro(leer(listas), destino, capacidad, args.error)
+    logger.info(f"✅ {entradas} contraseñas en {destino} ({os.path.getsize(destino) / 1024 / 1024:.1f} MB, "
+                f"{time.perf_counter() - inicio:.1f} s)")
+    logger.info("Reiniciar los workers para que abran el filtro nuevo.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Elimina de Supabase Storage los objetos que ninguna fila referencia.
+
+Uso:
+    python scripts/gc_storage.py --dry-run
+    python scripts/gc_storage.py --lote 100 --lotes-por-segundo 2 --gracia-horas 24
+"""
+
+import os
+import sys
+import argparse
+import logging
+from datetime import timedelta
+
+# Añadir el directorio del proyecto al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from config.supabase_client import supabase_admin
+from utils.recolector_storage import recolectar
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recolector de objetos huérfanos en Storage")
+    parser.add_argument('--bucket', default='becas-public')
+    parser.add_argument('--prefijos', default='imagenes,documentos,gallery',
+                        help="Carpetas a revisar, separadas por coma")
+    parser.add_argument('--dry-run', action='store_true', help="Solo reportar, no borrar")
+    parser.add_argument('--lote', type=int, default=100, help="Objetos por llamada de borrado")
+    parser.add_argument('--lotes-por-segundo', type=float, default=2.0, help="Límite de velocidad")
+    parser.add_argument('--gracia-horas', type=float, default=24,
+                        help="No borrar objetos más nuevos que esto")
+    args = parser.parse_args()
+
+    # El cliente admin es obligatorio: con RLS el cliente anónimo no ve todas
+    # las filas y el recolector borraría archivos que sí están en uso.
+    if not supabase_admin:
+        logger.error("Se requiere SUPABASE_SERVICE_KEY para ejecutar el recolector.")
+        sys.exit(1)
+
+    resultado = recolectar(
+        supabase_admin,
+        bucket=args.bucket,
+        prefijos=[p for p in args.prefijos.split(',') if p],
+        dry_run=args.dry_run,
+        tamano_lote=args.lote,
+        lotes_por_segundo=args.lotes_por_segundo,
+        gracia=timedelta(hours=args.gracia_horas),
+    )
+
+    if args.dry_run:
+        for ruta in resultado.rutas_huerfanas:
+            logger.info(f"Huérfano: {args.bucket}/{ruta}")
+    sys.exit(1 if resultado.errores else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Importa atletas desde una planilla CSV/XLSX (upsert por cédula).
+
+Si se corta, volver a ejecutar con el mismo archivo retoma desde la última
+fila confirmada (--reiniciar para empezar de cero).
+
+Uso:
+    python scripts/importar_becas.py cohorte_2025.xlsx --dry-run
+    python scripts/importar_becas.py cohorte_2025.xlsx --lote 500 --paralelo 4
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+# Añadir el directorio del proyecto al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from config.supabase_client import supabase_admin
+from utils.importador_becas import ArchivoInvalido, importar_planilla
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación masiva de atletas")
+    parser.add_argument('archivo', help="Planilla .csv o .xlsx")
+    parser.add_argument('--dry-run', action='store_true', help="Solo validar, no guardar")
+    parser.add_argument('--lote', type=int, default=500, help="Filas por upsert")
+    parser.add_argument('--paralelo', type=int, default=4, help="Upserts en vuelo a la vez")
+    parser.add_argument('--solo-nuevas', action='store_true', help="Rechazar cédulas ya registradas")
+    parser.add_argument('--reiniciar', action='store_true', help="Ignorar el checkpoint y empezar de cero")
+    args = parser.parse_args()
+
+    if not supabase_admin and not args.dry_run:
+        logger.error("Se requiere SUPABASE_SERVICE_KEY para importar.")
+        sys.exit(1)
+
+    def progreso(r):
+        logger.info(f"{r.leidas} filas leídas, {r.importadas} importadas, {r.con_error} con error")
+
+    try:
+        with open(args.archivo, 'rb') as archivo:
+            resultado = importar_planilla(
+                archivo, args.archivo, supabase_admin, dry_run=args.dry_run, reanudar=not args.reiniciar,
+                tamano_lote=args.lote, paralelo=args.paralelo, progreso=progreso, solo_nuevas=args.solo_nuevas,
+            )
+    except ArchivoInvalido as e:
+        logger.error(str(e))
+        sys.exit(2)
+
+    if resultado.reanudado_desde:
+        logger.info(f"Retomado desde la fila {resultado.reanudado_desde + 1}")
+    logger.info(f"{resultado.existentes} filas con cédula ya registrada")
+    if resultado.columnas_ignoradas:
+        logger.warning(f"Columnas ignoradas: {', '.join(resultado.columnas_ignoradas)}")
+    for error in resultado.errores:
+        logger.warning(f"Fila {error['fila']} {error['campo']}: {error['mensaje']}")
+    sys.exit(1 if resultado.con_error or resultado.lotes_fallidos else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ from datetime import datetime
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'project'))
 
 from config.supabase_client import supabase
+from utils.galeria import invalidar_galeria
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -87,6 +88,9 @@ def migrate_images():
     except Exception as e:
         logger.error(f"Error querying gallery_images: {e}")
 
+    # Que los workers de la app lean las URLs nuevas de la galería
+    invalidar_galeria()
+
     logger.info("Migración finalizada.")
 
 if __name__ == "__main__":
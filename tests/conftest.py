@@ -0,0 +1,41 @@
+"""
+Plugin de pytest: detector de consultas N+1 (utils/detector_n1.py).
+
+Activa el detector en cada test; si una request (o un bloque vigilar())
+excede su presupuesto de llamadas a Supabase o repite la misma consulta,
+el test falla con el detalle de las llamadas.
+
+Marcas:
+    @pytest.mark.presupuesto_llamadas(n)   otro presupuesto para el test
+    @pytest.mark.permitir_n1               no fallar (el test revisa las infracciones él mismo)
+"""
+
+import sys
+import os
+import pytest
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import detector_n1
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "presupuesto_llamadas(n): presupuesto de llamadas a Supabase por request")
+    config.addinivalue_line('markers', "permitir_n1: no fallar por infracciones del detector N+1")
+
+
+@pytest.fixture(autouse=True)
+def infracciones_n1(request, monkeypatch):
+    """Infracciones del detector N+1 durante el test"""
+    infracciones = []
+    monkeypatch.setattr(detector_n1, 'ACTIVO', True)
+    monkeypatch.setattr(detector_n1, '_oyentes', [infracciones.append])
+    marca = request.node.get_closest_marker('presupuesto_llamadas')
+    if marca:
+        monkeypatch.setattr(detector_n1, 'PRESUPUESTO', marca.args[0])
+
+    yield infracciones
+
+    if infracciones and not request.node.get_closest_marker('permitir_n1'):
+        pytest.fail("Posibles consultas N+1:\n" + '\n'.join(map(str, infracciones)), pytrace=False)
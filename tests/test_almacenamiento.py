@@ -0,0 +1,217 @@
+"""
+Tests para el almacenamiento direccionado por contenido (utils/almacenamiento_cas.py).
+
+Ejecutar:
+    python -m pytest tests/test_almacenamiento.py -v
+"""
+
+import sys
+import os
+import hashlib
+import pytest
+from io import BytesIO
+from unittest.mock import Mock, patch
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from werkzeug.datastructures import FileStorage
+from storage3.exceptions import StorageApiError
+from utils import almacenamiento_cas
+from utils.almacenamiento_cas import (
+    IndiceHashLocal, hash_archivo, ruta_por_contenido, extraer_bucket_y_ruta,
+    subir_por_contenido, liberar_referencia
+)
+
+
+@pytest.fixture
+def indice(tmp_path, monkeypatch):
+    """Índice local aislado en un directorio temporal"""
+    indice = IndiceHashLocal(str(tmp_path / 'indice.sqlite3'))
+    monkeypatch.setattr(almacenamiento_cas, '_indice_local', indice)
+    return indice
+
+
+def crear_archivo(contenido=b"foto del atleta", nombre="foto.JPG"):
+    return FileStorage(stream=BytesIO(contenido), filename=nombre, content_type="image/jpeg")
+
+
+def mock_rpc(mock_supabase, valor):
+    mock_supabase.rpc.return_value.execute.return_value = Mock(data=valor)
+    mock_supabase.storage.from_.return_value.upload.return_value = None  # Upload exitoso
+
+
+# ============================================
+# HASH Y RUTAS
+# ============================================
+
+def test_hash_archivo_por_bloques():
+    """El hash por bloques coincide con el SHA-256 del contenido completo"""
+    contenido = os.urandom(200 * 1024)
+    sha, size = hash_archivo(crear_archivo(contenido))
+    assert sha == hashlib.sha256(contenido).hexdigest()
+    assert size == len(contenido)
+
+
+def test_hash_archivo_deja_stream_al_inicio():
+    archivo = crear_archivo(b"abc")
+    hash_archivo(archivo)
+    assert archivo.stream.read() == b"abc"
+
+
+def test_hash_archivo_con_read_que_ignora_el_tamano():
+    """Un stream cuyo read() devuelve todo sin importar el tamaño no cuelga el hash"""
+    contenido = os.urandom(200 * 1024)
+
+    class LeeTodo:
+        def __init__(self):
+            self.posicion = 0
+
+        def read(self, size=-1):
+            datos = contenido[self.posicion:]
+            self.posicion = len(contenido)
+            return datos
+
+        def seek(self, posicion):
+            self.posicion = posicion
+
+    assert hash_archivo(LeeTodo()) == (hashlib.sha256(contenido).hexdigest(), len(contenido))
+
+
+def test_ruta_por_contenido_normaliza_extension():
+    assert ruta_por_contenido('imagenes', 'ab12', 'Foto.JPG') == 'imagenes/ab12.jpg'
+    assert ruta_por_contenido('documentos', 'ab12', 'sin_extension') == 'documentos/ab12.bin'
+    assert ruta_por_contenido('documentos', 'ab12', 'x.p/hp') == 'documentos/ab12.bin'
+
+
+def test_extraer_bucket_y_ruta():
+    url = "https://xyz.supabase.co/storage/v1/object/public/becas-public/imagenes/abc.jpg?t=1"
+    assert extraer_bucket_y_ruta(url) == ('becas-public', 'imagenes/abc.jpg')
+    assert extraer_bucket_y_ruta("data:image/jpeg;base64,xxx") is None
+    assert extraer_bucket_y_ruta(None) is None
+
+
+# ============================================
+# SUBIDA DEDUPLICADA
+# ============================================
+
+@patch('utils.almacenamiento_cas.supabase')
+def test_primera_subida_sube_el_objeto(mock_supabase, indice):
+    """Un archivo nuevo se sube con nombre = hash del contenido"""
+    mock_rpc(mock_supabase, 1)
+    storage = mock_supabase.storage.from_.return_value
+    storage.get_public_url.side_effect = lambda path: f"https://x/object/public/becas-public/{path}"
+
+    url = subir_por_contenido(crear_archivo(), 'becas-public', 'imagenes')
+
+    sha = hashlib.sha256(b"foto del atleta").hexdigest()
+    assert url.endswith(f"imagenes/{sha}.jpg")
+    assert storage.upload.call_args.kwargs['path'] == f"imagenes/{sha}.jpg"
+    assert indice.contiene('becas-public', f"imagenes/{sha}.jpg")
+
+
+@patch('utils.almacenamiento_cas.supabase')
+def test_subida_repetida_es_solo_metadatos(mock_supabase, indice):
+    """Si el índice local conoce el objeto y ya tiene referencias, no se sube otra vez"""
+    storage = mock_supabase.storage.from_.return_value
+    mock_rpc(mock_supabase, 1)
+    subir_por_contenido(crear_archivo(), 'becas-public', 'imagenes')
+
+    mock_rpc(mock_supabase, 2)
+    storage.upload.reset_mock()
+    subir_por_contenido(crear_archivo(), 'becas-public', 'imagenes')
+
+    assert not storage.upload.called
+
+
+@patch('utils.almacenamiento_cas.supabase')
+def test_objeto_duplicado_en_storage_no_es_error(mock_supabase, indice):
+    """Un 409 de Storage significa que el objeto ya existe"""
+    mock_rpc(mock_supabase, 1)
+    storage = mock_supabase.storage.from_.return_value
+    storage.upload.side_effect = Exception("{'statusCode': 409, 'error': 'Duplicate'}")
+    storage.get_public_url.return_value = "https://x/url"
+
+    assert subir_por_contenido(crear_archivo(), 'becas-public', 'imagenes') == "https://x/url"
+
+
+@patch('utils.almacenamiento_cas.supabase')
+def test_error_de_storage_con_409_en_el_texto_no_es_duplicado(mock_supabase, indice):
+    """Solo el código de estado decide si es duplicado, no el texto del mensaje"""
+    mock_rpc(mock_supabase, 1)
+    storage = mock_supabase.storage.from_.return_value
+    storage.upload.side_effect = StorageApiError("Payload too large: 4090 KB", 'EntityTooLarge', 413)
+
+    assert subir_por_contenido(crear_archivo(), 'becas-public', 'imagenes') is None
+
+
+@patch('utils.almacenamiento_cas.supabase')
+def test_duplicado_por_codigo_de_estado(mock_supabase, indice):
+    mock_rpc(mock_supabase, 1)
+    storage = mock_supabase.storage.from_.return_value
+    storage.upload.side_effect = StorageApiError("The resource already exists", 'Duplicate', 409)
+    storage.get_public_url.return_value = "https://x/url"
+
+    assert subir_por_contenido(crear_archivo(), 'becas-public', 'imagenes') == "https://x/url"
+
+
+@pytest.mark.parametrize('fallo', ['upload', 'error_en_respuesta', 'url'])
+@patch('utils.almacenamiento_cas.supabase')
+def test_subida_fallida_libera_la_referencia(mock_supabase, indice, fallo):
+    """La referencia registrada antes de subir se suelta en cualquier fallo"""
+    mock_rpc(mock_supabase, 1)
+    storage = mock_supabase.storage.from_.return_value
+    if fallo == 'upload':
+        storage.upload.side_effect = StorageApiError("Internal error", 'InternalError', 500)
+    elif fallo == 'error_en_respuesta':
+        storage.upload.return_value = Mock(error={'statusCode': 400, 'message': 'Invalid key'})
+    else:
+        storage.get_public_url.side_effect = RuntimeError("sin red")
+
+    assert subir_por_contenido(crear_archivo(), 'becas-public', 'imagenes') is None
+
+    funciones = [c.args[0] for c in mock_supabase.rpc.call_args_list]
+    assert funciones == ['storage_ref_incrementar', 'storage_ref_decrementar']
+
+
+@patch('utils.almacenamiento_cas.supabase')
+def test_fallo_al_registrar_no_libera(mock_supabase, indice):
+    """Si la referencia no llegó a registrarse no hay nada que soltar"""
+    mock_supabase.rpc.return_value.execute.side_effect = RuntimeError("sin red")
+    mock_supabase.storage.from_.return_value.upload.side_effect = RuntimeError("sin red")
+
+    assert subir_por_contenido(crear_archivo(), 'becas-public', 'imagenes') is None
+    assert mock_supabase.rpc.call_count == 1
+
+
+def test_subir_sin_archivo():
+    assert subir_por_contenido(None, 'becas-public', 'imagenes') is None
+
+
+# ============================================
+# LIBERAR REFERENCIAS
+# ============================================
+
+URL = "https://x/storage/v1/object/public/becas-public/imagenes/abc.jpg"
+
+
+@patch('utils.almacenamiento_cas.supabase')
+def test_liberar_borra_al_llegar_a_cero(mock_supabase, indice):
+    mock_rpc(mock_supabase, 0)
+    assert liberar_referencia(URL) is True
+    mock_supabase.storage.from_.return_value.remove.assert_called_once_with(['imagenes/abc.jpg'])
+
+
+@patch('utils.almacenamiento_cas.supabase')
+def test_liberar_no_borra_si_quedan_referencias(mock_supabase, indice):
+    mock_rpc(mock_supabase, 1)
+    assert liberar_referencia(URL) is False
+    assert not mock_supabase.storage.from_.return_value.remove.called
+
+
+@patch('utils.almacenamiento_cas.supabase')
+def test_liberar_no_borra_objetos_sin_registro(mock_supabase, indice):
+    """Objetos anteriores al CAS (sin fila en storage_refs) nunca se borran"""
+    mock_rpc(mock_supabase, None)
+    assert liberar_referencia(URL) is False
+    assert not mock_supabase.storage.from_.return_value.remove.called
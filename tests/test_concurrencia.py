@@ -0,0 +1,63 @@
+"""
+Tests para la ejecución concurrente de consultas (utils/concurrencia.py).
+
+Ejecutar:
+    python -m pytest tests/test_concurrencia.py -v
+"""
+
+import sys
+import os
+import time
+import pytest
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils.concurrencia import ejecutar_en_paralelo
+
+
+def lenta(valor, segundos=0.1):
+    def fn():
+        time.sleep(segundos)
+        return valor
+    return fn
+
+
+def falla():
+    raise RuntimeError("tabla no existe")
+
+
+def test_tareas_corren_en_paralelo():
+    """3 tareas de 100ms deben tardar ~100ms, no 300ms"""
+    inicio = time.monotonic()
+    resultado = ejecutar_en_paralelo({'a': lenta(1), 'b': lenta(2), 'c': lenta(3)})
+    duracion = time.monotonic() - inicio
+
+    assert resultado == {'a': 1, 'b': 2, 'c': 3}
+    assert duracion < 0.25
+
+
+def test_tarea_con_default_no_rompe_la_vista():
+    resultado = ejecutar_en_paralelo({'beca': lenta({'id': 1}, 0), 'medallas': falla}, defaults={'medallas': []})
+    assert resultado == {'beca': {'id': 1}, 'medallas': []}
+
+
+def test_tarea_sin_default_propaga_error():
+    with pytest.raises(RuntimeError):
+        ejecutar_en_paralelo({'beca': falla, 'medallas': lenta([], 0)}, defaults={'medallas': []})
+
+
+def test_timeout_por_tarea():
+    """Una tarea lenta con default no retrasa la respuesta más allá de su timeout"""
+    inicio = time.monotonic()
+    resultado = ejecutar_en_paralelo(
+        {'rapida': lenta(1, 0), 'lenta': lenta(2, 1.0)},
+        timeouts={'lenta': 0.1}, defaults={'lenta': None}
+    )
+    assert resultado == {'rapida': 1, 'lenta': None}
+    assert time.monotonic() - inicio < 0.5
+
+
+def test_timeout_sin_default_lanza_timeout():
+    with pytest.raises(TimeoutError):
+        ejecutar_en_paralelo({'a': lenta(1, 1.0), 'b': lenta(2, 0)}, timeout=0.1)
@@ -0,0 +1,125 @@
+"""
+Tests para el detector de consultas N+1 (utils/detector_n1.py).
+
+Ejecutar:
+    python -m pytest tests/test_detector_n1.py -v
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import detector_n1, tiempos_peticion
+from utils.detector_n1 import analizar, presupuesto_llamadas, vigilar
+from utils.tiempos_peticion import TiemposPeticion, envolver_cliente
+
+
+class ConsultaFalsa:
+    def __getattr__(self, nombre):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=[])
+
+
+class ClienteFalso:
+    auth = SimpleNamespace()
+    storage = SimpleNamespace()
+
+    def table(self, nombre):
+        return ConsultaFalsa()
+
+
+@pytest.fixture
+def cliente():
+    return envolver_cliente(ClienteFalso())
+
+
+@pytest.fixture
+def app(cliente):
+    app = Flask(__name__)
+    tiempos_peticion.registrar_en_app(app)
+    detector_n1.registrar_en_app(app)
+
+    @app.route('/medallas')
+    def medallas():
+        # Una consulta por atleta: el patrón que el detector debe ver
+        for atleta_id in range(6):
+            cliente.table('medallas').select('*').eq('beca_id', atleta_id).execute()
+        return 'ok'
+
+    @app.route('/agrupada')
+    def agrupada():
+        cliente.table('becas').select('id').execute()
+        cliente.table('medallas').select('*').in_('beca_id', list(range(6))).execute()
+        return 'ok'
+
+    @app.route('/reporte')
+    @presupuesto_llamadas(50)
+    def reporte():
+        for tabla in ('becas', 'medallas', 'documentos', 'profiles'):
+            cliente.table(tabla).select('*').execute()
+        return 'ok'
+
+    return app
+
+
+def test_analizar_detecta_formas_repetidas():
+    tiempos = TiemposPeticion()
+    for _ in range(5):
+        tiempos.registrar('postgrest', 0.01, 'medallas.select.eq')
+    tiempos.registrar('jinja', 0.2, 'ver_beca.html')
+
+    infraccion = analizar(tiempos, 'ver_beca', presupuesto=20, repeticiones=5)
+
+    assert infraccion.llamadas == 5
+    assert infraccion.repetidas == [('postgrest', 'medallas.select.eq', 5)]
+    assert analizar(tiempos, 'ver_beca', presupuesto=20, repeticiones=6) is None
+
+
+def test_analizar_detecta_exceso_de_presupuesto():
+    tiempos = TiemposPeticion()
+    for tabla in ('a', 'b', 'c'):
+        tiempos.registrar('postgrest', 0.01, f'{tabla}.select')
+
+    infraccion = analizar(tiempos, 'lista', presupuesto=2)
+
+    assert infraccion.llamadas == 3
+    assert not infraccion.repetidas
+
+
+@pytest.mark.permitir_n1
+def test_ruta_con_una_consulta_por_elemento(app, infracciones_n1):
+    app.test_client().get('/medallas')
+
+    assert len(infracciones_n1) == 1
+    assert infracciones_n1[0].origen == 'medallas'
+    assert infracciones_n1[0].repetidas[0][1:] == ('medallas.select.eq', 6)
+
+
+def test_ruta_agrupada_no_es_infraccion(app, infracciones_n1):
+    app.test_client().get('/agrupada')
+
+    assert infracciones_n1 == []
+
+
+@pytest.mark.presupuesto_llamadas(3)
+def test_presupuesto_de_la_vista_gana_al_global(app, infracciones_n1):
+    app.test_client().get('/reporte')
+
+    assert infracciones_n1 == []
+
+
+@pytest.mark.permitir_n1
+def test_vigilar_en_scripts(cliente, infracciones_n1):
+    with vigilar('migrate_images'):
+        for _ in range(5):
+            cliente.table('becas').update({'foto': 'x'}).eq('id', 1).execute()
+
+    assert infracciones_n1[0].origen == 'migrate_images'
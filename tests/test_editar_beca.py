@@ -0,0 +1,135 @@
+"""
+Tests para la edición de atletas (blueprints/dashboard.py: editar_beca) sobre
+el Supabase local en proceso.
+
+Ejecutar:
+    python -m pytest tests/test_editar_beca.py -v
+"""
+
+import sys
+import os
+import pytest
+from html.parser import HTMLParser
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from flask import Flask
+from blueprints import dashboard
+from blueprints.auth import auth_blueprint
+from blueprints.dashboard import dashboard_blueprint
+from blueprints.media import media_blueprint
+from utils import cache_compartido, decorators, indice_cedulas, repositorio_becas
+from utils.cache_compartido import CacheCompartido
+from utils.indice_cedulas import cedula_registrada
+from utils.supabase_local import SupabaseLocal
+
+PLANTILLAS = os.path.join(os.path.dirname(__file__), '..', 'project', 'templates')
+
+# Creado solo con los campos requeridos: los opcionales quedaron en NULL
+OPCIONALES = ('sexo', 'peso', 'estatura', 'sangre', 'telefono', 'email', 'municipio', 'tipo_beca',
+              'disciplina', 'representante_cedula', 'representante_telefono', 'fecha_nacimiento')
+ATLETA = {'nombre': 'Ana', 'apellido': 'Pérez', 'cedula': 'V-12345678', 'estatus': 'Activo',
+          **dict.fromkeys(OPCIONALES)}
+
+
+@pytest.fixture
+def servicio(tmp_path, monkeypatch):
+    """Supabase local con un atleta; caché e índice de cédulas aislados"""
+    servicio = SupabaseLocal(str(tmp_path / 'supabase'))
+    servicio.cargar({'becas': [dict(ATLETA)]})
+    cliente = servicio.crear_cliente()
+    for modulo in (dashboard, decorators, indice_cedulas, repositorio_becas):
+        monkeypatch.setattr(modulo, 'supabase', cliente)
+    monkeypatch.setattr(cache_compartido, '_cache', CacheCompartido(str(tmp_path / 'cache.sqlite3')))
+    monkeypatch.setattr(indice_cedulas, '_indice', None)
+    monkeypatch.setattr(indice_cedulas, '_generacion', None)
+    monkeypatch.setattr(indice_cedulas, '_aplicadas', set())
+    servicio.cliente = cliente
+    return servicio
+
+
+@pytest.fixture
+def client(servicio):
+    """Cliente con sesión de administrador"""
+    app = Flask(__name__, template_folder=PLANTILLAS)
+    app.config['SECRET_KEY'] = 'test_secret_key'
+    app.config['TESTING'] = True
+    app.register_blueprint(dashboard_blueprint, url_prefix='/dashboard')
+    app.register_blueprint(auth_blueprint, url_prefix='/')
+    app.register_blueprint(media_blueprint, url_prefix='/media')
+
+    cliente = servicio.cliente
+    usuario = cliente.auth.sign_up({'email': 'admin@correo.com', 'password': 'Clave-123456!'}).user
+    sesion = cliente.auth.sign_in_with_password({'email': 'admin@correo.com', 'password': 'Clave-123456!'}).session
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s.update(user_id=usuario.id, role='admin', email='admin@correo.com',
+                 access_token=sesion.access_token, refresh_token=sesion.refresh_token)
+    return client
+
+
+class LectorFormulario(HTMLParser):
+    """Campos de texto y la opción seleccionada (la primera) de cada select, como los enviaría el navegador"""
+
+    def __init__(self):
+        super().__init__()
+        self.campos = {}
+        self._select = None
+        self._opcion = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'input' and attrs.get('name') and attrs.get('type') not in ('file', 'checkbox', 'hidden'):
+            self.campos.setdefault(attrs['name'], attrs.get('value') or '')
+        elif tag == 'select':
+            self._select = attrs.get('name')
+        elif tag == 'option' and self._select and self._select not in self.campos:
+            self._opcion = attrs.get('value')
+            self.campos[self._select] = self._opcion if self._opcion is not None else ''
+
+    def handle_data(self, data):
+        if self._select and self._opcion is None and self._select in self.campos and not self.campos[self._select]:
+            self.campos[self._select] = data.strip()
+
+    def handle_endtag(self, tag):
+        if tag == 'option' and self._select:
+            self._select = None
+        elif tag == 'select':
+            self._select = None
+
+
+def formulario(html):
+    lector = LectorFormulario()
+    lector.feed(html)
+    return lector.campos
+
+
+def test_campos_nulos_no_se_muestran_como_none(client, servicio):
+    """Un atleta creado con opcionales vacíos se puede volver a guardar sin tocarlos"""
+    res = client.get('/dashboard/becas/editar/1')
+    assert res.status_code == 200
+    html = res.get_data(as_text=True)
+    assert 'value="None"' not in html
+    assert '<option>None</option>' not in html
+
+    datos = formulario(html)
+    # El script de la plantilla copia el select de disciplina al campo oculto
+    datos['disciplina'] = datos.pop('disciplina_select')
+    res = client.post('/dashboard/becas/editar/1', data=datos)
+
+    assert res.status_code == 302 and res.headers['Location'].endswith('/dashboard/becas/editar/1')
+    fila = servicio.filas('becas')[0]
+    assert fila['nombre'] == 'Ana'
+    assert 'None' not in [fila.get(campo) for campo in OPCIONALES]
+
+
+def test_cambio_de_cedula_saca_la_anterior_del_indice(client):
+    assert cedula_registrada('V-12345678')
+
+    res = client.post('/dashboard/becas/editar/1', data={'nombre': 'Ana', 'apellido': 'Pérez',
+                                                          'cedula': 'V-87654321', 'estatus': 'Activo'})
+
+    assert res.status_code == 302
+    assert not cedula_registrada('V-12345678')
+    assert cedula_registrada('V-87654321')
@@ -0,0 +1,100 @@
+"""
+Tests para el esquema declarativo del atleta (utils/esquema_atleta.py).
+
+Ejecutar:
+    python -m pytest tests/test_esquema_atleta.py -v
+"""
+
+import sys
+import os
+import pytest
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils.esquema_atleta import (
+    ESQUEMA_ATLETA, ErrorCampo, cedula, estatura, mensajes_por_campo, peso, validar_atleta, validar_lote
+)
+from utils.validaciones import validar_datos_atleta
+
+FILA = {
+    'nombre': ' Ana ', 'apellido': 'Pérez', 'cedula': 'v 12.345.678', 'edad': '17', 'sexo': 'f',
+    'telefono': '+58 414 123 4567', 'email': 'Ana@Correo.com', 'peso': '60,5 kg', 'estatura': '170 cm',
+    'fecha_nacimiento': '04/03/2007', 'usa_lentes': 'sí', 'es_menor': 'on', 'representante_nombre': 'Luis',
+    'direccion': 'Calle <b>1</b>',
+}
+
+
+def test_campos_del_formulario():
+    """El esquema cubre todos los campos que recoge obtener_datos_formulario"""
+    from blueprints.dashboard import obtener_datos_formulario
+    from types import SimpleNamespace
+    formulario = obtener_datos_formulario(SimpleNamespace(form={}))
+    assert set(formulario) == set(ESQUEMA_ATLETA)
+
+
+def test_conversion():
+    limpio, errores = validar_atleta(FILA)
+
+    assert errores == {}
+    assert limpio['nombre'] == 'Ana'
+    assert limpio['cedula'] == 'V-12345678'
+    assert limpio['edad'] == 17
+    assert limpio['sexo'] == 'Femenino'
+    assert limpio['telefono'] == '0414-1234567'
+    assert limpio['email'] == 'ana@correo.com'
+    assert limpio['peso'] == 60.5
+    assert limpio['estatura'] == 1.7
+    assert limpio['fecha_nacimiento'] == '2007-03-04'
+    assert limpio['usa_lentes'] == 'Si'
+    assert limpio['usa_bucal'] == 'No'
+    assert limpio['es_menor'] is True
+    assert limpio['direccion'] == 'Calle 1'
+    assert limpio['estatus'] == 'Activo'
+
+
+@pytest.mark.parametrize("fn,valor", [
+    (peso, '500'), (peso, '60 lb'), (estatura, '4 m'), (estatura, 'alto'), (cedula, 'X-123'), (cedula, 'V-12'),
+])
+def test_valores_invalidos(fn, valor):
+    with pytest.raises(ErrorCampo):
+        fn(valor)
+
+
+def test_errores_por_campo():
+    _, errores = validar_atleta({**FILA, 'nombre': '', 'fecha_nacimiento': '2999-01-01', 'cedula': '123'})
+
+    assert set(errores) == {'nombre', 'fecha_nacimiento', 'cedula'}
+    assert errores['nombre'] == "El nombre es requerido"
+    assert "Cédula: Formato de cédula inválido. Use V-12345678 o E-12345678" in mensajes_por_campo(errores)
+    assert mensajes_por_campo({'talla_short': 'x'}) == ["Talla short: x"]
+
+
+def test_no_agrega_reglas_al_formulario_anterior():
+    """Menor sin representante y grupo sanguíneo libre se aceptaban antes del esquema"""
+    limpio, errores = validar_atleta({**FILA, 'representante_nombre': None, 'sangre': 'O Rh positivo'})
+
+    assert errores == {}
+    assert limpio['es_menor'] is True and limpio['sangre'] == 'O Rh positivo'
+
+
+def test_parcial_solo_campos_presentes():
+    limpio, errores = validar_atleta({'peso': '70'}, parcial=True)
+    assert errores == {}
+    assert limpio == {'peso': 70.0}
+
+
+def test_lote_marca_cedulas_repetidas():
+    filas = [FILA, {**FILA, 'cedula': 'V-12345678'}, {**FILA, 'cedula': ''}, {**FILA, 'cedula': 'E-87654321'}]
+
+    validas, errores = validar_lote(filas)
+
+    assert [i for i, _ in validas] == [0, 3]
+    assert errores[1] == {'cedula': "Cédula repetida (fila 1)"}
+    assert errores[2] == {'cedula': "La cédula es requerida"}
+
+
+def test_validar_datos_atleta_usa_el_esquema():
+    es_valido, errores = validar_datos_atleta({**FILA, 'apellido': ''})
+    assert not es_valido
+    assert errores == ["El apellido es requerido"]
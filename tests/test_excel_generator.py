@@ -0,0 +1,69 @@
+"""
+Tests para la ficha Excel con plantilla y caché (utils/excel_generator.py).
+
+Ejecutar:
+    python -m pytest tests/test_excel_generator.py -v
+"""
+
+import sys
+import os
+import pytest
+from unittest.mock import patch
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from openpyxl import load_workbook
+
+from utils import cache_compartido
+from utils.cache_compartido import CacheCompartido
+from utils.excel_generator import PlantillaFicha, ficha_excel_bytes, generar_ficha_excel
+
+BECA = {
+    'id': 7, 'nombre': 'María <José>', 'apellido': 'Pérez & Hijos', 'cedula': 'V-12345678',
+    'disciplina': 'Natación', 'fecha_nacimiento': '2006-11-23', 'created_at': '2024-05-01T12:00:00',
+    'updated_at': '2024-06-01T08:00:00', 'sexo': 'F', 'usa_lentes': 'Si', 'peso': None,
+}
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    """Caché compartida aislada por test"""
+    cache = CacheCompartido(str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(cache_compartido, '_cache', cache)
+    return cache
+
+
+def test_ficha_con_valores():
+    ws = load_workbook(generar_ficha_excel(BECA)).active
+
+    assert ws['G5'].value == 'Natación'
+    assert ws['G7'].value == '2024-05-01'
+    assert ws['B10'].value == 'V-12345678'
+    assert ws['C10'].value == 'Pérez & Hijos'
+    assert ws['E10'].value == 'María <José>'
+    assert ws['D13'].value == 'F [X]'
+    assert [ws['A14'].value, ws['B14'].value, ws['C14'].value] == ['23', '11', '2006']
+    assert ws['A24'].value == 'Si [X]'
+    assert ws['B24'].value == 'No'
+    assert ws['G19'].value == 'TELÉFONO / EMAIL'
+    # Sin marcadores pendientes
+    assert not any('{{' in str(c.value) for fila in ws.iter_rows() for c in fila if c.value)
+
+
+def test_estilos_con_nombre():
+    wb = load_workbook(generar_ficha_excel(BECA))
+    assert 'ficha_tabla' in wb.named_styles
+    assert wb.active['A9'].font.b
+    assert wb.active['A9'].border.left.style == 'thin'
+
+
+def test_descarga_repetida_desde_cache():
+    primera = ficha_excel_bytes(BECA)
+    with patch.object(PlantillaFicha, 'rellenar') as mock_rellenar:
+        assert ficha_excel_bytes(dict(BECA)) == primera
+        mock_rellenar.assert_not_called()
+
+        # Una edición genera la ficha otra vez aunque updated_at no cambie
+        mock_rellenar.return_value = b'nueva'
+        assert ficha_excel_bytes({**BECA, 'peso': 61}) == b'nueva'
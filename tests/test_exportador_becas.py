@@ -0,0 +1,82 @@
+"""
+Tests para la exportación masiva de atletas (utils/exportador_becas.py y
+repositorio_becas.iterar_becas).
+
+Ejecutar:
+    python -m pytest tests/test_exportador_becas.py -v
+"""
+
+import sys
+import os
+from io import BytesIO
+from unittest.mock import MagicMock, Mock, patch
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from openpyxl import load_workbook
+
+from utils.exportador_becas import COLUMNAS_EXPORTACION, exportar_becas_xlsx
+from utils.repositorio_becas import iterar_becas
+
+
+def crear_consulta(filas):
+    """Consulta falsa que respeta lt('id') y limit() sobre filas ordenadas por id desc."""
+    estado = {'limite': None, 'menor_que': None, 'llamadas': 0, 'filtros': []}
+    query = MagicMock()
+
+    def encadenar(nombre):
+        def metodo(*args, **kwargs):
+            if nombre == 'limit':
+                estado['limite'] = args[0]
+            elif nombre == 'lt':
+                estado['menor_que'] = args[1]
+            elif nombre in ('eq', 'or_'):
+                estado['filtros'].append(args)
+            return query
+        return metodo
+
+    for nombre in ('select', 'eq', 'or_', 'lt', 'order', 'limit'):
+        setattr(query, nombre, encadenar(nombre))
+
+    def execute():
+        estado['llamadas'] += 1
+        visibles = [f for f in filas if estado['menor_que'] is None or f['id'] < estado['menor_que']]
+        return Mock(data=visibles[:estado['limite']])
+
+    query.execute = execute
+    return query, estado
+
+
+@patch('utils.repositorio_becas.supabase')
+def test_iterar_becas_keyset(mock_supabase):
+    filas = [{'id': i} for i in range(2500, 0, -1)]
+    query, estado = crear_consulta(filas)
+    mock_supabase.table.return_value = query
+
+    ids = [f['id'] for f in iterar_becas('id', tamano_pagina=1000, disciplina='Boxeo', estatus='Todos')]
+
+    assert ids == list(range(2500, 0, -1))
+    assert estado['llamadas'] == 3
+    # 'Todos' no filtra; la disciplina se aplica en cada página
+    assert estado['filtros'].count(('disciplina', 'Boxeo')) == 3
+    assert not any(f[0] == 'estatus' for f in estado['filtros'])
+
+
+def test_exportar_xlsx():
+    becas = (
+        {'id': i, 'nombre': f'Atleta {i}', 'cedula': f'V{i}', 'es_menor': i % 2 == 0, 'peso': '60'}
+        for i in range(1, 501)
+    )
+    destino = BytesIO()
+
+    total = exportar_becas_xlsx(becas, destino)
+
+    assert total == 500
+    ws = load_workbook(destino, read_only=True).active
+    filas = list(ws.iter_rows(values_only=True))
+    assert len(filas) == 501
+    assert filas[0][:3] == ('ID', 'Cédula', 'Nombre')
+    assert len(filas[0]) == len(COLUMNAS_EXPORTACION)
+    indice_menor = [c[0] for c in COLUMNAS_EXPORTACION].index('es_menor')
+    assert filas[2][indice_menor] == 'Sí'
@@ -0,0 +1,78 @@
+"""
+Tests para la exportación CSV/Parquet de becas (utils/exportador_datos.py).
+
+Ejecutar:
+    python -m pytest tests/test_exportador_datos.py -v
+"""
+
+import sys
+import os
+import csv
+import io
+import pytest
+from datetime import date
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import exportador_datos
+from utils.exportador_datos import (
+    ColumnaInvalida, columnas_select, escribir_parquet, generar_csv,
+    normalizar_estatura, normalizar_peso, parsear_columnas
+)
+
+BECAS = [
+    {'id': 2, 'nombre': 'Ana', 'peso': '60,5 kg', 'estatura': '170', 'fecha_nacimiento': '2005-03-04',
+     'es_menor': False, 'created_at': '2024-01-01T10:00:00+00:00'},
+    {'id': 1, 'nombre': 'Luis', 'peso': 'N/A', 'estatura': '1.82 m', 'fecha_nacimiento': None,
+     'es_menor': True, 'created_at': None},
+]
+
+
+@pytest.mark.parametrize("valor,esperado", [
+    ('60', 60.0), ('60,5 kg', 60.5), ('72kg', 72.0), (65, 65.0), ('', None), ('N/A', None), (None, None),
+])
+def test_normalizar_peso(valor, esperado):
+    assert normalizar_peso(valor) == esperado
+
+
+@pytest.mark.parametrize("valor,esperado", [
+    ('1.70', 1.70), ('1,65 m', 1.65), ('170', 1.70), ('182 cm', 1.82), ('abc', None), ('0', None),
+])
+def test_normalizar_estatura(valor, esperado):
+    assert normalizar_estatura(valor) == esperado
+
+
+def test_parsear_columnas():
+    assert parsear_columnas('nombre, peso') == ['nombre', 'peso']
+    assert columnas_select(['nombre', 'peso']) == 'id,nombre,peso'
+    with pytest.raises(ColumnaInvalida):
+        parsear_columnas('nombre,cuenta_bancaria')
+
+
+def test_csv_por_trozos(monkeypatch):
+    monkeypatch.setattr(exportador_datos, 'FILAS_POR_TROZO', 1)
+    columnas = ['id', 'nombre', 'peso', 'estatura', 'fecha_nacimiento', 'es_menor']
+
+    trozos = list(generar_csv(iter(BECAS), columnas))
+
+    assert len(trozos) == 3
+    filas = list(csv.reader(io.StringIO(''.join(trozos))))
+    assert filas[0] == columnas
+    assert filas[1] == ['2', 'Ana', '60.5', '1.7', '2005-03-04', 'False']
+    assert filas[2] == ['1', 'Luis', '', '1.82', '', 'True']
+
+
+def test_parquet_tipado(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    ruta = tmp_path / 'becas.parquet'
+    columnas = ['id', 'peso', 'estatura', 'fecha_nacimiento', 'created_at', 'es_menor']
+
+    with open(ruta, 'wb') as f:
+        assert escribir_parquet(iter(BECAS), columnas, f) == 2
+
+    tabla = pq.read_table(ruta)
+    assert str(tabla.schema.field('peso').type) == 'double'
+    assert str(tabla.schema.field('fecha_nacimiento').type) == 'date32[day]'
+    assert tabla.column('fecha_nacimiento').to_pylist() == [date(2005, 3, 4), None]
+    assert tabla.column('estatura').to_pylist() == [1.7, 1.82]
@@ -0,0 +1,74 @@
+"""
+Tests para la exportación masiva de fichas en ZIP (utils/exportador_fichas.py).
+
+Ejecutar:
+    python -m pytest tests/test_exportador_fichas.py -v
+"""
+
+import sys
+import os
+import zipfile
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import cache_compartido, exportador_fichas
+from utils.cache_compartido import CacheCompartido
+from utils.exportador_fichas import (
+    ExportacionOcupada, liberar_exportacion, nombre_archivo_ficha, obtener_progreso,
+    reservar_exportacion, zip_fichas
+)
+
+
+@pytest.fixture(autouse=True)
+def entorno(tmp_path, monkeypatch):
+    """Caché aislada y un pool de hilos en lugar del de procesos"""
+    monkeypatch.setattr(cache_compartido, '_cache', CacheCompartido(str(tmp_path / 'cache.sqlite3')))
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(exportador_fichas, 'obtener_pool_procesos', lambda nombre, n: pool)
+    yield
+    pool.shutdown()
+
+
+def becas(n):
+    return ({'id': i, 'nombre': 'Ana María', 'apellido': 'Pérez', 'cedula': f'V{i}'} for i in range(1, n + 1))
+
+
+def test_zip_con_todas_las_fichas_por_partes():
+    partes = list(zip_fichas(becas(60), total=60, exportacion_id='abc'))
+
+    # Un trozo por lote terminado (60 fichas / 25 por lote = 3) más el cierre del ZIP
+    assert len([p for p in partes if p]) >= 3
+    with zipfile.ZipFile(BytesIO(b''.join(partes))) as z:
+        nombres = z.namelist()
+        assert len(nombres) == 60
+        assert 'Ficha_Ana_María_Pérez_1.xlsx' in nombres
+        assert z.testzip() is None
+    assert obtener_progreso('abc') == {'estado': 'listo', 'hechas': 60, 'total': 60}
+
+
+def test_cancelar_descarga_publica_error():
+    generador = zip_fichas(becas(60), total=60, exportacion_id='xyz')
+    next(generador)
+    generador.close()
+    assert obtener_progreso('xyz')['estado'] == 'error'
+
+
+def test_limite_de_exportaciones(monkeypatch):
+    import threading
+    monkeypatch.setattr(exportador_fichas, '_exportaciones', threading.BoundedSemaphore(1))
+    reservar_exportacion()
+    with pytest.raises(ExportacionOcupada):
+        reservar_exportacion()
+    liberar_exportacion()
+    reservar_exportacion()
+    liberar_exportacion()
+
+
+def test_nombre_archivo_seguro():
+    nombre = nombre_archivo_ficha({'id': 3, 'nombre': 'Luis/../x', 'apellido': None})
+    assert '/' not in nombre
+    assert nombre.startswith('Ficha_Luis_') and nombre.endswith('_3.xlsx')
@@ -0,0 +1,79 @@
+"""
+Tests para la ficha PDF con caché en disco (utils/ficha_pdf.py).
+
+Ejecutar:
+    python -m pytest tests/test_ficha_pdf.py -v
+"""
+
+import sys
+import os
+import re
+import pytest
+from concurrent.futures import Future
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import ficha_pdf
+from utils.ficha_pdf import obtener_ficha_pdf, renderizar_ficha_pdf
+
+BECA = {
+    'id': 7, 'nombre': 'María', 'apellido': 'Pérez (Hijo)', 'cedula': 'V-12345678',
+    'disciplina': 'Natación', 'fecha_nacimiento': '2006-11-23', 'created_at': '2024-05-01T12:00:00',
+    'updated_at': '2024-06-01T08:00:00', 'sexo': 'F', 'usa_lentes': 'Si',
+}
+
+
+@pytest.fixture
+def renders(tmp_path, monkeypatch):
+    """Caché en tmp_path y generación en el mismo proceso (cuenta las generaciones)"""
+    monkeypatch.setattr(ficha_pdf, 'directorio_datos', lambda *_: str(tmp_path))
+    llamadas = []
+
+    def enviar(beca):
+        llamadas.append(beca['id'])
+        futuro = Future()
+        futuro.set_result(renderizar_ficha_pdf(beca))
+        return futuro
+
+    monkeypatch.setattr(ficha_pdf, '_enviar', enviar)
+    return llamadas
+
+
+def test_pdf_valido():
+    pdf = renderizar_ficha_pdf(BECA)
+
+    assert pdf.startswith(b'%PDF-1.4') and pdf.rstrip().endswith(b'%%EOF')
+    # Las entradas del xref apuntan a cada objeto
+    inicio = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+    assert pdf[inicio:].startswith(b'xref')
+    for i, posicion in enumerate(re.findall(rb'(\d{10}) 00000 n', pdf), start=1):
+        assert pdf[int(posicion):].startswith(b'%d 0 obj' % i)
+
+
+def test_pdf_contiene_datos():
+    pdf = renderizar_ficha_pdf(BECA)
+
+    assert b'(Nataci\xf3n)' in pdf  # WinAnsiEncoding
+    assert b'(P\xe9rez \\(Hijo\\))' in pdf  # Paréntesis escapados
+    assert b'(V-12345678)' in pdf
+    assert b'(Si [X])' in pdf
+
+
+def test_cache_en_disco(renders, tmp_path):
+    ruta = obtener_ficha_pdf(BECA)
+
+    assert os.path.dirname(ruta) == str(tmp_path)
+    assert open(ruta, 'rb').read().startswith(b'%PDF')
+    assert obtener_ficha_pdf(dict(BECA)) == ruta
+    assert renders == [7]
+
+
+def test_nueva_version_reemplaza_anterior(renders, tmp_path):
+    anterior = obtener_ficha_pdf(BECA)
+    # Una edición cambia la versión aunque updated_at siga igual
+    nueva = obtener_ficha_pdf({**BECA, 'peso': 61})
+
+    assert nueva != anterior
+    assert renders == [7, 7]
+    assert os.listdir(tmp_path) == [os.path.basename(nueva)]
@@ -0,0 +1,82 @@
+"""
+Tests para la firma de URLs en lote con caché (utils/firmador_urls.py).
+
+Ejecutar:
+    python -m pytest tests/test_firmador_urls.py -v
+"""
+
+import sys
+import os
+import pytest
+from unittest.mock import patch
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import cache_compartido
+from utils.cache_compartido import CacheCompartido
+from utils.firmador_urls import firmar_urls, firmar_documentos
+
+BASE = "https://xyz.supabase.co/storage/v1/object/public"
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    """Caché compartida aislada por test"""
+    cache = CacheCompartido(str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(cache_compartido, '_cache', cache)
+    return cache
+
+
+def respuesta_firmada(paths, expires_in):
+    return [{'path': p, 'signedURL': f"https://signed/{p}?token=abc", 'error': None} for p in paths]
+
+
+@patch('utils.firmador_urls.supabase_admin')
+def test_una_llamada_por_bucket(mock_admin):
+    """20 documentos del mismo bucket se firman con una sola llamada"""
+    mock_admin.storage.from_.return_value.create_signed_urls.side_effect = respuesta_firmada
+    urls = [f"{BASE}/becas-public/documentos/doc{i}.pdf" for i in range(20)]
+
+    firmadas = firmar_urls(urls)
+
+    assert mock_admin.storage.from_.return_value.create_signed_urls.call_count == 1
+    assert firmadas[urls[3]] == "https://signed/documentos/doc3.pdf?token=abc"
+
+
+@patch('utils.firmador_urls.supabase_admin')
+def test_segunda_vista_sale_de_cache(mock_admin):
+    """Una URL ya firmada no vuelve a llamar a Storage"""
+    storage = mock_admin.storage.from_.return_value
+    storage.create_signed_urls.side_effect = respuesta_firmada
+    url = f"{BASE}/becas-public/documentos/cedula.pdf"
+
+    firmar_urls([url])
+    firmar_urls([url])
+
+    assert storage.create_signed_urls.call_count == 1
+
+
+@patch('utils.firmador_urls.supabase_admin')
+def test_error_de_storage_devuelve_url_original(mock_admin):
+    mock_admin.storage.from_.return_value.create_signed_urls.side_effect = Exception("timeout")
+    url = f"{BASE}/becas-public/documentos/cedula.pdf"
+    assert firmar_urls([url]) == {url: url}
+
+
+@patch('utils.firmador_urls.supabase_admin')
+def test_urls_externas_no_se_firman(mock_admin):
+    url = "https://otro-sitio.com/archivo.pdf"
+    assert firmar_urls([url, None]) == {url: url}
+    assert not mock_admin.storage.from_.called
+
+
+@patch('utils.firmador_urls.supabase_admin')
+def test_firmar_documentos_reemplaza_campo(mock_admin):
+    mock_admin.storage.from_.return_value.create_signed_urls.side_effect = respuesta_firmada
+    documentos = [{'id': 1, 'archivo': f"{BASE}/becas-public/documentos/a.pdf"}, {'id': 2, 'archivo': None}]
+
+    firmar_documentos(documentos)
+
+    assert documentos[0]['archivo'].startswith("https://signed/")
+    assert documentos[1]['archivo'] is None
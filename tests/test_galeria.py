@@ -0,0 +1,206 @@
+"""
+Tests para el servicio de galería con caché compartida (utils/galeria.py).
+
+Ejecutar:
+    python -m pytest tests/test_galeria.py -v
+"""
+
+import sys
+import os
+import pytest
+from unittest.mock import Mock, patch
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import cache_compartido
+from utils.cache_compartido import CacheCompartido
+from utils.galeria import obtener_slots, invalidar_galeria
+
+FILAS = [
+    {'slot': 'home_1', 'image_data': 'https://x/home1.jpg'},
+    {'slot': 'left_1', 'image_data': 'https://x/left1.jpg'},
+    {'slot': 'left_2', 'image_data': None},
+]
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    """Caché compartida aislada por test"""
+    cache = CacheCompartido(str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(cache_compartido, '_cache', cache)
+    return cache
+
+
+def configurar(mock_supabase, filas=FILAS):
+    query = mock_supabase.table.return_value.select.return_value
+    query.execute.return_value = Mock(data=filas)
+    return mock_supabase.table.return_value.select
+
+
+@patch('utils.galeria.supabase')
+def test_una_consulta_y_solo_columnas_necesarias(mock_supabase):
+    select = configurar(mock_supabase)
+
+    assert obtener_slots() == {'home_1': 'https://x/home1.jpg', 'left_1': 'https://x/left1.jpg'}
+    assert obtener_slots('home_') == {'home_1': 'https://x/home1.jpg'}
+
+    select.assert_called_once_with('slot,image_data')
+
+
+@patch('utils.galeria.supabase')
+def test_galeria_vacia_tambien_se_cachea(mock_supabase):
+    select = configurar(mock_supabase, [])
+    assert obtener_slots() == {}
+    assert obtener_slots() == {}
+    assert select.call_count == 1
+
+
+@patch('utils.galeria.supabase')
+def test_invalidar_vuelve_a_consultar(mock_supabase):
+    select = configurar(mock_supabase)
+    obtener_slots()
+    invalidar_galeria()
+    obtener_slots()
+    assert select.call_count == 2
+
+
+# ============================================
+# LOTES
+# ============================================
+
+def futuro_listo(resultado=None, error=None):
+    from concurrent.futures import Future
+    futuro = Future()
+    if error:
+        futuro.set_exception(error)
+    else:
+        futuro.set_result(resultado)
+    return futuro
+
+
+@patch('utils.galeria.liberar_referencia')
+@patch('utils.galeria.subir_imagen_galeria', side_effect=lambda contenido, nombre: f"https://x/{nombre}")
+@patch('utils.galeria.enviar_procesamiento')
+@patch('utils.galeria.supabase')
+def test_lote_un_solo_upsert_y_resultado_por_slot(mock_supabase, mock_procesar, mock_subir, mock_liberar):
+    from utils.galeria import procesar_lote
+    from utils.procesador_imagenes import ImagenInvalida
+
+    mock_procesar.side_effect = lambda datos, espera: (
+        futuro_listo(error=ImagenInvalida('no es imagen')) if datos == b'malo' else futuro_listo(b'jpeg')
+    )
+    consulta = mock_supabase.table.return_value
+    consulta.select.return_value.in_.return_value.execute.return_value = Mock(
+        data=[{'slot': 'home_1', 'image_data': 'https://x/vieja.jpg'}]
+    )
+
+    resultados = procesar_lote({
+        'home_1': (b'ok', 'a.jpg'),
+        'home_2': (b'ok', 'b.jpg'),
+        'left_1': (b'malo', 'c.jpg'),
+    })
+
+    assert resultados['home_1'] == {'estado': 'listo', 'url': 'https://x/a.jpg'}
+    assert resultados['home_2']['estado'] == 'listo'
+    assert resultados['left_1'] == {'estado': 'error', 'error': 'no es imagen'}
+
+    consulta.upsert.assert_called_once()
+    filas = consulta.upsert.call_args.args[0]
+    assert {f['slot'] for f in filas} == {'home_1', 'home_2'}
+    mock_liberar.assert_called_once_with('https://x/vieja.jpg')
+
+
+@patch('utils.galeria.liberar_referencia')
+@patch('utils.galeria.subir_imagen_galeria', return_value='https://x/a.jpg')
+@patch('utils.galeria.enviar_procesamiento', side_effect=lambda datos, espera: futuro_listo(b'jpeg'))
+@patch('utils.galeria.supabase')
+def test_lote_upsert_fallido_libera_nuevas(mock_supabase, _procesar, _subir, mock_liberar):
+    from utils.galeria import procesar_lote
+
+    consulta = mock_supabase.table.return_value
+    consulta.select.return_value.in_.return_value.execute.return_value = Mock(data=[])
+    consulta.upsert.return_value.execute.side_effect = Exception("DB caída")
+
+    resultados = procesar_lote({'home_1': (b'ok', 'a.jpg')})
+
+    assert resultados['home_1']['estado'] == 'error'
+    mock_liberar.assert_called_once_with('https://x/a.jpg')
+
+
+@patch('utils.galeria.liberar_referencia')
+@patch('utils.galeria.supabase')
+def test_misma_imagen_en_el_slot_libera_la_referencia_anterior(mock_supabase, mock_liberar):
+    """Volver a subir la misma imagen suma una referencia: la anterior se suelta aunque la URL no cambie"""
+    from utils.galeria import asignar_slots
+
+    consulta = mock_supabase.table.return_value
+    consulta.select.return_value.in_.return_value.execute.return_value = Mock(
+        data=[{'slot': 'home_1', 'image_data': 'https://x/a.jpg'}]
+    )
+
+    asignar_slots({'home_1': 'https://x/a.jpg'})
+
+    mock_liberar.assert_called_once_with('https://x/a.jpg')
+
+
+@patch('utils.galeria.liberar_referencia')
+@patch('utils.galeria.subir_imagen_galeria', side_effect=lambda contenido, nombre: f"https://x/{nombre}")
+@patch('utils.galeria.supabase')
+def test_lote_un_solo_plazo_para_todas_las_imagenes(mock_supabase, _subir, _liberar, monkeypatch):
+    """Las imágenes que no terminan dentro del plazo del lote fallan sin esperar un plazo cada una"""
+    import time
+    from concurrent.futures import Future
+    from utils import galeria
+
+    monkeypatch.setattr(galeria, 'TIMEOUT_LOTE', 0.2)
+    colgados = []
+
+    def procesar(datos, espera):
+        if datos == b'lento':
+            colgados.append(Future())
+            return colgados[-1]
+        return futuro_listo(b'jpeg')
+
+    monkeypatch.setattr(galeria, 'enviar_procesamiento', procesar)
+    mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value = Mock(data=[])
+
+    inicio = time.monotonic()
+    resultados = galeria.procesar_lote({f'home_{i}': (b'lento', f'{i}.jpg') for i in range(1, 6)}
+                                       | {'home_6': (b'ok', '6.jpg')})
+
+    assert time.monotonic() - inicio < 0.6
+    assert resultados['home_6']['estado'] == 'listo'
+    assert {resultados[f'home_{i}']['error'] for i in range(1, 6)} == {'Tiempo de procesamiento agotado'}
+    assert all(f.cancelled() for f in colgados)
+
+
+@patch('utils.galeria.liberar_referencia')
+@patch('utils.galeria.supabase')
+def test_lote_libera_las_subidas_que_terminan_fuera_de_plazo(mock_supabase, mock_liberar, monkeypatch):
+    """Una subida que sigue en curso al vencer el plazo suma una referencia que el lote no usa"""
+    import threading
+    from utils import galeria
+
+    monkeypatch.setattr(galeria, 'TIMEOUT_LOTE', 0.2)
+    monkeypatch.setattr(galeria, 'enviar_procesamiento', lambda datos, espera: futuro_listo(datos))
+    mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value = Mock(data=[])
+    seguir = threading.Event()
+    liberada = threading.Event()
+    mock_liberar.side_effect = lambda url: liberada.set()
+
+    def subir(contenido, nombre):
+        if contenido == b'lento':
+            seguir.wait(5)
+        return f"https://x/{nombre}"
+
+    monkeypatch.setattr(galeria, 'subir_imagen_galeria', subir)
+
+    resultados = galeria.procesar_lote({'home_1': (b'lento', 'a.jpg'), 'home_2': (b'ok', 'b.jpg')})
+
+    assert resultados['home_1'] == {'estado': 'error', 'error': 'Tiempo de subida agotado'}
+    assert resultados['home_2']['estado'] == 'listo'
+    assert not mock_liberar.called
+    seguir.set()
+    assert liberada.wait(5)
+    mock_liberar.assert_called_once_with('https://x/a.jpg')
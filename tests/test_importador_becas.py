@@ -0,0 +1,202 @@
+"""
+Tests para la importación masiva de atletas (utils/importador_becas.py).
+
+Ejecutar:
+    python -m pytest tests/test_importador_becas.py -v
+"""
+
+import sys
+import os
+import io
+import threading
+from types import SimpleNamespace
+import pytest
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from openpyxl import Workbook
+
+from config import rutas_datos
+from utils import importador_becas
+from utils.importador_becas import ArchivoInvalido, importar_planilla, leer_planilla
+from utils.indice_cedulas import IndiceCedulas
+
+
+class ClienteFalso:
+    """
+    Registra los upserts; falla en los lotes cuya primera cédula esté en fallar.
+    Los select por cédula responden con las de registradas.
+    """
+
+    def __init__(self, fallar=(), registradas=()):
+        self.lotes = []
+        self.fallar = set(fallar)
+        self.registradas = set(registradas)
+        self.consultas = []
+        self._lock = threading.Lock()
+
+    def table(self, nombre):
+        cliente = self
+
+        class Consulta:
+            filas = None
+
+            def upsert(self, filas, on_conflict=None):
+                assert on_conflict == 'cedula'
+                self.filas = filas
+                return self
+
+            def select(self, columnas):
+                return self
+
+            def in_(self, columna, valores):
+                cliente.consultas.append(list(valores))
+                self.encontradas = [{'cedula': c} for c in valores if c in cliente.registradas]
+                return self
+
+            def execute(self):
+                if self.filas is None:
+                    return SimpleNamespace(data=self.encontradas)
+                if self.filas[0]['cedula'] in cliente.fallar:
+                    raise RuntimeError("conexión perdida")
+                with cliente._lock:
+                    cliente.lotes.append(self.filas)
+
+        return Consulta()
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Checkpoints en un directorio temporal"""
+    monkeypatch.setattr(rutas_datos, 'DATA_DIR', str(tmp_path))
+
+
+@pytest.fixture(autouse=True)
+def indice(monkeypatch):
+    """Índice de cédulas en memoria (sin consultar la base); registra las guardadas"""
+    indice = IndiceCedulas(['V-20000001'])
+    indice.registradas = []
+    monkeypatch.setattr(importador_becas, 'obtener_indice', lambda: indice)
+    monkeypatch.setattr(importador_becas, 'registrar_cedulas', indice.registradas.extend)
+    return indice
+
+
+def csv_bytes(filas, separador=','):
+    lineas = [separador.join(['Cédula', 'Nombres', 'Apellido', 'Peso', 'Columna Extra'])]
+    lineas += [separador.join(f) for f in filas]
+    return io.BytesIO('\n'.join(lineas).encode('utf-8'))
+
+
+def atletas(n, desde=0):
+    return [[f'V-{20000000 + i}', f'Atleta {i}', 'Pérez', '60', 'x'] for i in range(desde, desde + n)]
+
+
+def test_lee_csv_con_alias_y_punto_y_coma():
+    ignoradas, filas = leer_planilla(csv_bytes(atletas(1), ';'), 'cohorte.csv')
+
+    assert ignoradas == ['columna_extra']
+    assert next(filas) == {'cedula': 'V-20000000', 'nombre': 'Atleta 0', 'apellido': 'Pérez', 'peso': '60'}
+
+
+def test_lee_xlsx_con_cedula_numerica():
+    wb = Workbook()
+    wb.active.append(['C.I.', 'Nombre', 'Apellido'])
+    wb.active.append([12345678, 'Ana', 'Pérez'])
+    archivo = io.BytesIO()
+    wb.save(archivo)
+    archivo.seek(0)
+
+    cliente = ClienteFalso()
+    resultado = importar_planilla(archivo, 'cohorte.xlsx', cliente)
+
+    assert resultado.importadas == 1
+    assert cliente.lotes[0][0]['cedula'] == 'V-12345678'
+
+
+def test_faltan_columnas_requeridas():
+    with pytest.raises(ArchivoInvalido, match='apellido'):
+        leer_planilla(io.BytesIO(b'cedula,nombre\nV-12345678,Ana'), 'a.csv')
+
+
+def test_lotes_y_errores_por_fila():
+    filas = atletas(5) + [['X-1', 'Malo', 'Pérez', '60', ''], ['V-20000001', 'Repetido', 'Pérez', '60', '']]
+    cliente = ClienteFalso()
+
+    resultado = importar_planilla(csv_bytes(filas), 'a.csv', cliente, tamano_lote=2, paralelo=2)
+
+    assert resultado.leidas == 7
+    assert resultado.importadas == 5
+    assert sorted(len(lote) for lote in cliente.lotes) == [1, 2, 2]
+    assert resultado.errores == [
+        {'fila': 7, 'campo': 'cedula', 'mensaje': "Formato de cédula inválido. Use V-12345678 o E-12345678"},
+        {'fila': 8, 'campo': 'cedula', 'mensaje': "Cédula repetida en la planilla"},
+    ]
+
+
+def test_celdas_vacias_no_sobrescriben_datos():
+    """Una celda en blanco no se envía: el upsert por cédula no debe borrar lo guardado"""
+    filas = [['V-20000001', 'Ana', 'Pérez', '', ''], ['V-20000002', 'Luis', 'Mora', '70', '']]
+    cliente = ClienteFalso()
+
+    resultado = importar_planilla(csv_bytes(filas), 'a.csv', cliente)
+
+    assert resultado.importadas == 2
+    # Un upsert por combinación de columnas (PostgREST pone NULL en las que falten)
+    assert sorted(sorted(lote[0]) for lote in cliente.lotes) == [
+        ['apellido', 'cedula', 'nombre'], ['apellido', 'cedula', 'nombre', 'peso'],
+    ]
+
+
+def test_dry_run_no_guarda():
+    cliente = ClienteFalso()
+    resultado = importar_planilla(csv_bytes(atletas(3)), 'a.csv', cliente, dry_run=True)
+
+    assert resultado.validas == 3
+    assert resultado.importadas == 0
+    assert cliente.lotes == []
+
+
+def test_retoma_desde_checkpoint():
+    datos = csv_bytes(atletas(6)).getvalue()
+
+    # El tercer lote falla: el checkpoint queda en las 4 primeras filas
+    fallido = ClienteFalso(fallar={'V-20000004'})
+    resultado = importar_planilla(io.BytesIO(datos), 'a.csv', fallido, tamano_lote=2, paralelo=1)
+    assert resultado.lotes_fallidos == 1
+    assert resultado.importadas == 4
+
+    cliente = ClienteFalso()
+    resultado = importar_planilla(io.BytesIO(datos), 'a.csv', cliente, tamano_lote=2, paralelo=1)
+    assert resultado.reanudado_desde == 4
+    assert [f['cedula'] for lote in cliente.lotes for f in lote] == ['V-20000004', 'V-20000005']
+
+    # Terminada sin fallas se borra el checkpoint
+    resultado = importar_planilla(io.BytesIO(datos), 'a.csv', ClienteFalso(), tamano_lote=2)
+    assert resultado.reanudado_desde == 0
+
+
+def test_cedulas_ya_registradas(indice):
+    cliente = ClienteFalso(registradas={'V-20000001'})
+    resultado = importar_planilla(csv_bytes(atletas(3)), 'a.csv', cliente)
+
+    assert resultado.existentes == 1
+    assert resultado.importadas == 3
+    assert sorted(indice.registradas) == ['V-20000000', 'V-20000001', 'V-20000002']
+
+    cliente = ClienteFalso(registradas={'V-20000001'})
+    resultado = importar_planilla(csv_bytes(atletas(3)), 'b.csv', cliente, solo_nuevas=True)
+    assert resultado.importadas == 2
+    assert resultado.errores == [{'fila': 3, 'campo': 'cedula', 'mensaje': "Cédula ya registrada"}]
+    # Solo los aciertos del índice se consultan, en un select por lote
+    assert cliente.consultas == [['V-20000001']]
+
+
+def test_acierto_del_indice_no_confirmado_se_importa():
+    """El índice conserva cédulas cambiadas o borradas y el Bloom da falsos positivos"""
+    cliente = ClienteFalso()
+    resultado = importar_planilla(csv_bytes(atletas(3)), 'a.csv', cliente, solo_nuevas=True)
+
+    assert resultado.existentes == 0
+    assert resultado.importadas == 3
+    assert resultado.errores == []
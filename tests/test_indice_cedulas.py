@@ -0,0 +1,128 @@
+"""
+Tests para el índice de cédulas (utils/indice_cedulas.py y utils/filtro_bloom.py).
+
+Ejecutar:
+    python -m pytest tests/test_indice_cedulas.py -v
+"""
+
+import sys
+import os
+import pytest
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import cache_compartido, indice_cedulas
+from utils.cache_compartido import CacheCompartido
+from utils.filtro_bloom import FiltroBloom
+from utils.indice_cedulas import (
+    IndiceCedulas, cedula_registrada, invalidar_indice, registrar_cedula, registrar_cedulas
+)
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    """Caché compartida aislada y estado del índice limpio por test"""
+    cache = CacheCompartido(str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(cache_compartido, '_cache', cache)
+    monkeypatch.setattr(indice_cedulas, '_indice', None)
+    monkeypatch.setattr(indice_cedulas, '_generacion', None)
+    monkeypatch.setattr(indice_cedulas, '_aplicadas', set())
+    monkeypatch.setattr(indice_cedulas, 'REVISION_GENERACION', 0)
+    return cache
+
+
+@pytest.fixture
+def cargas(monkeypatch):
+    """Tabla becas simulada; cuenta las veces que se recorre"""
+    filas = [{'id': 1, 'cedula': 'V-11111111'}, {'id': 2, 'cedula': '22.222.222'}, {'id': 3, 'cedula': None}]
+    contador = []
+
+    def iterar_becas(columnas):
+        contador.append(columnas)
+        return iter(filas)
+
+    monkeypatch.setattr(indice_cedulas, 'iterar_becas', iterar_becas)
+    return contador
+
+
+def test_bloom_sin_falsos_negativos():
+    bloom = FiltroBloom(capacidad=5000, error=0.01)
+    bloom.agregar_todos(f'V-{i}' for i in range(5000))
+
+    assert all(f'V-{i}' in bloom for i in range(5000))
+    falsos = sum(f'E-{i}' in bloom for i in range(5000))
+    assert falsos < 5000 * 0.03
+
+
+def test_indice_normaliza():
+    indice = IndiceCedulas(['V-11111111', '22.222.222', None, ''])
+
+    assert 'v 11.111.111' in indice
+    assert 'V-22222222' in indice
+    assert 'V-33333333' not in indice
+
+    indice.agregar('33333333')
+    assert 'V-33333333' in indice
+    assert len(indice) == 3
+
+
+def test_carga_una_vez(cargas):
+    assert cedula_registrada('V-22222222')
+    assert not cedula_registrada('V-44444444')
+    assert cargas == ['id,cedula']
+
+
+def test_registrar_no_recarga_este_worker(cargas):
+    cedula_registrada('V-11111111')
+    registrar_cedula('V-55555555')
+
+    assert cedula_registrada('V-55555555')
+    assert len(cargas) == 1
+
+
+def otro_worker(monkeypatch, accion):
+    """Ejecuta accion como un worker sin índice en memoria"""
+    propio = indice_cedulas._indice, indice_cedulas._generacion, indice_cedulas._aplicadas
+    monkeypatch.setattr(indice_cedulas, '_indice', None)
+    monkeypatch.setattr(indice_cedulas, '_aplicadas', set())
+    accion()
+    indice_cedulas._indice, indice_cedulas._generacion, indice_cedulas._aplicadas = propio
+
+
+def test_altas_de_otro_worker_sin_recargar(cargas, monkeypatch):
+    cedula_registrada('V-11111111')
+    registrar_cedula('V-55555555')  # crea la generación
+
+    otro_worker(monkeypatch, lambda: registrar_cedulas(['V-66666666', 'E-77777777']))
+
+    assert cedula_registrada('V-66666666') and cedula_registrada('E-77777777')
+    assert len(cargas) == 1
+
+
+def test_demasiadas_altas_compactan(cargas, monkeypatch):
+    monkeypatch.setattr(indice_cedulas, 'MAX_ALTAS', 2)
+    cedula_registrada('V-11111111')
+    registrar_cedula('V-55555555')
+    for i in range(2):
+        otro_worker(monkeypatch, lambda: registrar_cedula(f'V-6666666{i}'))
+
+    cedula_registrada('V-11111111')
+    assert len(cargas) == 2
+    assert indice_cedulas.obtener_cache().claves(indice_cedulas.PREFIJO_ALTAS) == []
+
+
+def test_otro_worker_recarga(cargas, cache):
+    cedula_registrada('V-11111111')
+    # Otro worker borró un atleta: cambia la generación
+    cache.set(indice_cedulas.CLAVE_GENERACION, 'otra', 60)
+
+    cedula_registrada('V-11111111')
+    assert len(cargas) == 2
+
+
+def test_invalidar_recarga(cargas):
+    cedula_registrada('V-11111111')
+    invalidar_indice()
+    cedula_registrada('V-11111111')
+    assert len(cargas) == 2
@@ -0,0 +1,139 @@
+"""
+Tests para el proxy de imágenes /media y su caché en disco
+(blueprints/media.py, utils/cache_medios.py).
+
+Ejecutar:
+    python -m pytest tests/test_media.py -v
+"""
+
+import sys
+import os
+import hashlib
+import pytest
+from unittest.mock import patch
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from flask import Flask
+from blueprints.media import media_blueprint, url_medios
+from utils import cache_medios
+from utils.cache_medios import CacheMedios
+
+CONTENIDO = b"\xff\xd8\xff" + b"imagen" * 100
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = CacheMedios(str(tmp_path / 'media'), max_bytes=10 * 1024)
+    monkeypatch.setattr(cache_medios, '_cache_medios', cache)
+    return cache
+
+
+@pytest.fixture
+def client(cache, monkeypatch):
+    monkeypatch.setenv('MEDIA_PROXY_ENABLED', 'true')
+    app = Flask(__name__)
+    app.register_blueprint(media_blueprint, url_prefix='/media')
+    return app.test_client()
+
+
+@pytest.fixture
+def storage():
+    with patch('utils.cache_medios.supabase') as mock_supabase:
+        mock_supabase.storage.from_.return_value.download.return_value = CONTENIDO
+        yield mock_supabase.storage.from_.return_value
+
+
+# ============================================
+# CACHÉ EN DISCO
+# ============================================
+
+def test_descarga_una_sola_vez(cache, storage):
+    primera = cache.obtener('becas-public', 'gallery/a.jpg')
+    segunda = cache.obtener('becas-public', 'gallery/a.jpg')
+
+    assert storage.download.call_count == 1
+    assert primera['etag'] == hashlib.sha256(CONTENIDO).hexdigest()
+    assert segunda['content_type'] == 'image/jpeg'
+
+
+def test_lru_por_bytes(cache, storage):
+    """Al pasar el límite (10 KB) se expulsan los archivos usados hace más tiempo"""
+    storage.download.return_value = b"x" * 4096
+    cache.obtener('becas-public', 'a.jpg')
+    antiguo = cache.obtener('becas-public', 'b.jpg')['ruta']
+    os.utime(antiguo, (1, 1))  # b.jpg es el menos usado
+    cache.obtener('becas-public', 'c.jpg')
+
+    assert not os.path.exists(antiguo)
+    assert cache.tamano_total() <= cache.max_bytes
+
+
+# ============================================
+# ENDPOINT /media
+# ============================================
+
+def test_sirve_con_etag_e_immutable(client, storage):
+    sha = hashlib.sha256(CONTENIDO).hexdigest()
+    res = client.get(f'/media/becas-public/imagenes/{sha}.jpg')
+
+    assert res.status_code == 200
+    assert res.data == CONTENIDO
+    assert res.headers['ETag'] == f'"{sha}"'
+    assert 'immutable' in res.headers['Cache-Control']
+    assert res.headers['Content-Disposition'].startswith('inline')
+
+
+def test_rutas_anteriores_al_cas_no_son_immutable(client, storage):
+    res = client.get('/media/becas-public/gallery/a.jpg')
+
+    assert res.status_code == 200
+    assert 'public' in res.headers['Cache-Control']
+    assert 'immutable' not in res.headers['Cache-Control']
+
+
+@pytest.mark.parametrize('archivo', ['pagina.html', 'dibujo.svg', 'script.js', 'sin_tipo.bin'])
+def test_lo_que_no_es_imagen_ni_pdf_se_descarga(client, storage, archivo):
+    """Un .html o .svg servido en línea desde nuestro dominio sería XSS almacenado"""
+    res = client.get(f'/media/becas-public/documentos/{archivo}')
+
+    assert res.headers['Content-Type'] == 'application/octet-stream'
+    assert res.headers['Content-Disposition'].startswith('attachment')
+
+
+def test_pdf_en_linea(client, storage):
+    res = client.get('/media/becas-public/documentos/cedula.pdf')
+
+    assert res.headers['Content-Type'] == 'application/pdf'
+    assert res.headers['Content-Disposition'].startswith('inline')
+
+
+def test_get_condicional_devuelve_304(client, storage):
+    etag = client.get('/media/becas-public/gallery/a.jpg').headers['ETag']
+    res = client.get('/media/becas-public/gallery/a.jpg', headers={'If-None-Match': etag})
+    assert res.status_code == 304
+
+
+def test_range_devuelve_206(client, storage):
+    res = client.get('/media/becas-public/gallery/a.jpg', headers={'Range': 'bytes=0-2'})
+    assert res.status_code == 206
+    assert res.data == b"\xff\xd8\xff"
+
+
+def test_bucket_no_permitido(client, storage):
+    assert client.get('/media/documentos-privados/cedula.pdf').status_code == 404
+    assert not storage.download.called
+
+
+def test_proxy_desactivado(client, storage, monkeypatch):
+    monkeypatch.setenv('MEDIA_PROXY_ENABLED', 'false')
+    assert client.get('/media/becas-public/gallery/a.jpg').status_code == 404
+
+
+def test_url_medios_reescribe_urls_publicas(client):
+    url = "https://xyz.supabase.co/storage/v1/object/public/becas-public/imagenes/abc.jpg"
+    with client.application.test_request_context():
+        assert url_medios(url) == '/media/becas-public/imagenes/abc.jpg'
+        assert url_medios("https://otro.com/foto.jpg") == "https://otro.com/foto.jpg"
+        assert url_medios(None) is None
@@ -0,0 +1,96 @@
+"""
+Tests para el monitor de memoria por worker (utils/memoria.py).
+
+Ejecutar:
+    python -m pytest tests/test_memoria.py -v
+"""
+
+import sys
+import os
+import json
+import tracemalloc
+import pytest
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from config import rutas_datos
+from utils import memoria
+from utils.memoria import MonitorMemoria, reportes_workers, rss_bytes
+
+
+@pytest.fixture(autouse=True)
+def datos(tmp_path, monkeypatch):
+    """DATA_DIR aislado"""
+    monkeypatch.setattr(rutas_datos, 'DATA_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def trazando():
+    ya_trazaba = tracemalloc.is_tracing()
+    if not ya_trazaba:
+        tracemalloc.start(5)
+    yield
+    if not ya_trazaba:
+        tracemalloc.stop()
+
+
+def test_rss_del_proceso():
+    assert rss_bytes() > 1024 * 1024
+
+
+def test_muestra_sin_tracemalloc_publica_rss():
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc ya está activo")
+
+    reporte = MonitorMemoria().muestrear()
+
+    assert reporte['pid'] == os.getpid()
+    assert reporte['rss_mb'] > 0
+    assert 'desde_inicio' not in reporte
+    assert reportes_workers() == [reporte]
+
+
+def test_diferencias_muestran_la_linea_que_crece(trazando):
+    monitor = MonitorMemoria()
+    monitor.muestrear()
+
+    retenido = [bytearray(1024) for _ in range(2000)]
+    reporte = monitor.muestrear()
+
+    linea = reporte['ultimo_intervalo'][0]
+    assert 'test_memoria.py:' in linea['ubicacion']
+    assert linea['crecimiento_kb'] >= 2000
+    assert any(d['ubicacion'].endswith('test_memoria.py') for d in reporte['por_modulo'])
+    assert len(retenido) == 2000
+
+
+def test_borra_reportes_de_workers_muertos(datos):
+    directorio = datos / 'memoria'
+    directorio.mkdir()
+    (directorio / '999999999.json').write_text(json.dumps({'pid': 999999999, 'rss_mb': 1}))
+
+    MonitorMemoria().muestrear()
+
+    assert [r['pid'] for r in reportes_workers()] == [os.getpid()]
+    assert not (directorio / '999999999.json').exists()
+
+
+def test_watchdog_recicla_una_sola_vez(monkeypatch):
+    reciclados = []
+    monkeypatch.setattr(memoria, 'MAX_MB', 1)
+    monkeypatch.setattr(memoria, 'reciclar_worker', lambda: reciclados.append(os.getpid()) or True)
+    monitor = MonitorMemoria()
+
+    monitor.muestrear()
+    monitor.muestrear()
+
+    assert reciclados == [os.getpid()]
+
+
+def test_watchdog_apagado_por_defecto(monkeypatch):
+    monkeypatch.setattr(memoria, 'MAX_MB', 0)
+    monkeypatch.setattr(memoria, 'reciclar_worker', lambda: pytest.fail("no debía reciclar"))
+
+    MonitorMemoria().muestrear()
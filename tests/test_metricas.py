@@ -0,0 +1,107 @@
+"""
+Tests para las métricas Prometheus (utils/metricas.py).
+
+Ejecutar:
+    python -m pytest tests/test_metricas.py -v
+"""
+
+import sys
+import os
+import pytest
+from flask import Flask
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import cache_compartido, metricas
+from utils.cache_compartido import CacheCompartido
+from utils.metricas import _operacion_corta, registrar_en_app
+from utils.tiempos_peticion import medir
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+    app = Flask(__name__)
+    registrar_en_app(app)
+
+    @app.route('/inicio')
+    def inicio():
+        return 'ok'
+
+    @app.route('/limitada')
+    def limitada():
+        return 'demasiadas', 429
+
+    return app
+
+
+def test_operacion_corta_acota_etiquetas():
+    assert _operacion_corta('becas.select.eq.order.range') == 'becas.select'
+    assert _operacion_corta('get_user') == 'get_user'
+    assert _operacion_corta('documentos.create_signed_urls') == 'documentos.create_signed_urls'
+
+
+def test_cache_cuenta_aciertos_y_fallos_por_espacio(tmp_path, monkeypatch):
+    conteos = []
+    monkeypatch.setattr(cache_compartido, 'metricas_disponibles', lambda: True)
+    monkeypatch.setattr(cache_compartido, 'contar_cache', lambda *args: conteos.append(args))
+    cache = CacheCompartido(str(tmp_path / 'cache.sqlite3'))
+    cache.set('firma:a', 1, 60)
+
+    cache.get_many(['firma:a', 'firma:b', 'cedulas:generacion'])
+
+    assert sorted(conteos) == [('cedulas', 0, 1), ('firma', 1, 1)]
+
+
+@pytest.mark.skipif(metricas.metricas_disponibles(), reason="prometheus_client instalado")
+def test_sin_prometheus_las_rutas_siguen_funcionando(app):
+    cliente = app.test_client()
+
+    assert cliente.get('/inicio').status_code == 200
+    assert cliente.get('/metrics').status_code == 503
+
+
+def test_metrics_exige_token_si_esta_configurado(app, monkeypatch):
+    pytest.importorskip('prometheus_client')
+    monkeypatch.setenv('METRICS_TOKEN', 'secreto')
+    cliente = app.test_client()
+
+    assert cliente.get('/metrics').status_code == 401
+    assert cliente.get('/metrics', headers={'Authorization': 'Bearer secreto'}).status_code == 200
+
+
+def test_metrics_sin_token_solo_en_desarrollo(app):
+    pytest.importorskip('prometheus_client')
+    cliente = app.test_client()
+
+    assert cliente.get('/metrics').status_code == 404
+    app.debug = True
+    assert cliente.get('/metrics').status_code == 200
+
+
+def test_metrics_expone_latencias_rechazos_y_documentos(app, monkeypatch):
+    prometheus_client = pytest.importorskip('prometheus_client')
+    registro = prometheus_client.REGISTRY
+    monkeypatch.setenv('METRICS_TOKEN', 'secreto')
+    cliente = app.test_client()
+
+    def valor(nombre, **etiquetas):
+        return registro.get_sample_value(nombre, etiquetas) or 0
+
+    antes = valor('irdebg_http_request_duration_seconds_count', endpoint='inicio', metodo='GET', estado='200')
+    rechazos = valor('irdebg_limiter_rechazos_total', endpoint='limitada')
+    fichas = valor('irdebg_documento_duration_seconds_count', formato='pdf', documento='ficha')
+
+    cliente.get('/inicio')
+    cliente.get('/limitada')
+    with medir('pdf', 'ficha'):
+        pass
+
+    assert valor('irdebg_http_request_duration_seconds_count',
+                 endpoint='inicio', metodo='GET', estado='200') == antes + 1
+    assert valor('irdebg_limiter_rechazos_total', endpoint='limitada') == rechazos + 1
+    assert valor('irdebg_documento_duration_seconds_count', formato='pdf', documento='ficha') == fichas + 1
+    assert valor('irdebg_http_requests_en_curso') == 0
+    assert b'irdebg_http_request_duration_seconds_bucket' in cliente.get('/metrics', headers={'Authorization': 'Bearer secreto'}).data
@@ -0,0 +1,76 @@
+"""
+Tests para el filtro de contraseñas comunes (utils/passwords_comunes.py).
+
+Ejecutar:
+    python -m pytest tests/test_passwords_comunes.py -v
+"""
+
+import sys
+import os
+import pytest
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from config import rutas_datos
+from utils import passwords_comunes
+from utils.passwords_comunes import FiltroPasswords, construir_filtro, es_password_comun
+from utils.password_strength import validar_fortaleza_password
+
+
+@pytest.fixture(autouse=True)
+def datos(tmp_path, monkeypatch):
+    """DATA_DIR aislado y filtro del proceso sin abrir"""
+    monkeypatch.setattr(rutas_datos, 'DATA_DIR', str(tmp_path))
+    monkeypatch.delenv('PASSWORDS_COMUNES_FILTRO', raising=False)
+    monkeypatch.setattr(passwords_comunes, '_filtro', None)
+    monkeypatch.setattr(passwords_comunes, '_cargado', False)
+    return tmp_path
+
+
+@pytest.fixture
+def filtro(datos):
+    lista = ['Tigre2024', 'Caracas123', 'Guayana.77'] + [f'filtrada{i}' for i in range(2000)]
+    construir_filtro(lista, passwords_comunes.ruta_filtro(), capacidad=len(lista))
+    return passwords_comunes.ruta_filtro()
+
+
+def test_filtro_compilado_sin_falsos_negativos(filtro):
+    abierto = FiltroPasswords(filtro)
+
+    assert abierto.entradas == 2003
+    assert all(f'filtrada{i}' in abierto for i in range(2000))
+    # Sin distinguir mayúsculas
+    assert 'TIGRE2024' in abierto
+    assert 'tigre2024' in abierto
+
+
+def test_es_password_comun_usa_el_filtro(filtro):
+    assert es_password_comun('Caracas123')
+    assert es_password_comun('Password1')  # lista mínima incorporada
+    assert not es_password_comun('Xq7#Lm2!vRp9')
+    assert not es_password_comun('')
+
+
+def test_sin_archivo_usa_lista_minima():
+    assert es_password_comun('Qwerty123')
+    assert not es_password_comun('Caracas123')
+    assert passwords_comunes.obtener_filtro() is None
+
+
+def test_archivo_invalido_no_rompe_la_validacion(datos):
+    with open(passwords_comunes.ruta_filtro(), 'wb') as f:
+        f.write(b'no es un filtro' * 10)
+
+    assert not es_password_comun('Caracas123')
+    assert es_password_comun('password123')
+
+
+def test_validar_fortaleza_rechaza_password_comun(filtro):
+    es_valida, errores, nivel = validar_fortaleza_password('Caracas123')
+
+    assert not es_valida
+    assert any('común' in e for e in errores)
+    assert nivel <= 20
+
+    assert validar_fortaleza_password('MiPassword123!')[0]
@@ -0,0 +1,93 @@
+"""
+Tests para el perfilado bajo demanda (utils/perfilador.py).
+
+Ejecutar:
+    python -m pytest tests/test_perfilador.py -v
+"""
+
+import sys
+import os
+import pytest
+from flask import Flask
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from config import rutas_datos
+from utils import perfilador
+from utils.perfilador import generar_token, leer_reporte, listar_perfiles, ruta_pstats, verificar_token
+
+SECRETO = 'secreto-de-prueba'
+
+
+@pytest.fixture(autouse=True)
+def datos(tmp_path, monkeypatch):
+    """DATA_DIR aislado"""
+    monkeypatch.setattr(rutas_datos, 'DATA_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def cliente():
+    app = Flask(__name__)
+    app.secret_key = SECRETO
+    perfilador.registrar_en_app(app)
+
+    @app.route('/lenta')
+    def lenta():
+        return str(sum(i * i for i in range(20000)))
+
+    return app.test_client()
+
+
+def test_token_firmado_y_con_vencimiento(monkeypatch):
+    token = generar_token(SECRETO, 'admin-1')
+
+    assert verificar_token(SECRETO, token) == 'admin-1'
+    assert verificar_token('otro-secreto', token) is None
+    assert verificar_token(SECRETO, token + 'x') is None
+    monkeypatch.setattr(perfilador, 'TTL_TOKEN', -1)
+    assert verificar_token(SECRETO, token) is None
+
+
+def test_sin_token_no_perfila(cliente):
+    respuesta = cliente.get('/lenta')
+
+    assert 'X-Perfil' not in respuesta.headers
+    assert listar_perfiles() == []
+
+
+def test_token_invalido_no_perfila(cliente):
+    respuesta = cliente.get('/lenta', headers={'X-Perfilar': 'falso'})
+
+    assert 'X-Perfil' not in respuesta.headers
+    assert listar_perfiles() == []
+
+
+def test_perfila_la_request_con_token(cliente):
+    token = generar_token(SECRETO, 'admin-1')
+
+    respuesta = cliente.get(f'/lenta?_perfilar={token}')
+
+    perfil_id = respuesta.headers['X-Perfil']
+    perfil, = listar_perfiles()
+    assert perfil['id'] == perfil_id
+    assert perfil['ruta'] == '/lenta'
+    assert perfil['usuario'] == 'admin-1'
+    assert perfil['estado'] == 200
+    assert 'lenta' in leer_reporte(perfil_id)
+    assert os.path.getsize(ruta_pstats(perfil_id)) > 0
+
+
+def test_conserva_solo_los_ultimos(cliente, monkeypatch):
+    monkeypatch.setattr(perfilador, 'MAX_PERFILES', 2)
+    token = generar_token(SECRETO, 'admin-1')
+
+    ids = [cliente.get('/lenta', headers={'X-Perfilar': token}).headers['X-Perfil'] for _ in range(4)]
+
+    assert [p['id'] for p in listar_perfiles()] == ids[:1:-1]
+
+
+def test_ids_invalidos_no_salen_del_directorio():
+    assert leer_reporte('../../etc/passwd') is None
+    assert ruta_pstats('../app') is None
@@ -0,0 +1,131 @@
+"""
+Tests para el procesamiento de imágenes de galería (utils/procesador_imagenes.py)
+y sus trabajos en segundo plano (utils/galeria.py).
+
+Ejecutar:
+    python -m pytest tests/test_procesador_imagenes.py -v
+"""
+
+import sys
+import os
+import pytest
+from concurrent.futures import Future
+from io import BytesIO
+from unittest.mock import patch
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from PIL import Image
+
+from utils import cache_compartido, galeria, procesador_imagenes
+from utils.cache_compartido import CacheCompartido
+from utils.procesador_imagenes import ImagenInvalida, procesar_imagen_galeria
+
+
+def crear_imagen(tamano, formato='JPEG', modo='RGB', orientacion=None):
+    img = Image.new(modo, tamano, (200, 30, 30, 128) if modo == 'RGBA' else (200, 30, 30))
+    buffer = BytesIO()
+    kwargs = {}
+    if orientacion:
+        exif = Image.Exif()
+        exif[0x0112] = orientacion
+        kwargs['exif'] = exif
+    img.save(buffer, format=formato, **kwargs)
+    return buffer.getvalue()
+
+
+def abrir(datos):
+    return Image.open(BytesIO(datos))
+
+
+# ============================================
+# PROCESAMIENTO
+# ============================================
+
+def test_foto_grande_se_reduce_a_la_caja():
+    img = abrir(procesar_imagen_galeria(crear_imagen((4000, 3000))))
+    assert img.format == 'JPEG'
+    assert img.size == (800, 600)
+
+
+def test_imagen_pequena_no_se_agranda():
+    assert abrir(procesar_imagen_galeria(crear_imagen((300, 200)))).size == (300, 200)
+
+
+def test_orientacion_exif_aplicada():
+    """Foto vertical guardada acostada con orientación EXIF 6"""
+    img = abrir(procesar_imagen_galeria(crear_imagen((4000, 3000), orientacion=6)))
+    assert img.size == (750, 1000)
+
+
+def test_png_transparente_a_rgb():
+    img = abrir(procesar_imagen_galeria(crear_imagen((1000, 1000), formato='PNG', modo='RGBA')))
+    assert img.mode == 'RGB'
+
+
+def test_bomba_de_descompresion_rechazada(monkeypatch):
+    monkeypatch.setattr(procesador_imagenes, 'MAX_PIXELES', 1_000_000)
+    with pytest.raises(ImagenInvalida):
+        procesar_imagen_galeria(crear_imagen((2000, 1000)))
+
+
+def test_archivo_no_imagen_rechazado():
+    with pytest.raises(ImagenInvalida):
+        procesar_imagen_galeria(b"esto no es una imagen")
+
+
+def test_pool_lleno_rechaza(monkeypatch):
+    import threading
+    monkeypatch.setattr(procesador_imagenes, '_pendientes', threading.BoundedSemaphore(1))
+    procesador_imagenes._pendientes.acquire()
+    with pytest.raises(procesador_imagenes.ProcesadorOcupado):
+        procesador_imagenes.enviar_procesamiento(b"")
+
+
+# ============================================
+# TRABAJOS
+# ============================================
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = CacheCompartido(str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(cache_compartido, '_cache', cache)
+    return cache
+
+
+def procesamiento_inmediato(resultado=None, error=None):
+    def enviar_procesamiento(datos):
+        futuro = Future()
+        if error:
+            futuro.set_exception(error)
+        else:
+            futuro.set_result(resultado)
+        return futuro
+    return enviar_procesamiento
+
+
+@patch('utils.galeria.enviar', side_effect=lambda fn, *args: fn(*args))
+@patch('utils.galeria.asignar_slots')
+@patch('utils.galeria.subir_imagen_galeria', return_value='https://x/gallery/abc.jpg')
+def test_trabajo_completo(mock_subir, mock_asignar, _enviar, cache, monkeypatch):
+    monkeypatch.setattr(galeria, 'enviar_procesamiento', procesamiento_inmediato(b'jpeg'))
+
+    job_id = galeria.iniciar_trabajo('home_1', b'original', 'foto.jpg')
+
+    mock_subir.assert_called_once_with(b'jpeg', 'foto.jpg')
+    mock_asignar.assert_called_once_with({'home_1': 'https://x/gallery/abc.jpg'})
+    assert galeria.estado_trabajo(job_id) == {'estado': 'listo', 'slot': 'home_1', 'url': 'https://x/gallery/abc.jpg'}
+
+
+@patch('utils.galeria.enviar', side_effect=lambda fn, *args: fn(*args))
+@patch('utils.galeria.subir_imagen_galeria')
+def test_trabajo_con_imagen_invalida(mock_subir, _enviar, cache, monkeypatch):
+    monkeypatch.setattr(galeria, 'enviar_procesamiento', procesamiento_inmediato(error=ImagenInvalida('muy grande')))
+
+    job_id = galeria.iniciar_trabajo('left_1', b'x', 'foto.jpg')
+
+    mock_subir.assert_not_called()
+    estado = galeria.estado_trabajo(job_id)
+    assert estado['estado'] == 'error'
+    assert estado['error'] == 'muy grande'
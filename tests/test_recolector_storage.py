@@ -0,0 +1,131 @@
+"""
+Tests para el recolector de objetos huérfanos (utils/recolector_storage.py).
+
+Ejecutar:
+    python -m pytest tests/test_recolector_storage.py -v
+"""
+
+import sys
+import os
+import pytest
+from datetime import timedelta
+from unittest.mock import MagicMock, Mock
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils import almacenamiento_cas
+from utils.almacenamiento_cas import IndiceHashLocal
+from utils import recolector_storage
+from utils.recolector_storage import ConjuntoCompacto, recolectar
+
+BASE = "https://x.supabase.co/storage/v1/object/public/becas-public/"
+VIEJO = "2020-01-01T00:00:00Z"
+NUEVO = "2999-01-01T00:00:00Z"
+
+
+@pytest.fixture(autouse=True)
+def indice(tmp_path, monkeypatch):
+    indice = IndiceHashLocal(str(tmp_path / 'indice.sqlite3'))
+    monkeypatch.setattr(almacenamiento_cas, '_indice_local', indice)
+    return indice
+
+
+def crear_cliente(filas_por_tabla, objetos_por_carpeta):
+    """Cliente falso: tablas con filas fijas y un bucket con carpetas planas."""
+    cliente = MagicMock()
+
+    def tabla(nombre):
+        query = MagicMock()
+        for metodo in ('select', 'order', 'limit', 'gt', 'eq', 'in_', 'delete'):
+            getattr(query, metodo).return_value = query
+        query.execute.return_value = Mock(data=filas_por_tabla.get(nombre, []))
+        return query
+
+    cliente.table.side_effect = tabla
+    bucket = cliente.storage.from_.return_value
+    bucket.list.side_effect = lambda prefijo, opciones: (
+        objetos_por_carpeta.get(prefijo, [])[opciones['offset']:opciones['offset'] + opciones['limit']]
+    )
+    return cliente, bucket
+
+
+def test_conjunto_compacto():
+    conjunto = ConjuntoCompacto()
+    for i in range(1000):
+        conjunto.agregar('becas-public', f'imagenes/{i}.jpg')
+    conjunto.agregar('becas-public', 'imagenes/1.jpg')  # Duplicado
+    conjunto.congelar()
+
+    assert len(conjunto) == 1000
+    assert conjunto.bytes_usados() == 8000
+    assert ('becas-public', 'imagenes/999.jpg') in conjunto
+    assert ('becas-public', 'imagenes/1000.jpg') not in conjunto
+    assert ('otro-bucket', 'imagenes/1.jpg') not in conjunto
+
+
+def test_recolectar_elimina_solo_huerfanos_viejos(indice):
+    filas = {
+        'becas': [{'id': 1, 'foto': BASE + 'imagenes/usada.jpg'}, {'id': 2, 'foto': None}],
+        'documentos': [{'id': 1, 'archivo': BASE + 'documentos/doc.pdf'}],
+        'gallery_images': [{'id': 1, 'image_data': 'data:image/png;base64,AAAA'}],
+    }
+    objetos = {
+        'imagenes': [
+            {'id': 'a', 'name': 'usada.jpg', 'created_at': VIEJO},
+            {'id': 'b', 'name': 'huerfana.jpg', 'created_at': VIEJO},
+            {'id': 'c', 'name': 'recien_subida.jpg', 'created_at': NUEVO},
+        ],
+        'documentos': [{'id': 'd', 'name': 'doc.pdf', 'created_at': VIEJO}],
+    }
+    cliente, bucket = crear_cliente(filas, objetos)
+    indice.registrar('becas-public', 'imagenes/huerfana.jpg')
+
+    resultado = recolectar(cliente, prefijos=('imagenes', 'documentos'), lotes_por_segundo=0)
+
+    bucket.remove.assert_called_once_with(['imagenes/huerfana.jpg'])
+    assert resultado.revisados == 4
+    assert resultado.eliminados == 1
+    assert resultado.retenidos_por_gracia == 1
+    assert not indice.contiene('becas-public', 'imagenes/huerfana.jpg')
+
+
+def test_recolectar_dry_run_no_borra():
+    objetos = {'imagenes': [{'id': 'a', 'name': f'{i}.jpg', 'created_at': VIEJO} for i in range(5)]}
+    cliente, bucket = crear_cliente({}, objetos)
+
+    resultado = recolectar(cliente, prefijos=('imagenes',), dry_run=True)
+
+    bucket.remove.assert_not_called()
+    assert resultado.huerfanos == 5
+    assert resultado.rutas_huerfanas[0] == 'imagenes/0.jpg'
+
+
+def test_recolectar_borra_en_lotes():
+    objetos = {'imagenes': [{'id': str(i), 'name': f'{i}.jpg', 'created_at': VIEJO} for i in range(25)]}
+    cliente, bucket = crear_cliente({}, objetos)
+
+    resultado = recolectar(cliente, prefijos=('imagenes',), tamano_lote=10,
+                           lotes_por_segundo=0, gracia=timedelta(0))
+
+    assert [len(c.args[0]) for c in bucket.remove.call_args_list] == [10, 10, 5]
+    assert resultado.eliminados == 25
+
+
+def test_borrar_no_salta_objetos_de_las_paginas_siguientes(monkeypatch):
+    """Storage pagina por offset: borrar mientras se lista correría las páginas"""
+    monkeypatch.setattr(recolector_storage, 'TAMANO_PAGINA', 10)
+    objetos = {'imagenes': [{'id': str(i), 'name': f'{i:02}.jpg', 'created_at': VIEJO} for i in range(25)]}
+    cliente, bucket = crear_cliente({}, objetos)
+
+    def remove(rutas):
+        nombres = {r.split('/', 1)[1] for r in rutas}
+        objetos['imagenes'] = [o for o in objetos['imagenes'] if o['name'] not in nombres]
+
+    bucket.remove.side_effect = remove
+
+    resultado = recolectar(cliente, prefijos=('imagenes',), tamano_lote=10,
+                           lotes_por_segundo=0, gracia=timedelta(0))
+
+    assert resultado.eliminados == 25
+    assert objetos['imagenes'] == []
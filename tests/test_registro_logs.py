@@ -0,0 +1,111 @@
+"""
+Tests para la configuración de logging (config/registro_logs.py).
+
+Ejecutar:
+    python -m pytest tests/test_registro_logs.py -v
+"""
+
+import sys
+import os
+import json
+import logging
+import pytest
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from config.registro_logs import FiltroMuestreo, FormatoJSON, configurar_logging, detener_logging
+
+
+def crear_record(nivel=logging.INFO, nombre='utils.prueba', msg='hola %s', args=('mundo',), **extra):
+    record = logging.LogRecord(nombre, nivel, __file__, 10, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def archivo(tmp_path, monkeypatch):
+    """Logging configurado hacia un archivo temporal; restaura el logger raíz al terminar"""
+    ruta = tmp_path / 'logs' / 'app.log'
+    monkeypatch.setenv('LOG_ARCHIVO', str(ruta))
+    monkeypatch.setenv('LOG_NIVELES', 'utils.ruidoso=WARNING')
+    monkeypatch.setenv('LOG_MUESTREO', 'utils.muestreado=0')
+    raiz = logging.getLogger()
+    nivel = raiz.level
+    yield ruta
+    detener_logging()
+    raiz.setLevel(nivel)
+    logging.getLogger('utils.ruidoso').setLevel(logging.NOTSET)
+
+
+def leer_lineas(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return [json.loads(linea) for linea in f]
+
+
+def test_formato_json_incluye_extra_y_traza():
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        record = crear_record(beca_id=7)
+        record.exc_info = sys.exc_info()
+
+    linea = json.loads(FormatoJSON().format(record))
+
+    assert linea['msg'] == 'hola mundo'
+    assert linea['nivel'] == 'INFO'
+    assert linea['logger'] == 'utils.prueba'
+    assert linea['beca_id'] == 7
+    assert 'ZeroDivisionError' in linea['exc']
+
+
+def test_muestreo_solo_afecta_debug_de_los_modulos_configurados():
+    filtro = FiltroMuestreo({'utils': 0, 'utils.vip': 1})
+
+    assert not filtro.filter(crear_record(logging.DEBUG, 'utils.x'))
+    assert filtro.filter(crear_record(logging.DEBUG, 'utils.vip.y'))
+    assert filtro.filter(crear_record(logging.INFO, 'utils.x'))
+    assert filtro.filter(crear_record(logging.DEBUG, 'blueprints.dashboard'))
+    # Muestreo pedido por el propio registro
+    assert not filtro.filter(crear_record(logging.WARNING, 'otro', muestreo=0))
+
+
+def test_configurar_logging_escribe_json_rotativo(archivo):
+    configurar_logging()
+    logging.getLogger('utils.prueba').info("Atleta registrado", extra={'beca_id': 3})
+    logging.getLogger('utils.ruidoso').info("descartado por nivel")
+    logging.getLogger('utils.ruidoso').warning("conservado")
+    logging.getLogger('utils.muestreado').setLevel(logging.DEBUG)
+    logging.getLogger('utils.muestreado').debug("descartado por muestreo")
+    try:
+        raise ValueError("falla")
+    except ValueError:
+        logging.getLogger('utils.prueba').exception("Error en crear_beca")
+    detener_logging()
+
+    lineas = leer_lineas(archivo)
+    mensajes = [l['msg'] for l in lineas]
+    assert mensajes == ["Atleta registrado", "conservado", "Error en crear_beca"]
+    assert lineas[0]['beca_id'] == 3
+    assert 'ValueError: falla' in lineas[2]['exc']
+    logging.getLogger('utils.muestreado').setLevel(logging.NOTSET)
+
+
+def test_configurar_dos_veces_no_duplica(archivo):
+    configurar_logging()
+    configurar_logging()
+    logging.getLogger('utils.prueba').warning("una vez")
+    detener_logging()
+
+    assert [l['msg'] for l in leer_lineas(archivo)] == ["una vez"]
+
+
+def test_archivo_por_proceso(archivo, monkeypatch):
+    """Con {pid} cada worker de gunicorn rota su propio archivo"""
+    monkeypatch.setenv('LOG_ARCHIVO', str(archivo.parent / 'app.{pid}.log'))
+    configurar_logging()
+    logging.getLogger('utils.prueba').warning("de este proceso")
+    detener_logging()
+
+    propio = archivo.parent / f'app.{os.getpid()}.log'
+    assert [l['msg'] for l in leer_lineas(propio)] == ["de este proceso"]
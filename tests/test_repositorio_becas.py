@@ -0,0 +1,79 @@
+"""
+Tests para la consulta embebida de atletas (utils/repositorio_becas.py).
+
+Ejecutar:
+    python -m pytest tests/test_repositorio_becas.py -v
+"""
+
+import sys
+import os
+import pytest
+from unittest.mock import Mock, MagicMock, patch
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from postgrest.exceptions import APIError
+from utils import repositorio_becas
+from utils.repositorio_becas import obtener_atleta_completo
+
+
+@pytest.fixture(autouse=True)
+def relaciones_disponibles(monkeypatch):
+    monkeypatch.setattr(repositorio_becas, '_relaciones_no_disponibles_desde', None)
+
+
+@patch('utils.repositorio_becas.supabase')
+def test_una_sola_consulta_embebida(mock_supabase):
+    """Atleta, medallas y documentos llegan en una respuesta"""
+    query = MagicMock()
+    query.select.return_value = query
+    query.eq.return_value = query
+    query.order.return_value = query
+    query.limit.return_value = query
+    query.execute.return_value = Mock(data=[{'id': 7, 'medallas': [{'id': 1}], 'documentos': []}])
+    mock_supabase.table.return_value = query
+
+    beca = obtener_atleta_completo(7)
+
+    assert beca['medallas'] == [{'id': 1}]
+    mock_supabase.table.assert_called_once_with('becas')
+    query.select.assert_called_once_with('*,medallas(*),documentos(*)')
+    query.order.assert_any_call('created_at', desc=True, foreign_table='medallas')
+    assert query.execute.call_count == 1
+
+
+@patch('utils.repositorio_becas.supabase')
+def test_atleta_inexistente(mock_supabase):
+    mock_supabase.table.return_value.select.return_value.eq.return_value \
+        .order.return_value.order.return_value.limit.return_value.execute.return_value = Mock(data=[])
+    assert obtener_atleta_completo(999) is None
+
+
+@patch('utils.repositorio_becas.supabase')
+def test_sin_relacion_usa_consultas_separadas(mock_supabase):
+    """Si PostgREST no conoce la relación (PGRST200) se consulta tabla por tabla"""
+    datos = {
+        'becas': [{'id': 7, 'nombre': 'Ana'}],
+        'medallas': [{'id': 1}],
+        'documentos': [{'id': 2}],
+    }
+
+    def tabla(nombre):
+        query = MagicMock()
+        for metodo in ('select', 'eq', 'order', 'limit'):
+            getattr(query, metodo).return_value = query
+        if nombre == 'becas' and not tabla.fallo:
+            tabla.fallo = True
+            query.execute.side_effect = APIError({'code': 'PGRST200', 'message': 'Could not find a relationship'})
+        else:
+            query.execute.return_value = Mock(data=datos[nombre])
+        return query
+    tabla.fallo = False
+    mock_supabase.table.side_effect = tabla
+
+    beca = obtener_atleta_completo(7)
+
+    assert beca == {'id': 7, 'nombre': 'Ana', 'medallas': [{'id': 1}], 'documentos': [{'id': 2}]}
+    # La relación queda marcada como no disponible para las siguientes consultas
+    assert repositorio_becas._relaciones_no_disponibles_desde is not None
@@ -0,0 +1,213 @@
+"""
+Tests para el Supabase local en proceso (utils/supabase_local.py).
+
+Ejecutar:
+    python -m pytest tests/test_supabase_local.py -v
+"""
+
+import sys
+import os
+import time
+import pytest
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from gotrue.errors import AuthApiError
+from postgrest.exceptions import APIError
+from storage3.exceptions import StorageApiError
+
+from utils import repositorio_becas
+from utils.supabase_local import SupabaseLocal, verificar_jwt
+
+
+@pytest.fixture
+def servicio(tmp_path):
+    servicio = SupabaseLocal(str(tmp_path))
+    servicio.cargar({
+        'becas': [
+            {'nombre': 'Ana', 'apellido': 'Pérez', 'cedula': 'V-1', 'estatus': 'Activo', 'disciplina': 'Judo'},
+            {'nombre': 'Ángel', 'apellido': 'Ruiz', 'cedula': 'V-2', 'estatus': 'Activo', 'disciplina': None},
+            {'nombre': 'Luis', 'apellido': 'Mora', 'cedula': 'V-3', 'estatus': 'En Revisión', 'disciplina': 'Boxeo'},
+        ],
+        'medallas': [
+            {'atleta_id': 1, 'tipo': 'oro', 'created_at': '2024-01-01'},
+            {'atleta_id': 1, 'tipo': 'plata', 'created_at': '2024-06-01'},
+        ],
+    })
+    return servicio
+
+
+@pytest.fixture
+def cliente(servicio):
+    return servicio.crear_cliente()
+
+
+def test_filtros_orden_y_conteo(cliente):
+    res = cliente.table('becas').select('id,nombre', count='exact').eq('estatus', 'Activo') \
+        .order('id', desc=True).range(0, 0).execute()
+
+    assert res.data == [{'id': 2, 'nombre': 'Ángel'}]
+    assert res.count == 2
+    # ilike sin distinguir mayúsculas ni en letras con tilde
+    buscados = cliente.table('becas').select('id').or_('nombre.ilike.%ÁNG%,apellido.ilike.%mora%').execute()
+    assert [f['id'] for f in buscados.data] == [2, 3]
+    assert cliente.table('becas').select('id').not_.is_('disciplina', 'null').lt('id', 3).execute().data == [{'id': 1}]
+    assert cliente.table('becas').select('id').eq('id', '3').single().execute().data == {'id': 3}
+
+
+def test_single_sin_filas_es_error_de_postgrest(cliente):
+    with pytest.raises(APIError) as error:
+        cliente.table('becas').select('*').eq('id', 99).single().execute()
+
+    assert error.value.code == 'PGRST116'
+    assert cliente.table('becas').select('*').eq('id', 99).maybe_single().execute() is None
+
+
+def test_upsert_y_llave_unica(cliente, servicio):
+    cliente.table('becas').upsert([{'cedula': 'V-1', 'estatus': 'Inactivo'}, {'cedula': 'V-4', 'nombre': 'Eva'}],
+                                  on_conflict='cedula').execute()
+
+    filas = {f['cedula']: f for f in servicio.filas('becas')}
+    assert filas['V-1']['estatus'] == 'Inactivo' and filas['V-1']['nombre'] == 'Ana'
+    assert filas['V-4']['id'] == 4
+    with pytest.raises(APIError) as error:
+        cliente.table('becas').insert({'cedula': 'V-4'}).execute()
+    assert error.value.code == '23505'
+
+
+def test_update_y_delete_devuelven_las_filas(cliente, servicio):
+    actualizadas = cliente.table('becas').update({'estatus': 'Inactivo'}).in_('id', [1, 3]).execute().data
+    borradas = cliente.table('medallas').delete().match({'atleta_id': 1, 'tipo': 'oro'}).execute().data
+
+    assert sorted(f['id'] for f in actualizadas) == [1, 3]
+    assert [m['tipo'] for m in borradas] == ['oro']
+    assert [m['tipo'] for m in servicio.filas('medallas')] == ['plata']
+
+
+def test_repositorio_con_relaciones_en_una_consulta(cliente, servicio, monkeypatch):
+    monkeypatch.setattr(repositorio_becas, 'supabase', cliente)
+
+    beca = repositorio_becas.obtener_atleta_completo(1)
+
+    assert [m['tipo'] for m in beca['medallas']] == ['plata', 'oro']
+    assert beca['documentos'] == []
+    assert servicio.red.llamadas == 1
+
+
+def test_relacion_inexistente_como_postgrest(cliente):
+    with pytest.raises(APIError) as error:
+        cliente.table('becas').select('*, profiles(*)').execute()
+
+    assert error.value.code == 'PGRST200'
+
+
+def test_iterar_becas_pagina_por_id(cliente, servicio, monkeypatch):
+    monkeypatch.setattr(repositorio_becas, 'supabase', cliente)
+
+    ids = [b['id'] for b in repositorio_becas.iterar_becas('id', tamano_pagina=2, estatus='Activo')]
+
+    assert ids == [2, 1]
+    assert servicio.red.llamadas == 2
+
+
+def test_rpc_de_referencias(cliente, servicio):
+    params = {'p_bucket': 'becas-public', 'p_path': 'imagenes/a.jpg'}
+
+    assert cliente.rpc('storage_ref_incrementar', params).execute().data == 1
+    assert cliente.rpc('storage_ref_incrementar', params).execute().data == 2
+    assert cliente.rpc('storage_ref_decrementar', params).execute().data == 1
+    assert cliente.rpc('storage_ref_decrementar', params).execute().data == 0
+    assert servicio.filas('storage_refs') == []
+    with pytest.raises(APIError):
+        cliente.rpc('no_existe')
+
+
+def test_registro_login_y_recuperacion(cliente, servicio):
+    registro = cliente.auth.sign_up({'email': 'ana@correo.com', 'password': 'Clave-123',
+                                     'options': {'data': {'first_name': 'Ana'}}})
+    uid = registro.user.id
+
+    assert servicio.filas('profiles')[0]['id'] == uid
+    with pytest.raises(AuthApiError):
+        cliente.auth.sign_in_with_password({'email': 'ana@correo.com', 'password': 'otra'})
+    sesion = cliente.auth.sign_in_with_password({'email': 'ANA@correo.com', 'password': 'Clave-123'}).session
+    assert verificar_jwt(sesion.access_token)['sub'] == uid
+    assert cliente.auth.get_user().user.user_metadata == {'first_name': 'Ana'}
+
+    cliente.auth.sign_out()
+    cliente.auth.reset_password_email('ana@correo.com')
+    recuperacion = cliente.auth.exchange_code_for_session({'auth_code': servicio.codigo_enviado('ana@correo.com')})
+    cliente.auth.set_session(recuperacion.session.access_token, recuperacion.session.refresh_token)
+    cliente.auth.update_user({'password': 'Nueva-456'})
+    assert cliente.auth.sign_in_with_password({'email': 'ana@correo.com', 'password': 'Nueva-456'}).user.id == uid
+
+
+def test_otp_por_telefono(cliente, servicio):
+    cliente.auth.sign_in_with_otp({'phone': '+584141234567'})
+
+    with pytest.raises(AuthApiError):
+        cliente.auth.verify_otp({'phone': '+584141234567', 'token': '000000x', 'type': 'sms'})
+    respuesta = cliente.auth.verify_otp({'phone': '+584141234567', 'type': 'sms',
+                                         'token': servicio.codigo_enviado('+584141234567')})
+    assert respuesta.user.phone == '+584141234567'
+
+
+def test_storage_en_disco_con_urls_firmadas(cliente, servicio):
+    bucket = cliente.storage.from_('becas-public')
+    bucket.upload('imagenes/a.jpg', b'jpeg', {'content-type': 'image/jpeg'})
+
+    with pytest.raises(StorageApiError) as error:
+        bucket.upload('imagenes/a.jpg', b'otro')
+    assert error.value.status == 409
+    assert bucket.list() == [{'name': 'imagenes', 'id': None, 'created_at': None, 'updated_at': None,
+                              'metadata': None}]
+    assert [o['name'] for o in bucket.list('imagenes')] == ['a.jpg']
+
+    firmadas = bucket.create_signed_urls(['imagenes/a.jpg', 'imagenes/no.jpg'], 60)
+    assert servicio.leer_url_firmada(firmadas[0]['signedURL']) == b'jpeg'
+    assert firmadas[1]['error']
+    with pytest.raises(StorageApiError):
+        servicio.leer_url_firmada(firmadas[0]['signedURL'].replace('a.jpg', 'b.jpg'))
+
+    assert bucket.remove(['imagenes/a.jpg'])[0]['name'] == 'imagenes/a.jpg'
+    with pytest.raises(StorageApiError):
+        bucket.download('imagenes/a.jpg')
+
+
+def test_rutas_fuera_del_bucket(cliente):
+    with pytest.raises(StorageApiError):
+        cliente.storage.from_('becas-public').upload('../fuera.txt', b'x')
+
+
+def test_latencia_y_fallos_inyectados(tmp_path):
+    servicio = SupabaseLocal(str(tmp_path), latencia=0.02)
+    cliente = servicio.crear_cliente()
+
+    inicio = time.perf_counter()
+    cliente.table('becas').select('*').execute()
+    assert time.perf_counter() - inicio >= 0.02
+
+    servicio.red.fallar_proximas(1, 'storage')
+    cliente.table('becas').select('*').execute()
+    with pytest.raises(StorageApiError):
+        cliente.storage.from_('becas-public').list()
+    assert servicio.red.por_servicio == {'postgrest': 2, 'storage': 1}
+
+
+def test_fallos_aleatorios_reproducibles(tmp_path):
+    def corrida(directorio):
+        cliente = SupabaseLocal(str(directorio), tasa_fallos=0.3, semilla=7).crear_cliente()
+        resultados = []
+        for _ in range(30):
+            try:
+                cliente.table('becas').select('*').execute()
+                resultados.append(True)
+            except APIError:
+                resultados.append(False)
+        return resultados
+
+    primera = corrida(tmp_path / 'a')
+
+    assert primera == corrida(tmp_path / 'b')
+    assert 0 < primera.count(False) < 30
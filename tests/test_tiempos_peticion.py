@@ -0,0 +1,129 @@
+"""
+Tests para la medición de llamadas por request (utils/tiempos_peticion.py).
+
+Ejecutar:
+    python -m pytest tests/test_tiempos_peticion.py -v
+"""
+
+import sys
+import os
+import contextvars
+import logging
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, render_template_string
+
+# Agregar el directorio project al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project'))
+
+from utils.concurrencia import ejecutar_en_paralelo
+from utils.tiempos_peticion import (
+    ClienteMedido, encabezado_server_timing, envolver_cliente, iniciar_medicion, medicion_actual, medir,
+    registrar_en_app,
+)
+
+
+class ConsultaFalsa:
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.not_ = self
+
+    def __getattr__(self, nombre):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=[{'tabla': self.tabla}])
+
+
+class ClienteFalso:
+    def __init__(self):
+        self.auth = SimpleNamespace(get_user=lambda: 'usuario', admin=SimpleNamespace(list_users=lambda: []))
+        self.storage = SimpleNamespace(
+            from_=lambda bucket: SimpleNamespace(create_signed_url=lambda ruta, expira: {'signedURL': ruta}))
+        self.url = 'https://local'
+
+    def table(self, nombre):
+        return ConsultaFalsa(nombre)
+
+
+@pytest.fixture
+def cliente():
+    return envolver_cliente(ClienteFalso())
+
+
+def test_envolver_conserva_none_y_no_duplica(cliente):
+    assert envolver_cliente(None) is None
+    assert envolver_cliente(cliente) is cliente
+    assert isinstance(cliente, ClienteMedido)
+    assert cliente.url == 'https://local'
+
+
+def test_cuenta_postgrest_gotrue_y_storage(cliente):
+    tiempos = iniciar_medicion()
+
+    respuesta = cliente.table('becas').select('*').not_.is_('foto', 'null').eq('id', 1).execute()
+    cliente.table('medallas').select('*').execute()
+    cliente.auth.get_user()
+    cliente.auth.admin.list_users()
+    cliente.storage.from_('documentos').create_signed_url('a.pdf', 60)
+
+    assert respuesta.data == [{'tabla': 'becas'}]
+    assert tiempos.categorias['postgrest'][0] == 2
+    assert tiempos.categorias['gotrue'][0] == 2
+    assert tiempos.categorias['storage'][0] == 1
+    operaciones = [op for _, op, _ in tiempos.eventos]
+    assert operaciones[0] == 'becas.select.not_.is_.eq'
+    assert 'admin.list_users' in operaciones
+    assert 'documentos.create_signed_url' in operaciones
+
+
+def test_tareas_en_paralelo_suman_a_la_request(cliente):
+    tiempos = iniciar_medicion()
+
+    ejecutar_en_paralelo({f't{i}': (lambda: cliente.table('becas').select('id').execute()) for i in range(4)})
+
+    assert tiempos.categorias['postgrest'][0] == 4
+
+
+def test_fuera_de_request_no_registra(cliente):
+    iniciar_medicion()
+    contexto = contextvars.Context()
+
+    contexto.run(lambda: cliente.table('becas').execute())
+
+    assert 'postgrest' not in medicion_actual().categorias
+
+
+def test_encabezado_server_timing():
+    tiempos = iniciar_medicion()
+    with medir('xlsx'):
+        pass
+    tiempos.registrar('postgrest', 0.0123)
+    tiempos.registrar('postgrest', 0.001)
+
+    encabezado = encabezado_server_timing(tiempos)
+
+    assert encabezado.startswith('postgrest;dur=13.3;desc="x2", xlsx;dur=')
+    assert ', total;dur=' in encabezado
+
+
+def test_app_emite_server_timing_y_log_de_acceso(cliente, caplog):
+    app = Flask(__name__)
+    registrar_en_app(app)
+
+    @app.route('/ficha')
+    def ficha():
+        filas = cliente.table('becas').select('*').execute().data
+        return render_template_string('{{ filas|length }}', filas=filas)
+
+    with caplog.at_level(logging.INFO, logger='acceso'):
+        respuesta = app.test_client().get('/ficha')
+
+    encabezado = respuesta.headers['Server-Timing']
+    assert 'postgrest;dur=' in encabezado and 'desc="x1"' in encabezado
+    assert 'jinja;dur=' in encabezado
+    acceso = [r for r in caplog.records if r.name == 'acceso'][0]
+    assert acceso.estado == 200
+    assert acceso.postgrest_n == 1
+    assert acceso.endpoint == 'ficha'